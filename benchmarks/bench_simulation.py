@@ -0,0 +1,80 @@
+"""
+Benchmark del paso de simulación vectorizado
+
+Construye una red en cuadrícula de ~50k tuberías y mide el tiempo por
+paso de WaterNetwork.update_simulation. Objetivo: menos de 10 ms por paso.
+
+Uso: python benchmarks/bench_simulation.py [--pipes 50000] [--steps 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from models.network import WaterNetwork
+
+TARGET_MS = 10.0
+
+
+def build_grid_network(num_pipes: int, num_tanks: int = 4) -> WaterNetwork:
+    """Red en cuadrícula con tanques en el borde y barrios intercalados"""
+    side = int(np.ceil(np.sqrt(num_pipes / 2))) + 1
+    network = WaterNetwork()
+    for row in range(side):
+        for col in range(side):
+            node_id = f"N{row}_{col}"
+            if row == 0 and col % max(1, side // num_tanks) == 0:
+                network.add_tank(node_id, 1e6, 100)
+            elif (row + col) % 3 == 0:
+                network.add_node(node_id, 'barrio', 6)
+            else:
+                network.add_node(node_id, 'interseccion')
+
+    added = 0
+    for row in range(side):
+        for col in range(side):
+            if col + 1 < side and added < num_pipes:
+                network.add_pipe(f"N{row}_{col}", f"N{row}_{col + 1}", 100)
+                added += 1
+            if row + 1 < side and added < num_pipes:
+                network.add_pipe(f"N{row}_{col}", f"N{row + 1}_{col}", 100)
+                added += 1
+    return network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pipes', type=int, default=50000)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    network = build_grid_network(args.pipes)
+    print(f"Red construida: {len(network.pipes)} tuberías, "
+          f"{network.pipes.node_count} nodos "
+          f"({time.perf_counter() - start:.2f} s)")
+
+    start = time.perf_counter()
+    network.update_simulation()
+    print(f"Primer paso (incluye enrutamiento): "
+          f"{1000 * (time.perf_counter() - start):.1f} ms")
+
+    samples = np.empty(args.steps)
+    for i in range(args.steps):
+        start = time.perf_counter()
+        network.update_simulation(1.0, 1.0)
+        samples[i] = time.perf_counter() - start
+    samples *= 1000
+    median = float(np.median(samples))
+    print(f"Paso de simulación: mediana {median:.2f} ms, "
+          f"p95 {np.percentile(samples, 95):.2f} ms, máx {samples.max():.2f} ms")
+    print(f"Objetivo < {TARGET_MS:.0f} ms: {'OK' if median < TARGET_MS else 'NO CUMPLE'}")
+    return 0 if median < TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,7 +13,9 @@ APP_SETTINGS: Dict[str, Any] = {
     'min_window_size': (1000, 700),
     'theme': 'clam',
     'language': 'es',
-    'debug_mode': False
+    'debug_mode': False,
+    'analysis_workers': 2,  # hilos para análisis en segundo plano
+    'analysis_poll_interval': 100  # ms entre consultas de progreso
 }
 
 # Configuraciones de la red
@@ -27,7 +29,44 @@ NETWORK_SETTINGS: Dict[str, Any] = {
     'default_houses': 6,
     'flow_update_interval': 100,  # ms
     'simulation_speed': 1.0,
-    'max_history_length': 1000
+    'max_history_length': 1000,
+    'max_flow_cache_entries': 16,
+    'optimization': {
+        'priority_factors': {'Alta': 1.5, 'Media': 1.0, 'Baja': 0.75},  # demanda a cubrir
+        'flow_resolution': 0.01,  # unidades de flujo por unidad entera del optimizador
+        'cost_resolution': 10,  # pasos enteros por unidad de costo de tubería
+        'connections': {
+            'neighbors': 8,  # vecinos cercanos por nodo como candidatos
+            'max_length': 2.0,  # largo máximo de una tubería nueva (en tuberías típicas)
+            'upgrade_ratio': 1.0,  # aumento de capacidad de una ampliación
+            'max_changes': 20,  # tuberías nuevas o ampliadas por plan
+            'chunk_size': 8,  # extremos por tarea del pool
+            'min_parallel': 32,  # con menos extremos pendientes se calculan en el mismo proceso
+            'max_workers': None  # procesos del pool (None: uno por núcleo)
+        },
+        'balance': {
+            'rho': 1.0,  # penalización inicial de ADMM (se adapta)
+            'relaxation': 1.6,  # sobrerrelajación de ADMM
+            'tank_weight': 1e-4,  # peso del reparto entre tanques frente a la varianza
+            'tolerance': 1e-4,  # residuo cuadrático medio en utilización para detenerse
+            'max_iterations': 2000
+        }
+    },
+    'contingency': {
+        'chunk_size': 32,  # tuberías por tarea del pool
+        'min_parallel': 64,  # con menos candidatas se evalúan en el mismo proceso
+        'max_workers': None  # procesos del pool (None: uno por núcleo)
+    },
+    'reliability': {
+        'failure_probability': 0.02,  # por tubería y muestra, sin obstrucción
+        'obstruction_weight': 0.5,  # fracción de la obstrucción que se suma a la falla
+        'confidence': 0.95,
+        'tolerance': 0.01,  # semiancho máximo del intervalo para detenerse
+        'min_samples': 1000,
+        'max_samples': 20000,
+        'batch_size': 256,  # muestras por lote
+        'batch_elements': 4_000_000  # tope de (nodos + tuberías) × muestras por lote
+    }
 }
 
 # Configuraciones de visualización
@@ -70,6 +109,21 @@ VISUALIZATION_SETTINGS: Dict[str, Any] = {
         'flow_speed': 1.0,
         'transition_time': 500,
         'fps': 30
+    },
+    'lod': {
+        'detail_pixels': 40,  # tamaño en pantalla de un barrio para ver el detalle
+        'max_detail_elements': 150,  # elementos con detalle completo a la vez
+        'label_cell_pixels': 80,  # como máximo una etiqueta por celda
+        'max_labels': 200,
+        'house_marker_size': 6,  # puntos² por casa en la vista agregada
+        'tank_marker_size': 80,
+        'pick_pixels': 8  # distancia máxima del cursor al elemento elegido
+    },
+    'layout': {
+        'edge_length': 3.0,  # largo típico de una tubería en el dibujo
+        'coarsest_size': 40,  # nodos del nivel más grueso
+        'iterations': 200,  # iteraciones en el nivel más grueso
+        'refine_iterations': 25  # iteraciones por nivel de refinamiento
     }
 }
 
@@ -77,6 +131,11 @@ VISUALIZATION_SETTINGS: Dict[str, Any] = {
 SIMULATION_SETTINGS: Dict[str, Any] = {
     'time_step': 0.1,
     'max_simulation_time': 3600,  # segundos
+    'start_hour': 8,  # hora del día al iniciar la simulación
+    'consumption_per_house': 0.5,  # unidades de flujo por casa
+    'history_chunk_rows': 256,  # filas del historial en memoria antes de volcar a .sim
+    'history_buffer_bytes': 32 * 1024 * 1024,  # tope del búfer en memoria
+    'history_file_bytes': 256 * 1024 * 1024,  # tope del .sim temporal (rota los bloques viejos)
     'consumption_patterns': {
         'morning': {
             'start': 6,
@@ -100,11 +159,29 @@ SIMULATION_SETTINGS: Dict[str, Any] = {
         'critical_low': 15,
         'critical_high': 90
     },
+    'hydraulics': {
+        'flow_unit': 0.001,  # m³/s por unidad de flujo (L/s)
+        'design_velocity': 1.0,  # m/s a capacidad; define el diámetro
+        'pipe_length': 100.0,  # m por tubería
+        'roughness': 130.0,  # coeficiente C de Hazen-Williams
+        'tank_base_head': 30.0,  # m de carga con el tanque vacío
+        'tank_height': 60.0,  # m de carga adicional con el tanque lleno
+        'min_flow': 1e-4,  # unidades; evita la derivada nula con caudal cero
+        'accuracy': 1e-3,  # error relativo de caudal estimado para converger
+        'max_iterations': 40,
+        'linear_tolerance': 1e-6,  # desbalance de masa relativo a la demanda
+        'max_cg_iterations': 25,  # con tantos pesos atípicos se vuelve a factorizar
+        'refactor_ratio': 4.0,  # cambio de peso respecto de la mediana que lo hace atípico
+        'panel_size': 2  # columnas por panel de SuperLU al factorizar
+    },
     'maintenance': {
         'inspection_interval': 30,  # días
         'maintenance_interval': 180,  # días
         'max_obstruction': 90,  # porcentaje
-        'deterioration_rate': 0.1  # porcentaje por día
+        'deterioration_rate': 0.1,  # porcentaje por día
+        'cleaning_threshold': 60,  # obstrucción que una inspección manda a limpiar
+        'thresholds': [25, 50, 75],  # umbrales cuyos cruces se informan
+        'horizon_days': 3650  # horizonte de la proyección de deterioro
     }
 }
 
@@ -113,7 +190,9 @@ FILE_SETTINGS: Dict[str, Any] = {
     'save_directory': Path.home() / 'water_distribution_system',
     'backup_directory': Path.home() / 'water_distribution_system' / 'backups',
     'log_directory': Path.home() / 'water_distribution_system' / 'logs',
+    'layout_cache_directory': Path.home() / 'water_distribution_system' / 'layouts',
     'max_backup_files': 5,
+    'max_layout_cache_files': 50,  # distribuciones guardadas, se borran las menos usadas
     'auto_save_interval': 300,  # segundos
     'file_extensions': {
         'network': '.wdn',
@@ -153,6 +232,7 @@ REPORT_SETTINGS: Dict[str, Any] = {
 for directory in [
     FILE_SETTINGS['save_directory'],
     FILE_SETTINGS['backup_directory'],
-    FILE_SETTINGS['log_directory']
+    FILE_SETTINGS['log_directory'],
+    FILE_SETTINGS['layout_cache_directory']
 ]:
     directory.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
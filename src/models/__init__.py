@@ -4,8 +4,44 @@ Modelos de datos y lógica de negocio
 
 from .graph import NetworkGraph
 from .network import WaterNetwork
+from .edge_store import EdgeStore, PipeDictView
+from .simulation import SimulationEngine
+from .hydraulics import HydraulicSolver
+from .scenarios import run_scenario_sweep
+from .flow_cache import MaxFlowCache, ResidualFlow
+from .flow_optimizer import MinCostFlow, FlowOptimizer
+from .connection_planner import ResidualGraph, ConnectionPlanner
+from .load_balancer import LoadBalancer
+from .contingency import ContingencyAnalysis
+from .reliability import ReliabilityEstimator
+from .deterioration import DeteriorationSimulator
+from .route_index import RouteIndex
+from .connectivity import ConnectivityIndex
+from .block_cut import BlockCutIndex
+from .history import FlowHistory
+from .events import ChangeBus
 
 __all__ = [
     'NetworkGraph',
-    'WaterNetwork'
+    'WaterNetwork',
+    'EdgeStore',
+    'PipeDictView',
+    'SimulationEngine',
+    'HydraulicSolver',
+    'run_scenario_sweep',
+    'MaxFlowCache',
+    'ResidualFlow',
+    'MinCostFlow',
+    'FlowOptimizer',
+    'ResidualGraph',
+    'ConnectionPlanner',
+    'LoadBalancer',
+    'ContingencyAnalysis',
+    'ReliabilityEstimator',
+    'DeteriorationSimulator',
+    'RouteIndex',
+    'ConnectivityIndex',
+    'BlockCutIndex',
+    'FlowHistory',
+    'ChangeBus'
 ]
\ No newline at end of file
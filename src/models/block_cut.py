@@ -0,0 +1,463 @@
+from typing import Dict, List, Set
+import numpy as np
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+from scipy.sparse.linalg import spsolve_triangular
+
+TANK_TYPE = 'tanque'
+NEIGHBORHOOD_TYPE = 'barrio'
+
+ABSENT, OTHER, TANK, NEIGHBORHOOD = -1, 0, 1, 2
+KIND_CODES = {TANK_TYPE: TANK, NEIGHBORHOOD_TYPE: NEIGHBORHOOD}
+
+
+class BlockCutIndex:
+    """Puentes, puntos de articulación y pérdida de suministro por elemento
+
+    Se guardan los bloques biconexos de la red como conjuntos de tuberías
+    (cada tubería pertenece a uno) y, a partir de ellos, el árbol de
+    bloques: un vértice por nodo y otro por bloque, unidos cuando el nodo
+    está en el bloque. Recorrido desde un nodo de cada componente, cada
+    subárbol es un rango contiguo del orden y sus tanques y barrios salen
+    de un sistema triangular. Con eso una tubería es un puente si su bloque
+    no tiene otra, un nodo es de articulación si está en dos o más bloques,
+    y al quitar un puente o aislar un nodo los pedazos son subárboles cuyos
+    conteos ya se tienen: pierden suministro los que no tienen tanques.
+
+    Las ediciones se aplican a los bloques sin recorrer la red:
+
+    - una tubería entre dos nodos de un mismo bloque se suma al bloque;
+    - una tubería entre bloques distintos une los bloques del camino entre
+      sus extremos en el árbol (o forma un puente si une componentes);
+    - quitar una tubería vuelve a buscar bloques, con la pila de tuberías
+      de Tarjan, solo entre las tuberías restantes de su bloque;
+    - un cambio de tipo de nodo solo cambia los conteos.
+
+    El árbol y los conteos se recalculan en la próxima consulta con
+    operaciones vectorizadas. Las cargas masivas, o demasiadas tuberías
+    entre bloques pendientes, vuelven a buscar los bloques de toda la red.
+    Los barrios de una componente sin tanques ya no tienen suministro y no
+    cuentan como pérdida. Las tuberías bloqueadas siguen formando parte de
+    la topología.
+    """
+
+    MAX_PENDING_LINKS = 32  # con más, se vuelven a buscar todos los bloques
+
+    def __init__(self, network):
+        self.network = network
+        self.blocks: Dict[int, Set[int]] = {}  # bloque -> slots de sus tuberías
+        self.stats = {'rebuilds': 0, 'local_updates': 0, 'visited_pipes': 0}
+        self.edge_block = np.zeros(0, dtype=np.int64)
+        self.kind = np.zeros(0, dtype=np.int8)
+        self._next_block = 0
+        self._dirty_all = True
+        self._split: Set[int] = set()  # bloques que perdieron una tubería
+        self._links: List[int] = []  # tuberías nuevas entre bloques distintos
+        self._stale = True
+        self._resize(0, 0)
+
+    def _resize(self, node_count: int, slot_count: int) -> None:
+        """Agranda los arreglos por nodo y por slot conservando su contenido"""
+        def grow(array, size, fill):
+            new = np.full(size, fill, dtype=array.dtype)
+            new[:len(array)] = array
+            return new
+
+        if len(self.kind) < node_count:
+            self.kind = grow(self.kind, max(node_count, 2 * len(self.kind)), ABSENT)
+        if len(self.edge_block) < slot_count:
+            self.edge_block = grow(self.edge_block,
+                                   max(slot_count, 2 * len(self.edge_block)), -1)
+
+    def clear(self) -> None:
+        """Descarta todo; se recalcula en la próxima consulta"""
+        self._dirty_all = True
+        self._split.clear()
+        self._links.clear()
+
+    def on_node_changed(self, node_id: str) -> None:
+        """Nodo agregado, eliminado o con tipo nuevo"""
+        store = self.network.pipes
+        index = store.node_index.get(node_id)
+        if index is None or self._dirty_all:
+            return
+        self._resize(store.node_count, store.size)
+        graph = self.network.graph
+        self.kind[index] = (KIND_CODES.get(graph.nodes[node_id].get('type'), OTHER)
+                            if node_id in graph else ABSENT)
+        self._stale = True
+
+    def _blocks_of(self, node: int) -> Set[int]:
+        """Bloques de las tuberías del nodo"""
+        store = self.network.pipes
+        u = store.node_ids[node]
+        found = {int(self.edge_block[store.find(u, v)]) for v in self.network.graph.adj[u]}
+        found.discard(-1)
+        return found
+
+    def on_pipe_added(self, slot: int) -> None:
+        """Tubería nueva; dentro de un bloque no cambia ningún puente ni corte"""
+        if self._dirty_all:
+            return
+        store = self.network.pipes
+        self._resize(store.node_count, store.size)
+        self.edge_block[slot] = -1
+        u, v = int(store.source[slot]), int(store.target[slot])
+        if u == v:
+            return  # un bucle no conecta nada: queda fuera de los bloques
+        shared = self._blocks_of(u) & self._blocks_of(v)
+        if shared:
+            block = shared.pop()
+            self.blocks[block].add(slot)
+            self.edge_block[slot] = block
+        else:
+            self._links.append(slot)
+            self._stale = True
+
+    def on_pipe_removed(self, slot: int) -> None:
+        if self._dirty_all:
+            return
+        block = int(self.edge_block[slot])
+        self.edge_block[slot] = -1
+        if block < 0:
+            return  # tubería entre bloques todavía pendiente
+        slots = self.blocks[block]
+        slots.discard(slot)
+        if not slots:
+            del self.blocks[block]
+        else:
+            self._split.add(block)
+        self._stale = True
+
+    def _add_block(self, slots) -> None:
+        block = self._next_block
+        self._next_block += 1
+        self.blocks[block] = set(slots)
+        self.edge_block[list(slots)] = block
+
+    def _biconnected(self, slots: np.ndarray) -> List[np.ndarray]:
+        """Bloques biconexos de las tuberías dadas (Tarjan con pila de tuberías)"""
+        store = self.network.pipes
+        slots = slots[store.source[slots] != store.target[slots]]
+        count = len(slots)
+        nodes, local = np.unique(np.r_[store.source[slots], store.target[slots]],
+                                 return_inverse=True)
+        a, b = local[:count], local[count:]
+        n = len(nodes)
+        edges = np.arange(count)
+        graph = csr_matrix((np.r_[edges, edges] + 1, (np.r_[a, b], np.r_[b, a])), shape=(n, n))
+        indptr = graph.indptr.tolist()
+        indices = graph.indices.tolist()
+        edge = (graph.data - 1).astype(np.int64).tolist()
+
+        disc = [-1] * n
+        low = [0] * n
+        pending: List[int] = []
+        blocks: List[List[int]] = []
+        time = 0
+        for root in range(n):
+            if disc[root] >= 0:
+                continue
+            disc[root] = low[root] = time
+            time += 1
+            stack = [(root, -1, indptr[root])]
+            while stack:
+                node, via, i = stack[-1]
+                if i < indptr[node + 1]:
+                    stack[-1] = (node, via, i + 1)
+                    w, e = indices[i], edge[i]
+                    if e == via:
+                        continue
+                    if disc[w] < 0:
+                        pending.append(e)
+                        disc[w] = low[w] = time
+                        time += 1
+                        stack.append((w, e, indptr[w]))
+                    elif disc[w] < disc[node]:
+                        # Tubería de retroceso; desde el otro extremo ya se vio
+                        pending.append(e)
+                        if disc[w] < low[node]:
+                            low[node] = disc[w]
+                else:
+                    stack.pop()
+                    if not stack:
+                        continue
+                    up = stack[-1][0]
+                    if low[node] < low[up]:
+                        low[up] = low[node]
+                    if low[node] >= disc[up]:
+                        # El subárbol de ``node`` cierra un bloque
+                        block = []
+                        while True:
+                            e = pending.pop()
+                            block.append(e)
+                            if e == via:
+                                break
+                        blocks.append(block)
+        self.stats['visited_pipes'] += count
+        return [slots[block] for block in blocks]
+
+    def _rebuild(self) -> None:
+        """Bloques de toda la red"""
+        store = self.network.pipes
+        self.kind[:] = ABSENT
+        index = store.node_index
+        for node_id, attrs in self.network.graph.nodes(data=True):
+            self.kind[index[node_id]] = KIND_CODES.get(attrs.get('type'), OTHER)
+        self.blocks.clear()
+        self._next_block = 0
+        self.edge_block[:] = -1
+        for block in self._biconnected(store.active_slots()):
+            self._add_block(block.tolist())
+        self._dirty_all = False
+        self._split.clear()
+        self._links.clear()
+        self._stale = True
+        self.stats['rebuilds'] += 1
+
+    def _update(self) -> None:
+        """Aplica las ediciones pendientes a los bloques afectados"""
+        store = self.network.pipes
+        for block in self._split:
+            slots = self.blocks.pop(block, None)
+            if slots:
+                for part in self._biconnected(np.fromiter(slots, dtype=np.int64)):
+                    self._add_block(part.tolist())
+        self._split.clear()
+        links = [slot for slot in dict.fromkeys(self._links)
+                 if store.active[slot] and self.edge_block[slot] < 0]
+        self._links.clear()
+        for slot in links:
+            u, v = store.endpoints(slot)
+            if not (self._blocks_of(store.node_index[u]) and self._blocks_of(store.node_index[v])):
+                # Un extremo sin otras tuberías: es un puente hacia él
+                self._add_block([slot])
+                self._stale = True
+                continue
+            self._tree()
+            self._link(slot)
+        self.stats['local_updates'] += 1
+
+    def _link(self, slot: int) -> None:
+        """Suma una tubería entre bloques distintos con el árbol vigente"""
+        store = self.network.pipes
+        u, v = int(store.source[slot]), int(store.target[slot])
+        root = self._root
+        if root[u] < 0 or root[u] != root[v]:
+            self._add_block([slot])  # une dos componentes: es un puente
+        else:
+            # Camino u-v en el árbol: sus bloques forman uno solo con la tubería
+            up = self._up
+            ancestors = []
+            vertex = u
+            while vertex >= 0:
+                ancestors.append(vertex)
+                vertex = int(up[vertex])
+            seen = set(ancestors)
+            path = []
+            vertex = v
+            while vertex not in seen:
+                path.append(vertex)
+                vertex = int(up[vertex])
+            path.extend(ancestors[:ancestors.index(vertex) + 1])
+            n = self._node_vertices
+            merged = {slot}
+            for vertex in path:
+                if vertex >= n:
+                    merged |= self.blocks.pop(int(self._block_ids[vertex - n]))
+            self._add_block(merged)
+        self._stale = True
+
+    def _tree(self) -> None:
+        """Árbol de bloques, rangos del recorrido y conteos por elemento"""
+        if not self._stale:
+            return
+        store = self.network.pipes
+        n, size = store.node_count, store.size
+        ids = np.fromiter(self.blocks, dtype=np.int64, count=len(self.blocks))
+        count = len(ids)
+        column = np.full(self._next_block, -1, dtype=np.int64)
+        column[ids] = np.arange(count)
+        slots = np.flatnonzero(self.edge_block[:size] >= 0)
+        block = n + column[self.edge_block[slots]]
+        node = np.r_[store.source[slots], store.target[slots]].astype(np.int64)
+
+        # Un nodo de cada componente cuelga de una raíz común
+        vertices = n + count + 1
+        top = vertices - 1
+        kind = self.kind[:n]
+        incidence = csr_matrix((np.ones(len(node)), (node, np.r_[block, block])),
+                               shape=(vertices, vertices))  # suma los pares repetidos
+        node = np.repeat(np.arange(vertices), np.diff(incidence.indptr))
+        block = incidence.indices.astype(np.int64)
+        _, label = connected_components(incidence, directed=False)
+        present = np.flatnonzero(kind != ABSENT)[::-1]
+        first = np.full(label.max() + 1, -1, dtype=np.int64)
+        first[label[present]] = present
+        roots = first[first >= 0]
+        graph = csr_matrix((np.ones(2 * len(node) + len(roots)),
+                            (np.r_[node, block, np.full(len(roots), top)],
+                             np.r_[block, node, roots])),
+                           shape=(vertices, vertices))
+        bfs, up = breadth_first_order(graph, top)
+        up = np.where(up < 0, -1, up)
+        up[roots] = -1
+        level = np.full(vertices, -1, dtype=np.int64)
+        level[bfs] = np.arange(len(bfs))
+
+        # Tamaño, tanques y barrios de cada subárbol: (I - hijos) S = propios
+        reached = len(bfs)
+        child = np.arange(1, reached)
+        parent = np.where(up[bfs[1:]] >= 0, level[up[bfs[1:]]], 0)
+        triangle = (identity(reached, format='csr')
+                    - csr_matrix((np.ones(reached - 1), (parent, child)), shape=(reached, reached)))
+        triangle.sort_indices()
+        own = np.zeros((reached, 3))
+        own[:, 0] = 1.0
+        mine = bfs < n
+        own[mine, 1] = kind[bfs[mine]] == TANK
+        own[mine, 2] = kind[bfs[mine]] == NEIGHBORHOOD
+        totals = np.rint(spsolve_triangular(triangle, own, lower=False)).astype(np.int64)
+        subtree = np.zeros((vertices, 3), dtype=np.int64)
+        subtree[bfs] = totals
+
+        # Preorden: cada hijo empieza tras su padre y los subárboles de sus
+        # hermanos anteriores (en anchura los hermanos quedan contiguos)
+        sizes = totals[1:, 0]
+        before = np.cumsum(sizes) - sizes
+        eldest = np.r_[True, parent[1:] != parent[:-1]]
+        offset = np.zeros(reached)
+        offset[1:] = 1 + before - before[np.maximum.accumulate(np.where(eldest, child - 1, 0))]
+        lower = triangle.T.tocsr()
+        lower.sort_indices()
+        preorder = np.rint(spsolve_triangular(lower, offset, lower=True)).astype(np.int64)
+        position = np.full(vertices, -1, dtype=np.int64)
+        position[bfs] = preorder
+        order = np.empty(reached, dtype=np.int64)
+        order[preorder] = bfs
+
+        # Raíz de la componente de cada vértice
+        root = np.r_[first[label[:top]], -1]
+        tanks = np.where(root >= 0, subtree[np.maximum(root, 0), 1], 0)
+        neighborhoods = np.where(root >= 0, subtree[np.maximum(root, 0), 2], 0)
+
+        # Aislar un nodo: pierden los bloques hijos sin tanques y el resto si no tiene
+        blocks = n + np.arange(count)
+        owner = up[blocks]
+        hanging = owner >= 0
+        orphaned = np.where(subtree[blocks, 1] == 0, subtree[blocks, 2], 0)
+        nodes = np.arange(n)
+        rest_tanks = tanks[:n] - subtree[:n, 1]
+        rest = neighborhoods[:n] - subtree[:n, 2]
+        node_loss = (np.bincount(owner[hanging], orphaned[hanging], minlength=n)[:n]
+                     + np.where(rest_tanks == 0, rest, 0)
+                     + (kind == NEIGHBORHOOD))
+        node_loss[tanks[:n] == 0] = 0
+        incident = np.bincount(owner[hanging], minlength=n)[:n] + (up[nodes] >= n)
+
+        # Quitar un puente: pierde el lado que queda sin tanques
+        pipes = np.bincount(column[self.edge_block[slots]], minlength=count)
+        bridge = np.full(len(self.edge_block), -1, dtype=np.int64)
+        single = slots[pipes[column[self.edge_block[slots]]] == 1]
+        bridge[single] = n + column[self.edge_block[single]]
+        side = bridge[single]
+        pipe_loss = np.zeros(len(self.edge_block), dtype=np.int64)
+        pipe_loss[single] = np.where(tanks[side] == 0, 0,
+                                     np.where(subtree[side, 1] == 0, subtree[side, 2], 0)
+                                     + np.where(tanks[side] == subtree[side, 1],
+                                                neighborhoods[side] - subtree[side, 2], 0))
+
+        self._node_vertices = n
+        self._block_ids = ids
+        self._up = up
+        self._root = root
+        self._order = order
+        self._position = position
+        self._subtree = subtree
+        self.articulation = incident >= 2
+        self.node_loss = node_loss
+        self.bridge_block = bridge
+        self.pipe_loss = pipe_loss
+        self._stale = False
+
+    def _refresh(self) -> None:
+        store = self.network.pipes
+        self._resize(store.node_count, store.size)
+        if self._dirty_all or len(set(self._links)) > self.MAX_PENDING_LINKS:
+            self._rebuild()
+        elif self._split or self._links:
+            self._update()
+        self._tree()
+
+    def _bridge(self, slot: int) -> int:
+        """Vértice del bloque si la tubería es un puente, o -1"""
+        # Las tuberías sumadas a un bloque después del árbol no son puentes
+        return int(self.bridge_block[slot]) if slot < len(self.bridge_block) else -1
+
+    def is_bridge(self, slot: int) -> bool:
+        """La tubería es la única conexión entre dos partes de la red"""
+        self._refresh()
+        return self._bridge(slot) >= 0
+
+    def is_articulation(self, node_id: str) -> bool:
+        """Aislar el nodo divide su componente"""
+        self._refresh()
+        index = self.network.pipes.node_index[node_id]
+        return bool(index < len(self.articulation) and self.articulation[index])
+
+    def pipe_loss_count(self, slot: int) -> int:
+        """Barrios que se quedan sin tanque al quitar la tubería"""
+        self._refresh()
+        return int(self.pipe_loss[slot]) if self._bridge(slot) >= 0 else 0
+
+    def node_loss_count(self, node_id: str) -> int:
+        """Barrios que se quedan sin tanque al aislar el nodo (incluido él)"""
+        self._refresh()
+        index = self.network.pipes.node_index[node_id]
+        return int(self.node_loss[index]) if index < len(self.node_loss) else 0
+
+    def _range(self, vertex: int) -> slice:
+        """Posiciones del subárbol del vértice en el recorrido"""
+        start = int(self._position[vertex])
+        return slice(start, start + int(self._subtree[vertex, 0]))
+
+    def _names(self, lost: np.ndarray, span: slice) -> List[str]:
+        """Barrios marcados en ``lost`` dentro del rango ``span`` del recorrido"""
+        vertices = self._order[span][lost]
+        vertices = vertices[vertices < self._node_vertices]
+        ids = self.network.pipes.node_ids
+        return [ids[node] for node in vertices[self.kind[vertices] == NEIGHBORHOOD].tolist()]
+
+    def pipe_losses(self, slot: int) -> List[str]:
+        """Barrios que se quedan sin tanque al quitar la tubería"""
+        if not self.pipe_loss_count(slot):
+            return []
+        block = self._bridge(slot)
+        component = self._range(int(self._root[block]))
+        inside = self._range(block)
+        lost = np.zeros(component.stop - component.start, dtype=bool)
+        lost[inside.start - component.start:inside.stop - component.start] = True
+        if self._subtree[block, 1]:
+            lost = ~lost
+        return self._names(lost, component)
+
+    def node_losses(self, node_id: str) -> List[str]:
+        """Barrios que se quedan sin tanque al aislar el nodo (incluido él)"""
+        if not self.node_loss_count(node_id):
+            return []
+        index = self.network.pipes.node_index[node_id]
+        component = self._range(int(self._root[index]))
+        offset = component.start
+        mine = self._range(index)
+        rest = np.ones(component.stop - offset, dtype=bool)  # pedazo que queda con el padre
+        rest[mine.start - offset:mine.stop - offset] = False
+        lost = np.zeros(len(rest), dtype=bool)
+        lost[mine.start - offset] = True
+        n = self._node_vertices
+        for block in (n + np.flatnonzero(self._up[n:n + len(self._block_ids)] == index)).tolist():
+            if self._subtree[block, 1] == 0:
+                span = self._range(block)
+                lost[span.start - offset:span.stop - offset] = True
+        if self._subtree[int(self._root[index]), 1] == self._subtree[index, 1]:
+            lost |= rest
+        return self._names(lost, component)
@@ -0,0 +1,396 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import multiprocessing
+import os
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, maximum_flow
+from scipy.spatial import cKDTree
+from config.settings import NETWORK_SETTINGS, SIMULATION_SETTINGS, VISUALIZATION_SETTINGS
+from .layout import network_layout
+from .scenarios import SharedNetwork
+
+INT32_MAX = np.iinfo(np.int32).max
+
+# Residual de la ronda vigente en cada proceso trabajador
+_worker_name: Optional[str] = None
+_worker_graph: Optional[csr_matrix] = None
+
+
+class ResidualGraph:
+    """Grafo residual de la demanda servida, con aumentos incrementales
+
+    Guarda las capacidades residuales de una red con súper fuente ``s``
+    (tanques) y súper sumidero ``t`` (barrios) como matriz dispersa
+    entera. Agregar capacidad solo busca caminos de aumento sobre el
+    residual vigente, y el flujo máximo desde ``s`` hasta un nodo (o desde
+    un nodo hasta ``t``) se calcula una vez por estado y se comparte entre
+    todos los candidatos con ese extremo.
+    """
+
+    def __init__(self, node_count: int, tail: np.ndarray, head: np.ndarray,
+                 capacity: np.ndarray, s: int, t: int):
+        self.node_count = node_count
+        self.s = s
+        self.t = t
+        self.value = 0
+        self.residual = csr_matrix((capacity.astype(np.int64), (tail, head)),
+                                   shape=(node_count, node_count))
+        self.augment()
+
+    def _graph(self) -> csr_matrix:
+        graph = self.residual.copy()
+        graph.data = np.minimum(graph.data, INT32_MAX).astype(np.int32)
+        return graph
+
+    def augment(self) -> int:
+        """Lleva el flujo al máximo partiendo del actual; devuelve lo añadido"""
+        result = maximum_flow(self._graph(), self.s, self.t)
+        self.residual = (self.residual - result.flow.astype(np.int64)).tocsr()
+        self.residual.eliminate_zeros()
+        self.value += int(result.flow_value)
+        self._source_side = None
+        self._to_node: Dict[int, int] = {}
+        self._from_node: Dict[int, int] = {}
+        return int(result.flow_value)
+
+    def add_capacity(self, u: int, v: int, amount: int) -> int:
+        """Suma capacidad a la tubería u-v (ambos sentidos) y aumenta el flujo"""
+        extra = csr_matrix(([amount, amount], ([u, v], [v, u])),
+                           shape=self.residual.shape, dtype=np.int64)
+        self.residual = (self.residual + extra).tocsr()
+        return self.augment()
+
+    @property
+    def source_side(self) -> np.ndarray:
+        """Nodos alcanzables desde ``s`` en el residual (lado fuente del corte)"""
+        if self._source_side is None:
+            side = np.zeros(self.node_count, dtype=bool)
+            side[breadth_first_order(self.residual, self.s, return_predecessors=False)] = True
+            self._source_side = side
+        return self._source_side
+
+    def bounds(self):
+        """Cotas de flujo hacia cada nodo y desde cada nodo (capacidad residual)"""
+        residual = self.residual
+        inflow = np.asarray(residual.sum(axis=0)).ravel()
+        outflow = np.asarray(residual.sum(axis=1)).ravel()
+        return inflow, outflow
+
+    def flow_to(self, node: int) -> int:
+        """Flujo máximo adicional de ``s`` a ``node`` en el residual"""
+        if node not in self._to_node:
+            self._to_node[node] = int(maximum_flow(self._graph(), self.s, node).flow_value)
+        return self._to_node[node]
+
+    def flow_from(self, node: int) -> int:
+        """Flujo máximo adicional de ``node`` a ``t`` en el residual"""
+        if node not in self._from_node:
+            self._from_node[node] = int(maximum_flow(self._graph(), node, self.t).flow_value)
+        return self._from_node[node]
+
+
+class SharedResidual:
+    """Arreglos CSR de un residual en un bloque de memoria compartida"""
+
+    def __init__(self, residual: csr_matrix):
+        arrays = {'data': residual.data.astype(np.int64),
+                  'indices': residual.indices.astype(np.int32),
+                  'indptr': residual.indptr.astype(np.int32)}
+        self.layout: Dict[str, Tuple[int, str, int]] = {}
+        offset = 0
+        for name, array in arrays.items():
+            self.layout[name] = (offset, array.dtype.str, len(array))
+            offset += -(-array.nbytes // 8) * 8
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        for name, array in arrays.items():
+            SharedNetwork.view(self.memory, self.layout, name)[:] = array
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _attach_residual(name: str, layout: Dict[str, Tuple[int, str, int]], shape: int) -> None:
+    """Copia en el trabajador el residual publicado con ``name`` (una vez por ronda)"""
+    global _worker_name, _worker_graph
+    if name == _worker_name:
+        return
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        data, indices, indptr = (np.array(SharedNetwork.view(memory, layout, field))
+                                 for field in ('data', 'indices', 'indptr'))
+    finally:
+        memory.close()
+    data = np.minimum(data, INT32_MAX).astype(np.int32)
+    _worker_graph = csr_matrix((data, indices, indptr), shape=(shape, shape))
+    _worker_name = name
+
+
+def _flows_in_worker(task: Tuple[str, Dict[str, Tuple[int, str, int]], int, int, int,
+                                 np.ndarray]) -> np.ndarray:
+    """Flujo máximo de ``s`` a cada nodo (o de cada nodo a ``t``) del lote"""
+    name, layout, shape, s, t, jobs = task
+    _attach_residual(name, layout, shape)
+    return np.array([maximum_flow(_worker_graph, s, node).flow_value if to_node
+                     else maximum_flow(_worker_graph, node, t).flow_value
+                     for node, to_node in jobs.tolist()], dtype=np.int64)
+
+
+class EndpointFlows:
+    """Flujos s→nodo y nodo→t de los candidatos, en lotes sobre un pool de procesos
+
+    El residual de cada ronda se publica una vez en memoria compartida y los
+    trabajadores lo copian al recibir el primer lote de esa ronda; los
+    resultados quedan en las cachés del ``ResidualGraph``. Con pocos
+    extremos pendientes no se usa el pool y se calculan a pedido.
+    """
+
+    def __init__(self, settings: Dict[str, Any], max_workers: Optional[int] = None):
+        self.settings = settings
+        self.workers = max_workers or settings['max_workers'] or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._shared: Optional[SharedResidual] = None
+        self._residual: Optional[csr_matrix] = None
+
+    @property
+    def wave_size(self) -> int:
+        """Candidatos cuyos extremos se piden juntos"""
+        return self.workers * self.settings['chunk_size']
+
+    def fetch(self, graph: ResidualGraph, heads: np.ndarray, tails: np.ndarray) -> None:
+        """Calcula en el pool los flujos de los extremos que aún no están en caché"""
+        jobs = ([(node, 1) for node in dict.fromkeys(heads.tolist())
+                 if node not in graph._to_node]
+                + [(node, 0) for node in dict.fromkeys(tails.tolist())
+                   if node not in graph._from_node])
+        if self.workers <= 1 or len(jobs) < self.settings['min_parallel']:
+            return
+        if self._residual is not graph.residual:
+            if self._shared is not None:
+                self._shared.close()
+            self._shared = SharedResidual(graph.residual)
+            self._residual = graph.residual
+        if self._executor is None:
+            # Se llama desde un hilo de la interfaz: ``spawn`` arranca limpio
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        jobs = np.array(jobs, dtype=np.int64)
+        chunk = self.settings['chunk_size']
+        batches = [jobs[i:i + chunk] for i in range(0, len(jobs), chunk)]
+        task = (self._shared.memory.name, self._shared.layout, graph.node_count,
+                graph.s, graph.t)
+        futures = [self._executor.submit(_flows_in_worker, task + (batch,))
+                   for batch in batches]
+        try:
+            for batch, future in zip(batches, futures):
+                for (node, to_node), value in zip(batch.tolist(), future.result().tolist()):
+                    (graph._to_node if to_node else graph._from_node)[node] = value
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+            self._residual = None
+
+
+class ConnectionPlanner:
+    """Ampliación de la red: tuberías nuevas y de mayor capacidad
+
+    Con el flujo máximo de los tanques a los barrios, solo una tubería que
+    cruce el corte mínimo puede aumentar la demanda servida, y lo hace en
+    ``min(capacidad, flujo s→u, flujo v→t)`` sobre el residual. Los
+    candidatos son pares de nodos cercanos en la distribución del dibujo y
+    el reemplazo de tuberías existentes por otras de mayor capacidad; su
+    costo crece con el largo y la capacidad. En cada ronda se acotan todos
+    los candidatos a la vez con las capacidades residuales de sus extremos
+    y solo se calcula la ganancia exacta de los que pueden superar al mejor
+    ya evaluado; esos flujos se piden por tandas a un pool de procesos
+    (``EndpointFlows``). El elegido se agrega al residual y se aumenta el
+    flujo.
+    """
+
+    def __init__(self, network, settings: Optional[Dict[str, Any]] = None):
+        self.network = network
+        self.settings = settings or NETWORK_SETTINGS['optimization']
+
+    def _candidates(self, xy: np.ndarray, valid: np.ndarray):
+        """Pares de nodos cercanos sin tubería entre ellos"""
+        options = self.settings['connections']
+        store = self.network.pipes
+        max_length = options['max_length'] * VISUALIZATION_SETTINGS['layout']['edge_length']
+        nodes = np.flatnonzero(valid)
+        if nodes.size < 2:
+            return np.zeros((0, 2), dtype=np.int64), np.zeros(0)
+        k = min(options['neighbors'] + 1, nodes.size)
+        distance, nearest = cKDTree(xy[nodes]).query(
+            xy[nodes], k=k, distance_upper_bound=max_length)
+        found = np.isfinite(distance) & (nearest != np.arange(nodes.size)[:, None])
+        rows = np.repeat(np.arange(nodes.size), k).reshape(-1, k)
+        a = nodes[rows[found]]
+        b = nodes[nearest[found]]
+        pairs = np.unique(np.sort(np.column_stack([a, b]), axis=1), axis=0)
+
+        slots = store.active_slots()
+        existing = ((np.minimum(store.source[slots], store.target[slots]).astype(np.int64) << 32)
+                    | np.maximum(store.source[slots], store.target[slots]))
+        keys = (pairs[:, 0] << 32) | pairs[:, 1]
+        pairs = pairs[~np.isin(keys, existing)]
+        length = np.hypot(*(xy[pairs[:, 0]] - xy[pairs[:, 1]]).T)
+        return pairs, length
+
+    def plan(self, priority: str = "Media", cost_factor: float = 1.0,
+             progress: Optional[Callable[..., None]] = None,
+             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Elige tuberías nuevas y ampliaciones con más demanda servida por costo
+
+        Args:
+            priority: "Alta", "Media" o "Baja"; escala la demanda a cubrir
+            cost_factor: costo de una tubería típica de capacidad por defecto
+            progress: ``progress(fracción, mensaje, parcial)`` por ronda
+            max_workers: procesos del pool (por defecto según la configuración)
+
+        Returns:
+            Dict[str, Any]: conexiones nuevas, modificadas, costo total,
+            demanda servida antes y después, y el detalle de cada cambio
+        """
+        network = self.network
+        store = network.pipes
+        options = self.settings['connections']
+        factors = self.settings['priority_factors']
+        if priority not in factors:
+            raise ValueError(f"Prioridad desconocida: {priority}")
+        resolution = self.settings['flow_resolution']
+        default_capacity = NETWORK_SETTINGS['default_pipe_capacity']
+        edge_length = VISUALIZATION_SETTINGS['layout']['edge_length']
+        n = store.node_count
+        s, t = n, n + 1
+
+        if progress is not None:
+            progress(0.0, "Calculando distribución")
+        layout = network_layout(network)
+        xy = np.full((n, 2), np.nan)
+        for node_id, position in layout.items():
+            xy[store.node_index[node_id]] = position
+        valid = np.isfinite(xy).all(axis=1)
+
+        # Red de demanda servida: tanques con agua -> tuberías -> barrios
+        neighborhoods = np.array([store.node_index[node_id]
+                                  for node_id in network.neighborhoods], dtype=np.int64)
+        demand = np.floor(np.array(list(network.neighborhoods.values()), dtype=np.float64)
+                          * SIMULATION_SETTINGS['consumption_per_house']
+                          * factors[priority] / resolution).astype(np.int64)
+        total = int(demand.sum())
+        tanks = np.array([store.node_index[node_id]
+                          for node_id, level in network.tank_levels.items() if level > 0],
+                         dtype=np.int64)
+        slots = store.active_slots()
+        usable = store.effective_capacity()[slots]
+        pipe_capacity = np.floor(usable / resolution).astype(np.int64)
+        u, v = store.source[slots].astype(np.int64), store.target[slots].astype(np.int64)
+        graph = ResidualGraph(
+            n + 2,
+            np.concatenate([u, v, np.full(tanks.size, s), neighborhoods]),
+            np.concatenate([v, u, tanks, np.full(neighborhoods.size, t)]),
+            np.concatenate([pipe_capacity, pipe_capacity,
+                            np.full(tanks.size, total), demand]),
+            s, t)
+        served_before = graph.value
+
+        # Candidatos: tuberías nuevas y reemplazo de las existentes sin bloquear
+        pairs, length = self._candidates(xy, valid)
+        new_capacity = default_capacity
+        upgradable = ~store.blocked[slots] & valid[u] & valid[v]
+        upgrade_capacity = store.capacity[slots] * (1.0 + options['upgrade_ratio'])
+        endpoints = np.concatenate([pairs, np.column_stack([u, v])[upgradable]])
+        capacity = np.concatenate([np.full(len(pairs), new_capacity),
+                                   upgrade_capacity[upgradable]])
+        gain_capacity = np.floor(np.concatenate([
+            np.full(len(pairs), new_capacity),
+            upgrade_capacity[upgradable] - usable[upgradable]
+        ]) / resolution).astype(np.int64)
+        pipe_length = np.concatenate([
+            length, np.hypot(*(xy[u] - xy[v])[upgradable].T)
+        ]) / edge_length
+        cost = cost_factor * np.maximum(pipe_length, 1e-6) * capacity / default_capacity
+        is_new = np.arange(len(endpoints)) < len(pairs)
+        alive = gain_capacity > 0
+
+        changes: List[Dict[str, Any]] = []
+        ids = store.node_ids
+
+        def summary() -> Dict[str, Any]:
+            return {
+                'new_connections': sum(change['action'] == 'nueva' for change in changes),
+                'modified': sum(change['action'] == 'ampliación' for change in changes),
+                'cost': round(sum(change['cost'] for change in changes), 2),
+                'served_before': round(served_before * resolution, 2),
+                'served_after': round(graph.value * resolution, 2),
+                'demand': round(total * resolution, 2),
+                'changes': list(changes)
+            }
+
+        flows = EndpointFlows(options, max_workers)
+        try:
+            while len(changes) < options['max_changes'] and graph.value < total:
+                # Orientar los candidatos que cruzan el corte: u del lado de los tanques
+                side = graph.source_side
+                a, b = endpoints[:, 0], endpoints[:, 1]
+                crossing = alive & (side[a] != side[b])
+                head = np.where(side[a], a, b)
+                tail = np.where(side[a], b, a)
+                inflow, outflow = graph.bounds()
+                bound = np.minimum(np.minimum(gain_capacity, total - graph.value),
+                                   np.minimum(inflow[head], outflow[tail]))
+                bound = np.where(crossing, bound, 0)
+                ratio = bound / cost
+                order = np.argsort(-ratio, kind='stable')
+                order = order[ratio[order] > 0]
+
+                best, best_ratio = None, 0.0
+                for start in range(0, len(order), flows.wave_size):
+                    wave = order[start:start + flows.wave_size]
+                    wave = wave[ratio[wave] > best_ratio]
+                    if not wave.size:
+                        break  # Ninguno de los restantes puede superar al mejor
+                    flows.fetch(graph, head[wave], tail[wave])
+                    for candidate in wave.tolist():
+                        if ratio[candidate] <= best_ratio:
+                            break
+                        gain = min(int(bound[candidate]),
+                                   graph.flow_to(int(head[candidate])),
+                                   graph.flow_from(int(tail[candidate])))
+                        if gain / cost[candidate] > best_ratio:
+                            best, best_ratio = candidate, gain / cost[candidate]
+                if best is None:
+                    break
+
+                alive[best] = False
+                # Los caminos s→u y v→t pueden compartir tuberías: la ganancia
+                # real es lo que aumenta el flujo al sumar la capacidad
+                gained = graph.add_capacity(int(head[best]), int(tail[best]),
+                                            int(gain_capacity[best]))
+                changes.append({
+                    'source': ids[a[best]],
+                    'target': ids[b[best]],
+                    'action': 'nueva' if is_new[best] else 'ampliación',
+                    'capacity': round(float(capacity[best]), 2),
+                    'cost': round(float(cost[best]), 2),
+                    'gain': round(gained * resolution, 2)
+                })
+                if progress is not None:
+                    progress(len(changes) / options['max_changes'],
+                             f"Cambio {len(changes)}: {ids[a[best]]}-{ids[b[best]]}",
+                             summary())
+        finally:
+            flows.close()
+        return summary()
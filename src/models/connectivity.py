@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from config.settings import VALIDATION_SETTINGS
+
+
+class ConnectivityIndex:
+    """Componentes conexas y conteo de tipos de nodo, mantenidos por edición
+
+    Las inserciones de nodos y tuberías se aplican a un union-find (con
+    compresión de caminos y unión por tamaño) y a contadores por tipo, de
+    modo que validar la red no recorre el grafo. Las eliminaciones solo
+    marcan el índice como desactualizado: la siguiente consulta lo
+    reconstruye de una vez con ``connected_components`` sobre la tabla de
+    tuberías, así una ráfaga de borrados cuesta una sola pasada. La
+    conectividad es la del grafo de la red: las tuberías bloqueadas cuentan.
+    """
+
+    def __init__(self, network):
+        self.network = network
+        self.parent = np.zeros(0, dtype=np.int64)
+        self.size = np.zeros(0, dtype=np.int64)
+        self.present = np.zeros(0, dtype=bool)
+        self.types: Dict[str, str] = {}
+        self.type_counts: Dict[str, int] = {}
+        self.roots: Dict[int, int] = {}  # raíz -> nodos del componente
+        self.largest = -1
+        self.stats = {'rebuilt': 0}
+        self._dirty = True
+
+    def clear(self) -> None:
+        """Descarta el estado; se reconstruye en la próxima consulta"""
+        self._dirty = True
+
+    def _grow(self, count: int) -> None:
+        """Agrega nodos aislados hasta tener ``count`` índices"""
+        old = len(self.parent)
+        if count <= old:
+            return
+        capacity = max(count, 2 * old)
+        parent = np.arange(capacity, dtype=np.int64)
+        parent[:old] = self.parent
+        size = np.ones(capacity, dtype=np.int64)
+        size[:old] = self.size
+        present = np.zeros(capacity, dtype=bool)
+        present[:old] = self.present
+        self.parent, self.size, self.present = parent, size, present
+
+    def _find(self, index: int) -> int:
+        parent = self.parent
+        root = index
+        while parent[root] != root:
+            root = parent[root]
+        while parent[index] != root:
+            parent[index], index = root, parent[index]
+        return int(root)
+
+    def _count(self, node_type: str, delta: int) -> None:
+        self.type_counts[node_type] = self.type_counts.get(node_type, 0) + delta
+
+    def rebuild(self) -> None:
+        """Pasada completa sobre el grafo y la tabla de tuberías"""
+        network = self.network
+        store = network.pipes
+        n = store.node_count
+        self.types = {node_id: attrs.get('type')
+                      for node_id, attrs in network.graph.nodes(data=True)}
+        self.type_counts = {}
+        for node_type in self.types.values():
+            self._count(node_type, 1)
+
+        self.parent = np.arange(n, dtype=np.int64)
+        self.size = np.ones(n, dtype=np.int64)
+        self.present = np.zeros(n, dtype=bool)
+        self.present[[store.node_index[node_id] for node_id in self.types]] = True
+        slots = store.active_slots()
+        src = store.source[slots].astype(np.int64)
+        dst = store.target[slots].astype(np.int64)
+        graph = csr_matrix((np.ones(len(slots)), (src, dst)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+
+        # Árbol plano: cada nodo apunta al primero de su componente
+        nodes = np.flatnonzero(self.present)
+        _, first, counts = np.unique(labels[nodes], return_index=True, return_counts=True)
+        representative = np.zeros(labels.max() + 1 if n else 0, dtype=np.int64)
+        representative[labels[nodes[first]]] = nodes[first]
+        self.parent[nodes] = representative[labels[nodes]]
+        self.size[nodes[first]] = counts
+        self.roots = dict(zip(nodes[first].tolist(), counts.tolist()))
+        self.largest = max(self.roots, key=self.roots.get) if self.roots else -1
+        self.stats['rebuilt'] += 1
+        self._dirty = False
+
+    def _ensure(self) -> None:
+        if self._dirty or len(self.parent) < self.network.pipes.node_count:
+            if self._dirty:
+                self.rebuild()
+            else:
+                self._grow(self.network.pipes.node_count)
+
+    def on_node_added(self, node_id: str, node_type: str) -> None:
+        """Nodo nuevo (o cambio de tipo de uno existente)"""
+        if self._dirty:
+            return
+        if node_id in self.types:
+            self._count(self.types[node_id], -1)
+        self.types[node_id] = node_type
+        self._count(node_type, 1)
+        index = self.network.pipes.node_index[node_id]
+        self._grow(index + 1)
+        if not self.present[index]:
+            self.present[index] = True
+            self.roots[index] = 1
+            if self.largest < 0:
+                self.largest = index
+
+    def on_node_removed(self, node_id: str) -> None:
+        self._dirty = True
+
+    def on_pipe_added(self, slot: int) -> None:
+        """Une los componentes de los extremos de la tubería"""
+        if self._dirty:
+            return
+        store = self.network.pipes
+        self._grow(store.node_count)
+        a = self._find(int(store.source[slot]))
+        b = self._find(int(store.target[slot]))
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.roots[a] = int(self.size[a])
+        del self.roots[b]
+        if self.largest == b or self.size[a] > self.roots.get(self.largest, 0):
+            self.largest = a
+
+    def on_pipe_removed(self, slot: int) -> None:
+        self._dirty = True
+
+    @property
+    def component_count(self) -> int:
+        self._ensure()
+        return len(self.roots)
+
+    def component_of(self, node_id: str) -> Optional[str]:
+        """Nodo representante del componente de ``node_id``"""
+        self._ensure()
+        index = self.network.pipes.node_index.get(node_id)
+        if index is None or not self.present[index]:
+            return None
+        return self.network.pipes.node_ids[self._find(index)]
+
+    def component_size(self, node_id: str) -> int:
+        root = self.component_of(node_id)
+        if root is None:
+            return 0
+        return self.roots[self.network.pipes.node_index[root]]
+
+    def detached(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Hasta ``limit`` componentes fuera del principal: (representante, nodos)"""
+        self._ensure()
+        ids = self.network.pipes.node_ids
+        result = []
+        for root, count in self.roots.items():
+            if len(result) >= limit:
+                break
+            if root != self.largest:
+                result.append((ids[root], count))
+        return result
+
+    def validate(self, max_reported: int = 5) -> Tuple[bool, List[str]]:
+        """
+        Valida conectividad, tipos y estructura mínima con el estado mantenido
+
+        Returns:
+            Tuple[bool, List[str]]: (es_válido, lista_de_errores)
+        """
+        self._ensure()
+        errors = []
+        if len(self.roots) > 1:
+            errors.append(f"La red no está completamente conectada "
+                          f"({len(self.roots)} componentes)")
+            for root, count in self.detached(max_reported):
+                errors.append(f"Componente de {root} ({count} nodos) "
+                              f"separado de la red principal")
+            if len(self.roots) - 1 > max_reported:
+                errors.append(f"... y {len(self.roots) - 1 - max_reported} componentes más")
+
+        valid_types = VALIDATION_SETTINGS['required_node_types']
+        invalid = [t for t, count in self.type_counts.items()
+                   if count > 0 and t not in valid_types]
+        for node_type in invalid:
+            if node_type is None:
+                errors.append(f"{self.type_counts[None]} nodos no tienen tipo definido")
+            else:
+                errors.append(f"{self.type_counts[node_type]} nodos tienen un tipo "
+                              f"inválido: {node_type}")
+
+        if self.type_counts.get('tanque', 0) < VALIDATION_SETTINGS['min_tanks']:
+            errors.append("La red debe tener al menos un tanque")
+        if self.type_counts.get('barrio', 0) < VALIDATION_SETTINGS['min_neighborhoods']:
+            errors.append("La red debe tener al menos un barrio")
+        return len(errors) == 0, errors
@@ -0,0 +1,290 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import csv
+import multiprocessing
+import os
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import maximum_flow
+from config.settings import NETWORK_SETTINGS, SIMULATION_SETTINGS
+from .connection_planner import INT32_MAX, ResidualGraph, SharedResidual
+from .scenarios import SharedNetwork
+
+CONTINGENCY_FIELDS = ['rank', 'source', 'target', 'base_flow', 'lost',
+                      'unserved', 'unserved_ratio']
+
+# Residual del caso base en cada proceso trabajador
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+_worker_residual: Optional[csr_matrix] = None
+_worker_reroute: Optional[csr_matrix] = None
+_worker_terminals: Tuple[int, int] = (0, 0)
+
+
+def _max_flow(graph: csr_matrix, source: int, sink: int):
+    capacities = graph.copy()
+    capacities.data = np.minimum(capacities.data, INT32_MAX).astype(np.int32)
+    return maximum_flow(capacities, source, sink)
+
+
+def _with_arcs(graph: csr_matrix, rows: List[int], cols: List[int],
+               values: List[int], size: int) -> csr_matrix:
+    """Copia de ``graph`` ampliada a ``size`` nodos con arcos sumados"""
+    extended = graph.copy()
+    extended.resize((size, size))
+    extra = csr_matrix((np.asarray(values, dtype=np.int64), (rows, cols)), shape=(size, size))
+    return (extended + extra).tocsr()
+
+
+def reroute_pattern(residual: csr_matrix) -> csr_matrix:
+    """
+    Residual en int32 con una fila extra para la fuente auxiliar
+
+    La fila auxiliar tiene una única entrada cuya columna y capacidad se
+    fijan en cada contingencia, así el desvío solo copia y retoca ``data``.
+    """
+    n = residual.shape[0]
+    residual = residual.tocsr()
+    residual.sort_indices()
+    data = np.append(np.minimum(residual.data, INT32_MAX), 0).astype(np.int32)
+    indices = np.append(residual.indices, 0).astype(np.int32)
+    indptr = np.append(residual.indptr, residual.nnz + 1).astype(np.int32)
+    return csr_matrix((data, indices, indptr), shape=(n + 1, n + 1))
+
+
+def _entry(graph: csr_matrix, row: int, col: int) -> int:
+    """Posición de (row, col) en ``graph.data``; -1 si no está almacenada"""
+    start, end = graph.indptr[row], graph.indptr[row + 1]
+    position = start + int(np.searchsorted(graph.indices[start:end], col))
+    return position if position < end and graph.indices[position] == col else -1
+
+
+def _rerouted(pattern: csr_matrix, a: int, b: int, u: int, v: int, phi: int) -> bool:
+    """Si el flujo φ de la tubería a-b puede ir de u a v sin ella"""
+    n = pattern.shape[0] - 1
+    data = pattern.data.copy()
+    indices = pattern.indices.copy()
+    for position in (_entry(pattern, a, b), _entry(pattern, b, a)):
+        if position >= 0:
+            data[position] = 0
+    data[-1] = min(phi, INT32_MAX)
+    indices[-1] = u
+    graph = csr_matrix((data, indices, pattern.indptr), shape=pattern.shape)
+    return maximum_flow(graph, n, v).flow_value >= phi
+
+
+def pipe_loss(residual: csr_matrix, s: int, t: int, a: int, b: int,
+              pattern: Optional[csr_matrix] = None) -> int:
+    """
+    Demanda servida que se pierde al quitar la tubería a-b del caso base
+
+    ``residual`` es el grafo residual del flujo máximo base (cada tubería
+    como dos arcos opuestos de igual capacidad). Se quita la tubería y se
+    intenta desviar su flujo φ de u a v por el residual; si no alcanza, lo
+    que falta se devuelve de u a los tanques y de los barrios a v por un
+    arco virtual s→t (cada unidad en él es demanda que deja de servirse) y
+    luego se aumenta de nuevo de s a t, con lo que el resultado es el flujo
+    máximo exacto sin la tubería. ``pattern`` (de ``reroute_pattern``)
+    acelera el desvío, que resuelve la mayoría de los casos.
+    """
+    forward, backward = int(residual[a, b]), int(residual[b, a])
+    phi = (backward - forward) // 2
+    if phi == 0:
+        return 0
+    u, v = (a, b) if phi > 0 else (b, a)
+    phi = abs(phi)
+    if pattern is not None and _rerouted(pattern, a, b, u, v, phi):
+        return 0
+    n = residual.shape[0]
+    z = n  # fuente auxiliar que entrega el exceso φ en u
+    removed = residual - csr_matrix(([forward, backward], ([a, b], [b, a])),
+                                    shape=residual.shape, dtype=np.int64)
+
+    # Desvío: flujo de u a v sin la tubería
+    graph = _with_arcs(removed, [z], [u], [phi], n + 1)
+    rerouted = _max_flow(graph, z, v)
+    if rerouted.flow_value >= phi:
+        return 0
+    graph = (graph - rerouted.flow.astype(np.int64)).tocsr()
+
+    # Devolución del resto por el arco virtual s→t
+    graph = _with_arcs(graph, [s], [t], [phi], n + 1)
+    returned = _max_flow(graph, z, v)
+    dropped = int(returned.flow[s, t])
+    graph = (graph - returned.flow.astype(np.int64)).tocsr()[:n, :n]
+    virtual = csr_matrix(([int(graph[s, t]), int(graph[t, s])], ([s, t], [t, s])),
+                         shape=graph.shape, dtype=np.int64)
+    graph = (graph - virtual).tocsr()
+
+    # Reaumentar desde el flujo válido resultante
+    recovered = _max_flow(graph, s, t).flow_value
+    return max(dropped - int(recovered), 0)
+
+
+def _attach_worker(name: str, layout: Dict[str, Tuple[int, str, int]],
+                   shape: int, terminals: Tuple[int, int]) -> None:
+    """Inicializador de cada proceso: arma el residual sobre el bloque compartido"""
+    global _worker_memory, _worker_residual, _worker_reroute, _worker_terminals
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    parts = [SharedNetwork.view(_worker_memory, layout, field)
+             for field in ('data', 'indices', 'indptr')]
+    _worker_residual = csr_matrix(tuple(parts), shape=(shape, shape))
+    _worker_reroute = reroute_pattern(_worker_residual)
+    _worker_terminals = terminals
+
+
+def _run_in_worker(pairs: np.ndarray) -> np.ndarray:
+    s, t = _worker_terminals
+    return np.array([pipe_loss(_worker_residual, s, t, a, b, _worker_reroute)
+                     for a, b in pairs.tolist()], dtype=np.int64)
+
+
+class ContingencyAnalysis:
+    """Análisis N-1: demanda sin servir con cada tubería fuera de servicio
+
+    Bloquear una tubería y obstruirla por completo equivalen a llevar su
+    capacidad útil a cero. El caso base es el flujo máximo de los tanques
+    con agua a los barrios (demanda base); su residual es el punto de
+    partida de cada contingencia. Quitar una tubería reduce el flujo máximo
+    a lo sumo en el flujo que lleva en la solución base, así que las
+    tuberías sin flujo base (fuera de todo camino de suministro) se
+    descartan sin calcular. El resto se reparte en lotes sobre un pool de
+    procesos que comparten el residual por memoria compartida.
+    """
+
+    def __init__(self, network, settings: Optional[Dict[str, Any]] = None):
+        self.network = network
+        self.settings = settings or NETWORK_SETTINGS['contingency']
+        self.loss = np.zeros(0)  # demanda perdida por slot, en unidades de flujo
+
+    def _base_case(self):
+        network = self.network
+        store = network.pipes
+        resolution = NETWORK_SETTINGS['optimization']['flow_resolution']
+        n = store.node_count
+        s, t = n, n + 1
+        neighborhoods = np.array([store.node_index[node_id]
+                                  for node_id in network.neighborhoods], dtype=np.int64)
+        demand = np.floor(np.array(list(network.neighborhoods.values()), dtype=np.float64)
+                          * SIMULATION_SETTINGS['consumption_per_house']
+                          / resolution).astype(np.int64)
+        total = int(demand.sum())
+        tanks = np.array([store.node_index[node_id]
+                          for node_id, level in network.tank_levels.items() if level > 0],
+                         dtype=np.int64)
+        slots = store.active_slots()
+        capacity = np.floor(store.effective_capacity()[slots] / resolution).astype(np.int64)
+        u, v = store.source[slots].astype(np.int64), store.target[slots].astype(np.int64)
+        graph = ResidualGraph(
+            n + 2,
+            np.concatenate([u, v, np.full(tanks.size, s), neighborhoods]),
+            np.concatenate([v, u, tanks, np.full(neighborhoods.size, t)]),
+            np.concatenate([capacity, capacity, np.full(tanks.size, total), demand]),
+            s, t)
+        return graph, slots, u, v, total
+
+    def run(self, progress: Optional[Callable[..., None]] = None,
+            max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Evalúa la salida de servicio de cada tubería
+
+        Args:
+            progress: ``progress(fracción, mensaje)`` por lote terminado
+            max_workers: procesos del pool (por defecto uno por núcleo)
+
+        Returns:
+            Dict[str, Any]: demanda y servido del caso base, tuberías
+            evaluadas y descartadas, y la tabla ordenada por criticidad
+        """
+        network = self.network
+        store = network.pipes
+        resolution = NETWORK_SETTINGS['optimization']['flow_resolution']
+        if progress is not None:
+            progress(0.0, "Caso base")
+        graph, slots, u, v, total = self._base_case()
+        residual = graph.residual
+        s, t = graph.s, graph.t
+
+        # Flujo neto base por tubería; sin flujo no hay pérdida posible
+        forward = np.asarray(residual[u, v]).ravel()
+        backward = np.asarray(residual[v, u]).ravel()
+        base_flow = (backward - forward) // 2
+        candidates = np.flatnonzero(base_flow != 0)
+        pairs = np.column_stack([u, v])[candidates]
+        lost = np.zeros(len(slots), dtype=np.int64)
+
+        chunk = self.settings['chunk_size']
+        batches = [pairs[i:i + chunk] for i in range(0, len(pairs), chunk)]
+        positions = [candidates[i:i + chunk] for i in range(0, len(pairs), chunk)]
+        workers = min(max_workers or self.settings['max_workers'] or os.cpu_count() or 1,
+                      len(batches))
+        done = 0
+        if workers <= 1 or len(pairs) < self.settings['min_parallel']:
+            pattern = reroute_pattern(residual)
+            for batch, where in zip(batches, positions):
+                lost[where] = [pipe_loss(residual, s, t, a, b, pattern)
+                               for a, b in batch.tolist()]
+                done += len(batch)
+                if progress is not None:
+                    progress(done / len(pairs), f"{done} de {len(pairs)} tuberías")
+        else:
+            shared = SharedResidual(residual)
+            try:
+                # Se llama desde un hilo de la interfaz: ``fork`` copiaría un
+                # proceso con hilos y cerrojos tomados, ``spawn`` arranca limpio
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_attach_worker,
+                                         initargs=(shared.memory.name, shared.layout,
+                                                   residual.shape[0], (s, t))) as executor:
+                    futures = {executor.submit(_run_in_worker, batch): where
+                               for batch, where in zip(batches, positions)}
+                    try:
+                        for future in as_completed(futures):
+                            where = futures[future]
+                            lost[where] = future.result()
+                            done += len(where)
+                            if progress is not None:
+                                progress(done / len(pairs), f"{done} de {len(pairs)} tuberías")
+                    except BaseException:
+                        for future in futures:
+                            future.cancel()
+                        raise
+            finally:
+                shared.close()
+
+        self.loss = np.zeros(store.size)
+        self.loss[slots] = lost * resolution
+        unserved = (total - graph.value) * resolution
+        ids = store.node_ids
+        order = np.argsort(-lost, kind='stable')
+        order = order[lost[order] > 0]
+        rows = []
+        for rank, i in enumerate(order.tolist(), start=1):
+            after = unserved + int(lost[i]) * resolution
+            rows.append({
+                'rank': rank,
+                'source': ids[u[i]],
+                'target': ids[v[i]],
+                'base_flow': round(abs(int(base_flow[i])) * resolution, 2),
+                'lost': round(int(lost[i]) * resolution, 2),
+                'unserved': round(after, 2),
+                'unserved_ratio': round(after / (total * resolution), 4) if total else 0.0
+            })
+        return {
+            'demand': round(total * resolution, 2),
+            'served': round(graph.value * resolution, 2),
+            'pipes': len(slots),
+            'evaluated': len(pairs),
+            'skipped': len(slots) - len(pairs),
+            'critical': len(rows),
+            'rows': rows
+        }
+
+
+def write_contingency_table(rows: List[Dict[str, Any]], filename: str) -> None:
+    """Guarda la tabla de criticidad N-1 en CSV"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CONTINGENCY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
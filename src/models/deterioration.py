@@ -0,0 +1,142 @@
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from config.settings import SIMULATION_SETTINGS
+
+
+class DeteriorationSimulator:
+    """Crecimiento de obstrucciones a largo plazo con saltos entre eventos
+
+    La obstrucción de cada tubería crece linealmente a ``deterioration_rate``
+    por día hasta ``max_obstruction``. Las inspecciones (cada
+    ``inspection_interval`` días) detectan las tuberías que pasaron
+    ``cleaning_threshold`` y la siguiente ronda de mantenimiento (cada
+    ``maintenance_interval`` días) las limpia.
+
+    Entre limpiezas la evolución es lineal y acotada, así que el día exacto
+    en que cada tubería cruza cada umbral, el tiempo que pasa en el tope y
+    la obstrucción media se obtienen en forma cerrada para todas las
+    tuberías a la vez. La simulación salta directamente a la próxima ronda
+    de mantenimiento en la que alguna tubería ya fue detectada; las rondas
+    sin trabajo no se recorren.
+    """
+
+    def __init__(self, network, settings: Optional[Dict[str, Any]] = None):
+        self.network = network
+        self.settings = settings or SIMULATION_SETTINGS['maintenance']
+        self.slots = np.zeros(0, dtype=np.int64)
+        self.obstruction = np.zeros(0)  # obstrucción final por tubería activa
+
+    def crossing_days(self, obstruction: np.ndarray, rate: np.ndarray,
+                      threshold: float) -> np.ndarray:
+        """Días hasta alcanzar ``threshold`` sin mantenimiento (0 si ya lo pasó, inf si nunca)"""
+        if threshold > self.settings['max_obstruction']:
+            return np.full(len(obstruction), np.inf)
+        gap = np.maximum(threshold - obstruction, 0.0)
+        days = np.divide(gap, rate, out=np.full(len(gap), np.inf), where=rate > 0)
+        days[gap == 0] = 0.0
+        return days
+
+    def run(self, days: Optional[float] = None, rate: Optional[np.ndarray] = None,
+            progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Simula el deterioro y el mantenimiento de todas las tuberías activas
+
+        Args:
+            days: horizonte en días (por defecto ``horizon_days``)
+            rate: deterioro por día de cada tubería activa (por defecto
+                ``deterioration_rate`` para todas)
+            progress: ``progress(fracción, mensaje)`` por ronda de mantenimiento
+
+        Returns:
+            Dict[str, Any]: cruces por umbral (tuberías distintas que lo
+            cruzaron, cruces contando cada ciclo de limpieza y primer día),
+            limpiezas, días-tubería en el tope, obstrucción media y final,
+            y una fila por ronda de mantenimiento con trabajo
+        """
+        options = self.settings
+        store = self.network.pipes
+        horizon = float(options['horizon_days'] if days is None else days)
+        inspection = float(options['inspection_interval'])
+        maintenance = float(options['maintenance_interval'])
+        cap = float(options['max_obstruction'])
+        cleaning = float(options['cleaning_threshold'])
+        thresholds: List[float] = sorted(options['thresholds'])
+
+        self.slots = store.active_slots()
+        count = len(self.slots)
+        obstruction = np.minimum(store.obstruction[self.slots].astype(np.float64), cap)
+        rate = (np.full(count, float(options['deterioration_rate'])) if rate is None
+                else np.broadcast_to(np.asarray(rate, dtype=np.float64), (count,)))
+        initial_mean = float(obstruction.mean()) if count else 0.0
+
+        crossings = {threshold: 0 for threshold in thresholds}
+        crossed_pipes = {threshold: np.zeros(count, dtype=bool) for threshold in thresholds}
+        first_crossing: Dict[float, float] = {threshold: np.inf for threshold in thresholds}
+        cleaned_total = 0
+        capped_days = 0.0
+        integral = 0.0
+        timeline = []
+        now = 0.0
+        while now < horizon:
+            # Próxima ronda con trabajo: la primera tras la detección más temprana
+            detected = now + self.crossing_days(obstruction, rate, cleaning)
+            detected = np.ceil(detected / inspection) * inspection
+            first = detected.min() if count else np.inf
+            next_round = maintenance * (np.floor(now / maintenance) + 1)
+            if np.isfinite(first):
+                next_round = max(next_round, maintenance * np.ceil(first / maintenance))
+            end = min(next_round, horizon)
+            span = end - now
+
+            # Cruces de umbral dentro del tramo, en forma cerrada
+            for threshold in thresholds:
+                reach = now + self.crossing_days(obstruction, rate, threshold)
+                crossed = (obstruction < threshold) & (reach <= end)
+                if crossed.any():
+                    crossings[threshold] += int(crossed.sum())
+                    crossed_pipes[threshold] |= crossed
+                    first_crossing[threshold] = min(first_crossing[threshold],
+                                                    float(reach[crossed].min()))
+
+            # Integral de min(o + r·t, tope) sobre el tramo
+            to_cap = np.minimum(self.crossing_days(obstruction, rate, cap), span)
+            integral += float((obstruction * to_cap + rate * to_cap ** 2 / 2
+                               + cap * (span - to_cap)).sum())
+            capped_days += float((span - to_cap).sum())
+            obstruction = np.minimum(obstruction + rate * span, cap)
+            now = end
+
+            if end == next_round:
+                due = detected <= end
+                cleaned = int(due.sum())
+                if cleaned:
+                    timeline.append({
+                        'day': round(end, 2),
+                        'cleaned': cleaned,
+                        'mean_obstruction': round(float(obstruction.mean()), 2),
+                        'max_obstruction': round(float(obstruction.max()), 2)
+                    })
+                    obstruction[due] = 0.0
+                    cleaned_total += cleaned
+            if progress is not None:
+                progress(now / horizon if horizon else 1.0, f"Día {now:.0f}")
+
+        self.obstruction = obstruction
+        return {
+            'days': horizon,
+            'pipes': count,
+            'initial_mean_obstruction': round(initial_mean, 2),
+            'mean_obstruction': round(integral / (count * horizon), 2)
+                                if count and horizon else round(initial_mean, 2),
+            'final_mean_obstruction': round(float(obstruction.mean()), 2) if count else 0.0,
+            'cleanings': cleaned_total,
+            'capped_pipe_days': round(capped_days, 2),
+            'crossings': [{
+                'threshold': threshold,
+                'pipes': int(crossed_pipes[threshold].sum()),
+                'events': crossings[threshold],
+                'first_day': (round(first_crossing[threshold], 2)
+                              if np.isfinite(first_crossing[threshold]) else None)
+            } for threshold in thresholds],
+            'timeline': timeline
+        }
@@ -0,0 +1,348 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from collections.abc import MutableMapping
+import numpy as np
+
+class EdgeStore:
+    """Tabla compacta de tuberías respaldada por arreglos NumPy
+
+    Cada tubería no dirigida ocupa un único slot. Los identificadores de
+    nodo se internan a índices enteros y el flujo se guarda con signo:
+    positivo significa circulación de ``source[slot]`` hacia ``target[slot]``.
+    Los slots eliminados se marcan como inactivos y no se reutilizan, de
+    modo que el índice de una tubería es estable durante la vida de la red.
+    """
+
+    def __init__(self, initial_capacity: int = 64):
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.version = 0  # Se incrementa con cada cambio de topología
+        self._size = 0
+        self._active_count = 0
+        self._table: Dict[int, int] = {}
+        self._pending: List[Tuple[int, int]] = []  # rangos de slots sin registrar
+        self._allocate(max(1, initial_capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        """Reserva los arreglos con la capacidad indicada"""
+        self.source = np.zeros(capacity, dtype=np.int32)
+        self.target = np.zeros(capacity, dtype=np.int32)
+        self.capacity = np.zeros(capacity, dtype=np.float64)
+        self.obstruction = np.zeros(capacity, dtype=np.float32)
+        self.flow = np.zeros(capacity, dtype=np.float64)
+        self.blocked = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, required: int) -> None:
+        """Duplica la capacidad de los arreglos hasta alojar ``required`` slots"""
+        capacity = len(self.source)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        for name in ('source', 'target', 'capacity', 'obstruction',
+                     'flow', 'blocked', 'active'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    @property
+    def _lookup(self) -> Dict[int, int]:
+        """Slot de cada par de nodos; los lotes por índice se registran al primer uso"""
+        if self._pending:
+            for start, end in self._pending:
+                i = self.source[start:end].astype(np.int64)
+                j = self.target[start:end].astype(np.int64)
+                keys = (np.minimum(i, j) << 32) | np.maximum(i, j)
+                self._table.update(zip(keys.tolist(), range(start, end)))
+            self._pending = []
+        return self._table
+
+    @_lookup.setter
+    def _lookup(self, table: Dict[int, int]) -> None:
+        self._table = table
+        self._pending = []
+
+    @staticmethod
+    def _key(i: int, j: int) -> int:
+        """Clave entera para un par no ordenado de índices de nodo"""
+        if i > j:
+            i, j = j, i
+        return (i << 32) | j
+
+    @property
+    def size(self) -> int:
+        """Número de slots usados (incluye tuberías eliminadas)"""
+        return self._size
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    def __len__(self) -> int:
+        return self._active_count
+
+    def intern(self, node_id: str) -> int:
+        """Devuelve el índice entero de un nodo, registrándolo si es nuevo"""
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = len(self.node_ids)
+            self.node_index[node_id] = index
+            self.node_ids.append(node_id)
+        return index
+
+    def find(self, u: str, v: str) -> Optional[int]:
+        """Devuelve el slot de la tubería u-v o None si no existe"""
+        i = self.node_index.get(u)
+        j = self.node_index.get(v)
+        if i is None or j is None:
+            return None
+        return self._lookup.get(self._key(i, j))
+
+    def slot(self, u: str, v: str) -> int:
+        """Como ``find`` pero lanza KeyError si la tubería no existe"""
+        slot = self.find(u, v)
+        if slot is None:
+            raise KeyError(f"No existe la tubería {u}-{v}")
+        return slot
+
+    def add(self, u: str, v: str, capacity: float) -> int:
+        """Agrega una tubería o actualiza su capacidad si ya existe"""
+        i = self.intern(u)
+        j = self.intern(v)
+        key = self._key(i, j)
+        slot = self._lookup.get(key)
+        if slot is not None:
+            self.capacity[slot] = capacity
+            return slot
+
+        slot = self._size
+        self._grow(slot + 1)
+        self.source[slot] = i
+        self.target[slot] = j
+        self.capacity[slot] = capacity
+        self.obstruction[slot] = 0
+        self.flow[slot] = 0
+        self.blocked[slot] = False
+        self.active[slot] = True
+        self._lookup[key] = slot
+        self._size += 1
+        self._active_count += 1
+        self.version += 1
+        return slot
+
+    def extend(self, sources: List[str], targets: List[str],
+               capacities: np.ndarray) -> np.ndarray:
+        """Inserta un lote de tuberías nuevas y devuelve sus slots"""
+        i = np.fromiter((self.intern(u) for u in sources), dtype=np.int32,
+                        count=len(sources))
+        j = np.fromiter((self.intern(v) for v in targets), dtype=np.int32,
+                        count=len(targets))
+        capacities = np.asarray(capacities, dtype=np.float64)
+
+        slots = np.empty(len(i), dtype=np.int64)
+        new_rows = []
+        for row, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+            key = self._key(a, b)
+            slot = self._lookup.get(key)
+            if slot is None:
+                slot = self._size + len(new_rows)
+                self._lookup[key] = slot
+                new_rows.append(row)
+            slots[row] = slot
+
+        start = self._size
+        count = len(new_rows)
+        self._grow(start + count)
+        rows = np.asarray(new_rows, dtype=np.int64)
+        end = start + count
+        self.source[start:end] = i[rows]
+        self.target[start:end] = j[rows]
+        self.obstruction[start:end] = 0
+        self.flow[start:end] = 0
+        self.blocked[start:end] = False
+        self.active[start:end] = True
+        # Las filas repetidas conservan la última capacidad, igual que add()
+        self.capacity[slots] = capacities
+        self._size = end
+        self._active_count += count
+        if count:
+            self.version += 1
+        return slots
+
+    def extend_indices(self, sources: np.ndarray, targets: np.ndarray,
+                       capacities: np.ndarray,
+                       obstructions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Inserta tuberías dadas por índices de nodo ya internados
+
+        Pensado para formatos binarios: los pares deben ser nuevos y
+        distintos entre sí, lo que permite registrarlos sin recorrerlos en
+        Python; el índice por par se completa recién al primer uso.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        count = len(sources)
+        start = self._size
+        end = start + count
+        self._grow(end)
+        self.source[start:end] = sources
+        self.target[start:end] = targets
+        self.capacity[start:end] = capacities
+        self.obstruction[start:end] = 0 if obstructions is None else obstructions
+        self.flow[start:end] = 0
+        self.blocked[start:end] = False
+        self.active[start:end] = True
+        if count:
+            self._pending.append((start, end))
+        self._size = end
+        self._active_count += count
+        if count:
+            self.version += 1
+        return np.arange(start, end)
+
+    def attach(self, sources: np.ndarray, targets: np.ndarray,
+               capacities: np.ndarray, obstructions: np.ndarray) -> np.ndarray:
+        """Como ``extend_indices`` pero usa los arreglos como tabla, sin copiarlos
+
+        Pensado para las secciones de un archivo mapeado con copia en
+        escritura: las páginas se leen al accederlas y las modificaciones
+        quedan en memoria. Solo aplica con la tabla vacía y los mismos
+        tipos; si no, copia con ``extend_indices``.
+        """
+        arrays = tuple(np.asarray(array) for array in (sources, targets, capacities, obstructions))
+        expected = (self.source, self.target, self.capacity, self.obstruction)
+        if (self._size or not len(sources)
+                or any(array.dtype != field.dtype or not array.flags.writeable
+                       for array, field in zip(arrays, expected))):
+            return self.extend_indices(*arrays)
+        count = len(sources)
+        self.source, self.target, self.capacity, self.obstruction = arrays
+        self.flow = np.zeros(count, dtype=np.float64)
+        self.blocked = np.zeros(count, dtype=bool)
+        self.active = np.ones(count, dtype=bool)
+        self._pending.append((0, count))
+        self._size = count
+        self._active_count = count
+        self.version += 1
+        return np.arange(count)
+
+    def remove(self, u: str, v: str) -> int:
+        """Elimina la tubería u-v dejando su slot inactivo"""
+        slot = self.slot(u, v)
+        del self._lookup[self._key(int(self.source[slot]), int(self.target[slot]))]
+        self.active[slot] = False
+        self.capacity[slot] = 0
+        self.obstruction[slot] = 0
+        self.flow[slot] = 0
+        self.blocked[slot] = False
+        self._active_count -= 1
+        self.version += 1
+        return slot
+
+    def orientation(self, slot: int, u: str) -> int:
+        """+1 si u es el origen almacenado del slot, -1 en caso contrario"""
+        return 1 if self.source[slot] == self.node_index[u] else -1
+
+    def endpoints(self, slot: int) -> Tuple[str, str]:
+        """Identificadores de los extremos almacenados de un slot"""
+        return (self.node_ids[self.source[slot]],
+                self.node_ids[self.target[slot]])
+
+    def active_slots(self) -> np.ndarray:
+        """Índices de los slots con tuberías activas"""
+        return np.flatnonzero(self.active[:self._size])
+
+    def pipes(self) -> Iterator[Tuple[str, str]]:
+        """Itera las tuberías activas como pares (origen, destino)"""
+        ids = self.node_ids
+        for slot in self.active_slots().tolist():
+            yield ids[self.source[slot]], ids[self.target[slot]]
+
+    def effective_capacity(self) -> np.ndarray:
+        """Capacidad útil por slot descontando obstrucciones y bloqueos"""
+        n = self._size
+        usable = self.capacity[:n] * (1.0 - self.obstruction[:n] / 100.0)
+        usable[self.blocked[:n] | ~self.active[:n]] = 0.0
+        return usable
+
+    def copy(self) -> 'EdgeStore':
+        """Copia independiente con los mismos slots e índices de nodo"""
+        other = EdgeStore.__new__(EdgeStore)
+        other.node_ids = list(self.node_ids)
+        other.node_index = dict(self.node_index)
+        other.version = self.version
+        other._size = self._size
+        other._active_count = self._active_count
+        other._lookup = dict(self._lookup)
+        length = max(1, self._size)
+        for name in ('source', 'target', 'capacity', 'obstruction',
+                     'flow', 'blocked', 'active'):
+            setattr(other, name, getattr(self, name)[:length].copy())
+        return other
+
+    def clear(self) -> None:
+        """Elimina todos los nodos y tuberías"""
+        self.node_ids = []
+        self.node_index = {}
+        self._lookup = {}
+        self._size = 0
+        self._active_count = 0
+        self._allocate(len(self.source))
+        self.version += 1
+
+
+class PipeDictView(MutableMapping):
+    """Vista tipo diccionario ``{(origen, destino): valor}`` sobre un EdgeStore
+
+    Mantiene la interfaz de los antiguos diccionarios de la red, que
+    guardaban cada tubería en ambas direcciones. Con ``signed=True`` el
+    valor se invierte al leer o escribir en sentido contrario al almacenado.
+    ``on_change`` recibe el slot de cada tubería escrita por la vista.
+    """
+
+    def __init__(self, store: EdgeStore, field: str, signed: bool = False,
+                 on_delete: Optional[Callable[[str, str], object]] = None,
+                 on_change: Optional[Callable[[int], object]] = None):
+        self._store = store
+        self._field = field
+        self._signed = signed
+        self._on_delete = on_delete
+        self._on_change = on_change
+
+    def _locate(self, key: Tuple[str, str]) -> Tuple[int, int]:
+        u, v = key
+        slot = self._store.slot(u, v)
+        sign = self._store.orientation(slot, u) if self._signed else 1
+        return slot, sign
+
+    def __getitem__(self, key: Tuple[str, str]) -> float:
+        slot, sign = self._locate(key)
+        return sign * getattr(self._store, self._field)[slot].item()
+
+    def __setitem__(self, key: Tuple[str, str], value: float) -> None:
+        slot, sign = self._locate(key)
+        getattr(self._store, self._field)[slot] = sign * value
+        if self._on_change is not None:
+            self._on_change(slot)
+
+    def __delitem__(self, key: Tuple[str, str]) -> None:
+        u, v = key
+        self._store.slot(u, v)
+        if self._on_delete is None:
+            raise TypeError("Use WaterNetwork.delete_pipe para eliminar tuberías")
+        self._on_delete(u, v)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for u, v in self._store.pipes():
+            yield (u, v)
+            yield (v, u)
+
+    def __len__(self) -> int:
+        return 2 * len(self._store)
+
+    def __contains__(self, key) -> bool:
+        try:
+            u, v = key
+        except (TypeError, ValueError):
+            return False
+        return self._store.find(u, v) is not None
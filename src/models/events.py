@@ -0,0 +1,212 @@
+"""
+Eventos de cambio de la red
+
+WaterNetwork publica un evento tipado por cada mutación en su ``events``
+(un ChangeBus). Los eventos pendientes se agrupan y se entregan juntos:
+con ``scheduler`` (en la interfaz, ``root.after_idle``) una vez por ciclo
+ocioso de Tk; sin él, al terminar cada operación o bloque ``batch()``.
+Dentro de un lote, varios eventos del mismo tipo sobre el mismo elemento
+se reducen al último.
+"""
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class NetworkEvent:
+    """Base de los eventos; ``key`` identifica el elemento afectado"""
+
+    @property
+    def key(self) -> Hashable:
+        return None
+
+
+@dataclass(frozen=True)
+class NodeAdded(NetworkEvent):
+    node_id: str
+    node_type: str
+
+    @property
+    def key(self) -> Hashable:
+        return self.node_id
+
+
+@dataclass(frozen=True)
+class NodeRemoved(NetworkEvent):
+    node_id: str
+    node_type: str
+
+    @property
+    def key(self) -> Hashable:
+        return self.node_id
+
+
+@dataclass(frozen=True)
+class PipeAdded(NetworkEvent):
+    source: str
+    target: str
+    slot: int
+
+    @property
+    def key(self) -> Hashable:
+        return self.slot
+
+
+@dataclass(frozen=True)
+class PipeRemoved(NetworkEvent):
+    source: str
+    target: str
+    slot: int
+
+    @property
+    def key(self) -> Hashable:
+        return self.slot
+
+
+@dataclass(frozen=True)
+class CapacityChanged(NetworkEvent):
+    source: str
+    target: str
+    slot: int
+    capacity: float
+
+    @property
+    def key(self) -> Hashable:
+        return self.slot
+
+
+@dataclass(frozen=True)
+class ObstructionChanged(NetworkEvent):
+    source: str
+    target: str
+    slot: int
+    level: float
+
+    @property
+    def key(self) -> Hashable:
+        return self.slot
+
+
+@dataclass(frozen=True)
+class PipeBlocked(NetworkEvent):
+    source: str
+    target: str
+    slot: int
+    blocked: bool
+
+    @property
+    def key(self) -> Hashable:
+        return self.slot
+
+
+@dataclass(frozen=True)
+class TankLevelChanged(NetworkEvent):
+    tank_id: str
+    level: float
+
+    @property
+    def key(self) -> Hashable:
+        return self.tank_id
+
+
+@dataclass(frozen=True)
+class SimulationStep(NetworkEvent):
+    """Flujos y niveles cambiaron en bloque (paso o reinicio de simulación)"""
+    time: float
+
+
+@dataclass(frozen=True)
+class NetworkReset(NetworkEvent):
+    """La red se vació o se cargó completa; hay que releerla entera"""
+
+
+TOPOLOGY_EVENTS = (NodeAdded, NodeRemoved, PipeAdded, PipeRemoved, NetworkReset)
+
+Callback = Callable[[List[NetworkEvent]], None]
+
+
+class ChangeBus:
+    """Bus de eventos con entrega agrupada y reducida por lote"""
+
+    def __init__(self, scheduler: Optional[Callable[[Callable[[], None]], object]] = None):
+        self.scheduler = scheduler
+        self._subscribers: List[Tuple[Callback, Tuple[Type[NetworkEvent], ...]]] = []
+        self._pending: Dict[Tuple[type, Hashable], NetworkEvent] = {}
+        self._scheduled = False
+        self._depth = 0
+        self.revision = 0  # cantidad de cambios publicados
+        self.edit_revision = 0  # cambios publicados sin contar pasos de simulación
+
+    def subscribe(self, callback: Callback, *event_types: Type[NetworkEvent],
+                  first: bool = False) -> Callback:
+        """Registra ``callback``; recibe la lista de eventos de esos tipos
+
+        Sin tipos, recibe todos los eventos. Con ``first`` se entrega antes
+        que a los suscriptores ya registrados (índices de los que otros leen).
+        """
+        entry = (callback, event_types or (NetworkEvent,))
+        if first:
+            self._subscribers.insert(0, entry)
+        else:
+            self._subscribers.append(entry)
+        return callback
+
+    def unsubscribe(self, callback: Callback) -> None:
+        self._subscribers = [(cb, types) for cb, types in self._subscribers
+                             if cb != callback]
+
+    def publish(self, event: NetworkEvent) -> None:
+        """Encola un evento y agenda la entrega del lote"""
+        self.revision += 1
+        if not isinstance(event, SimulationStep):
+            self.edit_revision += 1
+        if not self._subscribers:
+            return
+        if isinstance(event, NetworkReset):
+            # Releer la red entera cubre cualquier cambio anterior
+            self._pending.clear()
+        key = (type(event), event.key)
+        self._pending.pop(key, None)
+        self._pending[key] = event
+        if not self._depth:
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if self.scheduler is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.scheduler(self.flush)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Agrupa las publicaciones del bloque en una sola entrega"""
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth and self._pending:
+                self._schedule()
+
+    def flush(self) -> None:
+        """Entrega los eventos pendientes a cada suscriptor interesado"""
+        self._scheduled = False
+        events = list(self._pending.values())
+        self._pending.clear()
+        if not events:
+            return
+        for callback, event_types in list(self._subscribers):
+            selected = [event for event in events if isinstance(event, event_types)]
+            if not selected:
+                continue
+            try:
+                callback(selected)
+            except Exception:
+                # Un suscriptor con error no debe dejar sin eventos a los demás
+                logger.exception("Error en el suscriptor %r", callback)
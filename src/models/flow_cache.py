@@ -0,0 +1,321 @@
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+import numpy as np
+from config.settings import NETWORK_SETTINGS
+
+EPS = 1e-9
+
+
+class ResidualFlow:
+    """Flujo máximo con grafo residual persistente (algoritmo de Dinic)
+
+    Cada arista ``e`` une ``tail[e]`` con ``head[e]`` y admite un flujo con
+    signo ``flow[e]`` acotado por ``-cap_bwd[e] <= flow[e] <= cap_fwd[e]``.
+    Una tubería no dirigida tiene ``cap_fwd == cap_bwd``; un arco dirigido
+    tiene ``cap_bwd == 0``. El flujo se conserva entre llamadas, de modo
+    que ``augment`` parte de la solución anterior.
+    """
+
+    def __init__(self, node_count: int, tail: np.ndarray, head: np.ndarray,
+                 cap_fwd: np.ndarray, cap_bwd: np.ndarray):
+        self.node_count = node_count
+        self.tail = tail.tolist()
+        self.head = head.tolist()
+        self.cap_fwd = [float(c) for c in cap_fwd]
+        self.cap_bwd = [float(c) for c in cap_bwd]
+        self.flow = [0.0] * len(self.tail)
+        self.adjacency: List[List[Tuple[int, int, int]]] = [[] for _ in range(node_count)]
+        for e, (a, b) in enumerate(zip(self.tail, self.head)):
+            self.adjacency[a].append((e, 1, b))
+            self.adjacency[b].append((e, -1, a))
+
+    def residual(self, e: int, sign: int) -> float:
+        """Capacidad residual de la arista ``e`` en el sentido ``sign``"""
+        if sign > 0:
+            return self.cap_fwd[e] - self.flow[e]
+        return self.cap_bwd[e] + self.flow[e]
+
+    def copy(self) -> 'ResidualFlow':
+        """Copia independiente; extremos y adyacencia no cambian y se comparten"""
+        other = ResidualFlow.__new__(ResidualFlow)
+        other.node_count = self.node_count
+        other.tail = self.tail
+        other.head = self.head
+        other.adjacency = self.adjacency
+        other.cap_fwd = list(self.cap_fwd)
+        other.cap_bwd = list(self.cap_bwd)
+        other.flow = list(self.flow)
+        return other
+
+    def reset(self) -> None:
+        """Descarta el flujo actual"""
+        self.flow = [0.0] * len(self.tail)
+
+    def _levels(self, s: int) -> List[int]:
+        level = [-1] * self.node_count
+        level[s] = 0
+        queue = [s]
+        flow, cap_fwd, cap_bwd = self.flow, self.cap_fwd, self.cap_bwd
+        for u in queue:
+            next_level = level[u] + 1
+            for e, sign, v in self.adjacency[u]:
+                if level[v] >= 0:
+                    continue
+                r = cap_fwd[e] - flow[e] if sign > 0 else cap_bwd[e] + flow[e]
+                if r > EPS:
+                    level[v] = next_level
+                    queue.append(v)
+        return level
+
+    def augment(self, s: int, t: int) -> float:
+        """Aumenta el flujo de ``s`` a ``t`` hasta el máximo; devuelve lo añadido"""
+        if s == t:
+            return 0.0
+        added = 0.0
+        flow, cap_fwd, cap_bwd = self.flow, self.cap_fwd, self.cap_bwd
+        adjacency = self.adjacency
+        while True:
+            level = self._levels(s)
+            if level[t] < 0:
+                return added
+            pointer = [0] * self.node_count
+            while True:
+                # Buscar un camino en el grafo de niveles (DFS iterativo)
+                path: List[Tuple[int, int, int]] = []
+                u = s
+                while u != t:
+                    edges = adjacency[u]
+                    advanced = False
+                    while pointer[u] < len(edges):
+                        e, sign, v = edges[pointer[u]]
+                        if level[v] == level[u] + 1:
+                            r = cap_fwd[e] - flow[e] if sign > 0 else cap_bwd[e] + flow[e]
+                            if r > EPS:
+                                path.append((e, sign, u))
+                                u = v
+                                advanced = True
+                                break
+                        pointer[u] += 1
+                    if not advanced:
+                        if u == s:
+                            break
+                        level[u] = -1
+                        _, _, u = path.pop()
+                        pointer[u] += 1
+                if u != t:
+                    break
+                bottleneck = min(
+                    cap_fwd[e] - flow[e] if sign > 0 else cap_bwd[e] + flow[e]
+                    for e, sign, _ in path
+                )
+                for e, sign, _ in path:
+                    flow[e] += sign * bottleneck
+                added += bottleneck
+
+    def source_side(self, s: int) -> List[bool]:
+        """Nodos alcanzables desde ``s`` en el residual (lado fuente del corte)"""
+        return [lvl >= 0 for lvl in self._levels(s)]
+
+    def outflow(self, s: int) -> float:
+        """Flujo neto que sale de ``s``"""
+        return sum(sign * self.flow[e] for e, sign, _ in self.adjacency[s])
+
+
+class _CacheEntry:
+    """Solución de flujo máximo para un par (origen, destino)"""
+
+    def __init__(self, residual: ResidualFlow, s: int, t: int,
+                 supply_edge: Optional[int]):
+        self.residual = residual
+        self.s = s
+        self.t = t
+        self.supply_edge = supply_edge
+        self.value = 0.0
+        self.cut: Optional[List[bool]] = None
+
+    def copy(self) -> '_CacheEntry':
+        other = _CacheEntry(self.residual.copy(), self.s, self.t, self.supply_edge)
+        other.value = self.value
+        other.cut = self.cut
+        return other
+
+    def solve(self) -> None:
+        """Recalcula desde cero"""
+        self.residual.reset()
+        self.value = self.residual.augment(self.s, self.t)
+        self.cut = None
+
+    def source_side(self) -> List[bool]:
+        if self.cut is None:
+            self.cut = self.residual.source_side(self.s)
+        return self.cut
+
+    def set_capacity(self, e: int, cap_fwd: float, cap_bwd: float) -> str:
+        """
+        Aplica el cambio de capacidad de una arista y repara la solución
+
+        Returns:
+            str: 'unchanged', 'augmented' o 'recomputed'
+        """
+        residual = self.residual
+        old_fwd, old_bwd = residual.cap_fwd[e], residual.cap_bwd[e]
+        f = residual.flow[e]
+        if f > cap_fwd + EPS or -f > cap_bwd + EPS:
+            # El flujo actual deja de ser factible: la arista está en el corte
+            residual.cap_fwd[e] = cap_fwd
+            residual.cap_bwd[e] = cap_bwd
+            self.solve()
+            return 'recomputed'
+
+        if cap_fwd <= old_fwd and cap_bwd <= old_bwd:
+            # El flujo sigue siendo factible y el máximo no puede crecer
+            residual.cap_fwd[e] = cap_fwd
+            residual.cap_bwd[e] = cap_bwd
+            self.cut = None
+            return 'unchanged'
+
+        # El corte se evalúa con las capacidades anteriores al cambio
+        side = self.source_side()
+        residual.cap_fwd[e] = cap_fwd
+        residual.cap_bwd[e] = cap_bwd
+        # Con más capacidad el lado fuente puede crecer aunque no haya aumento
+        self.cut = None
+        a, b = residual.tail[e], residual.head[e]
+        if side[a] == side[b]:
+            # Ambos extremos del mismo lado: el corte mínimo no cambia
+            return 'unchanged'
+        self.value += residual.augment(self.s, self.t)
+        return 'augmented'
+
+
+class MaxFlowCache:
+    """Flujos máximos por (origen, destino) con reparación incremental
+
+    Cada entrada conserva su grafo residual. Un cambio de capacidad en una
+    tubería (obstrucción, bloqueo) o en el suministro de un tanque se aplica
+    sobre ese residual: si el flujo vigente sigue siendo factible solo se
+    buscan caminos de aumento nuevos cuando la arista cruza el corte mínimo,
+    y únicamente se recalcula todo cuando el cambio invalida el flujo.
+    Los cambios de topología descartan la caché.
+    """
+
+    def __init__(self, network, max_entries: Optional[int] = None):
+        self.network = network
+        self.max_entries = max_entries or NETWORK_SETTINGS.get('max_flow_cache_entries', 16)
+        self.entries: 'OrderedDict[Tuple[str, str], _CacheEntry]' = OrderedDict()
+        self._version = None
+        self.stats = {'hits': 0, 'full': 0, 'augmented': 0, 'unchanged': 0}
+
+    def invalidate(self) -> None:
+        """Descarta todas las soluciones almacenadas"""
+        self.entries.clear()
+
+    def copy(self, network) -> 'MaxFlowCache':
+        """Copia de las soluciones para ``network`` (una copia de la red)"""
+        other = MaxFlowCache(network, self.max_entries)
+        other.entries = OrderedDict((key, entry.copy()) for key, entry in self.entries.items())
+        other._version = self._version
+        other.stats = dict(self.stats)
+        return other
+
+    def cached(self, source: str, target: str) -> Optional[float]:
+        """Flujo máximo ya calculado entre dos nodos, o None si no está en la caché"""
+        self._check_topology()
+        entry = self.entries.get((source, target))
+        if entry is None:
+            return None
+        self.stats['hits'] += 1
+        self.entries.move_to_end((source, target))
+        return entry.value
+
+    def _check_topology(self) -> None:
+        store = self.network.pipes
+        version = (store.version, store.size, store.node_count)
+        if version != self._version:
+            self.entries.clear()
+            self._version = version
+
+    def _tank_supply(self, node_id: str) -> float:
+        """Capacidad del arco de suministro de un tanque (0 si está vacío)"""
+        if self.network.tank_levels.get(node_id, 0) <= 0:
+            return 0.0
+        store = self.network.pipes
+        index = store.node_index[node_id]
+        size = store.size
+        incident = (store.source[:size] == index) | (store.target[:size] == index)
+        return float(store.effective_capacity()[incident].sum())
+
+    def _build(self, source: str, target: str) -> _CacheEntry:
+        store = self.network.pipes
+        size = store.size
+        capacity = store.effective_capacity()
+        tail = store.source[:size].astype(np.int64)
+        head = store.target[:size].astype(np.int64)
+        cap_fwd = capacity
+        cap_bwd = capacity.copy()
+        node_count = store.node_count
+        s = store.node_index[source]
+        supply_edge = None
+        if source in self.network.tank_levels:
+            # Arco virtual desde una súper fuente: el nivel del tanque lo habilita
+            supply_edge = size
+            tail = np.append(tail, node_count)
+            head = np.append(head, s)
+            cap_fwd = np.append(cap_fwd, self._tank_supply(source))
+            cap_bwd = np.append(cap_bwd, 0.0)
+            s = node_count
+            node_count += 1
+        residual = ResidualFlow(node_count, tail, head, cap_fwd, cap_bwd)
+        entry = _CacheEntry(residual, s, store.node_index[target], supply_edge)
+        entry.solve()
+        return entry
+
+    def max_flow(self, source: str, target: str) -> float:
+        """Valor del flujo máximo entre dos nodos"""
+        self._check_topology()
+        key = (source, target)
+        entry = self.entries.get(key)
+        if entry is None:
+            if source not in self.network.pipes.node_index:
+                raise KeyError(f"No existe el nodo {source}")
+            if target not in self.network.pipes.node_index:
+                raise KeyError(f"No existe el nodo {target}")
+            entry = self._build(source, target)
+            self.stats['full'] += 1
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.stats['hits'] += 1
+            self.entries.move_to_end(key)
+        return entry.value
+
+    def _apply(self, entry: _CacheEntry, e: int, cap_fwd: float, cap_bwd: float) -> None:
+        outcome = entry.set_capacity(e, cap_fwd, cap_bwd)
+        self.stats['full' if outcome == 'recomputed' else outcome] += 1
+
+    def on_pipe_change(self, slot: int) -> None:
+        """Actualiza las soluciones tras cambiar la capacidad útil de una tubería"""
+        self._check_topology()
+        if not self.entries:
+            return
+        store = self.network.pipes
+        capacity = 0.0
+        if store.active[slot] and not store.blocked[slot]:
+            capacity = float(store.capacity[slot] * (1.0 - store.obstruction[slot] / 100.0))
+        for entry in self.entries.values():
+            self._apply(entry, slot, capacity, capacity)
+        # La capacidad del arco de suministro depende de las tuberías del tanque
+        for (source, _), entry in self.entries.items():
+            if entry.supply_edge is not None:
+                self._apply(entry, entry.supply_edge, self._tank_supply(source), 0.0)
+
+    def on_tank_change(self, tank_id: str) -> None:
+        """Actualiza las soluciones cuyo origen es el tanque modificado"""
+        self._check_topology()
+        supply = None
+        for (source, _), entry in self.entries.items():
+            if source == tank_id and entry.supply_edge is not None:
+                if supply is None:
+                    supply = self._tank_supply(tank_id)
+                self._apply(entry, entry.supply_edge, supply, 0.0)
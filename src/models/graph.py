@@ -5,6 +5,7 @@ from matplotlib.patches import Circle, Rectangle, PathPatch
 import matplotlib.path as mpath
 import matplotlib.colors as mcolors
 import numpy as np
+from .layout import cached_layout
 
 class NetworkGraph:
     """Clase para manejar la visualización y operaciones del grafo de la red"""
@@ -14,30 +15,13 @@ class NetworkGraph:
         self.node_positions: Dict[str, Tuple[float, float]] = {}
         
     def calculate_layout(self, G: nx.Graph) -> Dict[str, Tuple[float, float]]:
-        """Calcula las posiciones óptimas de los nodos"""
-        positions = {}
-        
-        # Separar nodos por tipo
-        tanks = [n for n, attr in G.nodes(data=True) if attr['tipo'] == 'tanque']
-        neighborhoods = [n for n, attr in G.nodes(data=True) if attr['tipo'] == 'barrio']
-        intersections = [n for n, attr in G.nodes(data=True) if attr['tipo'] == 'interseccion']
-        
-        # Posicionar tanques en la parte superior
-        for i, tank in enumerate(tanks):
-            x = -4 + (8 * i/(len(tanks) if len(tanks) > 1 else 1))
-            positions[tank] = (x, 6)
-        
-        # Posicionar intersecciones en el medio
-        for i, intersection in enumerate(intersections):
-            x = -4 + (8 * i/(len(intersections) if len(intersections) > 1 else 1))
-            positions[intersection] = (x, 0)
-        
-        # Posicionar barrios en la parte inferior
-        for i, neighborhood in enumerate(neighborhoods):
-            x = -4 + (8 * i/(len(neighborhoods) if len(neighborhoods) > 1 else 1))
-            positions[neighborhood] = (x, -6)
-            
-        return positions
+        """Calcula las posiciones de los nodos (multinivel, con caché por topología)"""
+        node_ids = list(G.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges],
+                         dtype=np.int64).reshape(-1, 2)
+        self.node_positions = cached_layout(node_ids, edges[:, 0], edges[:, 1])
+        return self.node_positions
     
     def draw_pipe(self, x1: float, y1: float, x2: float, y2: float, 
                   flow: float = 0, obstruction: float = 0, is_route: bool = False) -> None:
@@ -0,0 +1,248 @@
+"""
+Historial columnar de flujos de la simulación
+
+Los flujos de cada paso se copian a un búfer circular preasignado de
+``chunk_rows`` filas por tubería en float32, limitado además a
+``history_buffer_bytes``. Cuando el búfer se llena se
+vuelca como un bloque a un archivo .sim y se vuelve a escribir desde la
+primera fila, de modo que la memoria usada no depende de la duración de la
+simulación. El archivo temporal propio también se acota: al superar
+``history_file_bytes`` se descartan los bloques más antiguos y se conserva
+la mitad más reciente. Un archivo indicado por el usuario guarda todo.
+
+Estructura del archivo .sim (little endian):
+
+    cabecera  '<4sHH'  magia b'SIM\\0', versión, reservado
+    bloques   '<QQ'    filas, ancho (slots del EdgeStore)
+              float64[filas]          tiempo de cada fila
+              float32[ancho * filas]  flujos por tubería (una serie
+                                      contigua por slot)
+
+Guardar cada bloque por columnas permite leer la serie de una tubería
+sin cargar las demás.
+"""
+
+import os
+import struct
+import tempfile
+import weakref
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from config.settings import FILE_SETTINGS, SIMULATION_SETTINGS
+
+SIM_MAGIC = b'SIM\0'
+SIM_VERSION = 1
+SIM_HEADER = struct.Struct('<4sHH')
+CHUNK_HEADER = struct.Struct('<QQ')
+
+
+def _remove_file(filename: str) -> None:
+    if os.path.exists(filename):
+        os.remove(filename)
+
+
+class FlowHistory:
+    """Registro de flujos por paso con memoria acotada
+
+    Las columnas son los slots del EdgeStore, estables durante la vida de
+    la red; un slot que aún no existía en un bloque se lee como flujo 0.
+    Una grabación nueva reemplaza el contenido de ``filename``.
+    """
+
+    def __init__(self, filename: Optional[str] = None,
+                 chunk_rows: Optional[int] = None,
+                 max_file_bytes: Optional[int] = None):
+        self.max_rows = chunk_rows or SIMULATION_SETTINGS['history_chunk_rows']
+        self.chunk_rows = self.max_rows
+        self.filename = filename
+        self._owns_file = filename is None
+        if max_file_bytes is None and self._owns_file:
+            max_file_bytes = SIMULATION_SETTINGS['history_file_bytes']
+        self.max_file_bytes = max_file_bytes
+        self.dropped_rows = 0  # filas descartadas por el tope del archivo
+        self._chunks: List[Tuple[int, int, int]] = []  # (offset, filas, ancho)
+        self._width = 0
+        self._rows = 0
+        self._times = np.zeros(self.chunk_rows, dtype=np.float64)
+        self._buffer = np.zeros((self.chunk_rows, 0), dtype=np.float32)
+        self._spilled_rows = 0
+        self._cleanup = None
+
+    @classmethod
+    def open(cls, filename: str) -> 'FlowHistory':
+        """Abre un archivo .sim existente recorriendo sus cabeceras de bloque"""
+        history = cls(filename)
+        size = os.path.getsize(filename)
+        with open(filename, 'rb') as f:
+            magic, version, _ = SIM_HEADER.unpack(f.read(SIM_HEADER.size))
+            if magic != SIM_MAGIC:
+                raise ValueError(f"{filename} no es un archivo .sim")
+            if version > SIM_VERSION:
+                raise ValueError(f"Versión de .sim no soportada: {version}")
+            offset = SIM_HEADER.size
+            while offset < size:
+                f.seek(offset)
+                rows, width = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+                history._chunks.append((offset, rows, width))
+                history._spilled_rows += rows
+                history._width = max(history._width, width)
+                offset += CHUNK_HEADER.size + 8 * rows + 4 * width * rows
+        history._resize(history._width)
+        return history
+
+    def __len__(self) -> int:
+        return self._spilled_rows + self._rows
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def _resize(self, width: int) -> None:
+        """Reserva el búfer para ``width`` slots sin superar el tope de bytes"""
+        budget = SIMULATION_SETTINGS['history_buffer_bytes'] // max(1, 4 * width)
+        self.chunk_rows = int(min(self.max_rows, max(1, budget)))
+        self._width = width
+        self._times = np.zeros(self.chunk_rows, dtype=np.float64)
+        self._buffer = np.zeros((self.chunk_rows, width), dtype=np.float32)
+
+    def record(self, time: float, flows: np.ndarray) -> None:
+        """Agrega una fila con los flujos de todos los slots"""
+        if len(flows) > self._width:
+            # La red creció: se vuelca lo acumulado y se amplía el búfer
+            self.flush()
+            self._resize(len(flows))
+        row = self._rows
+        self._times[row] = time
+        self._buffer[row, :len(flows)] = flows
+        self._buffer[row, len(flows):] = 0
+        self._rows += 1
+        if self._rows == self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Vuelca las filas del búfer al archivo .sim"""
+        rows = self._rows
+        if rows == 0:
+            return
+        if self.filename is None:
+            directory = Path(FILE_SETTINGS['save_directory'])
+            fd, self.filename = tempfile.mkstemp(
+                suffix=FILE_SETTINGS['file_extensions']['simulation'], dir=directory)
+            os.close(fd)
+            self._cleanup = weakref.finalize(self, _remove_file, self.filename)
+        # El primer bloque de una grabación reemplaza lo que hubiera en el archivo
+        new_file = not self._chunks
+        with open(self.filename, 'wb' if new_file else 'ab') as f:
+            if new_file:
+                f.write(SIM_HEADER.pack(SIM_MAGIC, SIM_VERSION, 0))
+            offset = f.tell()
+            f.write(CHUNK_HEADER.pack(rows, self._width))
+            f.write(self._times[:rows].tobytes())
+            f.write(np.ascontiguousarray(self._buffer[:rows].T).tobytes())
+            size = f.tell()
+        self._chunks.append((offset, rows, self._width))
+        self._spilled_rows += rows
+        self._rows = 0
+        if self.max_file_bytes and size > self.max_file_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Reescribe el archivo con los bloques más recientes que caben en medio tope"""
+        keep = []
+        size = 0
+        for offset, rows, width in reversed(self._chunks):
+            length = CHUNK_HEADER.size + 8 * rows + 4 * width * rows
+            if keep and size + length > self.max_file_bytes // 2:
+                break
+            keep.append((offset, rows, width, length))
+            size += length
+        keep.reverse()
+        partial = self.filename + '.tmp'
+        chunks = []
+        with open(self.filename, 'rb') as source, open(partial, 'wb') as f:
+            f.write(SIM_HEADER.pack(SIM_MAGIC, SIM_VERSION, 0))
+            for offset, rows, width, length in keep:
+                source.seek(offset)
+                chunks.append((f.tell(), rows, width))
+                f.write(source.read(length))
+        os.replace(partial, self.filename)
+        kept_rows = sum(rows for _, rows, _ in chunks)
+        self.dropped_rows += self._spilled_rows - kept_rows
+        self._spilled_rows = kept_rows
+        self._chunks = chunks
+
+    def times(self) -> np.ndarray:
+        """Tiempo de cada fila registrada"""
+        parts = []
+        if self._chunks:
+            with open(self.filename, 'rb') as f:
+                for offset, rows, _ in self._chunks:
+                    f.seek(offset + CHUNK_HEADER.size)
+                    parts.append(np.fromfile(f, dtype=np.float64, count=rows))
+        parts.append(self._times[:self._rows].copy())
+        return np.concatenate(parts)
+
+    def series(self, slot: int) -> np.ndarray:
+        """Serie de flujo de un slot leyendo solo sus bytes en cada bloque"""
+        parts = []
+        if self._chunks:
+            with open(self.filename, 'rb') as f:
+                for offset, rows, width in self._chunks:
+                    if slot >= width:
+                        parts.append(np.zeros(rows, dtype=np.float32))
+                        continue
+                    f.seek(offset + CHUNK_HEADER.size + 8 * rows + 4 * slot * rows)
+                    parts.append(np.fromfile(f, dtype=np.float32, count=rows))
+        if slot < self._width:
+            parts.append(self._buffer[:self._rows, slot].copy())
+        else:
+            parts.append(np.zeros(self._rows, dtype=np.float32))
+        return np.concatenate(parts)
+
+    def rows(self, start: int, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Tiempos y matriz (filas × slots) del rango [start, stop)"""
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        start = max(0, start)
+        times = np.zeros(max(0, stop - start), dtype=np.float64)
+        matrix = np.zeros((len(times), self._width), dtype=np.float32)
+        position = 0
+        with open(self.filename, 'rb') if self._chunks else nullcontext() as f:
+            for offset, rows, width in self._chunks:
+                lo, hi = max(start, position), min(stop, position + rows)
+                if lo < hi:
+                    f.seek(offset + CHUNK_HEADER.size)
+                    chunk_times = np.fromfile(f, dtype=np.float64, count=rows)
+                    data = np.fromfile(f, dtype=np.float32, count=width * rows)
+                    data = data.reshape(width, rows)
+                    times[lo - start:hi - start] = chunk_times[lo - position:hi - position]
+                    matrix[lo - start:hi - start, :width] = data[:, lo - position:hi - position].T
+                position += rows
+        lo, hi = max(start, position), min(stop, position + self._rows)
+        if lo < hi:
+            times[lo - start:hi - start] = self._times[lo - position:hi - position]
+            matrix[lo - start:hi - start] = self._buffer[lo - position:hi - position]
+        return times, matrix
+
+    def clear(self) -> None:
+        """Descarta el historial y el archivo temporal"""
+        if self._owns_file and self._cleanup is not None:
+            self._cleanup()
+            self._cleanup = None
+            self.filename = None
+        elif self.filename and os.path.exists(self.filename):
+            open(self.filename, 'wb').close()
+        self._chunks = []
+        self._spilled_rows = 0
+        self._rows = 0
+        self.dropped_rows = 0
+
+    def close(self) -> None:
+        """Vuelca lo pendiente; los archivos temporales se eliminan"""
+        if self._owns_file:
+            self.clear()
+        else:
+            self.flush()
+
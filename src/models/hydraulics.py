@@ -0,0 +1,243 @@
+from typing import Any, Dict, Optional
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import LinearOperator, cg, splu
+from config.settings import SIMULATION_SETTINGS
+
+HW_EXPONENT = 1.852
+HW_CONSTANT = 10.67  # Hazen-Williams en unidades SI (m, m³/s)
+
+
+class HydraulicSolver:
+    """Estado estacionario de cargas y caudales con pérdidas de Hazen-Williams
+
+    Método del gradiente global (Todini-Pilati): cada iteración de Newton
+    elimina los caudales y resuelve las cargas de los nodos con la matriz
+    ``B G⁻¹ Bᵀ``, un laplaciano ponderado por la inversa de la derivada de
+    la pérdida de cada tubería. Los tanques son nodos de carga fija.
+
+    La estructura de la matriz y su orden de mínimo grado se calculan una
+    vez por topología, y la factorización LU se reutiliza como
+    precondicionador de gradiente conjugado en las iteraciones y los pasos
+    siguientes. Como ambos son laplacianos con la misma estructura, el
+    sistema precondicionado difiere de la identidad en los pesos que
+    cambiaron de forma distinta al resto, y el gradiente conjugado necesita
+    del orden de una iteración por cada uno. Solo se vuelve a factorizar
+    cuando hay ``max_cg_iterations`` o más pesos que se alejaron de la
+    mediana más de ``refactor_ratio``, o si el gradiente conjugado no
+    converge. Cada paso parte de los caudales y cargas del anterior.
+
+    Se detiene cuando el error relativo de caudal, estimado a partir de la
+    razón entre dos cambios sucesivos, baja de ``accuracy``: así no hace
+    falta una iteración más (una factorización más, en frío) solo para
+    confirmar la convergencia.
+
+    Las tuberías no tienen largo ni diámetro propios: el largo es
+    ``pipe_length`` y el diámetro el que lleva la capacidad a la velocidad
+    de diseño, reducido en sección por la obstrucción.
+    """
+
+    def __init__(self, node_count: int, source: np.ndarray, target: np.ndarray,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or SIMULATION_SETTINGS['hydraulics']
+        self.node_count = node_count
+        self.source = np.asarray(source, dtype=np.int64)
+        self.target = np.asarray(target, dtype=np.int64)
+        self.tanks = np.zeros(0, dtype=np.int64)
+        self.unknown = np.zeros(0, dtype=np.int64)
+        self.head = np.zeros(node_count)
+        self.flow = np.zeros(len(self.source))  # m³/s, positivo de source a target
+        self.iterations = 0
+        self.factorizations = 0
+        self._lu = None
+        self._lu_weight = None
+        self._lu_permuted = False
+        self._order = None
+        self._open = None
+
+    def _structure(self, tanks: np.ndarray, open_pipes: np.ndarray) -> None:
+        """Nodos con carga desconocida e índices del laplaciano para las tuberías abiertas"""
+        n = self.node_count
+        self.tanks = tanks
+        src, dst = self.source[open_pipes], self.target[open_pipes]
+        graph = csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+        _, component = connected_components(graph, directed=False)
+        fed = np.zeros(n, dtype=bool)
+        fed[np.isin(component, component[self.tanks])] = True
+        fixed = np.zeros(n, dtype=bool)
+        fixed[self.tanks] = True
+
+        # Sin camino a un tanque la carga no está definida: esos nodos se excluyen
+        self.unknown = np.flatnonzero(fed & ~fixed)
+        self.row = np.full(n, -1, dtype=np.int64)
+        self.row[self.unknown] = np.arange(self.unknown.size)
+        self.pipes = open_pipes[fed[src]]
+        a, b = self.row[self.source[self.pipes]], self.row[self.target[self.pipes]]
+
+        # Posición de cada aporte en los datos CSR del laplaciano
+        size = self.unknown.size
+        diagonal = np.arange(size)
+        both = (a >= 0) & (b >= 0)
+        rows = np.concatenate([diagonal, a[both], b[both]])
+        cols = np.concatenate([diagonal, b[both], a[both]])
+        pattern = csr_matrix((np.arange(1, rows.size + 1, dtype=np.float64), (rows, cols)),
+                             shape=(size, size))
+        pattern.sort_indices()
+        self._pattern = pattern
+        position = np.empty(rows.size, dtype=np.int64)
+        position[pattern.data.astype(np.int64) - 1] = np.arange(rows.size)
+        self._slot = position
+        self._a, self._b, self._both = a, b, both
+        self._lu = None
+        self._lu_weight = None
+        self._order = None
+        self._open = open_pipes
+
+    def _resistance(self, capacity: np.ndarray, obstruction: np.ndarray) -> np.ndarray:
+        """Coeficiente r de h = r·Q^1.852 por tubería"""
+        unit = self.settings['flow_unit']
+        area = np.maximum(capacity, 1e-9) * unit / self.settings['design_velocity']
+        area = area * np.maximum(1.0 - obstruction / 100.0, 1e-3)
+        diameter = np.sqrt(4.0 * area / np.pi)
+        return (HW_CONSTANT * self.settings['pipe_length']
+                / (self.settings['roughness'] ** HW_EXPONENT * diameter ** 4.87))
+
+    def _assemble(self, weight: np.ndarray) -> csr_matrix:
+        """Laplaciano B·diag(weight)·Bᵀ restringido a los nodos de carga desconocida"""
+        a, b, both = self._a, self._b, self._both
+        size = self.unknown.size
+        diagonal = (np.bincount(a[a >= 0], weight[a >= 0], minlength=size)
+                    + np.bincount(b[b >= 0], weight[b >= 0], minlength=size))
+        values = np.concatenate([diagonal, -weight[both], -weight[both]])
+        matrix = self._pattern.copy()
+        matrix.data = np.bincount(self._slot, values, minlength=len(matrix.data))
+        return matrix
+
+    def _linear_solve(self, weight: np.ndarray, rhs: np.ndarray,
+                      guess: np.ndarray, scale: float) -> np.ndarray:
+        """Gradiente conjugado precondicionado con la última LU; la rehace si hace falta
+
+        El residuo es el desbalance de masa de los caudales resultantes, así
+        que se acota respecto de ``scale`` (la demanda) y no del lado
+        derecho, dominado por la carga de los tanques.
+        """
+        matrix = self._assemble(weight)
+        if self._lu is not None and weight.size:
+            # Cada peso que se alejó de la mediana más de ``refactor_ratio``
+            # aporta un autovalor aislado: cuesta del orden de una iteración
+            ratio = weight / self._lu_weight
+            ratio = ratio / np.median(ratio)
+            limit = self.settings['refactor_ratio']
+            outliers = np.count_nonzero((ratio > limit) | (ratio * limit < 1.0))
+            if outliers < self.settings['max_cg_iterations']:
+                preconditioner = LinearOperator(matrix.shape, self._precondition)
+                solution, info = cg(matrix, rhs, x0=guess,
+                                    rtol=0.0, atol=self.settings['linear_tolerance'] * scale,
+                                    maxiter=self.settings['max_cg_iterations'],
+                                    M=preconditioner)
+                if info == 0:
+                    return solution
+        # Matriz simétrica definida positiva: orden simétrico y sin pivoteo.
+        # Con laplacianos poco densos los paneles angostos factorizan más rápido
+        options = {'SymmetricMode': True}
+        panel = self.settings['panel_size']
+        if self._order is None:
+            # La primera factorización calcula el orden de mínimo grado y se usa tal cual
+            self._lu = splu(matrix.tocsc(), permc_spec='MMD_AT_PLUS_A',
+                            diag_pivot_thresh=0.0, panel_size=panel, options=options)
+            self._order = np.argsort(self._lu.perm_c)
+            self._lu_permuted = False
+        else:
+            order = self._order
+            self._lu = splu(matrix[order][:, order].tocsc(), permc_spec='NATURAL',
+                            diag_pivot_thresh=0.0, panel_size=panel, options=options)
+            self._lu_permuted = True
+        self._lu_weight = weight
+        self.factorizations += 1
+        return self._precondition(rhs)
+
+    def _precondition(self, rhs: np.ndarray) -> np.ndarray:
+        """Resuelve con la última LU (en el orden de mínimo grado)"""
+        if not self._lu_permuted:
+            return self._lu.solve(rhs)
+        solution = np.empty_like(rhs)
+        solution[self._order] = self._lu.solve(rhs[self._order])
+        return solution
+
+    def solve(self, demand: np.ndarray, tanks: np.ndarray, tank_head: np.ndarray,
+              capacity: np.ndarray, obstruction: np.ndarray,
+              open_pipes: np.ndarray) -> Dict[str, float]:
+        """
+        Resuelve el estado estacionario
+
+        Args:
+            demand: consumo por nodo (unidades de flujo)
+            tanks: nodos de carga fija (tanques con agua)
+            tank_head: carga de cada tanque (m), en el orden de ``tanks``
+            capacity, obstruction: por tubería
+            open_pipes: índices de las tuberías abiertas
+
+        Returns:
+            Dict[str, float]: iteraciones, cambio relativo final de caudal y
+            error relativo estimado
+        """
+        unit = self.settings['flow_unit']
+        tanks = np.asarray(tanks, dtype=np.int64)
+        if (self._open is None or not np.array_equal(self._open, open_pipes)
+                or not np.array_equal(self.tanks, tanks)):
+            self._structure(tanks, open_pipes)
+        pipes = self.pipes
+        a, b = self._a, self._b
+        r = self._resistance(capacity[pipes], obstruction[pipes])
+        q = self.flow[pipes]
+        if not np.any(q):
+            q = capacity[pipes] * unit * 0.1
+        head = self.head.copy()
+        head[self.tanks] = tank_head
+        # Carga fija de los extremos que son tanques
+        fixed_a = np.where(a < 0, head[self.source[pipes]], 0.0)
+        fixed_b = np.where(b < 0, head[self.target[pipes]], 0.0)
+        d = demand[self.unknown] * unit
+        minimum = self.settings['min_flow'] * unit
+        scale = max(float(np.linalg.norm(d)), minimum)
+
+        change = np.inf
+        error = np.inf
+        iteration = 0
+        for iteration in range(1, self.settings['max_iterations'] + 1):
+            magnitude = np.maximum(np.abs(q), minimum)
+            loss = r * magnitude ** (HW_EXPONENT - 1.0) * q
+            gradient = HW_EXPONENT * r * magnitude ** (HW_EXPONENT - 1.0)
+            inverse = 1.0 / gradient
+            # Q' = Q + G⁻¹(Bᵀh - φ(Q)) y B Q' = -d  =>  (B G⁻¹ Bᵀ) h = rhs
+            y = q - inverse * (loss - fixed_a + fixed_b)
+            rhs = -d - (np.bincount(a[a >= 0], y[a >= 0], minlength=self.unknown.size)
+                        - np.bincount(b[b >= 0], y[b >= 0], minlength=self.unknown.size))
+            h = self._linear_solve(inverse, rhs, head[self.unknown], scale)
+            head[self.unknown] = h
+            drop = (np.where(a >= 0, head[self.source[pipes]], fixed_a)
+                    - np.where(b >= 0, head[self.target[pipes]], fixed_b))
+            q_new = q + inverse * (drop - loss)
+            previous, change = change, float(np.abs(q_new - q).sum()
+                                             / max(np.abs(q_new).sum(), 1e-12))
+            q = q_new
+            # Error de Q' estimado con la razón de convergencia entre cambios
+            # sucesivos; nunca mayor que el último cambio
+            ratio = min(change / previous, 0.5)
+            error = change * ratio / (1.0 - ratio) if iteration > 1 else change
+            if error < self.settings['accuracy']:
+                break
+
+        self.flow[:] = 0.0
+        self.flow[pipes] = q
+        self.head = head
+        self.iterations = iteration
+        return {'iterations': iteration, 'change': change, 'error': error}
+
+    def pressure(self, elevation: float = 0.0) -> np.ndarray:
+        """Presión por nodo (m); NaN en nodos sin conexión a un tanque"""
+        pressure = np.full(self.node_count, np.nan)
+        known = np.concatenate([self.unknown, self.tanks])
+        pressure[known] = self.head[known] - elevation
+        return pressure
@@ -0,0 +1,351 @@
+"""
+Distribución automática de nodos para redes grandes
+
+Algoritmo multinivel: se contrae el grafo por emparejamientos aleatorios
+de aristas hasta unas decenas de nodos, se distribuye el grafo más grueso
+con fuerzas (Fruchterman-Reingold) y se refina nivel por nivel partiendo
+de la posición del nodo padre. La repulsión se aproxima al estilo
+Barnes-Hut con dos rejillas: cada nodo se repele del centro de masa de
+las demás celdas de una rejilla gruesa y, de forma exacta, de sus
+vecinos más cercanos dentro de una rejilla fina de lado ~2k.
+
+Las posiciones se guardan por hash de topología en el directorio de
+caché, de modo que reabrir la misma red no recalcula la distribución;
+solo se conservan las ``max_layout_cache_files`` usadas más recientemente.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from config.settings import FILE_SETTINGS, VISUALIZATION_SETTINGS
+
+# Vecinos de celda comparados de forma exacta en la repulsión cercana
+NEAR_NEIGHBORS = 8
+# Celdas por lado de la rejilla del campo lejano
+FAR_FIELD_GRID = 8
+# Filas procesadas a la vez en la repulsión lejana (acota la memoria)
+FAR_FIELD_CHUNK = 8192
+# Distribuciones retenidas en memoria
+MEMORY_CACHE_ENTRIES = 8
+
+_memory_cache: Dict[str, np.ndarray] = {}
+
+
+def topology_hash(node_ids: Sequence[str], source: np.ndarray,
+                  target: np.ndarray) -> str:
+    """Hash de la topología independiente del orden de nodos y tuberías"""
+    order = np.argsort(np.asarray(node_ids, dtype=object), kind='stable')
+    rank = np.empty(len(node_ids), dtype=np.int64)
+    rank[order] = np.arange(len(node_ids))
+    a, b = rank[np.asarray(source, dtype=np.int64)], rank[np.asarray(target, dtype=np.int64)]
+    edges = np.unique(np.minimum(a, b) << 32 | np.maximum(a, b))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\0'.join(node_ids[i] for i in order.tolist()).encode('utf-8'))
+    digest.update(edges.tobytes())
+    return digest.hexdigest()
+
+
+def _coarsen(n: int, source: np.ndarray, target: np.ndarray,
+             rng: np.random.Generator) -> Tuple[np.ndarray, int]:
+    """Emparejamiento aleatorio: une cada arista mínima en sus dos extremos
+
+    Los nodos que quedan sin pareja se suman al grupo del vecino de su
+    arista mínima si ese vecino ya fue emparejado.
+    """
+    key = rng.random(len(source))
+    best = np.full(n, np.inf)
+    np.minimum.at(best, source, key)
+    np.minimum.at(best, target, key)
+    matched = (best[source] == key) & (best[target] == key)
+    parent = np.arange(n)
+    parent[target[matched]] = source[matched]
+    paired = np.zeros(n, dtype=bool)
+    paired[source[matched]] = True
+    paired[target[matched]] = True
+    for u, v in ((source, target), (target, source)):
+        join = (best[u] == key) & ~paired[u] & paired[v]
+        parent[u[join]] = parent[v[join]]
+    _, cluster = np.unique(parent, return_inverse=True)
+    return cluster, int(cluster.max()) + 1 if n else 0
+
+
+def _contract(cluster: np.ndarray, source: np.ndarray,
+              target: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Aristas entre grupos, sin lazos ni duplicados"""
+    a, b = cluster[source], cluster[target]
+    keep = a != b
+    keys = np.unique(np.minimum(a[keep], b[keep]) << 32 | np.maximum(a[keep], b[keep]))
+    return keys >> 32, keys & 0xFFFFFFFF
+
+
+def _cells(pos: np.ndarray, size: float) -> np.ndarray:
+    """Identificador de celda de cada punto en una rejilla de lado ``size``"""
+    cell_xy = np.floor((pos - pos.min(axis=0)) / size).astype(np.int64)
+    return cell_xy[:, 0] * (int(cell_xy[:, 1].max()) + 1) + cell_xy[:, 1]
+
+
+def _repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    """Fuerza de repulsión aproximada con centros de masa por celda"""
+    n = len(pos)
+    k2 = k * k
+    force = np.zeros_like(pos)
+
+    # Campo lejano: centro de masa de cada celda de una rejilla gruesa
+    span = max(float(np.ptp(pos, axis=0).max()), 1e-9)
+    cell = _cells(pos, span / FAR_FIELD_GRID * (1 + 1e-9))
+    occupied, cell = np.unique(cell, return_inverse=True)
+    mass = np.bincount(cell).astype(np.float64)
+    center = np.stack([np.bincount(cell, pos[:, 0]), np.bincount(cell, pos[:, 1])],
+                      axis=1) / mass[:, None]
+    own = np.arange(len(occupied))
+    for start in range(0, n, FAR_FIELD_CHUNK):
+        rows = slice(start, min(n, start + FAR_FIELD_CHUNK))
+        delta = pos[rows, None, :] - center[None, :, :]
+        dist2 = np.einsum('ijk,ijk->ij', delta, delta) + 1e-9
+        weight = mass[None, :] * k2 / dist2
+        weight[cell[rows, None] == own[None, :]] = 0.0
+        force[rows] += np.einsum('ij,ijk->ik', weight, delta)
+
+    # Campo cercano: pares exactos entre vecinos de una rejilla de lado ~2k
+    fine = _cells(pos, 2.0 * k)
+    order = np.argsort(fine, kind='stable')
+    sorted_cell = fine[order]
+    sorted_pos = pos[order]
+    for shift in range(1, min(NEAR_NEIGHBORS, n - 1) + 1):
+        same = sorted_cell[shift:] == sorted_cell[:-shift]
+        delta = sorted_pos[shift:] - sorted_pos[:-shift]
+        dist2 = np.einsum('ij,ij->i', delta, delta) + 1e-9
+        push = delta * (same * k2 / dist2)[:, None]
+        force[order[shift:]] += push
+        force[order[:-shift]] -= push
+    return force
+
+
+def _force_directed(pos: np.ndarray, source: np.ndarray, target: np.ndarray,
+                    iterations: int, k: float, temperature: float) -> np.ndarray:
+    """Iteraciones de Fruchterman-Reingold con enfriamiento lineal"""
+    n = len(pos)
+    if n < 2:
+        return pos
+    for step in range(iterations):
+        force = _repulsion(pos, k)
+        delta = pos[source] - pos[target]
+        distance = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+        pull = delta * (distance / k)[:, None]
+        for axis in range(2):
+            force[:, axis] -= np.bincount(source, pull[:, axis], minlength=n)
+            force[:, axis] += np.bincount(target, pull[:, axis], minlength=n)
+        length = np.sqrt(np.einsum('ij,ij->i', force, force)) + 1e-9
+        limit = temperature * (1.0 - step / iterations)
+        pos = pos + force * (np.minimum(length, limit) / length)[:, None]
+    return pos
+
+
+def _component_layout(node_count: int, source: np.ndarray, target: np.ndarray,
+                      rng: np.random.Generator, settings: Dict) -> np.ndarray:
+    """Distribución multinivel de un grafo conexo, centrada en el origen"""
+    # Contraer hasta el nivel más grueso
+    levels: List[Tuple[int, np.ndarray, np.ndarray, Optional[np.ndarray]]] = []
+    n = node_count
+    while True:
+        levels.append((n, source, target, None))
+        if n <= settings['coarsest_size'] or not len(source):
+            break
+        cluster, coarse = _coarsen(n, source, target, rng)
+        if coarse > 0.95 * n:
+            break
+        levels[-1] = (n, source, target, cluster)
+        source, target = _contract(cluster, source, target)
+        n = coarse
+
+    # Distribuir el nivel más grueso y refinar hacia el original
+    k = 1.0
+    n, source, target, _ = levels[-1]
+    pos = rng.random((n, 2)) * np.sqrt(max(n, 1)) * k
+    pos = _force_directed(pos, source, target, settings['iterations'], k,
+                          temperature=np.sqrt(max(n, 1)) * k / 4)
+    for n, source, target, cluster in reversed(levels[:-1]):
+        pos = pos[cluster] * np.sqrt(2.0) + rng.normal(scale=0.1 * k, size=(n, 2))
+        # Los niveles finos solo corrigen detalles locales: menos iteraciones
+        iterations = max(settings['refine_iterations'] // 3,
+                         int(settings['refine_iterations'] * min(1.0, 1e4 / n)))
+        pos = _force_directed(pos, source, target, iterations, k, temperature=k)
+
+    # Escalar para que la tubería típica tenga el largo configurado
+    if len(source):
+        delta = pos[source] - pos[target]
+        typical = float(np.median(np.sqrt(np.einsum('ij,ij->i', delta, delta))))
+        if typical > 0:
+            pos = pos * (settings['edge_length'] / typical)
+    return pos - pos.mean(axis=0) if len(pos) else pos
+
+
+def _pack(layouts: List[np.ndarray], gap: float) -> List[np.ndarray]:
+    """Acomoda las componentes en filas, de mayor a menor, sin superponerlas
+
+    El ancho de las filas se elige para que el conjunto quede
+    aproximadamente cuadrado.
+    """
+    low = [pos.min(axis=0) for pos in layouts]
+    extent = [pos.max(axis=0) - corner + gap for pos, corner in zip(layouts, low)]
+    width = max(float(np.sqrt(sum(w * h for w, h in extent))),
+                max(float(w) for w, _ in extent))
+    placed = []
+    x = y = row_height = 0.0
+    for pos, corner, (w, h) in zip(layouts, low, extent):
+        if x > 0 and x + w > width:
+            x, y, row_height = 0.0, y + row_height, 0.0
+        placed.append(pos - corner + (x, y))
+        x += w
+        row_height = max(row_height, float(h))
+    return placed
+
+
+def multilevel_layout(node_count: int, source: np.ndarray, target: np.ndarray,
+                      seed: int = 0, settings: Optional[Dict] = None) -> np.ndarray:
+    """Posiciones (node_count × 2) para el grafo dado por índices de nodo
+
+    Cada componente conexa se distribuye por separado y luego se
+    empaquetan juntas, de modo que los nodos aislados y las componentes
+    chicas no salen despedidas lejos de la principal por la repulsión.
+    """
+    settings = settings or VISUALIZATION_SETTINGS['layout']
+    rng = np.random.default_rng(seed)
+    source = np.asarray(source, dtype=np.int64)
+    target = np.asarray(target, dtype=np.int64)
+    keep = source != target
+    source, target = source[keep], target[keep]
+    if node_count == 0:
+        return np.zeros((0, 2))
+
+    adjacency = coo_matrix((np.ones(len(source)), (source, target)),
+                           shape=(node_count, node_count))
+    count, label = connected_components(adjacency, directed=False)
+    if count == 1:
+        return _component_layout(node_count, source, target, rng, settings)
+
+    # Índice local de cada nodo y tuberías agrupadas por componente
+    sizes = np.bincount(label, minlength=count)
+    by_label = np.argsort(label, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    local = np.empty(node_count, dtype=np.int64)
+    local[by_label] = np.arange(node_count) - starts[label[by_label]]
+    edge_order = np.argsort(label[source], kind='stable')
+    edge_starts = np.concatenate([[0], np.cumsum(np.bincount(label[source],
+                                                             minlength=count))])
+
+    components = np.argsort(-sizes, kind='stable')
+    layouts = []
+    for component in components.tolist():
+        size = int(sizes[component])
+        if size == 1:
+            layouts.append(np.zeros((1, 2)))
+            continue
+        edges = edge_order[edge_starts[component]:edge_starts[component + 1]]
+        layouts.append(_component_layout(size, local[source[edges]],
+                                         local[target[edges]], rng, settings))
+
+    pos = np.empty((node_count, 2))
+    for component, placed in zip(components.tolist(),
+                                 _pack(layouts, settings['edge_length'])):
+        pos[by_label[starts[component]:starts[component + 1]]] = placed
+    return pos - pos.mean(axis=0)
+
+
+def _cache_path(key: str) -> Path:
+    return Path(FILE_SETTINGS['layout_cache_directory']) / f"{key}.npy"
+
+
+def _evict(directory: Path) -> None:
+    """Borra las distribuciones menos usadas por encima del tope"""
+    limit = FILE_SETTINGS['max_layout_cache_files']
+    try:
+        files = sorted(directory.glob('*.npy'), key=lambda path: path.stat().st_mtime)
+        for path in files[:max(len(files) - limit, 0)]:
+            path.unlink()
+    except OSError:
+        pass
+
+
+def cached_layout(node_ids: Sequence[str], source: np.ndarray,
+                  target: np.ndarray) -> Dict[str, Tuple[float, float]]:
+    """Distribución de la topología, leída de la caché si ya se calculó
+
+    Las posiciones se guardan en el orden alfabético de los ids, de modo
+    que la caché no depende del orden en que se cargó la red.
+    """
+    key = topology_hash(node_ids, source, target)
+    order = np.argsort(np.asarray(node_ids, dtype=object), kind='stable')
+    sorted_pos = _memory_cache.pop(key, None)
+    if sorted_pos is None:
+        path = _cache_path(key)
+        if path.exists():
+            sorted_pos = np.load(path)
+            # La fecha de modificación marca el último uso para ``_evict``
+            path.touch()
+        else:
+            pos = multilevel_layout(len(node_ids), source, target)
+            sorted_pos = pos[order]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(path, sorted_pos)
+            _evict(path.parent)
+    _memory_cache[key] = sorted_pos
+    while len(_memory_cache) > MEMORY_CACHE_ENTRIES:
+        del _memory_cache[next(iter(_memory_cache))]
+    return {node_ids[i]: (float(x), float(y))
+            for i, (x, y) in zip(order.tolist(), sorted_pos.tolist())}
+
+
+def network_layout(network) -> Dict[str, Tuple[float, float]]:
+    """Distribución de una WaterNetwork a partir de su tabla de tuberías"""
+    store = network.pipes
+    slots = store.active_slots()
+    ids = store.node_ids
+    present = [node_id in network.graph for node_id in ids]
+    if all(present):
+        return cached_layout(ids, store.source[slots], store.target[slots])
+    # Nodos internados pero eliminados del grafo: reindexar los presentes
+    remap = np.cumsum(present) - 1
+    keep = [i for i, flag in enumerate(present) if flag]
+    return cached_layout([ids[i] for i in keep],
+                         remap[store.source[slots]], remap[store.target[slots]])
+
+
+def extend_layout(network, positions: Dict[str, Tuple[float, float]],
+                  settings: Optional[Dict] = None) -> Dict[str, Tuple[float, float]]:
+    """Agrega posiciones para los nodos nuevos sin mover los existentes
+
+    Cada nodo nuevo se ubica junto a sus vecinos ya ubicados (a un largo
+    de tubería si tiene uno solo, cerca del centro si tiene varios). Los
+    que no tienen ningún vecino ubicado se alinean debajo del dibujo.
+    """
+    settings = settings or VISUALIZATION_SETTINGS['layout']
+    length = settings['edge_length']
+    graph = network.graph
+    placed = dict(positions)
+    pending = [node_id for node_id in graph.nodes if node_id not in placed]
+    while pending:
+        waiting = []
+        for node_id in pending:
+            anchors = [placed[v] for v in graph.neighbors(node_id) if v in placed]
+            if not anchors:
+                waiting.append(node_id)
+                continue
+            x, y = np.mean(anchors, axis=0)
+            # Ángulo áureo: nodos sucesivos junto al mismo vecino no se pisan
+            angle = 2.399963 * len(placed)
+            radius = length if len(anchors) == 1 else length / 2
+            placed[node_id] = (float(x + radius * np.cos(angle)),
+                               float(y + radius * np.sin(angle)))
+        if len(waiting) == len(pending):
+            break
+        pending = waiting
+    if pending:
+        known = np.array(list(placed.values())) if placed else np.zeros((1, 2))
+        left, bottom = known.min(axis=0)
+        for i, node_id in enumerate(pending):
+            placed[node_id] = (float(left + i * length), float(bottom - length))
+    return placed
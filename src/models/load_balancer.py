@@ -0,0 +1,216 @@
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import factorized
+from config.settings import NETWORK_SETTINGS
+from .simulation import SimulationEngine
+from .connection_planner import ResidualGraph
+
+
+def utilization_deviation(utilization: np.ndarray) -> float:
+    """Desviación estándar de la utilización |f|/c de las tuberías, en %"""
+    if not len(utilization):
+        return 0.0
+    return 100.0 * float(np.std(utilization))
+
+
+class LoadBalancer:
+    """Reparto de la demanda que equilibra la utilización de las tuberías
+
+    Cada tubería se orienta de menor a mayor (nivel desde los tanques,
+    índice), igual que el enrutamiento de la simulación, y se resuelve el
+    programa cuadrático convexo
+
+        min ½ Σ_p (u_p - ū)² + ½ λ Σ_k u_k²   sujeto a   A u = b,   0 <= u_p <= 1
+
+    en utilizaciones ``u = f / c``. El primer término es la varianza de la
+    utilización de las tuberías (con el sentido fijo, |f|/c = u), el
+    segundo, con peso λ pequeño, reparte la extracción entre los tanques:
+    el arco de la súper fuente a cada tanque tiene como "capacidad" su
+    parte de la demanda en proporción al volumen disponible. ``A`` es la incidencia escalada por
+    las capacidades y ``b`` la demanda que la red orientada puede servir
+    (la de todos los barrios si su flujo máximo alcanza). Como la
+    orientación no tiene ciclos, el agua no puede circular en redondo para
+    emparejar utilizaciones.
+
+    Se usa ADMM: el paso de conservación resuelve A·Aᵀ (factorizada una
+    vez) con una corrección de rango uno por la media ū, y el de
+    capacidades es un recorte vectorizado. Con la misma topología la
+    siguiente llamada arranca desde las variables de la anterior.
+    """
+
+    def __init__(self, network, settings: Optional[Dict[str, Any]] = None):
+        self.network = network
+        self.settings = settings or NETWORK_SETTINGS['optimization']['balance']
+        self.flow = np.zeros(0)  # flujo equilibrado por slot, con signo
+        self.tank_draw: Dict[str, float] = {}
+        self.warm: Optional[Dict[str, Any]] = None  # arcos y variables de ADMM
+
+    def _servable(self, node_count: int, tail: np.ndarray, head: np.ndarray,
+                  capacity: np.ndarray, tanks: np.ndarray,
+                  demand: np.ndarray) -> np.ndarray:
+        """Demanda por nodo que el flujo máximo por la red orientada puede entregar"""
+        n = node_count
+        s, t = n, n + 1
+        resolution = NETWORK_SETTINGS['optimization']['flow_resolution']
+        neighborhoods = np.flatnonzero(demand > 0)
+        wanted = np.floor(demand[neighborhoods] / resolution).astype(np.int64)
+        pipe_capacity = np.floor(capacity / resolution).astype(np.int64)
+        graph = ResidualGraph(
+            n + 2,
+            np.concatenate([tail, np.full(tanks.size, s), neighborhoods]),
+            np.concatenate([head, tanks, np.full(neighborhoods.size, t)]),
+            np.concatenate([pipe_capacity, np.full(tanks.size, int(wanted.sum())), wanted]),
+            s, t)
+        if graph.value >= int(wanted.sum()):
+            return demand
+        missing = graph.residual[:, [t]].toarray().ravel()[neighborhoods]
+        servable = np.zeros(n)
+        servable[neighborhoods] = (wanted - missing) * resolution
+        return servable
+
+    def balance(self, progress: Optional[Callable[..., None]] = None,
+                tolerance: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Equilibra la utilización para la demanda base de los barrios
+
+        Args:
+            progress: ``progress(fracción, mensaje)`` cada 50 iteraciones
+            tolerance: residuo cuadrático medio de ADMM para detenerse (por
+                defecto el de la configuración)
+
+        Returns:
+            Dict[str, Any]: demanda servida, desviación estándar de la
+            utilización antes (enrutamiento de la simulación) y después,
+            mejora (%), iteraciones, residuo primal cuadrático medio y
+            máximo exceso de capacidad (en utilización) y si se partió de
+            la solución anterior
+        """
+        network = self.network
+        store = network.pipes
+        engine = SimulationEngine.from_network(network)
+        engine.rebuild_routing()
+        n = engine.node_count
+        s = n
+        level = engine.level
+
+        # Tuberías utilizables dentro de lo que alcanzan los tanques con agua
+        usable = store.effective_capacity()
+        source = engine.source.astype(np.int64)
+        target = engine.target.astype(np.int64)
+        slots = np.flatnonzero(engine.usable_mask() & (usable > 0) & (level[source] >= 0))
+        capacity = usable[slots]
+        source, target = source[slots], target[slots]
+        # Sentido fijo de menor a mayor (nivel, índice): sin ciclos dirigidos
+        forward = ((level[source] < level[target])
+                   | ((level[source] == level[target]) & (source < target)))
+        tail = np.where(forward, source, target)
+        head = np.where(forward, target, source)
+        sign = np.where(forward, 1.0, -1.0)
+        demand = np.where(level >= 0, engine.base_demand, 0.0)
+
+        volume = engine.tank_level[engine.tanks] / 100.0 * engine.tank_capacity[engine.tanks]
+        supplied = volume > 0
+        tanks = engine.tanks[supplied]
+        demand = self._servable(n, tail, head, capacity, tanks, demand)
+        total = float(demand.sum())
+        share = volume[supplied] / volume[supplied].sum() if supplied.any() else volume[supplied]
+
+        # Enrutamiento de la simulación, recortado por capacidad como en un paso
+        pipes = len(slots)
+        routed = np.minimum(np.abs(engine.unit_flow[slots]) / capacity, 1.0)
+        before = utilization_deviation(routed)
+
+        # Arcos: tuberías orientadas y súper fuente -> tanque, en utilización
+        tail = np.concatenate([tail, np.full(tanks.size, s)])
+        head = np.concatenate([head, tanks])
+        # El arco de un tanque se escala por 1/√λ: su término pesa λ y solo desempata
+        weight = self.settings['tank_weight']
+        scale = np.concatenate([capacity, np.maximum(share * total, 1e-9) / np.sqrt(weight)])
+        upper = np.concatenate([np.ones(pipes), np.full(tanks.size, np.inf)])
+        arcs = len(tail)
+
+        rows = np.full(n + 1, -1, dtype=np.int64)
+        keep = np.flatnonzero(level >= 0)
+        rows[keep] = np.arange(keep.size)
+        tail_row, head_row = rows[tail], rows[head]
+        arc_ids = np.arange(arcs)
+        out_arcs, in_arcs = arc_ids[tail_row >= 0], arc_ids[head_row >= 0]
+        # A = B·diag(scale) restringida a los nodos alcanzados (sin la fuente)
+        A = csr_matrix((np.concatenate([scale[out_arcs], -scale[in_arcs]]),
+                        (np.concatenate([tail_row[out_arcs], head_row[in_arcs]]),
+                         np.concatenate([out_arcs, in_arcs]))),
+                       shape=(keep.size, arcs))
+        b = -demand[keep]  # salida neta de cada nodo
+
+        warm = self.warm
+        warm_start = (warm is not None and np.array_equal(warm['tail'], tail)
+                      and np.array_equal(warm['head'], head))
+        if warm_start:
+            u, z, y, rho = warm['u'].copy(), warm['z'].copy(), warm['y'].copy(), warm['rho']
+        else:
+            u, z, y, rho = np.zeros(arcs), np.zeros(arcs), np.zeros(arcs), self.settings['rho']
+        tolerance = tolerance or self.settings['tolerance']
+        max_iterations = self.settings['max_iterations']
+        iterations = 0
+        residual = 0.0
+        if A.shape[0] and pipes and total > 0:
+            # M = P + ρI con P = I - w wᵀ/m (w: tuberías); M⁻¹ y A M⁻¹ Aᵀ se
+            # resuelven con A·Aᵀ, que no depende de ρ, y Sherman-Morrison
+            w = np.zeros(arcs)
+            w[:pipes] = 1.0
+            Aw = A @ w
+            solve = factorized((A @ A.T).tocsc())
+            K_Aw = solve(Aw)
+            Aw_K_Aw = float(Aw @ K_Aw)
+            relaxation = self.settings['relaxation']
+            for iterations in range(1, max_iterations + 1):
+                # Conservación: paso proximal proyectado sobre A u = b
+                g = 1.0 / (pipes * rho)
+                x = rho * (z - y)
+                Mx = (x + g * x[:pipes].sum() * w) / (1.0 + rho)
+                rhs = solve(A @ Mx - b)
+                multiplier = (1.0 + rho) * (rhs - g * K_Aw * (Aw @ rhs) / (1.0 + g * Aw_K_Aw))
+                x -= A.T @ multiplier
+                u = (x + g * x[:pipes].sum() * w) / (1.0 + rho)
+                # Capacidades: recorte a la caja (con sobrerrelajación)
+                relaxed = relaxation * u + (1.0 - relaxation) * z
+                previous = z
+                z = np.clip(relaxed + y, 0.0, upper)
+                y += relaxed - z
+                # Residuos cuadráticos medios: primal (conservación contra
+                # capacidades) y dual (cambio de z)
+                residual = float(np.sqrt(np.mean((u - z) ** 2)))
+                change = rho * float(np.sqrt(np.mean((z - previous) ** 2)))
+                if residual < tolerance and change < tolerance:
+                    break
+                # Cada pocas iteraciones, acercar los residuos ajustando rho
+                # (y el dual escalado) en la raíz de su cociente
+                if iterations % 5 == 0:
+                    factor = min(max(np.sqrt(residual / max(change, 1e-12)), 0.2), 5.0)
+                    if not 1 / 1.5 < factor < 1.5:
+                        rho *= factor
+                        y /= factor
+                if progress is not None and iterations % 50 == 0:
+                    progress(iterations / max_iterations, f"Iteración {iterations}")
+        self.warm = {'tail': tail, 'head': head, 'u': u, 'z': z, 'y': y, 'rho': rho}
+        excess = float(np.abs(u - z).max()) if arcs else 0.0
+
+        flow = u * scale
+        self.flow = np.zeros(store.size)
+        self.flow[slots] = sign * flow[:pipes]
+        ids = store.node_ids
+        self.tank_draw = {ids[tank]: float(draw)
+                          for tank, draw in zip(tanks.tolist(), flow[pipes:].tolist())}
+        after = utilization_deviation(np.clip(u[:pipes], 0.0, 1.0))
+        improvement = 100.0 * (before - after) / before if before > 0 else 0.0
+        return {
+            'served': round(total, 2),
+            'before_deviation': round(before, 2),
+            'after_deviation': round(after, 2),
+            'improvement': round(improvement, 1),
+            'iterations': iterations,
+            'residual': residual,
+            'max_excess': excess,
+            'warm_start': warm_start
+        }
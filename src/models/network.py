@@ -1,31 +1,572 @@
+import copy
 import networkx as nx
-from typing import Dict, List, Tuple
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional
+from config.settings import NETWORK_SETTINGS
+from .edge_store import EdgeStore, PipeDictView
+from .simulation import SimulationEngine
+from .flow_cache import MaxFlowCache
+from .flow_optimizer import FlowOptimizer
+from .connection_planner import ConnectionPlanner
+from .load_balancer import LoadBalancer
+from .contingency import ContingencyAnalysis
+from .reliability import ReliabilityEstimator
+from .deterioration import DeteriorationSimulator
+from .route_index import RouteIndex
+from .connectivity import ConnectivityIndex
+from .block_cut import BlockCutIndex
+from .history import FlowHistory
+from .events import (ChangeBus, NodeAdded, NodeRemoved, PipeAdded, PipeRemoved,
+                     CapacityChanged, ObstructionChanged, PipeBlocked, TankLevelChanged,
+                     SimulationStep, NetworkReset)
 
 class WaterNetwork:
     def __init__(self):
         self.graph = nx.Graph()
-        self.capacities = {}
-        self.obstructions = {}
+        self._graph_types: Optional[List[str]] = None  # tipos de una carga aún sin grafo
+        # Tabla compacta de tuberías; los diccionarios por tupla son vistas
+        self.pipes = EdgeStore()
+        self._create_views()
         self.neighborhoods = {}
-        self.flows = {}
         self.tank_levels = {}
-        
+        self.tank_capacities = {}
+        self._engine = None
+        self._engine_key = None
+        self.hydraulic_mode = False
+        self.flow_cache = MaxFlowCache(self)
+        self.route_index = RouteIndex(self)
+        self.connectivity = ConnectivityIndex(self)
+        self.block_cut = BlockCutIndex(self)
+        self.optimizer = FlowOptimizer(self)
+        self.balancer = LoadBalancer(self)
+        self.contingency = ContingencyAnalysis(self)
+        self.history = FlowHistory()
+        self.events = ChangeBus()
+        self._revision = 0  # cambios de la red original al tomar una copia
+
+    @property
+    def graph(self) -> nx.Graph:
+        """Grafo de networkx; tras ``load_indexed`` se arma en el primer acceso
+
+        En ``_graph_types`` un tipo None marca un id interno que ya no es nodo.
+        """
+        if self._graph_types is not None:
+            types, self._graph_types = self._graph_types, None
+            store = self.pipes
+            ids = store.node_ids
+            slots = store.active_slots()
+            self._graph.add_nodes_from(
+                (node_id, {'type': node_type})
+                for node_id, node_type in zip(ids, types) if node_type is not None)
+            self._graph.add_edges_from(zip(map(ids.__getitem__, store.source[slots].tolist()),
+                                           map(ids.__getitem__, store.target[slots].tolist())))
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: nx.Graph) -> None:
+        self._graph = graph
+        self._graph_types = None
+
+    def _create_views(self) -> None:
+        """Vistas por tupla sobre ``pipes``; escribir en ellas publica el cambio"""
+        self.capacities = PipeDictView(self.pipes, 'capacity', on_delete=self.delete_pipe,
+                                       on_change=self._capacity_set)
+        self.obstructions = PipeDictView(self.pipes, 'obstruction', on_delete=self.delete_pipe,
+                                         on_change=self._obstruction_set)
+        self.flows = PipeDictView(self.pipes, 'flow', signed=True,
+                                  on_delete=self.delete_pipe)
+
+    def snapshot(self) -> 'WaterNetwork':
+        """Copia congelada para analizar en otro hilo
+
+        Copia la tabla de tuberías (con los mismos slots), los tanques y los
+        barrios; el grafo de la copia se arma recién si el análisis lo usa.
+        La caché de flujos máximos, los árboles de rutas y el solver del
+        despacho se copian para arrancar en caliente.
+        """
+        frozen = WaterNetwork()
+        frozen.pipes = self.pipes.copy()
+        frozen._create_views()
+        if self._graph_types is not None:
+            frozen._graph_types = list(self._graph_types)
+        else:
+            index = self.pipes.node_index
+            types = [None] * self.pipes.node_count
+            for node_id, attrs in self._graph.nodes(data=True):
+                types[index[node_id]] = attrs.get('type')
+            frozen._graph_types = types
+        frozen.neighborhoods = dict(self.neighborhoods)
+        frozen.tank_levels = dict(self.tank_levels)
+        frozen.tank_capacities = dict(self.tank_capacities)
+        frozen.hydraulic_mode = self.hydraulic_mode
+        frozen.flow_cache = self.flow_cache.copy(frozen)
+        frozen.route_index = self.route_index.copy(frozen)
+        frozen.optimizer.solver = copy.deepcopy(self.optimizer.solver)
+        frozen.balancer.warm = copy.deepcopy(self.balancer.warm)
+        frozen._revision = self.events.edit_revision
+        return frozen
+
+    def adopt(self, frozen: 'WaterNetwork') -> bool:
+        """Retoma el estado de los solvers de una copia si la red no se editó desde entonces
+
+        Se llama en el hilo de la interfaz al terminar el análisis. Los pasos
+        de simulación no cuentan como edición: solo cambian niveles de
+        tanques, y la caché de flujos se pone al día con ellos. Si hubo
+        ediciones, la copia se descarta y la red conserva su estado.
+        """
+        if frozen._revision != self.events.edit_revision:
+            return False
+        for name in ('flow_cache', 'route_index', 'optimizer', 'balancer', 'contingency'):
+            solver = getattr(frozen, name)
+            solver.network = self
+            setattr(self, name, solver)
+        for tank_id in self.tank_levels:
+            if frozen.tank_levels.get(tank_id) != self.tank_levels[tank_id]:
+                self.flow_cache.on_tank_change(tank_id)
+        return True
+
     def add_node(self, node_id: str, node_type: str, houses: int = None) -> bool:
         try:
             self.graph.add_node(node_id, type=node_type)
+            self.pipes.intern(node_id)
             if node_type == 'barrio':
                 self.neighborhoods[node_id] = houses or 6
+            elif node_type == 'tanque':
+                self.tank_levels.setdefault(node_id, 100.0)
+                self.tank_capacities.setdefault(
+                    node_id, NETWORK_SETTINGS['default_tank_capacity'])
+            self.connectivity.on_node_added(node_id, node_type)
+            self.block_cut.on_node_changed(node_id)
+            self.events.publish(NodeAdded(node_id, node_type))
             return True
         except Exception as e:
             return False
-            
+
     def add_pipe(self, source: str, target: str, capacity: float) -> bool:
         try:
-            self.graph.add_edge(source, target)
-            self.capacities[(source, target)] = capacity
-            self.capacities[(target, source)] = capacity
-            self.obstructions[(source, target)] = 0
-            self.obstructions[(target, source)] = 0
+            with self.events.batch():
+                # Los extremos no declarados quedan como intersecciones
+                for node_id in (source, target):
+                    if node_id not in self.graph:
+                        self.add_node(node_id, 'interseccion')
+                self.graph.add_edge(source, target)
+                version = self.pipes.version
+                slot = self.pipes.add(source, target, capacity)
+                if self.pipes.version != version:
+                    self.route_index.on_pipe_added(slot)
+                    self.connectivity.on_pipe_added(slot)
+                    self.block_cut.on_pipe_added(slot)
+                    self.flow_cache.on_pipe_change(slot)
+                    self.events.publish(PipeAdded(source, target, slot))
+                else:
+                    # Tubería existente: solo cambia su capacidad
+                    self._capacity_set(slot)
             return True
         except Exception as e:
-            return False
\ No newline at end of file
+            return False
+
+    def bulk_load(self, node_ids: List[str], node_types: List[str],
+                  houses: List[Optional[int]], sources: List[str],
+                  targets: List[str], capacities: List[float],
+                  obstructions: Optional[List[float]] = None) -> None:
+        """Inserta nodos y tuberías en lote (una sola pasada por tabla)"""
+        self.graph.add_nodes_from(
+            (node_id, {'type': node_type})
+            for node_id, node_type in zip(node_ids, node_types)
+        )
+        for node_id, node_type, num_houses in zip(node_ids, node_types, houses):
+            self.pipes.intern(node_id)
+            if node_type == 'barrio':
+                self.neighborhoods[node_id] = num_houses or 6
+            elif node_type == 'tanque':
+                self.tank_levels.setdefault(node_id, 100.0)
+                self.tank_capacities.setdefault(
+                    node_id, NETWORK_SETTINGS['default_tank_capacity'])
+        slots = self.pipes.extend(sources, targets, capacities)
+        if obstructions is not None:
+            self.pipes.obstruction[slots] = obstructions
+        self.graph.add_edges_from(zip(sources, targets))
+        self.route_index.clear()
+        self.connectivity.clear()
+        self.block_cut.clear()
+        self.flow_cache.invalidate()
+        self.events.publish(NetworkReset())
+
+    def load_indexed(self, node_ids: List[str], node_types: List[str],
+                     houses: List[Optional[int]], sources: np.ndarray,
+                     targets: np.ndarray, capacities: np.ndarray,
+                     obstructions: np.ndarray) -> None:
+        """Carga una red vacía con tuberías dadas por índice de nodo
+
+        Los arreglos pasan a respaldar la tabla de tuberías sin copiarse
+        (``EdgeStore.attach``) y el grafo de networkx no se arma hasta que
+        algo lo usa, de modo que abrir una red grande solo recorre los
+        nodos.
+        """
+        store = self.pipes
+        empty = not store.node_ids and len(set(node_ids)) == len(node_ids)
+        if empty:
+            store.node_ids = list(node_ids)
+            store.node_index = dict(zip(node_ids, range(len(node_ids))))
+        for node_id, node_type, num_houses in zip(node_ids, node_types, houses):
+            if node_type == 'barrio':
+                self.neighborhoods[node_id] = num_houses or 6
+            elif node_type == 'tanque':
+                self.tank_levels.setdefault(node_id, 100.0)
+                self.tank_capacities.setdefault(
+                    node_id, NETWORK_SETTINGS['default_tank_capacity'])
+        if empty:
+            store.attach(sources, targets, capacities, obstructions)
+            self._graph_types = list(node_types)
+        else:
+            # Red no vacía: índices propios de la tabla y grafo al día
+            index = np.fromiter((store.intern(node_id) for node_id in node_ids),
+                                dtype=np.int64, count=len(node_ids))
+            sources = index[np.asarray(sources, dtype=np.int64)]
+            targets = index[np.asarray(targets, dtype=np.int64)]
+            store.extend_indices(sources, targets, capacities, obstructions)
+            ids = store.node_ids
+            self.graph.add_nodes_from(
+                (node_id, {'type': node_type})
+                for node_id, node_type in zip(node_ids, node_types))
+            self.graph.add_edges_from(zip(map(ids.__getitem__, sources.tolist()),
+                                          map(ids.__getitem__, targets.tolist())))
+        self.route_index.clear()
+        self.connectivity.clear()
+        self.block_cut.clear()
+        self.flow_cache.invalidate()
+        self.events.publish(NetworkReset())
+
+    def delete_pipe(self, source: str, target: str) -> bool:
+        """Elimina una tubería del grafo y de la tabla de tuberías"""
+        if self.pipes.find(source, target) is None:
+            return False
+        self.graph.remove_edge(source, target)
+        slot = self.pipes.remove(source, target)
+        self.route_index.on_pipe_removed(slot)
+        self.connectivity.on_pipe_removed(slot)
+        self.block_cut.on_pipe_removed(slot)
+        self.events.publish(PipeRemoved(*self.pipes.endpoints(slot), slot))
+        return True
+
+    def verify_safe_pipe_deletion(self, source: str, target: str) -> bool:
+        """Quitar la tubería no deja a ningún barrio sin camino a un tanque"""
+        slot = self.pipes.find(source, target)
+        if slot is None:
+            return True
+        return self.block_cut.pipe_loss_count(slot) == 0
+
+    def neighborhoods_cut_by_pipe(self, source: str, target: str) -> List[str]:
+        """Barrios que quedarían sin camino a un tanque sin esta tubería"""
+        slot = self.pipes.find(source, target)
+        return [] if slot is None else self.block_cut.pipe_losses(slot)
+
+    def neighborhoods_cut_by_node(self, node_id: str) -> List[str]:
+        """Barrios que quedarían sin camino a un tanque si se aísla el nodo"""
+        if node_id not in self.graph:
+            return []
+        return self.block_cut.node_losses(node_id)
+
+    def get_pipes(self) -> List[Tuple[str, str]]:
+        """Lista de tuberías activas como pares (origen, destino)"""
+        return list(self.pipes.pipes())
+
+    def add_obstruction(self, source: str, target: str, level: float) -> None:
+        """Fija el porcentaje de obstrucción de una tubería"""
+        slot = self.pipes.slot(source, target)
+        self.pipes.obstruction[slot] = level
+        self._pipe_changed(slot)
+        self.events.publish(ObstructionChanged(*self.pipes.endpoints(slot), slot, level))
+
+    def set_obstructions(self, slots, levels) -> None:
+        """Fija la obstrucción de muchas tuberías a la vez (por slot)"""
+        slots = np.asarray(slots, dtype=np.int64)
+        levels = np.asarray(levels, dtype=self.pipes.obstruction.dtype)
+        changed = self.pipes.obstruction[slots] != levels
+        slots, levels = slots[changed], levels[changed]
+        if not len(slots):
+            return
+        self.pipes.obstruction[slots] = levels
+        if self._engine is not None:
+            self._engine.invalidate_routing()
+        self.flow_cache.invalidate()
+        with self.events.batch():
+            for slot, level in zip(slots.tolist(), levels.tolist()):
+                self.events.publish(ObstructionChanged(*self.pipes.endpoints(slot), slot, level))
+
+    def remove_obstruction(self, source: str, target: str) -> None:
+        """Elimina la obstrucción de una tubería"""
+        slot = self.pipes.slot(source, target)
+        self.pipes.obstruction[slot] = 0
+        self._pipe_changed(slot)
+        self.events.publish(ObstructionChanged(*self.pipes.endpoints(slot), slot, 0.0))
+
+    def block_pipe(self, source: str, target: str) -> None:
+        """Bloquea el paso de agua por una tubería"""
+        slot = self.pipes.slot(source, target)
+        self.pipes.blocked[slot] = True
+        self.route_index.on_pipe_removed(slot)
+        self._pipe_changed(slot)
+        self.events.publish(PipeBlocked(*self.pipes.endpoints(slot), slot, True))
+
+    def unblock_pipe(self, source: str, target: str) -> None:
+        """Restablece el paso de agua por una tubería bloqueada"""
+        slot = self.pipes.slot(source, target)
+        self.pipes.blocked[slot] = False
+        self.route_index.on_pipe_added(slot)
+        self._pipe_changed(slot)
+        self.events.publish(PipeBlocked(*self.pipes.endpoints(slot), slot, False))
+
+    def add_tank(self, tank_id: str, capacity: float, level: float) -> bool:
+        """Agrega un tanque con su capacidad (m³) y nivel inicial (%)"""
+        with self.events.batch():
+            if not self.add_node(tank_id, 'tanque'):
+                return False
+            self.tank_capacities[tank_id] = capacity
+            self.tank_levels[tank_id] = level
+        return True
+
+    def remove_tank(self, tank_id: str) -> None:
+        """Elimina un tanque y sus tuberías"""
+        with self.events.batch():
+            for neighbor in list(self.graph.neighbors(tank_id)):
+                self.delete_pipe(tank_id, neighbor)
+            self.graph.remove_node(tank_id)
+            self.tank_levels.pop(tank_id, None)
+            self.tank_capacities.pop(tank_id, None)
+            self._engine = None
+            self.connectivity.on_node_removed(tank_id)
+            self.block_cut.on_node_changed(tank_id)
+            self.events.publish(NodeRemoved(tank_id, 'tanque'))
+
+    def get_tanks(self) -> List[Dict[str, Any]]:
+        """Lista de tanques con su capacidad y nivel actual"""
+        return [
+            {
+                'id': tank_id,
+                'capacity': self.tank_capacities.get(tank_id),
+                'level': round(level, 1)
+            }
+            for tank_id, level in self.tank_levels.items()
+        ]
+
+    def update_tank_level(self, tank_id: str, level: float) -> None:
+        """Fija el nivel (%) de un tanque"""
+        if tank_id not in self.tank_levels:
+            raise KeyError(f"No existe el tanque {tank_id}")
+        self.tank_levels[tank_id] = level
+        if self._engine is not None:
+            index = self.pipes.node_index[tank_id]
+            self._engine.tank_level[index] = level
+            self._engine.initial_tank_level[index] = level
+            self._engine.invalidate_routing()
+        self.flow_cache.on_tank_change(tank_id)
+        self.events.publish(TankLevelChanged(tank_id, level))
+
+    def _capacity_set(self, slot: int) -> None:
+        """Propaga y publica la nueva capacidad de una tubería existente"""
+        self._pipe_changed(slot)
+        self.events.publish(CapacityChanged(*self.pipes.endpoints(slot), slot,
+                                            float(self.pipes.capacity[slot])))
+
+    def _obstruction_set(self, slot: int) -> None:
+        """Propaga y publica la obstrucción escrita por ``obstructions``"""
+        self._pipe_changed(slot)
+        self.events.publish(ObstructionChanged(*self.pipes.endpoints(slot), slot,
+                                               float(self.pipes.obstruction[slot])))
+
+    def _pipe_changed(self, slot: int) -> None:
+        """Propaga un cambio de capacidad útil de una tubería"""
+        if self._engine is not None:
+            self._engine.invalidate_routing()
+        self.flow_cache.on_pipe_change(slot)
+
+    def find_shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Ruta con menos tuberías entre dos nodos evitando las bloqueadas"""
+        for node in (source, target):
+            if node not in self.pipes.node_index:
+                raise KeyError(f"No existe el nodo {node}")
+        if source in self.tank_levels:
+            return self.route_index.route_from_tank(source, target)
+        if target in self.tank_levels:
+            path = self.route_index.route_from_tank(target, source)
+            return path[::-1] if path else None
+
+        store = self.pipes
+
+        def open_pipe(u, v):
+            return not store.blocked[store.slot(u, v)]
+
+        try:
+            return nx.shortest_path(nx.subgraph_view(self.graph, filter_edge=open_pipe),
+                                    source, target)
+        except nx.NetworkXNoPath:
+            return None
+
+    def analyze_flow_capacity(self, source: str, target: str) -> float:
+        """Flujo máximo entre dos nodos según la capacidad útil de las tuberías"""
+        return round(self.flow_cache.max_flow(source, target), 2)
+
+    def optimize_flow(self, priority: str = "Media", cost_factor: float = 1.0,
+                      progress=None) -> Dict[str, Any]:
+        """Despacho de costo mínimo de los tanques a los barrios"""
+        return self.optimizer.optimize(priority, cost_factor, progress)
+
+    def optimize_connections(self, priority: str = "Media", cost_factor: float = 1.0,
+                             progress=None) -> Dict[str, Any]:
+        """Tuberías nuevas y ampliaciones con más demanda servida por costo"""
+        return ConnectionPlanner(self).plan(priority, cost_factor, progress)
+
+    def balance_load(self, progress=None) -> Dict[str, Any]:
+        """Reparto de la demanda con la utilización más pareja posible"""
+        return self.balancer.balance(progress)
+
+    def analyze_contingencies(self, progress=None) -> Dict[str, Any]:
+        """Análisis N-1: demanda sin servir al sacar de servicio cada tubería"""
+        return self.contingency.run(progress)
+
+    def estimate_reliability(self, progress=None, seed: Optional[int] = None) -> Dict[str, Any]:
+        """Confiabilidad de suministro por barrio ante fallas simultáneas al azar"""
+        return ReliabilityEstimator(self).estimate(progress, seed)
+
+    def simulate_deterioration(self, days: Optional[float] = None,
+                               apply: bool = False) -> Dict[str, Any]:
+        """Proyecta el deterioro de las tuberías con inspecciones y mantenimiento
+
+        Con ``apply`` las obstrucciones al final del horizonte quedan en la red.
+        """
+        simulator = DeteriorationSimulator(self)
+        result = simulator.run(days)
+        if apply:
+            self.set_obstructions(simulator.slots, simulator.obstruction)
+        return result
+
+    def get_simulation_engine(self) -> SimulationEngine:
+        """Motor de simulación sincronizado con la topología actual"""
+        key = (self.pipes.version, self.pipes.size, self.pipes.node_count,
+               id(self.pipes.source))
+        if self._engine is None or self._engine_key != key:
+            previous = self._engine
+            self._engine = SimulationEngine.from_network(self)
+            if previous is not None:
+                self._engine.time = previous.time
+            self._engine.set_hydraulic_mode(self.hydraulic_mode)
+            self._engine_key = key
+        return self._engine
+
+    def set_hydraulic_mode(self, enabled: bool) -> None:
+        """Simula con el modelo hidráulico (presiones) o solo con capacidades"""
+        self.hydraulic_mode = bool(enabled)
+        if self._engine is not None:
+            self._engine.set_hydraulic_mode(self.hydraulic_mode)
+
+    def get_node_pressure(self, node_id: str) -> Optional[float]:
+        """Presión del último paso hidráulico (m), o None si no se calculó"""
+        index = self.pipes.node_index.get(node_id)
+        if self._engine is None or index is None or index >= self._engine.node_count:
+            return None
+        pressure = float(self._engine.pressure[index])
+        return None if pressure != pressure else pressure
+
+    def update_simulation(self, speed: float = 1.0,
+                          consumption_scale: float = 1.0) -> Dict[str, float]:
+        """Avanza un paso de simulación en toda la red"""
+        engine = self.get_simulation_engine()
+        result = engine.step(speed, consumption_scale)
+        self.history.record(engine.time, engine.flow)
+        ids = self.pipes.node_ids
+        for index in engine.tanks.tolist():
+            self.tank_levels[ids[index]] = float(engine.tank_level[index])
+        self.events.publish(SimulationStep(engine.time))
+        return result
+
+    def reset_simulation(self) -> None:
+        """Reinicia el reloj, los flujos y los niveles de los tanques"""
+        if self._engine is not None:
+            self._engine.reset()
+            ids = self.pipes.node_ids
+            for index in self._engine.tanks.tolist():
+                self.tank_levels[ids[index]] = float(self._engine.tank_level[index])
+        self.pipes.flow[:] = 0
+        self.history.clear()
+        self.events.publish(SimulationStep(0.0))
+
+    def get_flow_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Últimos pasos del historial como ``{'time', 'flows'}`` por paso
+
+        Materializa un diccionario por paso; para series largas conviene
+        usar ``history.times()`` y ``history.series(slot)``.
+        """
+        limit = limit or NETWORK_SETTINGS['max_history_length']
+        times, matrix = self.history.rows(len(self.history) - limit)
+        slots = self.pipes.active_slots()
+        slots = slots[slots < matrix.shape[1]]
+        edges = [self.pipes.endpoints(slot) for slot in slots.tolist()]
+        history = []
+        for time, row in zip(times.tolist(), matrix[:, slots].tolist()):
+            flows = {}
+            for (u, v), flow in zip(edges, row):
+                flows[(u, v)] = flow
+                flows[(v, u)] = -flow
+            history.append({'time': time, 'flows': flows})
+        return history
+
+    def get_flow_info(self) -> str:
+        """Resumen textual de flujos, bloqueos y obstrucciones"""
+        store = self.pipes
+        slots = store.active_slots()
+        flow = abs(store.flow[slots])
+        capacity = store.capacity[slots]
+        busy = flow[capacity > 0] / capacity[capacity > 0]
+        return (
+            f"Tuberías: {len(slots)} ({int(store.blocked[slots].sum())} bloqueadas, "
+            f"{int((store.obstruction[slots] > 0).sum())} obstruidas)\n"
+            f"Flujo total: {float(flow.sum()):.1f} unidades\n"
+            f"Utilización máxima: {100 * float(busy.max()) if len(busy) else 0.0:.1f}%"
+        )
+
+    def get_system_status(self) -> str:
+        """Resumen textual del estado de la simulación"""
+        step = self._engine.last_step if self._engine is not None else {}
+        if not step:
+            return "Simulación sin iniciar"
+        served = 100.0 * step['served'] / step['demand'] if step['demand'] > 0 else 100.0
+        status = (
+            f"Demanda atendida: {served:.1f}%\n"
+            f"Déficit: {step['unserved']:.1f} unidades\n"
+            f"Nivel mínimo de tanque: {step['min_tank_level']:.1f}%\n"
+            f"Utilización máxima: {100 * step['peak_utilization']:.1f}%"
+        )
+        if 'min_pressure' in step:
+            status += (f"\nPresión mínima: {step['min_pressure']:.1f} m"
+                       f" ({step['low_pressure']} barrios bajo el mínimo)")
+        return status
+
+    def load_from_file(self, filename: str) -> None:
+        """Carga la red desde un archivo JSON o .wdn"""
+        from utils.file_handler import NetworkFileHandler
+        if not NetworkFileHandler.load_network(filename, self):
+            errors = NetworkFileHandler.last_load_stats.get('errors') or []
+            raise ValueError("; ".join(errors[:5]) or f"No se pudo cargar {filename}")
+
+    def save_to_file(self, filename: str) -> None:
+        """Guarda la red en un archivo JSON o .wdn según la extensión"""
+        from utils.file_handler import NetworkFileHandler
+        if not NetworkFileHandler.save_network(filename, self):
+            raise ValueError(f"No se pudo guardar {filename}")
+
+    def clear(self) -> None:
+        """Elimina todos los nodos, tuberías y estados de la red"""
+        self._graph_types = None
+        self._graph.clear()
+        self.pipes.clear()
+        self.neighborhoods.clear()
+        self.tank_levels.clear()
+        self.tank_capacities.clear()
+        self._engine = None
+        self.flow_cache.invalidate()
+        self.route_index.clear()
+        self.connectivity.clear()
+        self.block_cut.clear()
+        self.history.clear()
+        self.events.publish(NetworkReset())
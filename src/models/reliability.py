@@ -0,0 +1,168 @@
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from scipy.special import ndtri
+from config.settings import NETWORK_SETTINGS
+
+
+def batch_components(node_count: int, source: np.ndarray, target: np.ndarray,
+                     alive: np.ndarray) -> np.ndarray:
+    """
+    Componentes conexas de muchas muestras a la vez con union-find vectorizado
+
+    Cada muestra es una copia disjunta de los nodos (desplazada en
+    ``node_count``) con sus tuberías en servicio. En cada ronda se
+    comprimen los caminos por saltos de puntero, se descartan las
+    tuberías con ambos extremos ya en el mismo conjunto y cada raíz se
+    cuelga de la menor raíz vecina. Como los padres solo decrecen no se
+    forman ciclos.
+
+    Args:
+        node_count: nodos por muestra
+        source, target: extremos de cada tubería
+        alive: (muestras, tuberías), True si la tubería opera en la muestra
+
+    Returns:
+        np.ndarray: (muestras, nodos) con la raíz de cada nodo (índice
+        global, dentro del bloque de su muestra)
+    """
+    samples = alive.shape[0]
+    dtype = np.int32 if samples * node_count < np.iinfo(np.int32).max else np.int64
+    sample, pipe = np.nonzero(alive)
+    offset = sample.astype(dtype) * dtype(node_count)
+    u = source.astype(dtype)[pipe] + offset
+    v = target.astype(dtype)[pipe] + offset
+    parent = np.arange(samples * node_count, dtype=dtype)
+    while u.size:
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        ru, rv = parent[u], parent[v]
+        apart = ru != rv
+        u, v, ru, rv = u[apart], v[apart], ru[apart], rv[apart]
+        np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+    return parent.reshape(samples, node_count)
+
+
+def wilson_interval(successes: np.ndarray, trials: int, z: float):
+    """Intervalo de Wilson para una proporción (cotas inferior y superior)"""
+    if trials == 0:
+        zeros = np.zeros(np.shape(successes))
+        return zeros, zeros + 1.0
+    p = np.asarray(successes, dtype=np.float64) / trials
+    denominator = 1.0 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half = z * np.sqrt(p * (1.0 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+
+class ReliabilityEstimator:
+    """Confiabilidad de suministro por barrio ante fallas simultáneas al azar
+
+    Cada tubería falla de forma independiente con probabilidad
+    ``failure_probability``, aumentada con su obstrucción; las bloqueadas
+    fallan siempre. Un barrio está abastecido en una muestra si sigue
+    conectado a algún tanque con agua. Las muestras se evalúan por lotes
+    con ``batch_components`` y el muestreo se detiene cuando el intervalo
+    de confianza de todos los barrios (y de la red completa) es más
+    angosto que ``tolerance``, o al llegar a ``max_samples``.
+    """
+
+    def __init__(self, network, settings: Optional[Dict[str, Any]] = None):
+        self.network = network
+        self.settings = settings or NETWORK_SETTINGS['reliability']
+
+    def failure_probability(self, slots: np.ndarray) -> np.ndarray:
+        """Probabilidad de falla de cada tubería activa"""
+        store = self.network.pipes
+        base = self.settings['failure_probability']
+        weight = self.settings['obstruction_weight']
+        obstruction = store.obstruction[slots].astype(np.float64) / 100.0
+        probability = base + (1.0 - base) * weight * obstruction
+        probability[store.blocked[slots]] = 1.0
+        return np.clip(probability, 0.0, 1.0)
+
+    def estimate(self, progress: Optional[Callable[..., None]] = None,
+                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Muestrea conjuntos de fallas hasta converger
+
+        Args:
+            progress: ``progress(fracción, mensaje, parcial)`` por lote
+            seed: semilla del generador (None: aleatoria)
+
+        Returns:
+            Dict[str, Any]: muestras, convergencia, confiabilidad de la red
+            y por barrio (de menor a mayor) con su intervalo de confianza
+        """
+        options = self.settings
+        network = self.network
+        store = network.pipes
+        n = store.node_count
+        slots = store.active_slots()
+        source = store.source[slots].astype(np.int64)
+        target = store.target[slots].astype(np.int64)
+        probability = self.failure_probability(slots)
+        names = list(network.neighborhoods)
+        neighborhoods = np.array([store.node_index[node_id] for node_id in names],
+                                 dtype=np.int64)
+        tanks = np.array([store.node_index[node_id]
+                          for node_id, level in network.tank_levels.items() if level > 0],
+                         dtype=np.int64)
+        z = float(ndtri(0.5 + options['confidence'] / 2.0))
+        # Muestras por lote según el tope de elementos en memoria
+        batch = int(max(1, min(options['batch_size'],
+                               options['batch_elements'] // max(n + len(slots), 1))))
+        rng = np.random.default_rng(seed)
+
+        supplied = np.zeros(len(names), dtype=np.int64)
+        all_supplied = 0
+        samples = 0
+        converged = False
+        result: Dict[str, Any] = {}
+        while samples < options['max_samples']:
+            size = min(batch, options['max_samples'] - samples)
+            alive = rng.random((size, len(slots))) >= probability
+            if tanks.size and neighborhoods.size:
+                roots = batch_components(n, source, target, alive)
+                fed = np.zeros(size * n, dtype=bool)
+                fed[roots[:, tanks]] = True
+                served = fed[roots[:, neighborhoods]]
+            else:
+                served = np.zeros((size, len(names)), dtype=bool)
+            supplied += served.sum(axis=0)
+            all_supplied += int(served.all(axis=1).sum())
+            samples += size
+
+            result = self._summary(names, supplied, all_supplied, samples, z)
+            converged = (samples >= options['min_samples']
+                         and result['half_width'] <= options['tolerance'])
+            result['converged'] = converged
+            if converged:
+                break
+            if progress is not None:
+                progress(samples / options['max_samples'], f"{samples} muestras", result)
+        return result
+
+    def _summary(self, names, supplied: np.ndarray, all_supplied: int,
+                 samples: int, z: float) -> Dict[str, Any]:
+        low, high = wilson_interval(supplied, samples, z)
+        system_low, system_high = wilson_interval(np.array([all_supplied]), samples, z)
+        widths = np.concatenate([high - low, system_high - system_low]) / 2.0
+        order = np.argsort(supplied, kind='stable')
+        return {
+            'samples': samples,
+            'half_width': round(float(widths.max()), 4),
+            'system': {
+                'reliability': round(all_supplied / samples, 4),
+                'low': round(float(system_low[0]), 4),
+                'high': round(float(system_high[0]), 4)
+            },
+            'neighborhoods': [{
+                'neighborhood': names[i],
+                'reliability': round(int(supplied[i]) / samples, 4),
+                'low': round(float(low[i]), 4),
+                'high': round(float(high[i]), 4)
+            } for i in order.tolist()]
+        }
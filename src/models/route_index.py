@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class RouteIndex:
+    """Índice de rutas más cortas desde cada tanque
+
+    Guarda un árbol de caminos mínimos (en número de tuberías) por tanque
+    como arreglos de predecesores y distancias indexados por nodo, lo que
+    permite responder cualquier ruta tanque→nodo en O(longitud del camino).
+    Al modificar la red solo se invalidan los árboles afectados:
+
+    - al agregar o desbloquear u-v, los árboles donde la nueva tubería
+      acorta alguna distancia (``|d(u) - d(v)| > 1``) o alcanza nodos nuevos;
+    - al eliminar o bloquear u-v, los árboles donde u-v es arista del árbol.
+    """
+
+    def __init__(self, network):
+        self.network = network
+        self.trees: Dict[int, Dict[str, np.ndarray]] = {}
+        self._csr = None
+        self._csr_version = None
+        self.stats = {'built': 0, 'invalidated': 0}
+
+    def copy(self, network) -> 'RouteIndex':
+        """Copia de los árboles para ``network``; los arreglos no se modifican en el lugar"""
+        other = RouteIndex(network)
+        other.trees = {root: dict(tree) for root, tree in self.trees.items()}
+        other._csr = self._csr
+        other._csr_version = self._csr_version
+        other.stats = dict(self.stats)
+        return other
+
+    def clear(self) -> None:
+        """Descarta todos los árboles"""
+        self.trees.clear()
+        self._csr = None
+
+    def _adjacency(self):
+        """Adyacencia CSR de las tuberías activas y sin bloquear"""
+        store = self.network.pipes
+        key = (store.version, store.node_count)
+        if self._csr is None or self._csr_version != key:
+            size = store.size
+            usable = store.active[:size] & ~store.blocked[:size]
+            src = store.source[:size][usable].astype(np.int64)
+            dst = store.target[:size][usable].astype(np.int64)
+            heads = np.concatenate([src, dst])
+            tails = np.concatenate([dst, src])
+            order = np.argsort(heads, kind='stable')
+            indptr = np.zeros(store.node_count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(heads, minlength=store.node_count), out=indptr[1:])
+            self._csr = (indptr, tails[order])
+            self._csr_version = key
+        return self._csr
+
+    def _build_tree(self, root: int) -> Dict[str, np.ndarray]:
+        """Recorrido en anchura vectorizado que registra predecesores"""
+        indptr, neighbors = self._adjacency()
+        n = len(indptr) - 1
+        distance = np.full(n, -1, dtype=np.int32)
+        predecessor = np.full(n, -1, dtype=np.int32)
+        distance[root] = 0
+        frontier = np.array([root], dtype=np.int64)
+        depth = 0
+        while frontier.size:
+            depth += 1
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            reached = neighbors[offsets + np.arange(total)]
+            parents = np.repeat(frontier, counts)
+            new = distance[reached] < 0
+            reached, first = np.unique(reached[new], return_index=True)
+            distance[reached] = depth
+            predecessor[reached] = parents[new][first]
+            frontier = reached
+        self.stats['built'] += 1
+        return {'distance': distance, 'predecessor': predecessor}
+
+    def _tree(self, tank_id: str) -> Dict[str, np.ndarray]:
+        store = self.network.pipes
+        root = store.node_index[tank_id]
+        tree = self.trees.get(root)
+        if tree is None:
+            tree = self._build_tree(root)
+            self.trees[root] = tree
+        elif len(tree['distance']) < store.node_count:
+            # Nodos nuevos sin tuberías: inalcanzables hasta que se conecten
+            missing = store.node_count - len(tree['distance'])
+            for name in ('distance', 'predecessor'):
+                tree[name] = np.concatenate([tree[name], np.full(missing, -1, dtype=np.int32)])
+        return tree
+
+    def _sync_tanks(self) -> None:
+        """Descarta árboles de nodos que ya no son tanques"""
+        store = self.network.pipes
+        tanks = {store.node_index[t] for t in self.network.tank_levels
+                 if t in store.node_index}
+        for root in list(self.trees):
+            if root not in tanks:
+                del self.trees[root]
+
+    def on_pipe_added(self, slot: int) -> None:
+        """Invalida los árboles en los que la nueva tubería acorta rutas"""
+        store = self.network.pipes
+        u, v = int(store.source[slot]), int(store.target[slot])
+        self._csr = None
+        for root, tree in list(self.trees.items()):
+            distance = tree['distance']
+            if max(u, v) >= len(distance):
+                del self.trees[root]
+                continue
+            du, dv = distance[u], distance[v]
+            if (du < 0) != (dv < 0) or (du >= 0 and abs(int(du) - int(dv)) > 1):
+                del self.trees[root]
+                self.stats['invalidated'] += 1
+
+    def on_pipe_removed(self, slot: int) -> None:
+        """Invalida los árboles que usan la tubería eliminada o bloqueada"""
+        store = self.network.pipes
+        u, v = int(store.source[slot]), int(store.target[slot])
+        self._csr = None
+        for root, tree in list(self.trees.items()):
+            predecessor = tree['predecessor']
+            if max(u, v) >= len(predecessor):
+                continue
+            if predecessor[v] == u or predecessor[u] == v:
+                del self.trees[root]
+                self.stats['invalidated'] += 1
+
+    def route_from_tank(self, tank_id: str, target: str) -> Optional[List[str]]:
+        """Ruta más corta desde un tanque hasta un nodo, o None"""
+        self._sync_tanks()
+        store = self.network.pipes
+        tree = self._tree(tank_id)
+        node = store.node_index[target]
+        if tree['distance'][node] < 0:
+            return None
+        predecessor = tree['predecessor']
+        path = []
+        while node >= 0:
+            path.append(store.node_ids[node])
+            node = predecessor[node]
+        path.reverse()
+        return path
+
+    def distance_from_tank(self, tank_id: str, target: str) -> int:
+        """Número de tuberías de la ruta más corta (-1 si no hay ruta)"""
+        self._sync_tanks()
+        store = self.network.pipes
+        return int(self._tree(tank_id)['distance'][store.node_index[target]])
@@ -0,0 +1,212 @@
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import csv
+import os
+import numpy as np
+from .simulation import SimulationEngine
+
+# Arreglos del motor que se publican en memoria compartida
+SHARED_FIELDS: List[Tuple[str, Any]] = [
+    ('node_types', np.int8),
+    ('houses', np.float64),
+    ('tank_capacity', np.float64),
+    ('tank_level', np.float64),
+    ('source', np.int32),
+    ('target', np.int32),
+    ('capacity', np.float64),
+    ('obstruction', np.float32),
+    ('blocked', np.bool_),
+    ('active', np.bool_)
+]
+
+KPI_FIELDS = ['scenario', 'unserved_demand', 'served_ratio',
+              'min_tank_level', 'peak_utilization', 'steps']
+
+# Estado del proceso trabajador (se fija una vez en el inicializador)
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_settings: Dict[str, Any] = {}
+_worker_hydraulic = False
+
+
+class SharedNetwork:
+    """Copia de los arreglos de una red en un bloque de memoria compartida
+
+    Los trabajadores se conectan al bloque por nombre y crean vistas NumPy
+    de solo lectura, por lo que la red se transfiere una sola vez en lugar
+    de serializarse con cada escenario. ``hydraulic`` indica si el motor de
+    origen simula en modo hidráulico.
+    """
+
+    def __init__(self, engine: SimulationEngine):
+        self.hydraulic = engine.hydraulics is not None
+        arrays = {name: np.ascontiguousarray(getattr(engine, name), dtype=dtype)
+                  for name, dtype in SHARED_FIELDS}
+        arrays['tank_level'] = np.ascontiguousarray(engine.initial_tank_level)
+
+        self.layout: Dict[str, Tuple[int, str, int]] = {}
+        offset = 0
+        for name, _ in SHARED_FIELDS:
+            array = arrays[name]
+            self.layout[name] = (offset, array.dtype.str, len(array))
+            offset += -(-array.nbytes // 8) * 8  # Alinear a 8 bytes
+        self.memory = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+        for name, array in arrays.items():
+            self.view(self.memory, self.layout, name)[:] = array
+
+    @staticmethod
+    def view(memory: shared_memory.SharedMemory,
+             layout: Dict[str, Tuple[int, str, int]], name: str) -> np.ndarray:
+        """Vista NumPy de un campo dentro del bloque compartido"""
+        offset, dtype, length = layout[name]
+        return np.ndarray((length,), dtype=np.dtype(dtype),
+                          buffer=memory.buf, offset=offset)
+
+    def close(self) -> None:
+        """Libera el bloque de memoria compartida"""
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _attach_worker(name: str, layout: Dict[str, Tuple[int, str, int]],
+                   settings: Dict[str, Any], hydraulic: bool) -> None:
+    """Inicializador de cada proceso: se conecta al bloque compartido"""
+    global _worker_memory, _worker_arrays, _worker_settings, _worker_hydraulic
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_arrays = {}
+    for field in layout:
+        array = SharedNetwork.view(_worker_memory, layout, field)
+        array.flags.writeable = False
+        _worker_arrays[field] = array
+    _worker_settings = settings
+    _worker_hydraulic = hydraulic
+
+
+def simulate_scenario(arrays: Dict[str, np.ndarray], scenario: Dict[str, Any],
+                      steps: int, speed: float, settings: Dict[str, Any],
+                      hydraulic: bool = False) -> Dict[str, Any]:
+    """
+    Simula un escenario ya resuelto a índices y calcula sus indicadores
+
+    Solo se copian los arreglos que el escenario modifica (obstrucciones,
+    bloqueos, niveles y flujos); el resto se comparte entre escenarios.
+    Con ``hydraulic`` los flujos salen del modelo hidráulico.
+    """
+    obstruction = arrays['obstruction'].copy()
+    blocked = arrays['blocked'].copy()
+    tank_level = arrays['tank_level'].copy()
+    slots, levels = scenario['obstruction_slots']
+    obstruction[slots] = levels
+    blocked[scenario['blocked_slots']] = True
+    indices, values = scenario['tank_indices']
+    tank_level[indices] = values
+
+    engine = SimulationEngine(
+        arrays['node_types'], arrays['houses'], arrays['tank_capacity'],
+        tank_level, arrays['source'], arrays['target'], arrays['capacity'],
+        obstruction, blocked, arrays['active'], settings=settings
+    )
+    engine.set_hydraulic_mode(hydraulic)
+    scale = scenario['consumption_scale']
+    dt = settings['time_step'] * speed
+    demand = served = 0.0
+    min_tank_level = float(tank_level[engine.tanks].min()) if engine.tanks.size else 0.0
+    peak_utilization = 0.0
+    for _ in range(steps):
+        result = engine.step(speed, scale)
+        demand += result['demand'] * dt
+        served += result['served'] * dt
+        min_tank_level = min(min_tank_level, result['min_tank_level'])
+        peak_utilization = max(peak_utilization, result['peak_utilization'])
+
+    return {
+        'scenario': scenario['name'],
+        'unserved_demand': demand - served,
+        'served_ratio': served / demand if demand > 0 else 1.0,
+        'min_tank_level': min_tank_level,
+        'peak_utilization': peak_utilization,
+        'steps': steps
+    }
+
+
+def _run_in_worker(task: Tuple[Dict[str, Any], int, float]) -> Dict[str, Any]:
+    scenario, steps, speed = task
+    return simulate_scenario(_worker_arrays, scenario, steps, speed, _worker_settings,
+                             _worker_hydraulic)
+
+
+def resolve_scenario(network, scenario: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Traduce las perturbaciones de un escenario a índices de la red
+
+    Claves admitidas: ``name``, ``consumption_scale``, ``blocked_pipes``
+    (lista de pares origen-destino), ``obstructions`` (lista de
+    ``(origen, destino, nivel)``) y ``tank_levels`` (``{tanque: nivel}``).
+    """
+    store = network.pipes
+    blocked = [store.slot(u, v) for u, v in scenario.get('blocked_pipes', [])]
+    obstructions = scenario.get('obstructions', [])
+    if isinstance(obstructions, dict):
+        obstructions = [(u, v, level) for (u, v), level in obstructions.items()]
+    tanks = scenario.get('tank_levels', {})
+    return {
+        'name': scenario.get('name', f"escenario_{index}"),
+        'consumption_scale': float(scenario.get('consumption_scale', 1.0)),
+        'blocked_slots': np.asarray(blocked, dtype=np.int64),
+        'obstruction_slots': (
+            np.asarray([store.slot(u, v) for u, v, _ in obstructions], dtype=np.int64),
+            np.asarray([level for _, _, level in obstructions], dtype=np.float32)
+        ),
+        'tank_indices': (
+            np.asarray([store.node_index[t] for t in tanks], dtype=np.int64),
+            np.asarray(list(tanks.values()), dtype=np.float64)
+        )
+    }
+
+
+def run_scenario_sweep(network, scenarios: List[Dict[str, Any]],
+                       steps: Optional[int] = None, speed: float = 1.0,
+                       max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Ejecuta una batería de escenarios en paralelo sobre un pool de procesos
+
+    Args:
+        network: Red base (WaterNetwork)
+        scenarios: Perturbaciones por escenario (ver ``resolve_scenario``)
+        steps: Pasos por escenario (por defecto hasta el tiempo máximo)
+        speed: Velocidad de simulación
+        max_workers: Procesos del pool (por defecto uno por núcleo)
+
+    Los escenarios usan el modo de simulación de la red (``hydraulic_mode``).
+
+    Returns:
+        List[Dict[str, Any]]: una fila de indicadores por escenario, en orden
+    """
+    settings = network.get_simulation_engine().settings
+    if steps is None:
+        steps = int(round(settings['max_simulation_time'] / (settings['time_step'] * speed)))
+    tasks = [(resolve_scenario(network, scenario, i), steps, speed)
+             for i, scenario in enumerate(scenarios)]
+    if not tasks:
+        return []
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    shared = SharedNetwork(network.get_simulation_engine())
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_attach_worker,
+                                 initargs=(shared.memory.name, shared.layout,
+                                           dict(settings), shared.hydraulic)) as executor:
+            chunksize = max(1, len(tasks) // (4 * workers))
+            return list(executor.map(_run_in_worker, tasks, chunksize=chunksize))
+    finally:
+        shared.close()
+
+
+def write_kpi_table(rows: List[Dict[str, Any]], filename: str) -> None:
+    """Guarda la tabla de indicadores de un barrido en CSV"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=KPI_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,282 @@
+from typing import Dict, Any, Optional
+import numpy as np
+from config.settings import SIMULATION_SETTINGS, NETWORK_SETTINGS
+from .hydraulics import HydraulicSolver
+
+# Códigos enteros de tipo de nodo usados por los arreglos del motor
+NODE_TYPE_CODES: Dict[str, int] = {
+    'tanque': 0,
+    'barrio': 1,
+    'interseccion': 2
+}
+TANK = NODE_TYPE_CODES['tanque']
+NEIGHBORHOOD = NODE_TYPE_CODES['barrio']
+INTERSECTION = NODE_TYPE_CODES['interseccion']
+
+
+def consumption_factor(hour: float, patterns: Dict[str, Dict[str, float]]) -> float:
+    """Factor de consumo del patrón horario que contiene ``hour``"""
+    for pattern in patterns.values():
+        if pattern['start'] <= hour < pattern['end']:
+            return pattern['factor']
+    return 1.0
+
+
+def bfs_levels(node_count: int, source: np.ndarray, target: np.ndarray,
+               roots: np.ndarray) -> np.ndarray:
+    """Distancia en saltos desde el conjunto ``roots`` (-1 si es inalcanzable)
+
+    Recorrido en anchura por niveles: cada nivel expande toda la frontera
+    con operaciones vectorizadas sobre una adyacencia CSR.
+    """
+    heads = np.concatenate([source, target])
+    tails = np.concatenate([target, source])
+    order = np.argsort(heads, kind='stable')
+    neighbors = tails[order]
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(heads, minlength=node_count), out=indptr[1:])
+
+    level = np.full(node_count, -1, dtype=np.int64)
+    frontier = np.unique(roots)
+    level[frontier] = 0
+    depth = 0
+    while frontier.size:
+        depth += 1
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        reached = neighbors[offsets + np.arange(total)]
+        reached = np.unique(reached[level[reached] < 0])
+        level[reached] = depth
+        frontier = reached
+    return level
+
+
+class SimulationEngine:
+    """Motor vectorizado de pasos de simulación
+
+    Opera sobre arreglos indexados por nodo y por slot de tubería. Al cambiar
+    la topología se calcula un enrutamiento desde los tanques: cada tubería
+    se orienta aguas abajo según la distancia al tanque más cercano y la
+    demanda de cada nodo se reparte entre sus tuberías de entrada. Con ello
+    se obtiene el flujo por unidad de demanda; un paso de simulación solo
+    escala ese vector, lo recorta por la capacidad útil y aplica la matriz
+    de incidencia para obtener el balance de cada nodo.
+
+    En modo hidráulico el flujo de cada paso es el estado estacionario de
+    ``HydraulicSolver`` (pérdidas de Hazen-Williams, tanques como cargas
+    fijas según su nivel) y además se obtiene la presión de cada nodo.
+    """
+
+    def __init__(self, node_types: np.ndarray, houses: np.ndarray,
+                 tank_capacity: np.ndarray, tank_level: np.ndarray,
+                 source: np.ndarray, target: np.ndarray,
+                 capacity: np.ndarray, obstruction: np.ndarray,
+                 blocked: np.ndarray, active: np.ndarray,
+                 flow: Optional[np.ndarray] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or SIMULATION_SETTINGS
+        self.node_types = np.asarray(node_types, dtype=np.int8)
+        self.houses = np.asarray(houses, dtype=np.float64)
+        self.tank_capacity = np.asarray(tank_capacity, dtype=np.float64)
+        self.initial_tank_level = np.array(tank_level, dtype=np.float64)
+        self.tank_level = self.initial_tank_level.copy()
+
+        # Arreglos de tuberías; pueden ser vistas sobre un EdgeStore
+        self.source = source
+        self.target = target
+        self.capacity = capacity
+        self.obstruction = obstruction
+        self.blocked = blocked
+        self.active = active
+        self.flow = flow if flow is not None else np.zeros(len(source))
+
+        self.node_count = len(self.node_types)
+        self.tanks = np.flatnonzero(self.node_types == TANK)
+        self.neighborhoods = np.flatnonzero(self.node_types == NEIGHBORHOOD)
+        self.base_demand = np.zeros(self.node_count)
+        self.base_demand[self.neighborhoods] = (
+            self.houses[self.neighborhoods] * self.settings['consumption_per_house']
+        )
+
+        self.time = 0.0
+        self.unit_flow = np.zeros(len(source))
+        self.last_step: Dict[str, float] = {}
+        self._routing_dirty = True
+        self.hydraulics: Optional[HydraulicSolver] = None
+        self.pressure = np.full(self.node_count, np.nan)
+
+    def set_hydraulic_mode(self, enabled: bool) -> None:
+        """Activa o desactiva el cálculo hidráulico de flujos y presiones"""
+        if not enabled:
+            self.hydraulics = None
+            self.pressure = np.full(self.node_count, np.nan)
+        elif self.hydraulics is None:
+            self.hydraulics = HydraulicSolver(self.node_count, self.source, self.target)
+
+    def solve_hydraulics(self, scale: float) -> Dict[str, float]:
+        """Flujos y presiones de estado estacionario para la demanda escalada"""
+        solver = self.hydraulics
+        options = solver.settings
+        supplied = self.tanks[self.tank_level[self.tanks] > 0]
+        head = options['tank_base_head'] + self.tank_level[supplied] / 100.0 * options['tank_height']
+        result = solver.solve(self.base_demand * scale, supplied, head,
+                              self.capacity, self.obstruction,
+                              np.flatnonzero(self.usable_mask()))
+        self.flow[:] = solver.flow / options['flow_unit']
+        self.pressure = solver.pressure()
+        return result
+
+    def invalidate_routing(self) -> None:
+        """Marca el enrutamiento para recalcularlo en el próximo paso"""
+        self._routing_dirty = True
+
+    def usable_mask(self) -> np.ndarray:
+        """Tuberías activas, sin bloquear y con paso de agua"""
+        return self.active & ~self.blocked & (self.obstruction < 100)
+
+    def rebuild_routing(self) -> None:
+        """Calcula el flujo por unidad de demanda desde los tanques con agua"""
+        edges = np.flatnonzero(self.usable_mask())
+        src = self.source[edges].astype(np.int64)
+        dst = self.target[edges].astype(np.int64)
+        supplied = self.tanks[self.tank_level[self.tanks] > 0]
+        level = bfs_levels(self.node_count, src, dst, supplied)
+
+        # Orientar cada tubería del nodo más cercano al más lejano
+        forward = (level[src] >= 0) & (level[dst] == level[src] + 1)
+        backward = (level[dst] >= 0) & (level[src] == level[dst] + 1)
+        downstream = forward | backward
+        parent = np.where(forward, src, dst)[downstream]
+        child = np.where(forward, dst, src)[downstream]
+        sign = np.where(forward, 1.0, -1.0)[downstream]
+        slots = edges[downstream]
+
+        parents_per_node = np.bincount(child, minlength=self.node_count)
+        reachable_demand = np.where(level >= 0, self.base_demand, 0.0)
+        throughput = reachable_demand.copy()
+        edge_flow = np.zeros(len(slots))
+
+        # Acumular demanda de las hojas hacia los tanques, nivel por nivel
+        child_level = level[child]
+        order = np.argsort(-child_level, kind='stable')
+        bounds = np.flatnonzero(np.diff(child_level[order])) + 1
+        for group in np.split(order, bounds):
+            if group.size == 0:
+                continue
+            c = child[group]
+            edge_flow[group] = throughput[c] / parents_per_node[c]
+            np.add.at(throughput, parent[group], edge_flow[group])
+
+        self.unit_flow = np.zeros(len(self.source))
+        self.unit_flow[slots] = sign * edge_flow
+        self.level = level
+        self.reachable_demand = reachable_demand
+        self._routing_dirty = False
+
+    def current_hour(self) -> float:
+        """Hora del día del reloj de simulación"""
+        return (self.settings.get('start_hour', 0) + self.time / 3600.0) % 24
+
+    def step(self, speed: float = 1.0, consumption_scale: float = 1.0) -> Dict[str, float]:
+        """Avanza un paso de simulación para toda la red"""
+        dt = self.settings['time_step'] * speed
+        scale = consumption_factor(self.current_hour(),
+                                   self.settings['consumption_patterns'])
+        scale *= consumption_scale
+
+        hydraulic = None
+        if self.hydraulics is not None:
+            hydraulic = self.solve_hydraulics(scale)
+        else:
+            if self._routing_dirty or len(self.unit_flow) != len(self.source):
+                self.rebuild_routing()
+            # Flujo deseado recortado por la capacidad útil de cada tubería
+            usable = self.capacity * (1.0 - self.obstruction / 100.0)
+            usable[~self.usable_mask()] = 0.0
+            desired = self.unit_flow * scale
+            np.copysign(np.minimum(np.abs(desired), usable), desired, out=self.flow)
+
+        # Balance por nodo: salida neta = B^T f
+        net_out = (np.bincount(self.source, self.flow, minlength=self.node_count)
+                   - np.bincount(self.target, self.flow, minlength=self.node_count))
+
+        tank_out = np.maximum(net_out[self.tanks], 0.0)
+        volume = self.tank_level[self.tanks] / 100.0 * self.tank_capacity[self.tanks]
+        drained = np.minimum(tank_out * dt, volume)
+        self.tank_level[self.tanks] = np.where(
+            self.tank_capacity[self.tanks] > 0,
+            (volume - drained) / np.maximum(self.tank_capacity[self.tanks], 1e-12) * 100.0,
+            0.0
+        )
+        if np.any((volume > 0) & (self.tank_level[self.tanks] <= 0)):
+            # Un tanque se vació: el resto del suministro se reenruta
+            self._routing_dirty = True
+
+        demand = self.base_demand[self.neighborhoods] * scale
+        served = np.clip(-net_out[self.neighborhoods], 0.0, demand)
+        utilization = np.divide(np.abs(self.flow), self.capacity,
+                                out=np.zeros(len(self.flow)),
+                                where=self.capacity > 0)
+
+        self.time += dt
+        self.last_step = {
+            'time': self.time,
+            'demand': float(demand.sum()),
+            'served': float(served.sum()),
+            'unserved': float(demand.sum() - served.sum()),
+            'tank_outflow': float(tank_out.sum()),
+            'min_tank_level': float(self.tank_level[self.tanks].min()) if self.tanks.size else 0.0,
+            'peak_utilization': float(utilization.max()) if utilization.size else 0.0
+        }
+        if hydraulic is not None:
+            pressure = self.pressure[self.neighborhoods]
+            fed = np.isfinite(pressure)
+            limits = self.settings['pressure_limits']
+            self.last_step.update({
+                'min_pressure': float(pressure[fed].min()) if fed.any() else 0.0,
+                'low_pressure': int((pressure[fed] < limits['min_operational']).sum()),
+                'hydraulic_iterations': hydraulic['iterations']
+            })
+        return self.last_step
+
+    def reset(self) -> None:
+        """Restaura el reloj, los flujos y los niveles iniciales"""
+        self.time = 0.0
+        self.flow[:] = 0.0
+        self.tank_level[:] = self.initial_tank_level
+        self.pressure[:] = np.nan
+        if self.hydraulics is not None:
+            self.hydraulics = HydraulicSolver(self.node_count, self.source, self.target)
+        self.last_step = {}
+        self._routing_dirty = True
+
+    @classmethod
+    def from_network(cls, network, settings: Optional[Dict[str, Any]] = None) -> 'SimulationEngine':
+        """Construye el motor sobre la tabla de tuberías de una WaterNetwork"""
+        store = network.pipes
+        n = store.node_count
+        node_types = np.full(n, INTERSECTION, dtype=np.int8)
+        houses = np.zeros(n)
+        tank_capacity = np.zeros(n)
+        tank_level = np.zeros(n)
+        for node_id, attrs in network.graph.nodes(data=True):
+            index = store.intern(node_id)
+            node_types[index] = NODE_TYPE_CODES.get(attrs.get('type'), INTERSECTION)
+        for node_id, num_houses in network.neighborhoods.items():
+            houses[store.node_index[node_id]] = num_houses
+        for node_id, level in network.tank_levels.items():
+            index = store.node_index[node_id]
+            tank_level[index] = level
+            tank_capacity[index] = network.tank_capacities.get(
+                node_id, NETWORK_SETTINGS['default_tank_capacity'])
+
+        size = store.size
+        return cls(node_types, houses, tank_capacity, tank_level,
+                   store.source[:size], store.target[:size],
+                   store.capacity[:size], store.obstruction[:size],
+                   store.blocked[:size], store.active[:size],
+                   flow=store.flow[:size], settings=settings)
@@ -0,0 +1,248 @@
+import math
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+class GridIndex:
+    """Índice espacial de rejilla uniforme sobre puntos
+
+    Cada punto se guarda en la celda ``floor((x, y) / cell_size)``. Una
+    consulta por rectángulo solo recorre las celdas que lo intersectan; si
+    el rectángulo cubre más celdas que puntos hay, se filtran todos los
+    puntos de una vez con NumPy. ``move`` e ``insert`` actualizan el índice
+    sin reconstruirlo.
+    """
+
+    def __init__(self, cell_size: Optional[float] = None):
+        self.cell_size = cell_size
+        self.keys: List[Hashable] = []
+        self.rows: Dict[Hashable, int] = {}
+        self.xy = np.zeros((0, 2))
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def build(self, keys: Sequence[Hashable], xy: np.ndarray) -> None:
+        """Indexa todos los puntos de una vez"""
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2).copy()
+        if self.cell_size is None:
+            self.cell_size = self._default_cell_size()
+        self.cells = {}
+        if not len(self.keys):
+            return
+        cell = np.floor(self.xy / self.cell_size).astype(np.int64)
+        order = np.lexsort((cell[:, 1], cell[:, 0]))
+        ordered = cell[order]
+        bounds = np.flatnonzero(np.any(np.diff(ordered, axis=0) != 0, axis=1)) + 1
+        for group in np.split(order, bounds):
+            cx, cy = cell[group[0]]
+            self.cells[(int(cx), int(cy))] = group.tolist()
+
+    def _default_cell_size(self) -> float:
+        """Tamaño de celda para unos pocos puntos por celda en promedio"""
+        if len(self.xy) < 2:
+            return 1.0
+        span = np.ptp(self.xy, axis=0)
+        area = max(float(span[0] * span[1]), float(max(span.max(), 1.0)) ** 2 / len(self.xy))
+        return max(np.sqrt(4.0 * area / len(self.xy)), 1e-9)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size)))
+
+    def query_box(self, xmin: float, ymin: float,
+                  xmax: float, ymax: float) -> np.ndarray:
+        """Filas de los puntos dentro del rectángulo"""
+        if not self.keys:
+            return np.zeros(0, dtype=np.int64)
+        cx0, cy0 = self._cell(xmin, ymin)
+        cx1, cy1 = self._cell(xmax, ymax)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            candidates = np.arange(len(self.keys))
+        else:
+            found = []
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    found.extend(self.cells.get((cx, cy), ()))
+            candidates = np.asarray(found, dtype=np.int64)
+        if not len(candidates):
+            return candidates
+        x, y = self.xy[candidates, 0], self.xy[candidates, 1]
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        return np.sort(candidates[inside])
+
+    def insert(self, key: Hashable, x: float, y: float) -> int:
+        """Agrega un punto y devuelve su fila"""
+        if key in self.rows:
+            self.move(key, x, y)
+            return self.rows[key]
+        if self.cell_size is None:
+            self.cell_size = 1.0
+        row = len(self.keys)
+        self.keys.append(key)
+        self.rows[key] = row
+        self.xy = np.vstack([self.xy, [(x, y)]])
+        self.cells.setdefault(self._cell(x, y), []).append(row)
+        return row
+
+    def move(self, key: Hashable, x: float, y: float) -> None:
+        """Cambia la posición de un punto, moviéndolo de celda si hace falta"""
+        row = self.rows[key]
+        old = self._cell(*self.xy[row])
+        new = self._cell(x, y)
+        self.xy[row] = (x, y)
+        if old != new:
+            members = self.cells[old]
+            members.remove(row)
+            if not members:
+                del self.cells[old]
+            self.cells.setdefault(new, []).append(row)
+
+    def nearest(self, x: float, y: float,
+                max_distance: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """Fila y distancia del punto más cercano, o None
+
+        Recorre anillos de celdas alrededor de la consulta hasta que el
+        siguiente anillo ya no puede contener un punto más cercano.
+        """
+        if not self.keys:
+            return None
+        limit = math.inf if max_distance is None else max_distance
+        cx, cy = self._cell(x, y)
+        best_row, best = None, math.inf
+        ring = 0
+        while True:
+            if 8 * ring > len(self.cells):
+                # Anillo más grande que el índice: filtrar todo con NumPy
+                distance = np.hypot(self.xy[:, 0] - x, self.xy[:, 1] - y)
+                row = int(np.argmin(distance))
+                best_row, best = row, float(distance[row])
+                break
+            found = [row for cell in _ring(cx, cy, ring)
+                     for row in self.cells.get(cell, ())]
+            if found:
+                rows = np.asarray(found, dtype=np.int64)
+                distance = np.hypot(self.xy[rows, 0] - x, self.xy[rows, 1] - y)
+                position = int(np.argmin(distance))
+                if distance[position] < best:
+                    best_row, best = int(rows[position]), float(distance[position])
+            # Todo punto del anillo siguiente está al menos a ring * cell_size
+            if best <= ring * self.cell_size or ring * self.cell_size > limit:
+                break
+            ring += 1
+        if best_row is None or best > limit:
+            return None
+        return best_row, best
+
+
+class SegmentIndex:
+    """Índice espacial de rejilla uniforme sobre segmentos
+
+    Cada segmento se registra en las celdas que atraviesa (muestreado cada
+    media celda), no en todas las de su rectángulo, así que una tubería
+    larga y diagonal no llena el índice. Las consultas revisan además un
+    anillo extra de celdas para cubrir las esquinas que el muestreo omite.
+    """
+
+    def __init__(self, cell_size: Optional[float] = None):
+        self.cell_size = cell_size
+        self.keys: List[Hashable] = []
+        self.rows: Dict[Hashable, int] = {}
+        self.segments = np.zeros((0, 2, 2))
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def build(self, keys: Sequence[Hashable], segments: np.ndarray) -> None:
+        """Indexa todos los segmentos (n × 2 × 2) de una vez"""
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2).copy()
+        self.cells = {}
+        if self.cell_size is None:
+            length = np.linalg.norm(self.segments[:, 1] - self.segments[:, 0], axis=1)
+            positive = length[length > 0]
+            self.cell_size = float(np.median(positive)) if len(positive) else 1.0
+        if not len(self.keys):
+            return
+        rows, cells = self._sample(np.arange(len(self.keys)))
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        ordered = cells[order]
+        bounds = np.flatnonzero(np.any(np.diff(ordered, axis=0) != 0, axis=1)) + 1
+        for group in np.split(order, bounds):
+            cx, cy = cells[group[0]]
+            self.cells[(int(cx), int(cy))] = rows[group].tolist()
+
+    def _sample(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares únicos (fila, celda) de los segmentos dados"""
+        start = self.segments[rows, 0]
+        delta = self.segments[rows, 1] - start
+        count = np.ceil(np.linalg.norm(delta, axis=1) / (self.cell_size / 2)).astype(np.int64) + 1
+        owner = np.repeat(np.arange(len(rows)), count)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(count) - count, count)
+        t = offset / np.maximum(np.repeat(count, count) - 1, 1)
+        points = start[owner] + delta[owner] * t[:, None]
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        unique = np.unique(np.column_stack([owner, cells]), axis=0)
+        return rows[unique[:, 0]], unique[:, 1:]
+
+    def _cell_keys(self, row: int) -> Iterator[Tuple[int, int]]:
+        _, cells = self._sample(np.array([row]))
+        return ((int(cx), int(cy)) for cx, cy in cells)
+
+    def move(self, key: Hashable, start: Sequence[float], end: Sequence[float]) -> None:
+        """Cambia los extremos de un segmento y sus celdas"""
+        row = self.rows[key]
+        for cell in self._cell_keys(row):
+            members = self.cells[cell]
+            members.remove(row)
+            if not members:
+                del self.cells[cell]
+        self.segments[row] = (start, end)
+        for cell in self._cell_keys(row):
+            self.cells.setdefault(cell, []).append(row)
+
+    def nearest(self, x: float, y: float,
+                max_distance: float) -> Optional[Tuple[int, float]]:
+        """Fila y distancia del segmento más cercano dentro de ``max_distance``"""
+        if not self.keys:
+            return None
+        cx = int(math.floor(x / self.cell_size))
+        cy = int(math.floor(y / self.cell_size))
+        reach = int(math.ceil(max_distance / self.cell_size)) + 1
+        if (2 * reach + 1) ** 2 > len(self.cells):
+            rows = np.arange(len(self.keys))
+        else:
+            rows = np.unique(np.asarray(
+                [row for gx in range(cx - reach, cx + reach + 1)
+                 for gy in range(cy - reach, cy + reach + 1)
+                 for row in self.cells.get((gx, gy), ())], dtype=np.int64))
+        if not len(rows):
+            return None
+        start = self.segments[rows, 0]
+        delta = self.segments[rows, 1] - start
+        length2 = np.einsum('ij,ij->i', delta, delta)
+        t = np.clip(np.divide(np.einsum('ij,ij->i', (x, y) - start, delta), length2,
+                              out=np.zeros(len(rows)), where=length2 > 0), 0.0, 1.0)
+        closest = start + delta * t[:, None]
+        distance = np.hypot(closest[:, 0] - x, closest[:, 1] - y)
+        position = int(np.argmin(distance))
+        if distance[position] > max_distance:
+            return None
+        return int(rows[position]), float(distance[position])
+
+
+def _ring(cx: int, cy: int, ring: int) -> Iterator[Tuple[int, int]]:
+    """Celdas en el borde del cuadrado de radio ``ring`` alrededor de (cx, cy)"""
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for gx in range(cx - ring, cx + ring + 1):
+        yield (gx, cy - ring)
+        yield (gx, cy + ring)
+    for gy in range(cy - ring + 1, cy + ring):
+        yield (cx - ring, gy)
+        yield (cx + ring, gy)
@@ -0,0 +1,169 @@
+"""
+Ejecución de simulaciones sin interfaz gráfica
+
+Carga una red con NetworkFileHandler, avanza la simulación tan rápido como
+permita la CPU y escribe los indicadores de cada paso en disco.
+
+Uso: python src/simulate.py red.json -o resultados.csv [--steps N]
+"""
+
+import sys
+import os
+import argparse
+import csv
+import json
+import time
+from typing import Dict, Any, Optional
+
+# Agregar el directorio src al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import SIMULATION_SETTINGS
+from models.network import WaterNetwork
+from models.history import FlowHistory
+from models.scenarios import run_scenario_sweep, write_kpi_table
+from utils.file_handler import NetworkFileHandler
+
+RESULT_FIELDS = ['step', 'time', 'demand', 'served', 'unserved',
+                 'tank_outflow', 'min_tank_level', 'peak_utilization']
+
+
+def max_steps(speed: float = 1.0) -> int:
+    """Pasos necesarios para alcanzar el tiempo máximo de simulación"""
+    dt = SIMULATION_SETTINGS['time_step'] * speed
+    return int(round(SIMULATION_SETTINGS['max_simulation_time'] / dt))
+
+
+def run_simulation(network: WaterNetwork, output: str,
+                   steps: Optional[int] = None, speed: float = 1.0,
+                   consumption_scale: float = 1.0,
+                   record_every: int = 1,
+                   history_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ejecuta la simulación y escribe los resultados en ``output``
+
+    Los archivos .json reciben un resumen con el estado final; cualquier
+    otra extensión recibe un CSV con los indicadores cada ``record_every``
+    pasos, escrito a medida que avanza la simulación. Con ``history_file``
+    los flujos de cada tubería se registran con la misma frecuencia en un
+    archivo .sim.
+
+    Returns:
+        Dict[str, Any]: resumen con pasos ejecutados, tiempo y rendimiento
+    """
+    limit = max_steps(speed)
+    steps = limit if steps is None else min(steps, limit)
+
+    network.reset_simulation()
+    engine = network.get_simulation_engine()
+    totals = {'demand': 0.0, 'served': 0.0}
+    min_tank_level = float('inf')
+    peak_utilization = 0.0
+    as_json = output.endswith('.json')
+    dt = SIMULATION_SETTINGS['time_step'] * speed
+    history = FlowHistory(history_file) if history_file else None
+
+    start = time.perf_counter()
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = None if as_json else csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if writer:
+            writer.writeheader()
+        for step in range(1, steps + 1):
+            result = engine.step(speed, consumption_scale)
+            totals['demand'] += result['demand'] * dt
+            totals['served'] += result['served'] * dt
+            min_tank_level = min(min_tank_level, result['min_tank_level'])
+            peak_utilization = max(peak_utilization, result['peak_utilization'])
+            if step % record_every == 0:
+                if writer:
+                    writer.writerow({'step': step, **result})
+                if history is not None:
+                    history.record(engine.time, engine.flow)
+        if history is not None:
+            history.close()
+        elapsed = time.perf_counter() - start
+
+        summary = {
+            'steps': steps,
+            'simulated_time': engine.time,
+            'elapsed_seconds': elapsed,
+            'steps_per_second': steps / elapsed if elapsed > 0 else float('inf'),
+            'total_demand': totals['demand'],
+            'total_served': totals['served'],
+            'unserved_demand': totals['demand'] - totals['served'],
+            'min_tank_level': min_tank_level if steps else None,
+            'peak_utilization': peak_utilization
+        }
+        if as_json:
+            ids = network.pipes.node_ids
+            summary['tank_levels'] = {
+                ids[i]: float(engine.tank_level[i]) for i in engine.tanks.tolist()
+            }
+            summary['flows'] = [
+                {'origen': u, 'destino': v, 'flujo': network.flows[(u, v)]}
+                for u, v in network.get_pipes()
+            ]
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    # Sincronizar niveles finales con la red
+    ids = network.pipes.node_ids
+    for index in engine.tanks.tolist():
+        network.tank_levels[ids[index]] = float(engine.tank_level[index])
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Simulación sin interfaz gráfica de la red de distribución")
+    parser.add_argument('network', help="Archivo de red (JSON)")
+    parser.add_argument('-o', '--output', default='resultados.csv',
+                        help="Archivo de resultados (.csv o .json)")
+    parser.add_argument('--steps', type=int, default=None,
+                        help="Número de pasos (por defecto hasta el tiempo máximo)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Velocidad de simulación")
+    parser.add_argument('--consumption', type=float, default=1.0,
+                        help="Factor de consumo")
+    parser.add_argument('--record-every', type=int, default=1,
+                        help="Registrar indicadores cada N pasos")
+    parser.add_argument('--history', default=None,
+                        help="Archivo .sim donde guardar los flujos por tubería")
+    parser.add_argument('--scenarios', default=None,
+                        help="Archivo JSON con una lista de escenarios a barrer")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos para el barrido de escenarios")
+    args = parser.parse_args(argv)
+
+    network = WaterNetwork()
+    if not NetworkFileHandler.load_network(args.network, network):
+        print(f"Error al cargar la red: {args.network}", file=sys.stderr)
+        for error in NetworkFileHandler.last_load_stats.get('errors', []):
+            print(f"  {error}", file=sys.stderr)
+        return 1
+    stats = NetworkFileHandler.last_load_stats
+    print(f"Red cargada: {stats['nodes']} nodos, {stats['connections']} conexiones "
+          f"({stats['rows_per_second']:.0f} filas/s)")
+
+    if args.scenarios:
+        with open(args.scenarios, 'r', encoding='utf-8') as f:
+            scenarios = json.load(f)
+        start = time.perf_counter()
+        rows = run_scenario_sweep(network, scenarios, args.steps, args.speed,
+                                  args.workers)
+        write_kpi_table(rows, args.output)
+        print(f"{len(rows)} escenarios en {time.perf_counter() - start:.2f} s")
+        print(f"Resultados guardados en {args.output}")
+        return 0
+
+    summary = run_simulation(network, args.output, args.steps, args.speed,
+                             args.consumption, max(1, args.record_every),
+                             args.history)
+    print(f"{summary['steps']} pasos en {summary['elapsed_seconds']:.2f} s "
+          f"({summary['steps_per_second']:.0f} pasos/s)")
+    print(f"Demanda no atendida: {summary['unserved_demand']:.1f} unidades")
+    print(f"Resultados guardados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
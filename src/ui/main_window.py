@@ -2,12 +2,17 @@ from tkinter import ttk, filedialog, messagebox
 import tkinter as tk
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from models.network import WaterNetwork
+from models.events import NetworkReset
+from utils.executor import AnalysisExecutor
+from .widgets import NetworkRenderer
 from .panels import PipesPanel, NodesPanel, MaintenancePanel, HistoryPanel, FlowPanel, SimulationPanel, ObstructionsPanel, FilesPanel, RoutesPanel, OptimizationPanel, TanksPanel
 
 class MainWindow:
     def __init__(self, root):
         self.root = root
         self.create_interface()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_interface(self):
         """Crea la interfaz principal con estilo moderno"""
@@ -24,6 +29,43 @@ class MainWindow:
         # Crear panel derecho (visualización)
         self.create_right_panel()
 
+        # Análisis largos en hilos, compartidos por los paneles
+        self.executor = AnalysisExecutor(self.root)
+        for panel in (self.optimization_panel, self.routes_panel, self.flow_panel):
+            panel.progress.executor = self.executor
+
+        # Red compartida por paneles y visualización
+        self.set_network(WaterNetwork())
+
+    def on_close(self):
+        """Cancela los análisis pendientes y cierra la ventana"""
+        self.executor.shutdown()
+        self.root.destroy()
+
+    def set_network(self, network):
+        """Asigna la red a paneles y renderizador y los suscribe a sus cambios
+
+        Los eventos de la red se entregan una vez por ciclo ocioso de Tk;
+        cada panel aplica solo el lote de cambios que le interesa.
+        """
+        self.network = network
+        network.events.scheduler = self.root.after_idle
+        panels = [self.nodes_panel, self.pipes_panel, self.flow_panel, self.tanks_panel,
+                  self.optimization_panel, self.files_panel, self.obstructions_panel,
+                  self.routes_panel, self.simulation_panel, self.history_panel,
+                  self.maintenance_panel]
+        for panel in panels:
+            panel.network = network
+        self.renderer.clear()
+        self.renderer.build(network)
+        network.events.subscribe(self.renderer.on_network_events,
+                                 *self.renderer.network_events)
+        for panel in panels:
+            if hasattr(panel, 'on_network_events'):
+                network.events.subscribe(panel.on_network_events, *panel.network_events)
+                panel.on_network_events([NetworkReset()])
+        self.canvas.draw_idle()
+
     def setup_styles(self):
         """Configura los estilos de la interfaz"""
         style = ttk.Style()
@@ -113,6 +155,10 @@ class MainWindow:
               text=" ",  # Texto vacío aquí
               style='Action.TButton',
               command=self.capture_view).pack(side=tk.LEFT, padx=5)
+
+        # Elemento bajo el cursor
+        self.hover_label = ttk.Label(toolbar, text="", style='Info.TLabel')
+        self.hover_label.pack(side=tk.LEFT, padx=10)
     
         # Panel de visualización
         self.viz_panel = ttk.Frame(viz_container)
@@ -132,6 +178,70 @@ class MainWindow:
         self.ax.set_facecolor('#f8f9fa')
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.viz_panel)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Renderizador con artistas persistentes, compartido con la simulación
+        self.renderer = NetworkRenderer(self.ax)
+        self.simulation_panel.renderer = self.renderer
+        self.flow_panel.renderer = self.renderer
+
+        # Selección con el cursor: clic para elegir, arrastrar para mover nodos
+        self.dragged_node = None
+        self.canvas.mpl_connect('motion_notify_event', self.on_canvas_motion)
+        self.canvas.mpl_connect('button_press_event', self.on_canvas_press)
+        self.canvas.mpl_connect('button_release_event', self.on_canvas_release)
+
+    def describe_element(self, element) -> str:
+        """Texto breve del nodo o tubería elegido"""
+        kind, key = element
+        network = self.renderer.network
+        if kind == 'nodo':
+            node_type = network.graph.nodes[key].get('type', 'nodo')
+            return f"{node_type.capitalize()} {key}"
+        u, v = key
+        return (f"Tubería {u}-{v}: flujo {network.flows[(u, v)]:.1f} / "
+                f"capacidad {network.capacities[(u, v)]:.1f}")
+
+    def on_canvas_motion(self, event):
+        """Arrastra el nodo tomado o muestra el elemento bajo el cursor"""
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        if self.dragged_node is not None:
+            self.renderer.move_node(self.dragged_node, event.xdata, event.ydata)
+            self.canvas.draw_idle()
+            return
+        element = self.renderer.pick(event.xdata, event.ydata)
+        self.hover_label.config(text=self.describe_element(element) if element else "")
+
+    def on_canvas_press(self, event):
+        """Selecciona el elemento bajo el cursor en los paneles
+
+        Clic izquierdo en una tubería la elige en los paneles de flujo y
+        obstrucciones; en un nodo lo fija como origen de la ruta (y permite
+        arrastrarlo). Clic derecho en un nodo lo fija como destino.
+        """
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        element = self.renderer.pick(event.xdata, event.ydata)
+        if element is None:
+            return
+        kind, key = element
+        if kind == 'tuberia':
+            pipe = f"{key[0]}-{key[1]}"
+            for combo in (self.flow_panel.pipe_select, self.flow_panel.pipe_to_block,
+                          self.obstructions_panel.pipe_combo):
+                combo.set(pipe)
+            self.renderer.set_highlight([key])
+            self.renderer.update()
+            self.canvas.draw_idle()
+        elif event.button == 3:
+            self.routes_panel.target_combo.set(key)
+        else:
+            self.routes_panel.source_combo.set(key)
+            self.dragged_node = key
+
+    def on_canvas_release(self, event):
+        """Suelta el nodo arrastrado"""
+        self.dragged_node = None
 
     def create_panels(self):
         """Crea los paneles de control con separadores"""
@@ -208,10 +318,11 @@ class MainWindow:
     def reset_view(self):
         """Resetea la vista del gráfico a su estado inicial"""
         try:
+            self.renderer.clear()
             self.ax.clear()
-            if self.network:
+            if self.renderer.network is not None:
                 # Redibujar el grafo con la configuración inicial
-                self.network.draw(self.ax)
+                self.renderer.build(self.renderer.network)
             else:
                 # Dibujar un grafo de ejemplo
                 self.ax.text(0.5, 0.5, 'Red no cargada', 
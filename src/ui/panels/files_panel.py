@@ -29,7 +29,8 @@ class FilesPanel(ttk.LabelFrame):
         try:
             filename = filedialog.askopenfilename(
                 title="Cargar Red",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                filetypes=[("JSON files", "*.json"), ("Red binaria", "*.wdn"),
+                           ("All files", "*.*")]
             )
             if filename and self.network:
                 self.network.load_from_file(filename)
@@ -45,7 +46,8 @@ class FilesPanel(ttk.LabelFrame):
             filename = filedialog.asksaveasfilename(
                 title="Guardar Red",
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                filetypes=[("JSON files", "*.json"), ("Red binaria", "*.wdn"),
+                           ("All files", "*.*")]
             )
             if filename and self.network:
                 self.network.save_to_file(filename)
@@ -1,14 +1,26 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from typing import Dict, Any
 import numpy as np
+from models.contingency import write_contingency_table
+from models.events import (NetworkReset, PipeAdded, PipeRemoved, CapacityChanged,
+                           ObstructionChanged, PipeBlocked)
+from ..widgets.job_progress import JobProgress
+from ..widgets.searchable_selector import SearchableSelector, IdSearchIndex, pipe_index
 
 class FlowPanel(ttk.LabelFrame):
     """Panel para control y visualización de flujos"""
+
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, PipeAdded, PipeRemoved, CapacityChanged,
+                      ObstructionChanged, PipeBlocked)
     
-    def __init__(self, parent, network):
+    def __init__(self, parent, network, renderer=None):
         super().__init__(parent, text="Gestión de Flujos", padding=10)
         self.network = network
+        self.renderer = renderer
+        self.contingency_rows = []
+        self.contingency_loss = None  # demanda perdida por slot del último análisis
         self.create_widgets()
         
     def create_widgets(self):
@@ -26,7 +38,7 @@ class FlowPanel(ttk.LabelFrame):
         pipe_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Label(pipe_frame, text="Tubería:").pack(fill=tk.X, pady=2)
-        self.pipe_select = ttk.Combobox(pipe_frame, state='readonly')
+        self.pipe_select = SearchableSelector(pipe_frame)
         self.pipe_select.pack(fill=tk.X, pady=2)
         
         # Frame para bloquear/desbloquear tubería
@@ -34,7 +46,7 @@ class FlowPanel(ttk.LabelFrame):
         block_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Label(block_frame, text="Tubería:").pack(fill=tk.X, pady=2)
-        self.pipe_to_block = ttk.Combobox(block_frame, state='readonly')
+        self.pipe_to_block = SearchableSelector(block_frame)
         self.pipe_to_block.pack(fill=tk.X, pady=2)
         
         # Botones de acción
@@ -48,6 +60,30 @@ class FlowPanel(ttk.LabelFrame):
         ttk.Button(button_frame, 
                   text="🔓 Desbloquear",
                   command=self.unblock_pipe).pack(side=tk.RIGHT, expand=True, padx=2)
+
+        # Análisis N-1: criticidad de cada tubería
+        contingency_frame = ttk.LabelFrame(self, text="Análisis N-1", padding=5)
+        contingency_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        contingency_buttons = ttk.Frame(contingency_frame)
+        contingency_buttons.pack(fill=tk.X, pady=2)
+        ttk.Button(contingency_buttons,
+                  text="⚠ Analizar",
+                  command=self.analyze_contingencies).pack(side=tk.LEFT, expand=True, padx=2)
+        ttk.Button(contingency_buttons,
+                  text="💾 Exportar CSV",
+                  command=self.export_contingencies).pack(side=tk.RIGHT, expand=True, padx=2)
+
+        self.overlay_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(contingency_frame,
+                        text="Colorear tuberías por criticidad",
+                        variable=self.overlay_var,
+                        command=self.toggle_overlay).pack(fill=tk.X, pady=2)
+
+        self.contingency_text = tk.Text(contingency_frame, height=6, width=30, wrap=tk.WORD)
+        self.contingency_text.pack(fill=tk.X, pady=2)
+        self.progress = JobProgress(contingency_frame, self.contingency_text)
+        self.progress.pack(fill=tk.X, pady=2)
         
         # Actualizar listas e información
         self.update_pipe_list()
@@ -83,7 +119,6 @@ class FlowPanel(ttk.LabelFrame):
         try:
             origen, destino = pipe.split('-')
             self.network.block_pipe(origen, destino)
-            self.update_flow_info()
             messagebox.showinfo("Éxito", f"Tubería {pipe} bloqueada correctamente")
         except Exception as e:
             messagebox.showerror("Error", f"Error al bloquear tubería: {str(e)}")
@@ -102,26 +137,91 @@ class FlowPanel(ttk.LabelFrame):
         try:
             origen, destino = pipe.split('-')
             self.network.unblock_pipe(origen, destino)
-            self.update_flow_info()
             messagebox.showinfo("Éxito", f"Tubería {pipe} desbloqueada correctamente")
         except Exception as e:
             messagebox.showerror("Error", f"Error al desbloquear tubería: {str(e)}")
         
+    def analyze_contingencies(self):
+        """Calcula en segundo plano la demanda perdida por cada tubería fuera de servicio"""
+        if self.network is None:
+            messagebox.showerror("Error", "No hay red disponible")
+            return
+        network = self.network
+        snapshot = network.snapshot()
+        self.progress.start(
+            "Análisis N-1",
+            lambda progress: snapshot.analyze_contingencies(progress=progress),
+            self._format_contingencies,
+            on_result=lambda result: self._show_contingencies(network, snapshot, result))
+
+    def _show_contingencies(self, network, snapshot, result: Dict[str, Any]) -> None:
+        """Guarda la tabla y la pérdida por slot (estables en la red) y actualiza los colores"""
+        network.adopt(snapshot)
+        self.contingency_rows = result['rows']
+        self.contingency_loss = snapshot.contingency.loss
+        self.toggle_overlay()
+
+    def _format_contingencies(self, result: Dict[str, Any]) -> str:
+        """Resumen del análisis N-1"""
+        lines = [f"Demanda base: {result['demand']} (servida: {result['served']})",
+                 f"Tuberías evaluadas: {result['evaluated']} de {result['pipes']}",
+                 f"Tuberías críticas: {result['critical']}"]
+        for row in result['rows'][:5]:
+            lines.append(f"{row['rank']}. {row['source']}-{row['target']}: "
+                         f"-{row['lost']} ({100 * row['unserved_ratio']:.1f}% sin servir)")
+        return "\n".join(lines)
+
+    def export_contingencies(self):
+        """Guarda la tabla de criticidad N-1 en CSV"""
+        if not self.contingency_rows:
+            messagebox.showerror("Error", "Primero ejecute el análisis N-1")
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Exportar Análisis N-1",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            write_contingency_table(self.contingency_rows, filename)
+            messagebox.showinfo("Éxito", f"Tabla exportada a {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al exportar: {str(e)}")
+
+    def toggle_overlay(self):
+        """Muestra u oculta la criticidad N-1 como color de las tuberías"""
+        if self.renderer is None or self.network is None:
+            return
+        show = self.overlay_var.get() and self.contingency_loss is not None
+        self.renderer.set_overlay(self.contingency_loss if show else None)
+        self.renderer.update()
+        self.renderer.ax.figure.canvas.draw_idle()
+
     def update_pipe_list(self):
-        """Actualiza la lista de tuberías en los comboboxes"""
+        """Actualiza las tuberías de los selectores"""
         if self.network is None:
             # Si no hay red, establecer listas vacías
-            pipes = []
+            pipes = IdSearchIndex([])
         else:
             try:
-                pipes = [f"{u}-{v}" for u, v in self.network.get_pipes()]
+                pipes = pipe_index(self.network)
             except:
-                pipes = []
+                pipes = IdSearchIndex([])
         
-        # Actualizar los comboboxes
-        for combo in [self.pipe_select]:
-            combo['values'] = pipes
-            if pipes:
-                combo.set(pipes[0])
-            else:
-                combo.set('')
\ No newline at end of file
+        # Actualizar los selectores
+        for selector in [self.pipe_select, self.pipe_to_block]:
+            selector.set_values(pipes)
+        self.pipe_select.set(self.pipe_select.first())
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red"""
+        if any(isinstance(event, NetworkReset) for event in events):
+            self.update_pipe_list()
+            self.contingency_rows = []
+            self.contingency_loss = None
+            self.toggle_overlay()
+        elif any(isinstance(event, (PipeAdded, PipeRemoved)) for event in events):
+            self.pipe_select.refresh()
+            self.pipe_to_block.refresh()
+        self.update_flow_info()
@@ -3,6 +3,7 @@ from tkinter import ttk, filedialog, messagebox
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from typing import List, Dict
+import csv
 import json
 from datetime import datetime
 
@@ -86,13 +87,14 @@ class HistoryPanel(ttk.LabelFrame):
     
     def plot_history_data(self, ax):
         """Grafica los datos históricos"""
-        history = self.network.get_flow_history()
-        times = [entry['time'] for entry in history]
+        history = self.network.history
+        times = history.times()
+        store = self.network.pipes
         
-        # Graficar flujos para cada tubería
-        for edge in self.network.graph.edges():
-            flows = [entry['flows'].get(edge, 0) for entry in history]
-            ax.plot(times, flows, label=f'{edge[0]}-{edge[1]}')
+        # Graficar flujos para cada tubería (una serie por slot)
+        for slot in store.active_slots().tolist():
+            source, target = store.endpoints(slot)
+            ax.plot(times, history.series(slot), label=f'{source}-{target}')
         
         ax.set_xlabel('Tiempo')
         ax.set_ylabel('Flujo')
@@ -118,4 +120,39 @@ class HistoryPanel(ttk.LabelFrame):
                     self.export_as_csv(filename)
                 messagebox.showinfo("Éxito", "Historial exportado correctamente")
             except Exception as e:
-                messagebox.showerror("Error", f"Error al exportar: {str(e)}")
\ No newline at end of file
+                messagebox.showerror("Error", f"Error al exportar: {str(e)}")
+
+    def export_as_json(self, filename: str):
+        """Exporta el historial como series por tubería"""
+        history = self.network.history
+        store = self.network.pipes
+        data = {
+            'tiempos': history.times().tolist(),
+            'flujos': [
+                {
+                    'origen': source,
+                    'destino': target,
+                    'serie': history.series(slot).tolist()
+                }
+                for slot in store.active_slots().tolist()
+                for source, target in [store.endpoints(slot)]
+            ]
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    
+    def export_as_csv(self, filename: str):
+        """Exporta el historial como tabla tiempo × tubería, por bloques"""
+        history = self.network.history
+        store = self.network.pipes
+        slots = store.active_slots()
+        slots = slots[slots < history.width]
+        chunk = history.chunk_rows
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['tiempo'] + ['-'.join(store.endpoints(slot))
+                                          for slot in slots.tolist()])
+            for start in range(0, len(history), chunk):
+                times, matrix = history.rows(start, start + chunk)
+                for time, row in zip(times.tolist(), matrix[:, slots].tolist()):
+                    writer.writerow([time] + row)
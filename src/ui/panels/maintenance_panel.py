@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from models.events import (NetworkReset, NodeAdded, NodeRemoved, PipeAdded,
+                           PipeRemoved)
+from ..widgets.searchable_selector import SearchableSelector, cached_index
 
 class MaintenancePanel(ttk.LabelFrame):
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, NodeAdded, NodeRemoved, PipeAdded, PipeRemoved)
+
     def __init__(self, parent, network):
         super().__init__(parent, text="Mantenimiento", padding=10)
         self.network = network
@@ -20,6 +26,12 @@ class MaintenancePanel(ttk.LabelFrame):
         
         self.create_register_form(register_frame)
 
+        # Frame para proyección de deterioro
+        projection_frame = ttk.LabelFrame(frame, text="Proyección de Deterioro", padding=5)
+        projection_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.create_projection_form(projection_frame)
+
     def create_register_form(self, parent):
         """Crea el formulario de registro de mantenimiento"""
         # Frame para el formulario
@@ -28,7 +40,7 @@ class MaintenancePanel(ttk.LabelFrame):
 
         # Selector de componente
         ttk.Label(form_frame, text="Componente:").grid(row=0, column=0, padx=5, pady=5)
-        self.component_combo = ttk.Combobox(form_frame, state='readonly')
+        self.component_combo = SearchableSelector(form_frame)
         self.component_combo.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
         # Tipo de mantenimiento
@@ -64,18 +76,79 @@ class MaintenancePanel(ttk.LabelFrame):
         # Actualizar lista de componentes
         self.update_component_list()
 
+    def create_projection_form(self, parent):
+        """Crea el formulario de proyección de deterioro"""
+        form_frame = ttk.Frame(parent)
+        form_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Label(form_frame, text="Años:").grid(row=0, column=0, padx=5, pady=5)
+        self.years_var = tk.IntVar(value=10)
+        ttk.Spinbox(form_frame, from_=1, to=50, textvariable=self.years_var,
+                    width=5).grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+        self.apply_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form_frame,
+                        text="Aplicar obstrucciones finales a la red",
+                        variable=self.apply_var).grid(
+                            row=1, column=0, columnspan=2, pady=2, sticky="w")
+
+        form_frame.columnconfigure(1, weight=1)
+
+        ttk.Button(form_frame,
+                  text="📈 Proyectar Deterioro",
+                  command=self.project_deterioration).grid(
+                      row=2,
+                      column=0,
+                      columnspan=2,
+                      pady=5,
+                      sticky="ew"
+        )
+
+        self.projection_text = tk.Text(parent, height=8, wrap=tk.WORD)
+        self.projection_text.pack(fill=tk.X, padx=5, pady=5)
+
+    def project_deterioration(self):
+        """Proyecta obstrucciones, inspecciones y limpiezas en el horizonte elegido"""
+        try:
+            if not self.network:
+                raise ValueError("No hay red disponible")
+            years = self.years_var.get()
+            if years <= 0:
+                raise ValueError("El horizonte debe ser de al menos un año")
+            result = self.network.simulate_deterioration(years * 365,
+                                                         apply=self.apply_var.get())
+            lines = [
+                f"Horizonte: {years} años ({result['pipes']} tuberías)",
+                f"Obstrucción media: {result['initial_mean_obstruction']}% inicial, "
+                f"{result['mean_obstruction']}% promedio, "
+                f"{result['final_mean_obstruction']}% final",
+                f"Limpiezas: {result['cleanings']} en {len(result['timeline'])} rondas",
+                f"Días-tubería en el tope: {result['capped_pipe_days']}"
+            ]
+            for crossing in result['crossings']:
+                first = crossing['first_day']
+                lines.append(f"Cruces de {crossing['threshold']}%: {crossing['events']} "
+                             f"en {crossing['pipes']} tuberías"
+                             + (f" (primero el día {first:.0f})" if first is not None else ""))
+            self.projection_text.delete('1.0', tk.END)
+            self.projection_text.insert('1.0', "\n".join(lines))
+
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en la proyección: {str(e)}")
+
     def update_component_list(self):
-        """Actualiza la lista de componentes en el combobox"""
+        """Actualiza los componentes del selector"""
         if self.network:
-            # Obtener componentes de la red
-            components = []
-            # Agregar tuberías
-            for u, v in self.network.graph.edges():
-                components.append(f"Tubería {u}-{v}")
-            # Agregar nodos
-            for node, attr in self.network.graph.nodes(data=True):
-                node_type = attr.get('type', 'Desconocido')
-                components.append(f"{node_type} {node}")
+            # Tuberías y nodos de la red, indexados una vez y al día por eventos
+            def components():
+                for u, v in self.network.pipes.pipes():
+                    yield f"Tubería {u}-{v}"
+                for node, attr in self.network.graph.nodes(data=True):
+                    yield f"{attr.get('type', 'Desconocido')} {node}"
+            components = cached_index(self.network, 'components', components,
+                                      self.component_label)
         else:
             # Datos de ejemplo para simulación
             components = [
@@ -86,9 +159,24 @@ class MaintenancePanel(ttk.LabelFrame):
                 "Intersección C"
             ]
 
-        self.component_combo['values'] = components
-        if components:
-            self.component_combo.set(components[0])
+        self.component_combo.set_values(components)
+        self.component_combo.set(self.component_combo.first())
+
+    @staticmethod
+    def component_label(event):
+        """Texto del componente que agrega o quita un evento de la red"""
+        if isinstance(event, (PipeAdded, PipeRemoved)):
+            return f"Tubería {event.source}-{event.target}"
+        if isinstance(event, (NodeAdded, NodeRemoved)):
+            return f"{event.node_type} {event.node_id}"
+        return None
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red"""
+        if any(isinstance(event, NetworkReset) for event in events):
+            self.update_component_list()
+        else:
+            self.component_combo.refresh()
 
     def register_maintenance(self):
         """Registra un nuevo mantenimiento"""
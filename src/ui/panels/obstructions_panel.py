@@ -1,7 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from models.events import NetworkReset, PipeAdded, PipeRemoved, ObstructionChanged
+from ..widgets.searchable_selector import SearchableSelector, pipe_index
 
 class ObstructionsPanel(ttk.LabelFrame):
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, PipeAdded, PipeRemoved, ObstructionChanged)
+
     def __init__(self, parent, network):
         super().__init__(parent, text="Gestión de Obstrucciones", padding=10)
         self.network = network
@@ -18,7 +23,7 @@ class ObstructionsPanel(ttk.LabelFrame):
 
         # Selector de tubería
         ttk.Label(add_frame, text="Tubería:").pack(fill=tk.X, pady=2)
-        self.pipe_combo = ttk.Combobox(add_frame, state='readonly')
+        self.pipe_combo = SearchableSelector(add_frame)
         self.pipe_combo.pack(fill=tk.X, pady=2)
 
         # Nivel de obstrucción
@@ -68,7 +73,6 @@ class ObstructionsPanel(ttk.LabelFrame):
                 source, target = self.parse_pipe_string(pipe)
                 self.network.add_obstruction(source, target, level)
                 messagebox.showinfo("Éxito", "Obstrucción agregada correctamente")
-                self.update_lists()
             else:
                 messagebox.showinfo("Simulación", 
                                   f"Obstrucción agregada (simulado):\n"
@@ -94,7 +98,6 @@ class ObstructionsPanel(ttk.LabelFrame):
                 source, target = self.parse_pipe_string(pipe)
                 self.network.remove_obstruction(source, target)
                 messagebox.showinfo("Éxito", "Obstrucción eliminada correctamente")
-                self.update_lists()
             else:
                 messagebox.showinfo("Simulación", 
                                   f"Obstrucción eliminada (simulado)")
@@ -104,23 +107,48 @@ class ObstructionsPanel(ttk.LabelFrame):
         """Actualiza las listas de tuberías y obstrucciones"""
         # Actualizar lista de tuberías
         if self.network:
-            pipes = [f"{u}-{v}" for u, v in self.network.graph.edges()]
+            pipes = pipe_index(self.network)
         else:
             pipes = ['A-B', 'B-C', 'C-D']  # Simulación
-        self.pipe_combo['values'] = pipes
+        self.pipe_combo.set_values(pipes)
 
         # Limpiar y actualizar lista de obstrucciones
         for item in self.obstruction_list.get_children():
             self.obstruction_list.delete(item)
 
         if self.network:
-            for (u, v), level in self.network.obstructions.items():
-                self.obstruction_list.insert('', 'end', values=(f"{u}-{v}", f"{level}%"))
+            store = self.network.pipes
+            slots = store.active_slots()
+            for slot in slots[store.obstruction[slots] > 0].tolist():
+                u, v = store.endpoints(slot)
+                self.set_obstruction_row(f"{u}-{v}", store.obstruction[slot])
         else:
             # Datos de ejemplo para simulación
             self.obstruction_list.insert('', 'end', values=("A-B", "30%"))
             self.obstruction_list.insert('', 'end', values=("B-C", "50%"))
 
+    def set_obstruction_row(self, pipe, level):
+        """Inserta, actualiza o quita (nivel 0) la fila de una tubería"""
+        if level <= 0:
+            if self.obstruction_list.exists(pipe):
+                self.obstruction_list.delete(pipe)
+        elif self.obstruction_list.exists(pipe):
+            self.obstruction_list.item(pipe, values=(pipe, f"{level:g}%"))
+        else:
+            self.obstruction_list.insert('', 'end', iid=pipe, values=(pipe, f"{level:g}%"))
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red fila por fila"""
+        for event in events:
+            if isinstance(event, NetworkReset):
+                self.update_lists()
+            elif isinstance(event, ObstructionChanged):
+                self.set_obstruction_row(f"{event.source}-{event.target}", event.level)
+            elif isinstance(event, PipeRemoved):
+                self.set_obstruction_row(f"{event.source}-{event.target}", 0)
+        if any(isinstance(event, (PipeAdded, PipeRemoved)) for event in events):
+            self.pipe_combo.refresh()
+
     @staticmethod
     def parse_pipe_string(pipe_str):
         """Convierte un string de tubería en origen y destino"""
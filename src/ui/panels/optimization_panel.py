@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from ..widgets.job_progress import JobProgress
 
 class OptimizationPanel(ttk.LabelFrame):
     def __init__(self, parent, network):
@@ -52,6 +53,11 @@ class OptimizationPanel(ttk.LabelFrame):
                   text=" ",
                   command=self.balance_load).pack(fill=tk.X, pady=2)
 
+        # Botón de confiabilidad ante fallas simultáneas
+        ttk.Button(buttons_frame,
+                  text="Estimar confiabilidad",
+                  command=self.estimate_reliability).pack(fill=tk.X, pady=2)
+
         # Frame para resultados
         results_frame = ttk.LabelFrame(frame, text="Resultados de Optimización", padding=5)
         results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -60,6 +66,10 @@ class OptimizationPanel(ttk.LabelFrame):
         self.results_text = tk.Text(results_frame, height=6, wrap=tk.WORD)
         self.results_text.pack(fill=tk.BOTH, expand=True, pady=5)
 
+        # Progreso de los análisis en segundo plano
+        self.progress = JobProgress(results_frame, self.results_text)
+        self.progress.pack(fill=tk.X, pady=2)
+
     def optimize_flow(self):
         """Optimiza el flujo en la red"""
         try:
@@ -67,13 +77,19 @@ class OptimizationPanel(ttk.LabelFrame):
             cost_factor = self.cost_scale.get()
 
             if self.network:
-                result = self.network.optimize_flow(priority, cost_factor)
-                self.show_results(
-                    "Optimización de flujo completada:\n"
-                    f"Mejora de eficiencia: {result['efficiency']}%\n"
-                    f"Costo estimado: {result['cost']}\n"
-                    f"Estado: {result['status']}"
-                )
+                network = self.network
+                snapshot = network.snapshot()
+                self.progress.start(
+                    "Optimización de flujo",
+                    lambda progress: snapshot.optimize_flow(priority, cost_factor,
+                                                            progress=progress),
+                    lambda result: (
+                        "Optimización de flujo completada:\n"
+                        f"Mejora de eficiencia: {result['efficiency']}%\n"
+                        f"Costo estimado: {result['cost']}\n"
+                        f"Estado: {result['status']}"
+                    ),
+                    on_result=lambda result: network.adopt(snapshot))
             else:
                 # Simulación
                 self.show_results(
@@ -93,13 +109,19 @@ class OptimizationPanel(ttk.LabelFrame):
             cost_factor = self.cost_scale.get()
 
             if self.network:
-                result = self.network.optimize_connections(priority, cost_factor)
-                self.show_results(
-                    "Optimización de conexiones completada:\n"
-                    f"Nuevas conexiones: {result['new_connections']}\n"
-                    f"Conexiones modificadas: {result['modified']}\n"
-                    f"Costo total: {result['cost']}"
-                )
+                network = self.network
+                snapshot = network.snapshot()
+                self.progress.start(
+                    "Optimización de conexiones",
+                    lambda progress: snapshot.optimize_connections(priority, cost_factor,
+                                                                   progress=progress),
+                    lambda result: (
+                        "Optimización de conexiones completada:\n"
+                        f"Nuevas conexiones: {result['new_connections']}\n"
+                        f"Conexiones modificadas: {result['modified']}\n"
+                        f"Costo total: {result['cost']}"
+                    ),
+                    on_result=lambda result: network.adopt(snapshot))
             else:
                 # Simulación
                 self.show_results(
@@ -116,25 +138,62 @@ class OptimizationPanel(ttk.LabelFrame):
         """Balancea la carga en la red"""
         try:
             if self.network:
-                result = self.network.balance_load()
-                self.show_results(
-                    "Balance de carga completado:\n"
-                    f"Desviación antes: {result['before_deviation']}%\n"
-                    f"Desviación después: {result['after_deviation']}%\n"
-                    f"Mejora total: {result['improvement']}%"
-                )
+                network = self.network
+                snapshot = network.snapshot()
+                self.progress.start(
+                    "Balance de carga",
+                    lambda progress: snapshot.balance_load(progress=progress),
+                    lambda result: (
+                        "Balance de carga completado:\n"
+                        f"Desviación de utilización antes: {result['before_deviation']}%\n"
+                        f"Desviación de utilización después: {result['after_deviation']}%\n"
+                        f"Mejora total: {result['improvement']}%"
+                    ),
+                    on_result=lambda result: network.adopt(snapshot))
             else:
                 # Simulación
                 self.show_results(
                     "Balance simulado:\n"
-                    "Desviación antes: 25%\n"
-                    "Desviación después: 10%\n"
+                    "Desviación de utilización antes: 25%\n"
+                    "Desviación de utilización después: 10%\n"
                     "Mejora total: 15%"
                 )
 
         except Exception as e:
             messagebox.showerror("Error", f"Error en balance: {str(e)}")
 
+    def estimate_reliability(self):
+        """Estima la confiabilidad de suministro por barrio (Monte Carlo)"""
+        try:
+            if self.network:
+                network = self.network
+                snapshot = network.snapshot()
+                self.progress.start(
+                    "Confiabilidad",
+                    lambda progress: snapshot.estimate_reliability(progress=progress),
+                    self.format_reliability,
+                    on_result=lambda result: network.adopt(snapshot))
+            else:
+                messagebox.showerror("Error", "No hay red disponible")
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en confiabilidad: {str(e)}")
+
+    @staticmethod
+    def format_reliability(result):
+        """Resumen de la confiabilidad: red completa y barrios menos confiables"""
+        system = result['system']
+        lines = [
+            f"Confiabilidad con {result['samples']} muestras"
+            f"{'' if result['converged'] else ' (sin converger)'}:",
+            f"Red completa: {100 * system['reliability']:.1f}% "
+            f"[{100 * system['low']:.1f}% - {100 * system['high']:.1f}%]"
+        ]
+        for row in result['neighborhoods'][:5]:
+            lines.append(f"{row['neighborhood']}: {100 * row['reliability']:.1f}% "
+                         f"[{100 * row['low']:.1f}% - {100 * row['high']:.1f}%]")
+        return "\n".join(lines)
+
     def show_results(self, text):
         """Muestra resultados en el área de texto"""
         self.results_text.delete('1.0', tk.END)
@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Tuple
+from models.events import NetworkReset, PipeAdded, PipeRemoved
+from ..widgets.searchable_selector import SearchableSelector, pipe_index
 
 class PipesPanel(ttk.LabelFrame):
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, PipeAdded, PipeRemoved)
+
     def __init__(self, parent, network):
         super().__init__(parent, text="Gestión de Tuberías", padding=10)
         self.network = network
@@ -59,11 +64,11 @@ class PipesPanel(ttk.LabelFrame):
         delete_frame_internal = ttk.Frame(delete_frame)
         delete_frame_internal.pack(fill=tk.X, padx=5, pady=5)
 
-        # Etiqueta y combobox para selección
+        # Etiqueta y selector
         ttk.Label(delete_frame_internal, 
                  text="Seleccionar tubería:").pack(fill=tk.X, pady=2)
         
-        self.pipe_to_delete = ttk.Combobox(delete_frame_internal, state='readonly')
+        self.pipe_to_delete = SearchableSelector(delete_frame_internal)
         self.pipe_to_delete.pack(fill=tk.X, pady=2)
         ttk.Button(delete_frame_internal, text=" ", command=self.delete_pipe).pack(fill=tk.X, pady=5)
 
@@ -89,7 +94,6 @@ class PipesPanel(ttk.LabelFrame):
                 if self.network.add_pipe(source, target, capacity):
                     messagebox.showinfo("Éxito", "Tubería agregada correctamente")
                     self.clear_fields()
-                    self.update_pipe_list()
                 else:
                     messagebox.showerror("Error", "No se pudo agregar la tubería")
             else:
@@ -105,17 +109,23 @@ class PipesPanel(ttk.LabelFrame):
             messagebox.showerror("Error", str(e))
 
     def update_pipe_list(self):
-        """Actualiza la lista de tuberías en el combobox para eliminar"""
-        # Datos de ejemplo para modo simulación
-        pipes = ['A-B', 'B-C', 'C-D']
+        """Actualiza las tuberías del selector para eliminar"""
+        if self.network:
+            pipes = pipe_index(self.network)
+        else:
+            # Datos de ejemplo para modo simulación
+            pipes = ['A-B', 'B-C', 'C-D']
         
-        # Actualizar el combobox
-        if hasattr(self, 'pipe_to_delete'):
-            self.pipe_to_delete['values'] = pipes
-            if pipes:
-                self.pipe_to_delete.set(pipes[0])
+        # Actualizar el selector
+        self.pipe_to_delete.set_values(pipes)
+        self.pipe_to_delete.set(self.pipe_to_delete.first())
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red"""
+        if any(isinstance(event, NetworkReset) for event in events):
+            self.update_pipe_list()
         else:
-            self.pipe_to_delete.set('')
+            self.pipe_to_delete.refresh()
 
     def delete_pipe(self):
         """Elimina una tubería de la red"""
@@ -127,22 +137,24 @@ class PipesPanel(ttk.LabelFrame):
         # Separar los nodos de la tubería seleccionada
         source, target = pipe.split('-')
         
-        # Verificar si es seguro eliminar la tuberí
+        # Verificar si es seguro eliminar la tubería
+        if not self.verify_safe_pipe_deletion(source, target):
+            lost = self.network.neighborhoods_cut_by_pipe(source, target)
+            shown = ", ".join(lost[:10]) + (f" y {len(lost) - 10} más" if len(lost) > 10 else "")
+            if not messagebox.askyesno(
+                    "Advertencia",
+                    f"La tubería {source}-{target} es la única conexión de "
+                    f"{len(lost)} barrios con un tanque ({shown}).\n"
+                    f"¿Eliminarla de todos modos?"):
+                return
         
         try:
         # Remove pipe and its references
-            self.network.G.remove_edge(source, target)
-            del self.network.capacities[(source, target)]
-            del self.network.capacities[(target, source)]
-            del self.network.obstructions[(source, target)]
-            del self.network.obstructions[(target, source)]
-            del self.network.flows[(source, target)]
-            del self.network.flows[(target, source)]
+            if not self.network.delete_pipe(source, target):
+                raise ValueError(f"No existe la tubería {source}-{target}")
     
-            self.network.update_visualization()
-            self.update_pipe_list()  # Update available pipes list
+            # Selectores y dibujo se actualizan con el evento PipeRemoved
             messagebox.showinfo("Success", f"Pipe between {source} and {target} successfully removed")
-            self.network.log_change("Remove Pipe", f"Pipe between {source} and {target} successfully removed")
     
         except Exception as e:
             messagebox.showerror("Error", f"Error removing pipe: {str(e)}")
@@ -1,7 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from models.events import NetworkReset, NodeAdded, NodeRemoved
+from ..widgets.searchable_selector import SearchableSelector, node_index
+from ..widgets.job_progress import JobProgress
 
 class RoutesPanel(ttk.LabelFrame):
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, NodeAdded, NodeRemoved)
+
     def __init__(self, parent, network):
         super().__init__(parent, text="Análisis de Rutas", padding=10)
         self.network = network
@@ -18,12 +24,12 @@ class RoutesPanel(ttk.LabelFrame):
 
         # Origen
         ttk.Label(select_frame, text="Origen:").pack(fill=tk.X, pady=2)
-        self.source_combo = ttk.Combobox(select_frame, state='readonly')
+        self.source_combo = SearchableSelector(select_frame)
         self.source_combo.pack(fill=tk.X, pady=2)
 
         # Destino
         ttk.Label(select_frame, text="Destino:").pack(fill=tk.X, pady=2)
-        self.target_combo = ttk.Combobox(select_frame, state='readonly')
+        self.target_combo = SearchableSelector(select_frame)
         self.target_combo.pack(fill=tk.X, pady=2)
 
         # Botones de análisis
@@ -46,6 +52,10 @@ class RoutesPanel(ttk.LabelFrame):
         self.results_text = tk.Text(results_frame, height=6, wrap=tk.WORD)
         self.results_text.pack(fill=tk.BOTH, expand=True, pady=5)
 
+        # Progreso de los análisis en segundo plano
+        self.progress = JobProgress(results_frame, self.results_text)
+        self.progress.pack(fill=tk.X, pady=2)
+
         # Actualizar listas de nodos
         self.update_node_lists()
 
@@ -87,11 +97,24 @@ class RoutesPanel(ttk.LabelFrame):
                 raise ValueError("Seleccione origen y destino")
 
             if self.network:
-                capacity = self.network.analyze_flow_capacity(source, target)
-                self.show_results(
-                    f"Capacidad máxima de flujo: {capacity} unidades\n"
-                    f"Estado: {'Óptimo' if capacity > 0 else 'Limitado'}"
-                )
+                network = self.network
+
+                def describe(capacity):
+                    return (f"Capacidad máxima de flujo: {capacity} unidades\n"
+                            f"Estado: {'Óptimo' if capacity > 0 else 'Limitado'}")
+
+                # Un par ya calculado se responde desde la caché, sin copiar la red
+                cached = network.flow_cache.cached(source, target)
+                if cached is not None:
+                    self.progress.cancel()
+                    self.show_results(describe(round(cached, 2)))
+                    return
+                snapshot = network.snapshot()
+                self.progress.start(
+                    "Análisis de capacidad",
+                    lambda progress: snapshot.analyze_flow_capacity(source, target),
+                    describe,
+                    on_result=lambda capacity: network.adopt(snapshot))
             else:
                 # Simulación
                 self.show_results(
@@ -104,14 +127,22 @@ class RoutesPanel(ttk.LabelFrame):
             messagebox.showerror("Error", str(e))
 
     def update_node_lists(self):
-        """Actualiza las listas de nodos en los combobox"""
+        """Actualiza los nodos de los selectores de origen y destino"""
         if self.network:
-            nodes = list(self.network.graph.nodes())
+            nodes = node_index(self.network)
         else:
             nodes = ['A', 'B', 'C', 'D']  # Simulación
 
-        self.source_combo['values'] = nodes
-        self.target_combo['values'] = nodes
+        self.source_combo.set_values(nodes)
+        self.target_combo.set_values(nodes)
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red"""
+        if any(isinstance(event, NetworkReset) for event in events):
+            self.update_node_lists()
+        else:
+            self.source_combo.refresh()
+            self.target_combo.refresh()
 
     def show_results(self, text):
         """Muestra resultados en el área de texto"""
@@ -6,9 +6,10 @@ import matplotlib.animation as animation
 class SimulationPanel(ttk.LabelFrame):
     """Panel para control de simulación"""
     
-    def __init__(self, parent, network):
+    def __init__(self, parent, network, renderer=None):
         super().__init__(parent, text="Control de Simulación", padding=10)
         self.network = network
+        self.renderer = renderer
         self.animation: Optional[animation.FuncAnimation] = None
         self.simulation_time = 0
         self.is_running = False
@@ -95,6 +96,19 @@ class SimulationPanel(ttk.LabelFrame):
         )
         self.consumption_scale.set(1.0)
         self.consumption_scale.pack(fill=tk.X, pady=2)
+
+        # Modelo hidráulico: presiones y pérdidas por fricción
+        self.hydraulic_var = tk.BooleanVar(value=self.network.hydraulic_mode)
+        ttk.Checkbutton(
+            parent,
+            text="Modelo hidráulico (presiones)",
+            variable=self.hydraulic_var,
+            command=self.toggle_hydraulic_mode
+        ).pack(fill=tk.X, pady=2)
+
+    def toggle_hydraulic_mode(self):
+        """Activa o desactiva el cálculo de presiones"""
+        self.network.set_hydraulic_mode(self.hydraulic_var.get())
         
     def create_status_display(self, parent):
         """Crea la visualización de estado"""
@@ -119,16 +133,24 @@ class SimulationPanel(ttk.LabelFrame):
         if not self.is_running:
             self.is_running = True
             self.update_button_states()
-            
-            # Configurar la animación
-            self.animation = animation.FuncAnimation(
-                self.network.fig,
-                self.update_simulation,
-                interval=50,
-                blit=False
-            )
-            
-            self.network.canvas.draw()
+            self.create_animation()
+    
+    def create_animation(self):
+        """Crea la animación; solo los artistas animados se redibujan"""
+        if self.animation:
+            self.animation.event_source.stop()
+        if self.renderer.network is not self.network:
+            self.renderer.build(self.network)
+        figure = self.renderer.ax.figure
+        self.animation = animation.FuncAnimation(
+            figure,
+            self.update_simulation,
+            init_func=lambda: self.renderer.animated_artists,
+            interval=50,
+            blit=True,
+            cache_frame_data=False
+        )
+        figure.canvas.draw_idle()
             
     def pause_simulation(self):
         """Pausa la simulación"""
@@ -136,6 +158,7 @@ class SimulationPanel(ttk.LabelFrame):
             self.is_running = False
             if self.animation:
                 self.animation.event_source.stop()
+            self.end_blitting()
             self.update_button_states()
             
     def stop_simulation(self):
@@ -144,10 +167,17 @@ class SimulationPanel(ttk.LabelFrame):
         if self.animation:
             self.animation.event_source.stop()
             self.animation = None
+        self.end_blitting()
         self.simulation_time = 0
         self.update_time_display()
         self.update_button_states()
         
+    def end_blitting(self):
+        """Devuelve los artistas animados al dibujo normal del canvas"""
+        if self.renderer is not None and self.renderer.network is not None:
+            self.renderer.set_animated(False)
+            self.renderer.ax.figure.canvas.draw_idle()
+
     def reset_simulation(self):
         """Reinicia la simulación"""
         self.stop_simulation()
@@ -169,6 +199,13 @@ class SimulationPanel(ttk.LabelFrame):
             self.update_time_display()
             self.update_status()
             
+            artists = self.renderer.update()
+            if self.renderer.rebuilt:
+                # Cambió la topología: el fondo cacheado ya no es válido
+                self.after_idle(self.create_animation)
+            return artists
+        return []
+            
     def update_time_display(self):
         """Actualiza el display de tiempo"""
         self.time_label.config(
@@ -1,7 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from models.events import (NetworkReset, NodeAdded, NodeRemoved, TankLevelChanged,
+                           SimulationStep)
 
 class TanksPanel(ttk.LabelFrame):
+    # Eventos de la red que este panel aplica
+    network_events = (NetworkReset, NodeAdded, NodeRemoved, TankLevelChanged, SimulationStep)
+
     def __init__(self, parent, network):
         super().__init__(parent, text="Gestión de Tanques", padding=10)
         self.network = network
@@ -93,7 +98,6 @@ class TanksPanel(ttk.LabelFrame):
                 self.network.add_tank(tank_id, capacity, level)
                 messagebox.showinfo("Éxito", "Tanque agregado correctamente")
                 self.clear_fields()
-                self.update_tanks_list()
             else:
                 # Simulación
                 messagebox.showinfo("Simulación",
@@ -122,7 +126,6 @@ class TanksPanel(ttk.LabelFrame):
             if self.network:
                 self.network.remove_tank(tank_id)
                 messagebox.showinfo("Éxito", "Tanque eliminado correctamente")
-                self.update_tanks_list()
             else:
                 messagebox.showinfo("Simulación",
                                   f"Tanque {tank_id} eliminado (simulado)")
@@ -162,8 +165,8 @@ class TanksPanel(ttk.LabelFrame):
                                       f"Nivel actualizado (simulado):\n"
                                       f"Tanque: {tank_id}\n"
                                       f"Nuevo nivel: {new_level}%")
+                    self.update_tanks_list()
                 dialog.destroy()
-                self.update_tanks_list()
 
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
@@ -181,13 +184,9 @@ class TanksPanel(ttk.LabelFrame):
             self.tanks_list.delete(item)
 
         if self.network:
-            # Obtener datos reales de la red
-            for tank in self.network.get_tanks():
-                self.tanks_list.insert('', 'end', values=(
-                    tank['id'],
-                    f"{tank['capacity']}",
-                    f"{tank['level']}%"
-                ))
+            # Obtener datos reales de la red; el id del tanque es el de la fila
+            for tank_id in self.network.tank_levels:
+                self.set_tank_row(tank_id)
         else:
             # Datos de ejemplo para simulación
             sample_data = [
@@ -198,6 +197,31 @@ class TanksPanel(ttk.LabelFrame):
             for tank in sample_data:
                 self.tanks_list.insert('', 'end', values=tank)
 
+    def set_tank_row(self, tank_id):
+        """Inserta o actualiza la fila de un tanque"""
+        values = (tank_id,
+                  f"{self.network.tank_capacities.get(tank_id)}",
+                  f"{round(self.network.tank_levels[tank_id], 1)}%")
+        if self.tanks_list.exists(tank_id):
+            self.tanks_list.item(tank_id, values=values)
+        else:
+            self.tanks_list.insert('', 'end', iid=tank_id, values=values)
+
+    def on_network_events(self, events):
+        """Aplica un lote de cambios de la red fila por fila"""
+        for event in events:
+            if isinstance(event, NetworkReset):
+                self.update_tanks_list()
+            elif isinstance(event, SimulationStep):
+                for tank_id in self.network.tank_levels:
+                    self.set_tank_row(tank_id)
+            elif isinstance(event, TankLevelChanged):
+                self.set_tank_row(event.tank_id)
+            elif isinstance(event, NodeAdded) and event.node_type == 'tanque':
+                self.set_tank_row(event.node_id)
+            elif isinstance(event, NodeRemoved) and self.tanks_list.exists(event.node_id):
+                self.tanks_list.delete(event.node_id)
+
     def clear_fields(self):
         """Limpia los campos del formulario"""
         self.tank_id.delete(0, tk.END)
@@ -5,13 +5,16 @@ Widgets personalizados para la visualización
 from .tank_widget import TankWidget
 from .pipe_widget import PipeWidget
 from .neighborhood_widget import NeighborhoodWidget
-from .intersection_widget import IntersectionWidget
-from .flow_indicator_widget import FlowIndicatorWidget
+from .network_renderer import NetworkRenderer
+from .searchable_selector import SearchableSelector, IdSearchIndex
+from .job_progress import JobProgress
 
 __all__ = [
     'TankWidget',
     'PipeWidget',
     'NeighborhoodWidget',
-    'IntersectionWidget',
-    'FlowIndicatorWidget'
+    'NetworkRenderer',
+    'SearchableSelector',
+    'IdSearchIndex',
+    'JobProgress'
 ]
\ No newline at end of file
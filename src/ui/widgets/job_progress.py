@@ -0,0 +1,102 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Optional
+from utils.executor import AnalysisExecutor, AnalysisJob, Progress
+
+
+class JobProgress(ttk.Frame):
+    """Progreso y cancelación de un análisis en segundo plano
+
+    Muestra el avance del trabajo y escribe en ``results_text`` del panel
+    los resultados parciales y el resultado final (con ``format_result``).
+    Cada panel ejecuta un análisis a la vez: iniciar otro cancela el
+    anterior. Los análisis de la red deben trabajar sobre
+    ``network.snapshot()``, no sobre la red que la interfaz sigue editando;
+    ``on_result`` recibe el resultado en el hilo de Tk (por ejemplo, para
+    ``network.adopt``).
+    """
+
+    def __init__(self, parent, results_text: tk.Text,
+                 executor: Optional[AnalysisExecutor] = None):
+        super().__init__(parent)
+        self.results_text = results_text
+        self.executor = executor
+        self.job: Optional[AnalysisJob] = None
+        self.format_result: Callable[[Any], str] = str
+        self.on_result: Optional[Callable[[Any], None]] = None
+
+        self.bar = ttk.Progressbar(self, mode='determinate', maximum=1.0)
+        self.bar.pack(fill=tk.X, pady=2)
+        self.status = ttk.Label(self, text="", style='Info.TLabel')
+        self.status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = ttk.Button(self, text="✖ Cancelar",
+                                        command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT)
+
+    @property
+    def running(self) -> bool:
+        return self.job is not None
+
+    def start(self, name: str, func: Callable[[Progress], Any],
+              format_result: Callable[[Any], str],
+              on_result: Optional[Callable[[Any], None]] = None) -> AnalysisJob:
+        """Ejecuta ``func(progress)`` en segundo plano"""
+        if self.executor is None:
+            self.executor = AnalysisExecutor(self)
+        if self.job is not None:
+            self.job.cancel()
+        self.format_result = format_result
+        self.on_result = on_result
+        job = None
+
+        def current(callback):
+            # Ignorar avisos de un trabajo ya reemplazado
+            return lambda *args: callback(*args) if self.job is job else None
+
+        job = self.executor.submit(
+            name, func,
+            on_done=current(self._on_done),
+            on_progress=current(self._on_progress),
+            on_error=current(self._on_error),
+            on_cancel=current(self._on_cancel))
+        self.job = job
+        self.bar['value'] = 0.0
+        self.status.config(text=f"{name}...")
+        self.cancel_button.config(state=tk.NORMAL)
+        return job
+
+    def cancel(self) -> None:
+        if self.job is not None:
+            self.job.cancel()
+            self.status.config(text="Cancelando...")
+
+    def _show(self, text: str) -> None:
+        self.results_text.delete('1.0', tk.END)
+        self.results_text.insert('1.0', text)
+
+    def _finish(self, status: str) -> None:
+        self.job = None
+        self.status.config(text=status)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def _on_progress(self, fraction: float, message: str, partial: Any) -> None:
+        self.bar['value'] = fraction
+        self.status.config(text=f"{self.job.name}: {message or f'{100 * fraction:.0f}%'}")
+        if partial is not None:
+            self._show(self.format_result(partial) +
+                       f"\n(resultado parcial, {100 * fraction:.0f}%)")
+
+    def _on_done(self, result: Any) -> None:
+        if self.on_result is not None:
+            self.on_result(result)
+        self.bar['value'] = 1.0
+        self._show(self.format_result(result))
+        self._finish("Completado")
+
+    def _on_error(self, error: BaseException) -> None:
+        self._show(f"Error en {self.job.name.lower()}: {error}")
+        self._finish("Error")
+
+    def _on_cancel(self) -> None:
+        self.bar['value'] = 0.0
+        self._finish("Cancelado")
@@ -6,10 +6,15 @@ import numpy as np
 class NeighborhoodWidget:
     """Widget para representar barrios en la visualización"""
     
+    # (umbral, color) de mayor a menor; se usa el primero superado
+    CONSUMPTION_COLORS = [(90, 'red'), (70, 'orange'), (40, 'yellow')]
+    CONSUMPTION_BASE_COLOR = 'green'
+    
     def __init__(self, ax):
         self.ax = ax
         self.houses = {}  # Almacena las casas por barrio
         self.consumption_indicators = {}  # Almacena indicadores de consumo
+        self.artists = []  # Artistas creados, para poder retirarlos
         
     def draw(self, position: Tuple[float, float], name: str,
             num_houses: int = 6, consumption: float = 0,
@@ -40,6 +45,20 @@ class NeighborhoodWidget:
         # Agregar etiqueta
         self._add_label(x, y, name, num_houses, consumption, pressure)
     
+    def draw_details(self, position: Tuple[float, float], num_houses: int = 6,
+                     pressure: float = 100) -> None:
+        """Dibuja casas, borde e indicador de presión (vista cercana)"""
+        x, y = position
+        self._add_decorative_border(x, y, 1.0, 0.8)
+        self._draw_houses(x, y, num_houses)
+        self._draw_pressure_indicator(x, y, pressure)
+    
+    def clear(self) -> None:
+        """Retira del eje los artistas dibujados por el widget"""
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+    
     def _draw_neighborhood_area(self, x: float, y: float, 
                               highlighted: bool) -> None:
         """Dibuja el área base del barrio"""
@@ -61,7 +80,7 @@ class NeighborhoodWidget:
             width, height,
             **style
         )
-        self.ax.add_patch(rect)
+        self.artists.append(self.ax.add_patch(rect))
         
         # Agregar borde decorativo
         self._add_decorative_border(x, y, width, height)
@@ -93,16 +112,16 @@ class NeighborhoodWidget:
             edgecolor='gray',
             alpha=0.8
         )
-        self.ax.add_patch(rect)
+        self.artists.append(self.ax.add_patch(rect))
         
         # Techo
         roof_height = size * 0.4
-        self.ax.plot(
+        self.artists.extend(self.ax.plot(
             [x - size/2, x, x + size/2],
             [y + size/2, y + size/2 + roof_height, y + size/2],
             color='brown',
             linewidth=2
-        )
+        ))
     
     def _draw_consumption_indicator(self, x: float, y: float,
                                  consumption: float) -> None:
@@ -119,7 +138,7 @@ class NeighborhoodWidget:
             edgecolor='gray',
             alpha=0.5
         )
-        self.ax.add_patch(rect_bg)
+        self.artists.append(self.ax.add_patch(rect_bg))
         
         # Barra de consumo
         rect_consumption = Rectangle(
@@ -129,7 +148,7 @@ class NeighborhoodWidget:
             edgecolor='none',
             alpha=0.8
         )
-        self.ax.add_patch(rect_consumption)
+        self.artists.append(self.ax.add_patch(rect_consumption))
     
     def _draw_pressure_indicator(self, x: float, y: float,
                               pressure: float) -> None:
@@ -141,10 +160,10 @@ class NeighborhoodWidget:
             edgecolor='gray',
             alpha=0.8
         )
-        self.ax.add_patch(circle)
+        self.artists.append(self.ax.add_patch(circle))
         
         # Agregar valor numérico
-        self.ax.text(
+        self.artists.append(self.ax.text(
             x - 0.6, y,
             f"{int(pressure)}",
             ha='center',
@@ -152,7 +171,7 @@ class NeighborhoodWidget:
             color='white',
             fontweight='bold',
             fontsize=8
-        )
+        ))
     
     def _add_label(self, x: float, y: float, name: str,
                   num_houses: int, consumption: float,
@@ -165,7 +184,7 @@ class NeighborhoodWidget:
             f"Presión: {pressure:.1f}"
         )
         
-        self.ax.text(
+        self.artists.append(self.ax.text(
             x, y + 0.5,
             label_text,
             ha='center',
@@ -177,7 +196,7 @@ class NeighborhoodWidget:
                 alpha=0.7,
                 pad=2
             )
-        )
+        ))
     
     def _add_decorative_border(self, x: float, y: float,
                              width: float, height: float) -> None:
@@ -192,25 +211,21 @@ class NeighborhoodWidget:
         ])
         
         # Dibujar borde con línea punteada
-        self.ax.plot(
+        self.artists.extend(self.ax.plot(
             border_points[:, 0],
             border_points[:, 1],
             'k--',
             linewidth=1,
             alpha=0.5
-        )
+        ))
     
     @staticmethod
     def _get_consumption_color(consumption: float) -> str:
         """Determina el color basado en el consumo"""
-        if consumption > 90:
-            return 'red'
-        elif consumption > 70:
-            return 'orange'
-        elif consumption > 40:
-            return 'yellow'
-        else:
-            return 'green'
+        for threshold, color in NeighborhoodWidget.CONSUMPTION_COLORS:
+            if consumption > threshold:
+                return color
+        return NeighborhoodWidget.CONSUMPTION_BASE_COLOR
     
     @staticmethod
     def _get_pressure_color(pressure: float) -> str:
@@ -0,0 +1,517 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import matplotlib
+import matplotlib.colors as mcolors
+from matplotlib.artist import Artist
+from matplotlib.collections import LineCollection, PatchCollection, PolyCollection
+from matplotlib.patches import Circle, Rectangle
+from matplotlib.text import Text
+from config.settings import SIMULATION_SETTINGS, VISUALIZATION_SETTINGS
+from models.events import NetworkEvent
+from models.layout import extend_layout, network_layout
+from models.spatial_index import GridIndex, SegmentIndex
+from .pipe_widget import PipeWidget
+from .neighborhood_widget import NeighborhoodWidget
+from .tank_widget import TankWidget
+
+# Vértices del arco que forma la superficie del agua en cada tanque
+WATER_ARC_POINTS = 24
+
+
+def _color_table(thresholds: List[Tuple[float, str]], base: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Umbrales ascendentes y colores RGBA para ``np.searchsorted``"""
+    ordered = sorted(thresholds)
+    limits = np.array([limit for limit, _ in ordered], dtype=np.float64)
+    colors = np.array([mcolors.to_rgba(base)] +
+                      [mcolors.to_rgba(color) for _, color in ordered])
+    return limits, colors
+
+
+class NetworkRenderer:
+    """Dibuja la red completa con artistas persistentes
+
+    Los artistas se crean una sola vez por topología: todas las tuberías en
+    un ``LineCollection`` y las flechas de flujo en un ``Quiver`` (una fila
+    por slot de tubería), los tanques y barrios en ``PatchCollection`` y
+    las partes variables (agua de los tanques, barras de consumo,
+    etiquetas de nivel) en colecciones marcadas como ``animated`` para
+    redibujarlas con blitting. ``update`` solo modifica colores, anchos,
+    vectores y vértices a partir de los arreglos del EdgeStore.
+
+    El nivel de detalle depende del zoom: si un barrio ocupa menos de
+    ``lod['detail_pixels']`` en pantalla, tanques y barrios se muestran
+    como un marcador por elemento (tamaño según casas); al acercarse se
+    muestran las colecciones completas y, para los elementos visibles,
+    los detalles de TankWidget y NeighborhoodWidget. Las etiquetas se
+    eligen con un índice de rejilla: como máximo una por celda de
+    ``lod['label_cell_pixels']`` dentro de la vista.
+
+    ``pick`` responde qué nodo o tubería está bajo el cursor con índices
+    de rejilla sobre nodos y segmentos; ``move_node`` mueve un nodo
+    actualizando artistas e índices sin reconstruir.
+    """
+
+    # Eventos de la red que afectan al dibujo (todos)
+    network_events = (NetworkEvent,)
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.network = None
+        self.positions: Dict[str, Tuple[float, float]] = {}
+        self.highlighted: set = set()
+        self.overlay: Optional[np.ndarray] = None  # valor por slot de tubería
+        self.pipe_rows: Dict[int, int] = {}  # slot -> fila de la colección
+        self.tank_rows: Dict[str, int] = {}
+        self.neighborhood_rows: Dict[str, int] = {}
+        self.intersection_rows: Dict[int, int] = {}  # índice de nodo -> fila
+        self._intersections = None
+        self._artists: List[Artist] = []
+        self._animated: List[Artist] = []
+        self._key = None
+        self.rebuilt = False
+        self.detailed = True
+        self.index = GridIndex()
+        self.node_index = GridIndex()
+        self.pipe_index = SegmentIndex()
+        self.tank_widget = TankWidget(ax)
+        self.neighborhood_widget = NeighborhoodWidget(ax)
+        self._labels: List[Text] = []  # Etiquetas reutilizables
+        self._label_rows: List[Tuple[str, int]] = []
+        self._view = None
+        self._callbacks: List[int] = []
+        self._flow_colors = _color_table(PipeWidget.FLOW_COLORS, PipeWidget.FLOW_BASE_COLOR)
+        self._obstruction_colors = _color_table(PipeWidget.OBSTRUCTION_COLORS,
+                                                PipeWidget.OBSTRUCTION_BASE_COLOR)
+        self._overlay_colors = matplotlib.colormaps['YlOrRd']
+        self._consumption_colors = _color_table(NeighborhoodWidget.CONSUMPTION_COLORS,
+                                                NeighborhoodWidget.CONSUMPTION_BASE_COLOR)
+
+    @property
+    def animated_artists(self) -> List[Artist]:
+        """Artistas que cambian en cada paso (los que se pasan al blitting)"""
+        return self._animated
+
+    def set_animated(self, animated: bool) -> None:
+        """Marca los artistas variables para blitting o para dibujo normal"""
+        for artist in self._animated:
+            artist.set_animated(animated)
+
+    def on_network_events(self, events: List[NetworkEvent]) -> None:
+        """Aplica un lote de cambios de la red y pide redibujar
+
+        Los cambios de estilo (obstrucciones, bloqueos, niveles) solo
+        recolorean; los de topología reconstruyen una vez por lote. Mientras
+        una animación con blitting está activa es ella quien redibuja.
+        """
+        if self.network is None:
+            return
+        if self._animated and self._animated[0].get_animated():
+            return
+        self.update()
+        self.ax.figure.canvas.draw_idle()
+
+    def _topology_key(self):
+        store = self.network.pipes
+        return (store.version, store.node_count, id(self.positions),
+                len(self.network.tank_levels), len(self.network.neighborhoods))
+
+    def clear(self) -> None:
+        """Retira del eje todos los artistas de la red"""
+        for cid in self._callbacks:
+            self.ax.callbacks.disconnect(cid)
+        self._callbacks = []
+        self.tank_widget.clear()
+        self.neighborhood_widget.clear()
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+        self._animated = []
+        self._labels = []
+        self._label_rows = []
+        self._view = None
+        self.pipe_rows = {}
+        self.tank_rows = {}
+        self.neighborhood_rows = {}
+        self.intersection_rows = {}
+        self._intersections = None
+        self._key = None
+        self.overlay = None
+
+    def _add(self, artist: Artist, animated: bool = False) -> Artist:
+        # FuncAnimation marca como ``animated`` los artistas que redibuja
+        if animated:
+            self._animated.append(artist)
+        self._artists.append(artist)
+        return artist
+
+    def build(self, network, positions: Optional[Dict[str, Tuple[float, float]]] = None) -> None:
+        """Crea los artistas de la red; se llama al cambiar la topología"""
+        self.clear()
+        self.network = network
+        if positions is not None:
+            self.positions = positions
+        missing = [n for n in network.graph.nodes if n not in self.positions]
+        if 2 * len(missing) > network.graph.number_of_nodes():
+            # Red nueva o recargada: distribución completa
+            self.positions = network_layout(network)
+        elif missing:
+            # Nodos agregados: junto a sus vecinos, en el marco del dibujo actual
+            self.positions = extend_layout(network, self.positions)
+
+        store = network.pipes
+        index = store.node_index
+        xy = np.zeros((store.node_count, 2))
+        for node_id, (x, y) in self.positions.items():
+            if node_id in index:
+                xy[index[node_id]] = (x, y)
+        self._xy = xy
+        sizes = VISUALIZATION_SETTINGS['sizes']
+        colors = VISUALIZATION_SETTINGS['colors']
+
+        # Tuberías: un segmento por slot activo
+        slots = store.active_slots()
+        self._slots = slots
+        self.pipe_rows = {slot: row for row, slot in enumerate(slots.tolist())}
+        start = xy[store.source[slots]]
+        end = xy[store.target[slots]]
+        self._pipe_collection = self._add(self.ax.add_collection(LineCollection(
+            np.stack([start, end], axis=1), linewidths=2.0, capstyle='round',
+            zorder=1)), animated=True)
+        middle = (start + end) / 2
+        direction = end - start
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        self._direction = np.divide(direction, length[:, None],
+                                    out=np.zeros_like(direction), where=length[:, None] > 0)
+        self._quiver = self._add(self.ax.quiver(
+            middle[:, 0], middle[:, 1], np.zeros(len(slots)), np.zeros(len(slots)),
+            angles='xy', scale_units='xy', scale=1, pivot='mid',
+            width=0.004, color='navy', zorder=2), animated=True)
+
+        # Tanques: cuerpo fijo, agua y etiqueta de nivel variables
+        tanks = [t for t in network.tank_levels if t in index]
+        self.tank_rows = {tank: row for row, tank in enumerate(tanks)}
+        self._tank_index = np.array([index[t] for t in tanks], dtype=np.int64)
+        radius = sizes['tank']
+        lod = VISUALIZATION_SETTINGS['lod']
+        self._tank_bodies = self._add(self.ax.add_collection(PatchCollection(
+            [Circle(tuple(xy[i]), radius) for i in self._tank_index],
+            facecolor=colors['tank']['fill'], edgecolor=colors['tank']['edge'],
+            linewidth=2, zorder=3)))
+        self._water = self._add(self.ax.add_collection(PolyCollection(
+            [], facecolor='royalblue', edgecolor='blue', alpha=0.6, zorder=4)),
+            animated=True)
+        self._tank_markers = self._add(self.ax.scatter(
+            xy[self._tank_index, 0], xy[self._tank_index, 1], s=lod['tank_marker_size'],
+            c=np.zeros(len(tanks)), cmap='Blues', vmin=0, vmax=100, marker='o',
+            edgecolors=colors['tank']['edge'], zorder=3), animated=True)
+
+        # Barrios: área fija y barra de consumo variable
+        neighborhoods = [n for n in network.neighborhoods if n in index]
+        self.neighborhood_rows = {n: row for row, n in enumerate(neighborhoods)}
+        self._neighborhood_index = np.array([index[n] for n in neighborhoods], dtype=np.int64)
+        self._houses = np.array([network.neighborhoods[n] for n in neighborhoods], dtype=np.float64)
+        width, height = 1.0, 0.8
+        self._neighborhood_areas = self._add(self.ax.add_collection(PatchCollection(
+            [Rectangle((xy[i, 0] - width / 2, xy[i, 1] - height / 2), width, height)
+             for i in self._neighborhood_index],
+            facecolor=colors['neighborhood']['fill'],
+            edgecolor=colors['neighborhood']['edge'], alpha=0.6, zorder=3)))
+        self._consumption = self._add(self.ax.add_collection(PolyCollection(
+            [], edgecolor='none', alpha=0.8, zorder=4)), animated=True)
+        self._neighborhood_markers = self._add(self.ax.scatter(
+            xy[self._neighborhood_index, 0], xy[self._neighborhood_index, 1],
+            s=lod['house_marker_size'] * self._houses, marker='s',
+            c=colors['neighborhood']['fill'], edgecolors=colors['neighborhood']['edge'],
+            zorder=3), animated=True)
+
+        # Intersecciones: estáticas
+        others = [i for n, i in index.items()
+                  if n not in self.tank_rows and n not in self.neighborhood_rows
+                  and n in network.graph]
+        self.intersection_rows = {i: row for row, i in enumerate(others)}
+        self._intersections = None
+        if others:
+            self._intersections = self._add(self.ax.scatter(
+                xy[others, 0], xy[others, 1], s=20, c=colors['intersection']['fill'],
+                edgecolors=colors['intersection']['edge'], zorder=3))
+
+        # Índices para elegir elementos con el cursor
+        present = [n for n in network.graph.nodes if n in index]
+        self.node_index = GridIndex()
+        self.node_index.build(present, xy[[index[n] for n in present]].reshape(-1, 2))
+        self.pipe_index = SegmentIndex()
+        self.pipe_index.build(slots.tolist(), np.stack([start, end], axis=1))
+
+        # Índice de los elementos con etiqueta; los tanques tienen prioridad
+        labeled = self._neighborhood_index[np.argsort(-self._houses, kind='stable')]
+        self._label_keys = ([('tanque', row) for row in range(len(tanks))] +
+                            [('barrio', self.neighborhood_rows[store.node_ids[i]])
+                             for i in labeled.tolist()])
+        self.index = GridIndex()
+        self.index.build(self._label_keys,
+                         xy[np.concatenate([self._tank_index, labeled])])
+
+        if len(xy):
+            self.ax.update_datalim(xy)
+            self.ax.autoscale_view()
+            self.ax.get_xlim()  # Fijar los límites antes de escuchar cambios
+        self._key = self._topology_key()
+        self.rebuilt = True
+        self._callbacks = [
+            self.ax.callbacks.connect('xlim_changed', self._on_view_change),
+            self.ax.callbacks.connect('ylim_changed', self._on_view_change)
+        ]
+        self.apply_lod()
+
+    def _on_view_change(self, ax) -> None:
+        if self.network is not None:
+            self.apply_lod()
+
+    def _label(self, position: int) -> Text:
+        """Etiqueta reutilizable del grupo, creada bajo demanda"""
+        while len(self._labels) <= position:
+            self._labels.append(self._add(self.ax.text(
+                0, 0, '', ha='center', va='bottom', zorder=5,
+                fontsize=VISUALIZATION_SETTINGS['labels']['font_size'],
+                bbox=dict(facecolor='white', edgecolor='none', alpha=0.7, pad=1)),
+                animated=True))
+        return self._labels[position]
+
+    def apply_lod(self) -> None:
+        """Ajusta detalle y etiquetas a la vista actual del eje"""
+        (xmin, xmax), (ymin, ymax) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        bbox = self.ax.bbox
+        view = (xmin, xmax, ymin, ymax, bbox.width, bbox.height)
+        if view == self._view:
+            return
+        self._view = view
+        lod = VISUALIZATION_SETTINGS['lod']
+        px_x = bbox.width / max(xmax - xmin, 1e-12)
+        px_y = bbox.height / max(ymax - ymin, 1e-12)
+
+        # Marcadores agregados de lejos, colecciones completas de cerca
+        self.detailed = min(px_x, px_y) >= lod['detail_pixels']
+        for artist in (self._tank_bodies, self._water,
+                       self._neighborhood_areas, self._consumption):
+            artist.set_visible(self.detailed)
+        for artist in (self._tank_markers, self._neighborhood_markers):
+            artist.set_visible(not self.detailed)
+
+        # Detalles por elemento solo para lo que está en la vista
+        visible = self.index.query_box(xmin, ymin, xmax, ymax)
+        self.tank_widget.clear()
+        self.neighborhood_widget.clear()
+        if self.detailed and len(visible) <= lod['max_detail_elements']:
+            radius = VISUALIZATION_SETTINGS['sizes']['tank']
+            for row in visible.tolist():
+                kind, element = self._label_keys[row]
+                x, y = self.index.xy[row]
+                if kind == 'tanque':
+                    self.tank_widget.draw_details(x, y, radius)
+                else:
+                    node_id = self.network.pipes.node_ids[self._neighborhood_index[element]]
+                    pressure = self.network.get_node_pressure(node_id)
+                    self.neighborhood_widget.draw_details(
+                        (x, y), int(self._houses[element]),
+                        pressure if pressure is not None else 100)
+
+        # Una etiqueta por celda de pantalla, en orden de prioridad
+        chosen = visible
+        if len(visible):
+            pixels = (self.index.xy[visible] - (xmin, ymin)) * (px_x, px_y)
+            cells = np.floor(pixels / lod['label_cell_pixels']).astype(np.int64)
+            _, first = np.unique(cells[:, 0] * (1 << 32) + cells[:, 1], return_index=True)
+            chosen = np.sort(visible[first])[:lod['max_labels']]
+        self._label_rows = [self._label_keys[row] for row in chosen.tolist()]
+        offset = VISUALIZATION_SETTINGS['sizes']['tank'] * 1.5
+        for position, row in enumerate(chosen.tolist()):
+            label = self._label(position)
+            x, y = self.index.xy[row]
+            label.set_position((x, y + offset))
+            label.set_visible(True)
+        for label in self._labels[len(chosen):]:
+            label.set_visible(False)
+        if self.network is not None and self._key is not None:
+            self._refresh()
+
+    def pick(self, x: float, y: float) -> Optional[Tuple[str, Any]]:
+        """Elemento bajo el punto (x, y) en coordenadas de datos
+
+        Los nodos tienen prioridad sobre las tuberías; la tolerancia es
+        ``lod['pick_pixels']`` convertida a unidades de datos.
+
+        Returns:
+            Optional[Tuple[str, Any]]: ('nodo', id), ('tuberia', (origen,
+            destino)) o None si no hay nada cerca
+        """
+        if self.network is None or self._key is None:
+            return None
+        (xmin, xmax), bbox = sorted(self.ax.get_xlim()), self.ax.bbox
+        tolerance = (VISUALIZATION_SETTINGS['lod']['pick_pixels']
+                     * (xmax - xmin) / max(bbox.width, 1.0))
+        hit = self.node_index.nearest(x, y, tolerance)
+        if hit is not None:
+            return ('nodo', self.node_index.keys[hit[0]])
+        hit = self.pipe_index.nearest(x, y, tolerance)
+        if hit is not None:
+            return ('tuberia', self.network.pipes.endpoints(self.pipe_index.keys[hit[0]]))
+        return None
+
+    def move_node(self, node_id: str, x: float, y: float) -> None:
+        """Mueve un nodo, sus tuberías e índices sin reconstruir artistas"""
+        store = self.network.pipes
+        index = store.node_index[node_id]
+        delta = np.array([x, y]) - self._xy[index]
+        self._xy[index] = (x, y)
+        self.positions[node_id] = (x, y)
+        self.node_index.move(node_id, x, y)
+
+        # Tuberías del nodo: segmento, flecha e índice
+        segments = self._pipe_collection.get_segments()
+        offsets = self._quiver.get_offsets()
+        for neighbor in self.network.graph.neighbors(node_id):
+            slot = store.find(node_id, neighbor)
+            row = self.pipe_rows.get(slot)
+            if row is None:
+                continue
+            start = self._xy[store.source[slot]]
+            end = self._xy[store.target[slot]]
+            segments[row] = np.array([start, end])
+            offsets[row] = (start + end) / 2
+            direction = end - start
+            length = np.hypot(*direction)
+            self._direction[row] = direction / length if length > 0 else 0.0
+            self.pipe_index.move(slot, start, end)
+        self._pipe_collection.set_segments(segments)
+        self._quiver.set_offsets(offsets)
+        self._quiver.XY = offsets  # Quiver calcula los ángulos 'xy' desde XY
+
+        # Símbolo del nodo según su tipo
+        if node_id in self.tank_rows:
+            row = self.tank_rows[node_id]
+            self._tank_bodies.get_paths()[row].vertices += delta
+            self._tank_markers.set_offsets(self._xy[self._tank_index])
+            self.index.move(('tanque', row), x, y)
+        elif node_id in self.neighborhood_rows:
+            row = self.neighborhood_rows[node_id]
+            self._neighborhood_areas.get_paths()[row].vertices += delta
+            self._neighborhood_markers.set_offsets(self._xy[self._neighborhood_index])
+            self.index.move(('barrio', row), x, y)
+        elif self._intersections is not None and index in self.intersection_rows:
+            offsets = self._intersections.get_offsets()
+            offsets[self.intersection_rows[index]] = (x, y)
+            self._intersections.set_offsets(offsets)
+        self._view = None  # Recolocar detalles y etiquetas
+        self.apply_lod()
+
+    def set_highlight(self, pipes: Iterable[Tuple[str, str]]) -> None:
+        """Resalta un conjunto de tuberías (por ejemplo, una ruta)"""
+        store = self.network.pipes
+        self.highlighted = {store.find(u, v) for u, v in pipes} - {None}
+
+    def set_overlay(self, values: Optional[np.ndarray]) -> None:
+        """Colorea las tuberías por un valor por slot (por ejemplo, criticidad N-1)
+
+        ``None`` vuelve al estilo según flujo y obstrucción. Los valores se
+        escalan al máximo; las tuberías en cero se muestran atenuadas.
+        """
+        self.overlay = None if values is None else np.asarray(values, dtype=np.float64)
+
+    def update(self) -> List[Artist]:
+        """Actualiza estilos y niveles; reconstruye si cambió la topología
+
+        Returns:
+            List[Artist]: artistas animados a redibujar. ``rebuilt`` indica
+            si además cambiaron los artistas estáticos.
+        """
+        if self.network is None:
+            return []
+        if self._key != self._topology_key():
+            self.build(self.network)
+        else:
+            self.rebuilt = False
+            self._refresh()
+        return self._animated
+
+    def _refresh(self) -> None:
+        store = self.network.pipes
+        slots = self._slots
+
+        # Estilo de tuberías, vectorizado con los mismos umbrales que PipeWidget
+        flow = store.flow[slots]
+        capacity = store.capacity[slots]
+        obstruction = store.obstruction[slots]
+        utilization = np.divide(np.abs(flow), capacity, out=np.zeros(len(slots)),
+                                where=capacity > 0)
+        limits, palette = self._flow_colors
+        rgba = palette[np.searchsorted(limits, utilization, side='left')].copy()
+        rgba[:, 3] = np.minimum(1.0, 0.6 + 0.4 * utilization)
+        obstructed = obstruction > 0
+        limits, palette = self._obstruction_colors
+        rgba[obstructed] = palette[np.searchsorted(limits, obstruction[obstructed], side='left')]
+        rgba[obstructed, 3] = 0.7
+        rgba[store.blocked[slots]] = mcolors.to_rgba(VISUALIZATION_SETTINGS['colors']['pipe']['blocked'])
+        widths = np.full(len(slots), 2.0)
+        if self.overlay is not None:
+            values = np.zeros(len(slots))
+            known = slots < len(self.overlay)
+            values[known] = self.overlay[slots[known]]
+            top = values.max() if len(values) else 0.0
+            scaled = values / top if top > 0 else values
+            rgba = self._overlay_colors(scaled)
+            rgba[scaled <= 0] = mcolors.to_rgba('lightgray', 0.5)
+            widths = 1.5 + 2.5 * scaled
+        if self.highlighted:
+            rows = [self.pipe_rows[s] for s in self.highlighted if s in self.pipe_rows]
+            rgba[rows] = mcolors.to_rgba('yellow', 0.8)
+            widths[rows] = 2.5
+        self._pipe_collection.set_color(rgba)
+        self._pipe_collection.set_linewidth(widths)
+
+        # Flechas: dirección según el signo del flujo, largo según utilización
+        arrow = np.sign(flow) * np.minimum(utilization, 1.0) * 0.4
+        self._quiver.set_UVC(self._direction[:, 0] * arrow, self._direction[:, 1] * arrow)
+
+        # Agua de los tanques: segmento circular bajo el nivel actual
+        levels = np.array([self.network.tank_levels[t] for t in self.tank_rows])
+        if len(levels) and not self.detailed:
+            self._tank_markers.set_array(levels)
+        elif len(levels):
+            radius = VISUALIZATION_SETTINGS['sizes']['tank']
+            surface = np.arcsin(np.clip(levels / 50.0 - 1.0, -1.0, 1.0))
+            t = np.linspace(0.0, 1.0, WATER_ARC_POINTS)
+            theta = (np.pi - surface)[:, None] + t[None, :] * (np.pi + 2 * surface)[:, None]
+            centers = self._xy[self._tank_index]
+            verts = np.stack([centers[:, 0:1] + radius * np.cos(theta),
+                              centers[:, 1:2] + radius * np.sin(theta)], axis=2)
+            self._water.set_verts(verts)
+        tanks = list(self.tank_rows)
+        neighborhoods = list(self.neighborhood_rows)
+        for label, (kind, row) in zip(self._labels, self._label_rows):
+            if kind == 'tanque':
+                label.set_text(f"{tanks[row]}\n{levels[row]:.0f}%")
+            else:
+                label.set_text(neighborhoods[row])
+
+        # Consumo de los barrios: caudal entrante sobre la demanda base
+        if len(self._neighborhood_index):
+            inflow = (np.bincount(store.target[slots], flow, minlength=store.node_count)
+                      - np.bincount(store.source[slots], flow, minlength=store.node_count))
+            demand = self._houses * SIMULATION_SETTINGS['consumption_per_house']
+            consumption = np.clip(np.divide(inflow[self._neighborhood_index], demand,
+                                            out=np.zeros(len(demand)), where=demand > 0)
+                                  * 100.0, 0.0, 100.0)
+            limits, palette = self._consumption_colors
+            colors = palette[np.searchsorted(limits, consumption, side='left')]
+            if not self.detailed:
+                self._neighborhood_markers.set_facecolor(colors)
+                return
+            centers = self._xy[self._neighborhood_index]
+            x0 = centers[:, 0] + 0.55
+            y0 = centers[:, 1] - 0.15
+            y1 = y0 + 0.3 * consumption / 100.0
+            x1 = x0 + 0.1
+            self._consumption.set_verts(np.stack([
+                np.stack([x0, y0], axis=1), np.stack([x1, y0], axis=1),
+                np.stack([x1, y1], axis=1), np.stack([x0, y1], axis=1)], axis=1))
+            self._consumption.set_facecolor(colors)
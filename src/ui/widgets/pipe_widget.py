@@ -8,6 +8,12 @@ from typing import Tuple, Dict, Optional
 class PipeWidget:
     """Widget para representar tuberías en la visualización"""
     
+    # (umbral, color) de mayor a menor; se usa el primero superado
+    FLOW_COLORS = [(0.9, 'red'), (0.7, 'orange'), (0.4, 'royalblue')]
+    FLOW_BASE_COLOR = 'lightblue'
+    OBSTRUCTION_COLORS = [(75, 'darkred'), (50, 'red'), (25, 'orange')]
+    OBSTRUCTION_BASE_COLOR = 'yellow'
+    
     def __init__(self, ax):
         self.ax = ax
         self.flow_animations = {}
@@ -105,25 +111,17 @@ class PipeWidget:
     
     def _get_flow_color(self, utilization: float) -> str:
         """Determina el color basado en la utilización"""
-        if utilization > 0.9:
-            return 'red'
-        elif utilization > 0.7:
-            return 'orange'
-        elif utilization > 0.4:
-            return 'royalblue'
-        else:
-            return 'lightblue'
+        for threshold, color in self.FLOW_COLORS:
+            if utilization > threshold:
+                return color
+        return self.FLOW_BASE_COLOR
     
     def _get_obstruction_color(self, obstruction: float) -> str:
         """Determina el color basado en la obstrucción"""
-        if obstruction > 75:
-            return 'darkred'
-        elif obstruction > 50:
-            return 'red'
-        elif obstruction > 25:
-            return 'orange'
-        else:
-            return 'yellow'
+        for threshold, color in self.OBSTRUCTION_COLORS:
+            if obstruction > threshold:
+                return color
+        return self.OBSTRUCTION_BASE_COLOR
     
     def _add_flow_indicators(self, x1: float, y1: float,
                            x2: float, y2: float,
@@ -0,0 +1,274 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+import weakref
+from models.events import (NetworkEvent, NetworkReset, NodeAdded, NodeRemoved,
+                           PipeAdded, PipeRemoved, TOPOLOGY_EVENTS)
+
+
+class IdSearchIndex:
+    """Identificadores ordenados para búsqueda incremental
+
+    Las coincidencias por prefijo salen de un rango contiguo de la lista
+    ordenada (búsqueda binaria); las coincidencias por subcadena se filtran
+    linealmente, pero si la consulta nueva extiende a la anterior solo se
+    revisan las coincidencias previas. ``add`` y ``remove`` mantienen el
+    orden sin reconstruir.
+    """
+
+    def __init__(self, values: Iterable[str]):
+        self.reset(values)
+
+    def reset(self, values: Iterable[str]) -> None:
+        """Reemplaza todos los valores"""
+        self.values: List[str] = sorted(set(values), key=lambda v: (v.lower(), v))
+        self.lowered: List[str] = [v.lower() for v in self.values]
+        self.members = set(self.values)
+        self._query = ''
+        self._substring: Sequence[int] = range(len(self.values))
+
+    def _position(self, value: str) -> int:
+        lowered = value.lower()
+        position = bisect_left(self.lowered, lowered)
+        while (position < len(self.values) and self.lowered[position] == lowered
+               and self.values[position] < value):
+            position += 1
+        return position
+
+    def add(self, value: str) -> None:
+        if value in self.members:
+            return
+        position = self._position(value)
+        self.values.insert(position, value)
+        self.lowered.insert(position, value.lower())
+        self.members.add(value)
+        self._query = ''
+
+    def remove(self, value: str) -> None:
+        if value not in self.members:
+            return
+        position = self._position(value)
+        del self.values[position]
+        del self.lowered[position]
+        self.members.discard(value)
+        self._query = ''
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value) -> bool:
+        return value in self.members
+
+    def search(self, query: str) -> Sequence[int]:
+        """Posiciones de los valores que contienen ``query``, prefijos primero"""
+        query = query.lower()
+        if not query:
+            return range(len(self.values))
+        candidates = (self._substring if self._query and query.startswith(self._query)
+                      else range(len(self.values)))
+        lowered = self.lowered
+        self._substring = [i for i in candidates if query in lowered[i]]
+        self._query = query
+        start = bisect_left(lowered, query)
+        end = bisect_left(lowered, query + '\uffff', start)
+        if start == end:
+            return self._substring
+        return list(range(start, end)) + [i for i in self._substring
+                                          if i < start or i >= end]
+
+
+# Índices compartidos por red, mantenidos con los eventos de la red
+_network_indexes: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def cached_index(network, kind: str, build: Callable[[], Iterable[str]],
+                 label: Callable[[NetworkEvent], Optional[str]]) -> IdSearchIndex:
+    """Índice ``kind`` de la red, creado una vez y actualizado por eventos
+
+    ``label(evento)`` es el texto que un alta o baja agrega o quita del
+    índice (None si el evento no lo afecta); NetworkReset lo reconstruye.
+    """
+    indexes: Dict[str, IdSearchIndex] = _network_indexes.setdefault(network, {})
+    if kind not in indexes:
+        index = indexes[kind] = IdSearchIndex(build())
+
+        def apply(events: List[NetworkEvent]) -> None:
+            for event in events:
+                if isinstance(event, NetworkReset):
+                    index.reset(build())
+                    continue
+                text = label(event)
+                if text is None:
+                    continue
+                if isinstance(event, (NodeAdded, PipeAdded)):
+                    index.add(text)
+                else:
+                    index.remove(text)
+
+        # Antes que los paneles, que así leen el índice ya actualizado
+        network.events.subscribe(apply, *TOPOLOGY_EVENTS, first=True)
+    return indexes[kind]
+
+
+def pipe_index(network) -> IdSearchIndex:
+    """Índice de tuberías 'origen-destino' de la red"""
+    return cached_index(
+        network, 'pipes', lambda: (f"{u}-{v}" for u, v in network.pipes.pipes()),
+        lambda e: f"{e.source}-{e.target}" if isinstance(e, (PipeAdded, PipeRemoved)) else None)
+
+
+def node_index(network) -> IdSearchIndex:
+    """Índice de nodos de la red"""
+    return cached_index(
+        network, 'nodes', lambda: network.graph.nodes(),
+        lambda e: e.node_id if isinstance(e, (NodeAdded, NodeRemoved)) else None)
+
+
+class SearchableSelector(ttk.Frame):
+    """Selector con búsqueda para listas largas de tuberías o nodos
+
+    Sustituye a ``ttk.Combobox(state='readonly')``: se escribe en la
+    entrada y la lista muestra las coincidencias. La lista es virtual:
+    el ``Listbox`` solo contiene las ``height`` filas visibles y la barra
+    de desplazamiento recorre las posiciones de los resultados, de modo
+    que el costo no depende del tamaño de la red.
+    """
+
+    def __init__(self, parent, height: int = 6,
+                 command: Optional[Callable[[str], None]] = None):
+        super().__init__(parent)
+        self.height = height
+        self.command = command
+        self.index = IdSearchIndex([])
+        self.matches: Sequence[int] = range(0)
+        self.offset = 0
+        self.active = 0
+        self._silent = False
+
+        self.text = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.text)
+        self.entry.pack(fill=tk.X)
+        self.popup = ttk.Frame(self)
+        self.scrollbar = ttk.Scrollbar(self.popup, orient='vertical', command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(self.popup, height=height, exportselection=False)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.trace_add('write', self._on_query)
+        self.entry.bind('<FocusIn>', lambda e: self.show())
+        self.entry.bind('<Down>', lambda e: self.move_active(1))
+        self.entry.bind('<Up>', lambda e: self.move_active(-1))
+        self.entry.bind('<Next>', lambda e: self.move_active(self.height))
+        self.entry.bind('<Prior>', lambda e: self.move_active(-self.height))
+        self.entry.bind('<Return>', lambda e: self.choose(self.active))
+        self.entry.bind('<Escape>', lambda e: self.hide())
+        self.listbox.bind('<ButtonRelease-1>', self._on_click)
+        self.listbox.bind('<MouseWheel>',
+                          lambda e: self.yview('scroll', -1 if e.delta > 0 else 1, 'units'))
+        self.listbox.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+        self.listbox.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+
+    def set_values(self, values) -> None:
+        """Cambia las opciones (un IdSearchIndex o cualquier iterable de textos)"""
+        self.index = values if isinstance(values, IdSearchIndex) else IdSearchIndex(values)
+        if self.get() == '':
+            self.set('')
+        self._search()
+
+    def refresh(self) -> None:
+        """Repite la búsqueda tras un cambio en el índice"""
+        if self.popup.winfo_ismapped():
+            self._search()
+
+    def first(self) -> str:
+        """Primera opción en orden alfabético, o '' si no hay opciones"""
+        return self.index.values[0] if len(self.index) else ''
+
+    def get(self) -> str:
+        """Valor elegido; '' si el texto no es una opción válida"""
+        value = self.text.get()
+        return value if value in self.index else ''
+
+    def set(self, value: str) -> None:
+        """Fija el valor sin abrir la lista de resultados"""
+        self._silent = True
+        try:
+            self.text.set(value)
+        finally:
+            self._silent = False
+        self.hide()
+
+    def show(self) -> None:
+        if not self.popup.winfo_ismapped():
+            self._search()
+            self.popup.pack(fill=tk.X)
+
+    def hide(self) -> None:
+        if self.popup.winfo_ismapped():
+            self.popup.pack_forget()
+
+    def _on_query(self, *args) -> None:
+        if self._silent:
+            return
+        self._search()
+        self.show()
+
+    def _search(self) -> None:
+        self.matches = self.index.search(self.text.get() if self.get() == '' else '')
+        self.offset = 0
+        self.active = 0
+        self._render()
+
+    def _render(self) -> None:
+        """Vuelca al Listbox solo la ventana visible de resultados"""
+        total = len(self.matches)
+        self.offset = max(0, min(self.offset, total - self.height))
+        values = self.index.values
+        window = [values[i] for i in self.matches[self.offset:self.offset + self.height]]
+        self.listbox.delete(0, tk.END)
+        if window:
+            self.listbox.insert(tk.END, *window)
+        if self.offset <= self.active < self.offset + len(window):
+            self.listbox.selection_set(self.active - self.offset)
+            self.listbox.activate(self.active - self.offset)
+        if total:
+            self.scrollbar.set(self.offset / total,
+                               min(1.0, (self.offset + self.height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args) -> None:
+        """Desplazamiento de la ventana de resultados (protocolo de Scrollbar)"""
+        total = len(self.matches)
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.height if args[2] == 'pages' else 1
+            self.offset += int(args[1]) * step
+        self._render()
+
+    def move_active(self, delta: int) -> str:
+        """Mueve la fila activa con el teclado, desplazando la ventana"""
+        self.show()
+        if len(self.matches):
+            self.active = max(0, min(len(self.matches) - 1, self.active + delta))
+            if self.active < self.offset:
+                self.offset = self.active
+            elif self.active >= self.offset + self.height:
+                self.offset = self.active - self.height + 1
+            self._render()
+        return 'break'
+
+    def _on_click(self, event) -> None:
+        row = self.listbox.nearest(event.y)
+        if row >= 0:
+            self.choose(self.offset + row)
+
+    def choose(self, position: int) -> None:
+        """Elige el resultado en la posición dada y cierra la lista"""
+        if 0 <= position < len(self.matches):
+            value = self.index.values[self.matches[position]]
+            self.set(value)
+            if self.command:
+                self.command(value)
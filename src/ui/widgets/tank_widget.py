@@ -7,6 +7,7 @@ class TankWidget:
     
     def __init__(self, ax):
         self.ax = ax
+        self.artists = []  # Artistas creados, para poder retirarlos
     
     def draw(self, x: float, y: float, level: float, 
             name: str, radius: float = 0.3) -> None:
@@ -29,6 +30,16 @@ class TankWidget:
         # Agregar etiqueta
         self._add_label(x, y, name, level, radius)
     
+    def draw_details(self, x: float, y: float, radius: float = 0.3) -> None:
+        """Dibuja solo los detalles decorativos (vista cercana)"""
+        self._draw_tank_details(x, y, radius)
+    
+    def clear(self) -> None:
+        """Retira del eje los artistas dibujados por el widget"""
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+    
     def _draw_tank_body(self, x: float, y: float, radius: float) -> None:
         """Dibuja el cuerpo del tanque"""
         # Círculo principal
@@ -36,7 +47,7 @@ class TankWidget:
                        facecolor='lightblue',
                        edgecolor='blue',
                        linewidth=2)
-        self.ax.add_patch(circle)
+        self.artists.append(self.ax.add_patch(circle))
         
         # Detalles decorativos
         self._draw_tank_details(x, y, radius)
@@ -53,29 +64,30 @@ class TankWidget:
         wave_y = y + water_height + amplitude * np.sin(10*np.pi*(wave_x-x)/radius)
         
         # Dibujar onda
-        self.ax.plot(wave_x, wave_y, color='blue', linewidth=1, alpha=0.6)
+        self.artists.extend(self.ax.plot(wave_x, wave_y, color='blue',
+                                         linewidth=1, alpha=0.6))
         
         # Rellenar área bajo la onda
-        self.ax.fill_between(wave_x, y - radius, wave_y,
-                           color='royalblue', alpha=0.3)
+        self.artists.append(self.ax.fill_between(wave_x, y - radius, wave_y,
+                                                 color='royalblue', alpha=0.3))
     
     def _draw_tank_details(self, x: float, y: float, radius: float) -> None:
         """Dibuja detalles decorativos del tanque"""
         # Borde superior reforzado
-        self.ax.plot([x-radius, x+radius],
-                    [y+radius, y+radius],
-                    color='navy', linewidth=3)
+        self.artists.extend(self.ax.plot([x-radius, x+radius],
+                                         [y+radius, y+radius],
+                                         color='navy', linewidth=3))
         
         # Conectores/tuberías
         connector_width = radius * 0.3
-        self.ax.plot([x-connector_width, x+connector_width],
-                    [y-radius, y-radius],
-                    color='navy', linewidth=4)
+        self.artists.extend(self.ax.plot([x-connector_width, x+connector_width],
+                                         [y-radius, y-radius],
+                                         color='navy', linewidth=4))
     
     def _add_label(self, x: float, y: float, name: str, 
                   level: float, radius: float) -> None:
         """Agrega etiqueta con nombre y nivel"""
-        self.ax.text(x, y+radius*1.5,
+        self.artists.append(self.ax.text(x, y+radius*1.5,
                     f"{name}\n{level:.0f}%",
                     ha='center',
                     va='bottom',
@@ -86,4 +98,4 @@ class TankWidget:
                         edgecolor='none',
                         alpha=0.7,
                         pad=1
-                    ))
\ No newline at end of file
+                    )))
@@ -4,20 +4,8 @@ Utilidades y funciones auxiliares
 
 from .file_handler import NetworkFileHandler
 from .validators import NetworkValidator
-from .calculations import FlowCalculator
-from .logger import Logger
-from .exporters import (
-    CSVExporter,
-    JSONExporter,
-    PDFExporter
-)
 
 __all__ = [
     'NetworkFileHandler',
-    'NetworkValidator',
-    'FlowCalculator',
-    'Logger',
-    'CSVExporter',
-    'JSONExporter',
-    'PDFExporter'
-]
\ No newline at end of file
+    'NetworkValidator'
+]
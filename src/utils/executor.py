@@ -0,0 +1,151 @@
+"""
+Ejecución de análisis largos en segundo plano
+
+Los análisis corren en un ThreadPoolExecutor. Mientras tanto la interfaz
+sigue editando y simulando la red, así que cada trabajo opera sobre una
+copia congelada (``WaterNetwork.snapshot``) tomada en el hilo de Tk, con
+copias de las cachés y solvers; al terminar, ``WaterNetwork.adopt`` retoma
+su estado si la red no se editó (los pasos de simulación no cuentan). Cada
+trabajo recibe una función ``progress(fracción, mensaje, parcial)`` que
+publica su avance y lanza AnalysisCancelled si se pidió cancelar; el hilo
+de Tk consulta los trabajos con ``after`` y entrega progreso y resultados
+en el hilo de la interfaz.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+from config.settings import APP_SETTINGS
+
+Progress = Callable[..., None]
+
+
+class AnalysisCancelled(Exception):
+    """El análisis se canceló antes de terminar"""
+
+
+class AnalysisJob:
+    """Análisis enviado al ejecutor: progreso, resultado parcial y cancelación"""
+
+    def __init__(self, name: str,
+                 on_done: Callable[[Any], None],
+                 on_progress: Optional[Callable[[float, str, Any], None]] = None,
+                 on_error: Optional[Callable[[BaseException], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.future: Optional[Future] = None
+        self.fraction = 0.0
+        self.message = ''
+        self.partial: Any = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._delivered = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Pide cancelar; el trabajo se detiene en su próximo ``progress``"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, fraction: float, message: str = '', partial: Any = None) -> None:
+        """Publica el avance desde el hilo de trabajo"""
+        if self._cancelled.is_set():
+            raise AnalysisCancelled(self.name)
+        with self._lock:
+            self.fraction = min(max(float(fraction), 0.0), 1.0)
+            self.message = message
+            if partial is not None:
+                self.partial = partial
+            self._version += 1
+
+    def take_progress(self) -> Optional[Tuple[float, str, Any]]:
+        """Último avance no entregado, o None"""
+        with self._lock:
+            if self._version == self._delivered:
+                return None
+            self._delivered = self._version
+            return self.fraction, self.message, self.partial
+
+
+class AnalysisExecutor:
+    """Cola de análisis en hilos con entrega de resultados en el hilo de Tk
+
+    ``widget`` es cualquier widget de Tk; se usa su ``after`` para consultar
+    los trabajos cada ``analysis_poll_interval`` ms mientras haya alguno.
+    """
+
+    def __init__(self, widget, max_workers: Optional[int] = None,
+                 poll_interval: Optional[int] = None):
+        self.widget = widget
+        self.poll_interval = poll_interval or APP_SETTINGS['analysis_poll_interval']
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers or APP_SETTINGS['analysis_workers'],
+            thread_name_prefix='analisis')
+        self.jobs: List[AnalysisJob] = []
+        self._poll_id = None
+
+    def submit(self, name: str, func: Callable[[Progress], Any],
+               on_done: Callable[[Any], None],
+               on_progress: Optional[Callable[[float, str, Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None) -> AnalysisJob:
+        """
+        Encola ``func(progress)`` y devuelve el trabajo
+
+        Los callbacks se llaman en el hilo de Tk: ``on_progress`` con el
+        último avance publicado, y al terminar uno de ``on_done`` (con el
+        resultado), ``on_error`` (con la excepción) u ``on_cancel``.
+        """
+        job = AnalysisJob(name, on_done, on_progress, on_error, on_cancel)
+        job.future = self.pool.submit(self._run, job, func)
+        self.jobs.append(job)
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+        return job
+
+    @staticmethod
+    def _run(job: AnalysisJob, func: Callable[[Progress], Any]) -> Any:
+        job.report(0.0)  # Cancelado mientras esperaba en la cola
+        return func(job.report)
+
+    def _poll(self) -> None:
+        self._poll_id = None
+        for job in list(self.jobs):
+            progress = job.take_progress()
+            if progress is not None and job.on_progress and not job.cancelled:
+                job.on_progress(*progress)
+            if not job.future.done():
+                continue
+            self.jobs.remove(job)
+            error = None if job.future.cancelled() else job.future.exception()
+            if job.cancelled or isinstance(error, AnalysisCancelled):
+                if job.on_cancel:
+                    job.on_cancel()
+            elif error is not None:
+                if job.on_error:
+                    job.on_error(error)
+            else:
+                job.on_done(job.future.result())
+        if self.jobs:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def cancel_all(self) -> None:
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """Cancela los trabajos y libera los hilos sin esperar"""
+        self.cancel_all()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,40 +1,245 @@
 import json
-from typing import Dict, Any
+import re
+import time
+from array import array
+from typing import Dict, Any, Iterator, Tuple, List
+from config.settings import FILE_SETTINGS
 from models.network import WaterNetwork
+from .validators import NetworkValidator
+from .wdn_format import load_wdn, save_wdn
+
+# Tamaño del bloque leído en cada recarga del lector incremental
+STREAM_CHUNK_SIZE = 1 << 20
+MAX_REPORTED_ERRORS = 100
+
+
+class JSONStreamReader:
+    """Lector incremental de un objeto JSON de primer nivel
+
+    Recorre ``{"clave": [elem, ...], ...}`` leyendo el archivo por bloques
+    y decodificando cada elemento de los arreglos por separado, de modo que
+    nunca se materializa el documento completo en memoria.
+    """
+
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    DELIMITERS = frozenset(',]} \t\n\r')
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.keys: List[str] = []
+
+    def _fill(self) -> None:
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                break
+            self._fill()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ''
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"JSON inválido: se esperaba '{char}' "
+                             f"y se encontró '{self._peek()}'")
+        self.pos += 1
+
+    def _decode(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            if (not self.eof and isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and (end == len(self.buffer) or self.buffer[end] not in self.DELIMITERS)):
+                # Un número cortado por el bloque ("1." o "1.5e") se decodifica
+                # antes de tiempo: solo es completo si le sigue un delimitador
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Produce ``(clave, elemento)`` por cada elemento de los arreglos"""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self.keys.append(key)
+            self._expect(':')
+            if self._peek() == '[':
+                self.pos += 1
+                if self._peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self._decode()
+                        separator = self._peek()
+                        self.pos += 1
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise ValueError("JSON inválido en arreglo")
+            else:
+                self._decode()
+            separator = self._peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError("JSON inválido en objeto")
+
 
 class NetworkFileHandler:
+    # Estadísticas de la última carga (filas, segundos, filas/s)
+    last_load_stats: Dict[str, Any] = {}
+
     @staticmethod
     def load_network(filename: str, network: WaterNetwork) -> bool:
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            if not NetworkFileHandler.validate_data(data):
-                return False
-                
-            network.clear()
-            
-            # Cargar nodos
-            for node in data['nodos']:
-                network.add_node(
-                    node['id'],
-                    node['tipo'],
-                    node.get('num_casas')
-                )
-                
-            # Cargar conexiones
-            for conn in data['conexiones']:
-                network.add_pipe(
-                    conn['origen'],
-                    conn['destino'],
-                    float(conn['capacidad'])
-                )
-                
+            if filename.endswith(FILE_SETTINGS['file_extensions']['network']):
+                start = time.perf_counter()
+                wdn = load_wdn(filename, network)
+                seconds = time.perf_counter() - start
+                rows = wdn.node_count + wdn.pipe_count
+                NetworkFileHandler.last_load_stats = {
+                    'valid': True,
+                    'errors': [],
+                    'nodes': wdn.node_count,
+                    'connections': wdn.pipe_count,
+                    'seconds': seconds,
+                    'rows_per_second': rows / seconds if seconds > 0 else float('inf')
+                }
+                wdn.close()
+                return True
+            stats = NetworkFileHandler.load_network_streaming(filename, network)
+            return stats['valid']
+        except Exception as e:
+            return False
+
+    @staticmethod
+    def save_network(filename: str, network: WaterNetwork) -> bool:
+        try:
+            if filename.endswith(FILE_SETTINGS['file_extensions']['network']):
+                save_wdn(network, filename)
+                return True
+            store = network.pipes
+            nodes = []
+            for node_id, attrs in network.graph.nodes(data=True):
+                node = {'id': node_id, 'tipo': attrs.get('type', 'interseccion')}
+                if node['tipo'] == 'barrio':
+                    node['num_casas'] = network.neighborhoods.get(node_id)
+                nodes.append(node)
+            connections = []
+            for slot in store.active_slots().tolist():
+                source, target = store.endpoints(slot)
+                conn = {'origen': source, 'destino': target,
+                        'capacidad': float(store.capacity[slot])}
+                if store.obstruction[slot]:
+                    conn['obstruccion'] = float(store.obstruction[slot])
+                connections.append(conn)
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({'nodos': nodes, 'conexiones': connections}, f,
+                          ensure_ascii=False)
             return True
-            
         except Exception as e:
             return False
-            
+
+    @staticmethod
+    def load_network_streaming(filename: str, network: WaterNetwork,
+                               chunk_size: int = STREAM_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Carga una red leyendo el JSON de forma incremental
+
+        Cada nodo y conexión se valida al leerse con búsquedas en conjuntos y
+        se acumula en columnas; si no hay errores la red se reemplaza con una
+        única inserción en lote. Las conexiones que aparecen antes que sus
+        nodos se validan al terminar la lectura.
+
+        Returns:
+            Dict[str, Any]: valid, errors, nodes, connections, seconds y
+            rows_per_second
+        """
+        start = time.perf_counter()
+        errors: List[str] = []
+        node_ids = set()
+        nodes = {'id': [], 'tipo': [], 'num_casas': []}
+        conns = {'origen': [], 'destino': [], 'capacidad': array('d'),
+                 'obstruccion': array('f')}
+        pending = []
+
+        def report(row_errors: List[str]) -> None:
+            if row_errors and len(errors) < MAX_REPORTED_ERRORS:
+                errors.extend(row_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+        def add_connection(conn: Dict[str, Any]) -> None:
+            row_errors = NetworkValidator.validate_json_connection(conn, node_ids)
+            report(row_errors)
+            if not row_errors:
+                conns['origen'].append(conn['origen'])
+                conns['destino'].append(conn['destino'])
+                conns['capacidad'].append(float(conn['capacidad']))
+                conns['obstruccion'].append(float(conn.get('obstruccion', 0)))
+
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = JSONStreamReader(f, chunk_size)
+            for key, item in reader.items():
+                if key == 'nodos':
+                    row_errors = NetworkValidator.validate_json_node(item, node_ids)
+                    report(row_errors)
+                    if not row_errors:
+                        nodes['id'].append(item['id'])
+                        nodes['tipo'].append(item['tipo'])
+                        nodes['num_casas'].append(item.get('num_casas'))
+                elif key == 'conexiones':
+                    if 'nodos' in reader.keys:
+                        add_connection(item)
+                    else:
+                        pending.append(item)
+
+        for conn in pending:
+            add_connection(conn)
+
+        if not {'nodos', 'conexiones'} <= set(reader.keys):
+            errors.append("Faltan campos requeridos en el JSON (nodos, conexiones)")
+
+        valid = not errors
+        if valid:
+            with network.events.batch():
+                network.clear()
+                network.bulk_load(nodes['id'], nodes['tipo'], nodes['num_casas'],
+                                  conns['origen'], conns['destino'], conns['capacidad'],
+                                  conns['obstruccion'])
+
+        seconds = time.perf_counter() - start
+        rows = len(nodes['id']) + len(conns['origen'])
+        stats = {
+            'valid': valid,
+            'errors': errors,
+            'nodes': len(nodes['id']),
+            'connections': len(conns['origen']),
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds > 0 else float('inf')
+        }
+        NetworkFileHandler.last_load_stats = stats
+        return stats
+
     @staticmethod
     def validate_data(data: Dict[str, Any]) -> bool:
-        return all(key in data for key in ['nodos', 'conexiones'])
\ No newline at end of file
+        return all(key in data for key in ['nodos', 'conexiones'])
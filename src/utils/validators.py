@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Set
 import networkx as nx
 import json
 from pathlib import Path
@@ -7,13 +7,20 @@ class NetworkValidator:
     """Validador para la red de distribución de agua"""
     
     @staticmethod
-    def validate_network(G: nx.Graph) -> Tuple[bool, List[str]]:
+    def validate_network(G) -> Tuple[bool, List[str]]:
         """
         Valida la estructura completa de la red
         
+        Con una WaterNetwork usa su índice de conectividad, que se mantiene
+        con cada edición y no vuelve a recorrer el grafo; con un nx.Graph
+        hace la pasada completa.
+        
         Returns:
             Tuple[bool, List[str]]: (es_válido, lista_de_errores)
         """
+        if not isinstance(G, nx.Graph):
+            return G.connectivity.validate()
+        
         errors = []
         
         # Validar conectividad
@@ -52,7 +59,7 @@ class NetworkValidator:
         # Validar conexiones
         connection_errors = NetworkValidator._validate_json_connections(
             data['conexiones'],
-            [node['id'] for node in data['nodos']]
+            {node['id'] for node in data['nodos'] if 'id' in node}
         )
         errors.extend(connection_errors)
         
@@ -124,6 +131,68 @@ class NetworkValidator:
             
         return errors
     
+    @staticmethod
+    def validate_json_node(node: Dict[str, Any], node_ids: Set[str]) -> List[str]:
+        """
+        Valida un nodo del JSON y lo registra en ``node_ids``
+        
+        Returns:
+            List[str]: errores encontrados en el nodo
+        """
+        errors = []
+        
+        # Validar campos requeridos
+        if not all(key in node for key in ['id', 'tipo']):
+            errors.append("Nodo con campos requeridos faltantes")
+            return errors
+            
+        # Validar ID único
+        if node['id'] in node_ids:
+            errors.append(f"ID de nodo duplicado: {node['id']}")
+        node_ids.add(node['id'])
+        
+        # Validar tipo
+        if node['tipo'] not in {'tanque', 'barrio', 'interseccion'}:
+            errors.append(f"Tipo de nodo inválido: {node['tipo']}")
+            
+        # Validar campos específicos por tipo
+        if node['tipo'] == 'barrio' and 'num_casas' not in node:
+            errors.append(f"Falta número de casas en barrio: {node['id']}")
+            
+        return errors
+    
+    @staticmethod
+    def validate_json_connection(conn: Dict[str, Any],
+                               valid_nodes: Set[str]) -> List[str]:
+        """
+        Valida una conexión del JSON contra el conjunto de nodos conocidos
+        
+        Returns:
+            List[str]: errores encontrados en la conexión
+        """
+        errors = []
+        
+        # Validar campos requeridos
+        if not all(key in conn for key in ['origen', 'destino', 'capacidad']):
+            errors.append("Conexión con campos requeridos faltantes")
+            return errors
+            
+        # Validar nodos existentes
+        if conn['origen'] not in valid_nodes:
+            errors.append(f"Nodo origen no existe: {conn['origen']}")
+        if conn['destino'] not in valid_nodes:
+            errors.append(f"Nodo destino no existe: {conn['destino']}")
+            
+        # Validar capacidad
+        try:
+            capacidad = float(conn['capacidad'])
+            if capacidad <= 0:
+                errors.append(f"Capacidad inválida en conexión: {capacidad}")
+        except (TypeError, ValueError):
+            errors.append("Capacidad no es un número válido")
+            
+        return errors
+    
     @staticmethod
     def _validate_json_nodes(nodes: List[Dict[str, Any]]) -> List[str]:
         """Valida la estructura de los nodos en el JSON"""
@@ -131,50 +200,17 @@ class NetworkValidator:
         node_ids = set()
         
         for node in nodes:
-            # Validar campos requeridos
-            if not all(key in node for key in ['id', 'tipo']):
-                errors.append("Nodo con campos requeridos faltantes")
-                continue
-                
-            # Validar ID único
-            if node['id'] in node_ids:
-                errors.append(f"ID de nodo duplicado: {node['id']}")
-            node_ids.add(node['id'])
-            
-            # Validar tipo
-            if node['tipo'] not in {'tanque', 'barrio', 'interseccion'}:
-                errors.append(f"Tipo de nodo inválido: {node['tipo']}")
-                
-            # Validar campos específicos por tipo
-            if node['tipo'] == 'barrio' and 'num_casas' not in node:
-                errors.append(f"Falta número de casas en barrio: {node['id']}")
+            errors.extend(NetworkValidator.validate_json_node(node, node_ids))
                 
         return errors
     
     @staticmethod
     def _validate_json_connections(connections: List[Dict[str, Any]], 
-                                 valid_nodes: List[str]) -> List[str]:
+                                 valid_nodes: Set[str]) -> List[str]:
         """Valida la estructura de las conexiones en el JSON"""
         errors = []
         
         for conn in connections:
-            # Validar campos requeridos
-            if not all(key in conn for key in ['origen', 'destino', 'capacidad']):
-                errors.append("Conexión con campos requeridos faltantes")
-                continue
-                
-            # Validar nodos existentes
-            if conn['origen'] not in valid_nodes:
-                errors.append(f"Nodo origen no existe: {conn['origen']}")
-            if conn['destino'] not in valid_nodes:
-                errors.append(f"Nodo destino no existe: {conn['destino']}")
-                
-            # Validar capacidad
-            try:
-                capacidad = float(conn['capacidad'])
-                if capacidad <= 0:
-                    errors.append(f"Capacidad inválida en conexión: {capacidad}")
-            except ValueError:
-                errors.append("Capacidad no es un número válido")
+            errors.extend(NetworkValidator.validate_json_connection(conn, valid_nodes))
                 
         return errors
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Formato binario de red (.wdn)
+
+Estructura (little endian, secciones alineadas a 8 bytes):
+
+    cabecera   '<4sHHQQ'  magia b'WDN\\0', versión, nº de secciones,
+                          nº de nodos, nº de tuberías
+    tabla      '<16s8sQQ'  por sección: nombre, dtype NumPy, offset, elementos
+    secciones  arreglos de ancho fijo
+
+Secciones de la versión 1:
+
+    str_offsets  uint64[n + 1]  inicio de cada id en str_data
+    str_data     uint8[...]     ids de nodo concatenados en UTF-8
+    node_type    uint8[n]       códigos de NODE_TYPE_CODES
+    houses       int32[n]       casas por barrio (0 en otros nodos)
+    source       int32[m]       índice del nodo origen
+    target       int32[m]       índice del nodo destino
+    capacity     float64[m]     capacidad de la tubería
+    obstruction  float32[m]     obstrucción (%)
+"""
+
+import json
+import os
+import struct
+from typing import Dict, List, Tuple
+import numpy as np
+from models.network import WaterNetwork
+from models.simulation import NODE_TYPE_CODES, INTERSECTION
+
+WDN_MAGIC = b'WDN\0'
+WDN_VERSION = 1
+HEADER = struct.Struct('<4sHHQQ')
+SECTION = struct.Struct('<16s8sQQ')
+NODE_TYPE_NAMES = {code: name for name, code in NODE_TYPE_CODES.items()}
+
+
+def _align(offset: int) -> int:
+    return -(-offset // 8) * 8
+
+
+class WdnFile:
+    """Archivo .wdn abierto con memoria mapeada
+
+    Abrir el archivo solo lee la cabecera; cada sección es una vista
+    sobre un ``np.memmap`` que el sistema operativo carga por páginas a
+    medida que se accede. Con ``mode='c'`` las vistas se pueden modificar
+    (copia en escritura) sin tocar el archivo.
+    """
+
+    def __init__(self, filename: str, mode: str = 'r'):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            magic, version, sections, nodes, pipes = HEADER.unpack(f.read(HEADER.size))
+            if magic != WDN_MAGIC:
+                raise ValueError(f"{filename} no es un archivo .wdn")
+            if version > WDN_VERSION:
+                raise ValueError(f"Versión de .wdn no soportada: {version}")
+            table = [SECTION.unpack(f.read(SECTION.size)) for _ in range(sections)]
+
+        self.version = version
+        self.node_count = nodes
+        self.pipe_count = pipes
+        self._raw = np.memmap(filename, dtype=np.uint8, mode=mode)
+        self.sections: Dict[str, np.ndarray] = {}
+        for name, dtype, offset, length in table:
+            dtype = np.dtype(dtype.rstrip(b'\0').decode())
+            end = offset + length * dtype.itemsize
+            self.sections[name.rstrip(b'\0').decode()] = self._raw[offset:end].view(dtype)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.sections[name]
+
+    def node_id(self, index: int) -> str:
+        """Id del nodo ``index`` decodificado bajo demanda"""
+        offsets = self.sections['str_offsets']
+        return bytes(self.sections['str_data'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def node_ids(self) -> List[str]:
+        """Todos los ids de nodo en orden de índice"""
+        offsets = self.sections['str_offsets'].tolist()
+        blob = bytes(self.sections['str_data'])
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i in range(self.node_count)]
+
+    def close(self) -> None:
+        """Suelta las secciones; el mapeo se libera cuando ninguna vista lo usa"""
+        self.sections = {}
+        self._raw = None
+
+
+def write_wdn(filename: str, node_ids: List[str], node_types: np.ndarray,
+              houses: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+              capacities: np.ndarray, obstructions: np.ndarray) -> None:
+    """Escribe un archivo .wdn a partir de arreglos por nodo y por tubería"""
+    encoded = [node_id.encode('utf-8') for node_id in node_ids]
+    str_offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(b) for b in encoded], out=str_offsets[1:])
+    sections: List[Tuple[str, np.ndarray]] = [
+        ('str_offsets', str_offsets),
+        ('str_data', np.frombuffer(b''.join(encoded), dtype=np.uint8)),
+        ('node_type', np.asarray(node_types, dtype=np.uint8)),
+        ('houses', np.asarray(houses, dtype=np.int32)),
+        ('source', np.asarray(sources, dtype=np.int32)),
+        ('target', np.asarray(targets, dtype=np.int32)),
+        ('capacity', np.asarray(capacities, dtype=np.float64)),
+        ('obstruction', np.asarray(obstructions, dtype=np.float32))
+    ]
+
+    offset = _align(HEADER.size + SECTION.size * len(sections))
+    table = []
+    for name, data in sections:
+        table.append(SECTION.pack(name.encode(), data.dtype.str.encode(), offset, len(data)))
+        offset = _align(offset + data.nbytes)
+
+    # Archivo nuevo y reemplazo: una red cargada de ``filename`` puede
+    # seguir mapeando el archivo anterior
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(WDN_MAGIC, WDN_VERSION, len(sections),
+                            len(node_ids), len(sources)))
+        for entry in table:
+            f.write(entry)
+        for (_, data), entry in zip(sections, table):
+            _, _, start, _ = SECTION.unpack(entry)
+            f.write(b'\0' * (start - f.tell()))
+            f.write(data.tobytes())
+    os.replace(temporary, filename)
+
+
+def save_wdn(network: WaterNetwork, filename: str) -> None:
+    """Guarda una red en formato .wdn (solo nodos del grafo y tuberías activas)
+
+    La tabla de tuberías conserva los ids de nodos ya eliminados; se
+    compactan y se renumeran los extremos de las tuberías.
+    """
+    store = network.pipes
+    present = np.zeros(store.node_count, dtype=bool)
+    node_types = np.full(store.node_count, INTERSECTION, dtype=np.uint8)
+    houses = np.zeros(store.node_count, dtype=np.int32)
+    for node_id, attrs in network.graph.nodes(data=True):
+        index = store.node_index[node_id]
+        present[index] = True
+        node_types[index] = NODE_TYPE_CODES.get(attrs.get('type'), INTERSECTION)
+    for node_id, num_houses in network.neighborhoods.items():
+        houses[store.node_index[node_id]] = num_houses
+    kept = np.flatnonzero(present)
+    remap = np.cumsum(present) - 1
+    slots = store.active_slots()
+    ids = store.node_ids
+    write_wdn(filename, [ids[i] for i in kept.tolist()], node_types[kept], houses[kept],
+              remap[store.source[slots]], remap[store.target[slots]],
+              store.capacity[slots], store.obstruction[slots])
+
+
+def load_wdn(filename: str, network: WaterNetwork) -> WdnFile:
+    """Carga un archivo .wdn en la red y devuelve el archivo mapeado
+
+    Las secciones de tuberías quedan como respaldo de la tabla de la red
+    (copia en escritura), así que solo se leen las páginas que se usan;
+    el grafo de networkx se arma cuando algo lo pide. Cerrar el archivo
+    devuelto no invalida la red.
+    """
+    wdn = WdnFile(filename, mode='c')
+    ids = wdn.node_ids()
+    types = [NODE_TYPE_NAMES.get(code, 'interseccion') for code in wdn['node_type'].tolist()]
+    houses = wdn['houses'].tolist()
+    with network.events.batch():
+        network.clear()
+        network.load_indexed(ids, types, houses, wdn['source'], wdn['target'],
+                             wdn['capacity'], wdn['obstruction'])
+    return wdn
+
+
+def wdn_to_json(wdn_filename: str, json_filename: str) -> None:
+    """Convierte un archivo .wdn al esquema JSON de nodos y conexiones"""
+    wdn = WdnFile(wdn_filename)
+    try:
+        ids = wdn.node_ids()
+        nodes = []
+        for node_id, code, num_houses in zip(ids, wdn['node_type'].tolist(),
+                                             wdn['houses'].tolist()):
+            node = {'id': node_id, 'tipo': NODE_TYPE_NAMES.get(code, 'interseccion')}
+            if node['tipo'] == 'barrio':
+                node['num_casas'] = num_houses
+            nodes.append(node)
+        connections = []
+        for i, j, capacity, obstruction in zip(wdn['source'].tolist(), wdn['target'].tolist(),
+                                               wdn['capacity'].tolist(),
+                                               wdn['obstruction'].tolist()):
+            conn = {'origen': ids[i], 'destino': ids[j], 'capacidad': capacity}
+            if obstruction:
+                conn['obstruccion'] = obstruction
+            connections.append(conn)
+    finally:
+        wdn.close()
+    with open(json_filename, 'w', encoding='utf-8') as f:
+        json.dump({'nodos': nodes, 'conexiones': connections}, f, ensure_ascii=False)
+
+
+def json_to_wdn(json_filename: str, wdn_filename: str) -> Dict[str, object]:
+    """Convierte un archivo JSON de red a .wdn; devuelve las estadísticas de carga"""
+    from .file_handler import NetworkFileHandler
+    network = WaterNetwork()
+    stats = NetworkFileHandler.load_network_streaming(json_filename, network)
+    if not stats['valid']:
+        raise ValueError("; ".join(stats['errors'][:5]))
+    save_wdn(network, wdn_filename)
+    return stats
@@ -0,0 +1,72 @@
+"""Índice de bloques y puntos de corte contra networkx"""
+
+import random
+import networkx as nx
+import pytest
+from models.network import WaterNetwork
+
+
+def supplied(graph: nx.Graph) -> set:
+    """Barrios con camino a algún tanque"""
+    result = set()
+    for component in nx.connected_components(graph):
+        if any(graph.nodes[n].get('type') == 'tanque' for n in component):
+            result.update(n for n in component if graph.nodes[n].get('type') == 'barrio')
+    return result
+
+
+def random_edit(network: WaterNetwork, rng: random.Random, nodes: list) -> None:
+    pipes = network.get_pipes()
+    action = rng.random()
+    if action < 0.45 or not pipes:
+        # Con algunos bucles, que no son puentes ni separan nada
+        u, v = rng.sample(nodes, 2) if action > 0.03 else [rng.choice(nodes)] * 2
+        network.add_pipe(u, v, 5.0)
+    elif action < 0.8:
+        network.delete_pipe(*rng.choice(pipes))
+    elif action < 0.87 and len(network.tank_levels) > 1:
+        tank_id = rng.choice(sorted(network.tank_levels))
+        network.remove_tank(tank_id)
+        nodes.remove(tank_id)
+    else:
+        node_id = f'x{network.pipes.node_count}'
+        network.add_node(node_id, rng.choice(['barrio', 'interseccion', 'tanque']), 3)
+        nodes.append(node_id)
+
+
+def check_block_cut(network: WaterNetwork) -> None:
+    graph = network.graph
+    store = network.pipes
+    bridges = {frozenset(edge) for edge in nx.bridges(graph)}
+    articulation = set(nx.articulation_points(graph))
+    before = supplied(graph)
+    for slot in store.active_slots().tolist():
+        u, v = store.endpoints(slot)
+        assert network.block_cut.is_bridge(slot) == (frozenset((u, v)) in bridges)
+        without = graph.copy()
+        without.remove_edge(u, v)
+        expected = before - supplied(without)
+        assert set(network.neighborhoods_cut_by_pipe(u, v)) == expected
+        assert network.verify_safe_pipe_deletion(u, v) == (not expected)
+    for node_id in graph.nodes:
+        assert network.block_cut.is_articulation(node_id) == (node_id in articulation)
+        isolated = graph.copy()
+        isolated.remove_edges_from(list(graph.edges(node_id)))
+        assert set(network.neighborhoods_cut_by_node(node_id)) == before - supplied(isolated)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_block_cut_matches_networkx_under_edits(seed):
+    rng = random.Random(seed)
+    network = WaterNetwork()
+    nodes = []
+    for i in range(9):
+        node_type = 'tanque' if i < 2 else rng.choice(['barrio', 'interseccion'])
+        network.add_node(f'n{i}', node_type, 3)
+        nodes.append(f'n{i}')
+    for _ in range(10):
+        network.add_pipe(*rng.sample(nodes, 2), 5.0)
+    check_block_cut(network)
+    for _ in range(25):
+        random_edit(network, rng, nodes)
+        check_block_cut(network)
@@ -0,0 +1,78 @@
+"""Plan de ampliación: la demanda ganada coincide con un flujo máximo nuevo"""
+
+import threading
+import networkx as nx
+import numpy as np
+from config.settings import NETWORK_SETTINGS, SIMULATION_SETTINGS
+from models.connection_planner import ConnectionPlanner
+from models.network import WaterNetwork
+
+RESOLUTION = NETWORK_SETTINGS['optimization']['flow_resolution']
+
+
+def grid_network(side: int, seed: int) -> WaterNetwork:
+    rng = np.random.default_rng(seed)
+    count = side * side
+    ids = [f'n{i}' for i in range(count)]
+    tanks = set(rng.choice(count, 2, replace=False).tolist())
+    types = ['tanque' if i in tanks else ('barrio' if rng.random() < 0.5 else 'interseccion')
+             for i in range(count)]
+    sources, targets = [], []
+    for row in range(side):
+        for col in range(side):
+            i = row * side + col
+            if col + 1 < side and rng.random() < 0.7:
+                sources.append(ids[i])
+                targets.append(ids[i + 1])
+            if row + 1 < side and rng.random() < 0.7:
+                sources.append(ids[i])
+                targets.append(ids[i + side])
+    network = WaterNetwork()
+    # Capacidades enteras: las ampliaciones quedan exactas en unidades del optimizador
+    network.bulk_load(ids, types, [int(rng.integers(1, 20)) for _ in ids],
+                      sources, targets, [float(c) for c in rng.integers(1, 5, len(sources))])
+    return network
+
+
+def fresh_max_flow(network: WaterNetwork) -> float:
+    """Demanda servida recalculada desde cero con networkx"""
+    graph = nx.DiGraph()
+    for u, v in network.get_pipes():
+        capacity = int(np.floor(network.pipes.capacity[network.pipes.slot(u, v)] / RESOLUTION))
+        graph.add_edge(u, v, capacity=capacity)
+        graph.add_edge(v, u, capacity=capacity)
+    for tank, level in network.tank_levels.items():
+        if level > 0:
+            graph.add_edge('s', tank)  # sin capacidad: ilimitada
+    for node_id, houses in network.neighborhoods.items():
+        demand = houses * SIMULATION_SETTINGS['consumption_per_house'] / RESOLUTION
+        graph.add_edge(node_id, 't', capacity=int(np.floor(demand)))
+    return nx.maximum_flow_value(graph, 's', 't') * RESOLUTION
+
+
+def test_plan_gain_matches_fresh_max_flow():
+    for seed in range(3):
+        network = grid_network(6, seed)
+        plan = ConnectionPlanner(network).plan(max_workers=1)
+        assert plan['changes']
+        assert plan['served_before'] == round(fresh_max_flow(network), 2)
+        for change in plan['changes']:
+            network.add_pipe(change['source'], change['target'], change['capacity'])
+        assert plan['served_after'] == round(fresh_max_flow(network), 2)
+        gained = sum(change['gain'] for change in plan['changes'])
+        assert round(gained, 2) == round(plan['served_after'] - plan['served_before'], 2)
+
+
+def test_process_pool_from_a_thread_matches_serial():
+    network = grid_network(8, 5)
+    serial = ConnectionPlanner(network).plan(max_workers=1)
+    optimization = dict(NETWORK_SETTINGS['optimization'])
+    optimization['connections'] = dict(optimization['connections'],
+                                       chunk_size=2, min_parallel=1)
+    results = []
+    # Como en la interfaz: el pool se crea desde un hilo de fondo
+    worker = threading.Thread(
+        target=lambda: results.append(ConnectionPlanner(network, optimization).plan(max_workers=2)))
+    worker.start()
+    worker.join()
+    assert results and results[0] == serial
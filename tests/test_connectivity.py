@@ -0,0 +1,50 @@
+"""Índice incremental de conectividad contra networkx"""
+
+import random
+import networkx as nx
+import pytest
+from models.network import WaterNetwork
+
+
+def random_edit(network: WaterNetwork, rng: random.Random, nodes: list) -> None:
+    pipes = network.get_pipes()
+    action = rng.random()
+    if action < 0.45 or not pipes:
+        u, v = rng.sample(nodes, 2)
+        network.add_pipe(u, v, 5.0)
+    elif action < 0.85:
+        network.delete_pipe(*rng.choice(pipes))
+    else:
+        node_id = f'x{len(nodes)}'
+        network.add_node(node_id, rng.choice(['barrio', 'interseccion', 'tanque']), 3)
+        nodes.append(node_id)
+
+
+def check_connectivity(network: WaterNetwork) -> None:
+    graph = network.graph
+    index = network.connectivity
+    assert index.component_count == nx.number_connected_components(graph)
+    for component in nx.connected_components(graph):
+        roots = {index.component_of(node_id) for node_id in component}
+        assert len(roots) == 1
+        assert index.component_size(next(iter(component))) == len(component)
+    valid, errors = index.validate()
+    disconnected = any('no está completamente conectada' in error for error in errors)
+    assert disconnected == (not nx.is_connected(graph))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_connectivity_matches_networkx_under_edits(seed):
+    rng = random.Random(seed)
+    network = WaterNetwork()
+    nodes = []
+    for i in range(9):
+        node_type = 'tanque' if i < 2 else rng.choice(['barrio', 'interseccion'])
+        network.add_node(f'n{i}', node_type, 3)
+        nodes.append(f'n{i}')
+    for _ in range(10):
+        network.add_pipe(*rng.sample(nodes, 2), 5.0)
+    check_connectivity(network)
+    for _ in range(25):
+        random_edit(network, rng, nodes)
+        check_connectivity(network)
@@ -0,0 +1,67 @@
+"""Deterioro a largo plazo: los saltos entre eventos coinciden con paso fino"""
+
+import numpy as np
+import pytest
+from config.settings import SIMULATION_SETTINGS
+from models.deterioration import DeteriorationSimulator
+from models.network import WaterNetwork
+
+SETTINGS = SIMULATION_SETTINGS['maintenance']
+
+
+def chain_network(pipes: int) -> WaterNetwork:
+    network = WaterNetwork()
+    network.add_node('T', 'tanque')
+    previous = 'T'
+    for i in range(pipes):
+        network.add_node(f'n{i}', 'interseccion')
+        network.add_pipe(previous, f'n{i}', 10.0)
+        previous = f'n{i}'
+    return network
+
+
+def stepped(obstruction: np.ndarray, rate: np.ndarray, days: float, dt: float):
+    """Referencia día a día con paso ``dt`` (múltiplo de los intervalos)"""
+    cap = SETTINGS['max_obstruction']
+    events = {threshold: 0 for threshold in SETTINGS['thresholds']}
+    pipes = {threshold: np.zeros(len(obstruction), dtype=bool)
+             for threshold in SETTINGS['thresholds']}
+    detected = np.zeros(len(obstruction), dtype=bool)
+    cleaned = 0
+    obstruction = np.minimum(obstruction, cap)
+    per_inspection = int(round(SETTINGS['inspection_interval'] / dt))
+    per_round = int(round(SETTINGS['maintenance_interval'] / dt))
+    for step in range(1, int(round(days / dt)) + 1):
+        new = np.minimum(obstruction + rate * dt, cap)
+        for threshold in events:
+            crossed = (obstruction < threshold) & (new >= threshold)
+            events[threshold] += int(crossed.sum())
+            pipes[threshold] |= crossed
+        obstruction = new
+        if step % per_inspection == 0:
+            detected |= obstruction >= SETTINGS['cleaning_threshold']
+        if step % per_round == 0:
+            cleaned += int(detected.sum())
+            obstruction[detected] = 0.0
+            detected[:] = False
+    return events, {t: int(mask.sum()) for t, mask in pipes.items()}, cleaned, obstruction
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_event_skipping_matches_fine_steps(seed):
+    rng = np.random.default_rng(seed)
+    network = chain_network(12)
+    slots = network.pipes.active_slots()
+    network.pipes.obstruction[slots] = rng.uniform(0, 80, len(slots))
+    # Tasas múltiplos de 1/8: los cruces caen justo en pasos de 1/8 de día
+    rate = rng.integers(1, 4, len(slots)) / 8.0
+    initial = network.pipes.obstruction[slots].astype(np.float64)
+
+    result = DeteriorationSimulator(network).run(1080, rate=rate)
+    events, pipes, cleaned, final = stepped(initial, rate, 1080, 0.125)
+    assert {c['threshold']: c['events'] for c in result['crossings']} == events
+    assert {c['threshold']: c['pipes'] for c in result['crossings']} == pipes
+    assert result['cleanings'] == cleaned
+    assert result['final_mean_obstruction'] == pytest.approx(final.mean(), abs=0.01)
+    for crossing in result['crossings']:
+        assert crossing['pipes'] <= min(crossing['events'], len(slots))
@@ -0,0 +1,47 @@
+"""Bus de eventos: lotes reducidos, suscriptores con error y cambios publicados"""
+
+import logging
+from models.events import CapacityChanged, ChangeBus, ObstructionChanged, PipeAdded
+from models.network import WaterNetwork
+
+
+def test_batch_keeps_last_event_per_element():
+    bus = ChangeBus()
+    received = []
+    bus.subscribe(received.append, ObstructionChanged)
+    with bus.batch():
+        bus.publish(ObstructionChanged('a', 'b', 0, 10.0))
+        bus.publish(PipeAdded('a', 'c', 1))
+        bus.publish(ObstructionChanged('a', 'b', 0, 30.0))
+    assert received == [[ObstructionChanged('a', 'b', 0, 30.0)]]
+    assert bus.revision == 3
+
+
+def test_failing_subscriber_is_logged_and_others_still_run(caplog):
+    bus = ChangeBus()
+    received = []
+
+    def broken(events):
+        raise RuntimeError('falla')
+
+    bus.subscribe(broken)
+    bus.subscribe(received.append)
+    with caplog.at_level(logging.ERROR, logger='models.events'):
+        bus.publish(PipeAdded('a', 'b', 0))
+    assert received == [[PipeAdded('a', 'b', 0)]]
+    assert 'falla' in caplog.text
+
+
+def test_capacity_changes_are_published():
+    network = WaterNetwork()
+    network.add_pipe('a', 'b', 5.0)
+    received = []
+    network.events.subscribe(received.extend)
+    network.add_pipe('b', 'a', 8.0)
+    network.capacities[('a', 'b')] = 9.0
+    network.obstructions[('b', 'a')] = 40.0
+    slot = network.pipes.slot('a', 'b')
+    assert received == [CapacityChanged('a', 'b', slot, 8.0),
+                        CapacityChanged('a', 'b', slot, 9.0),
+                        ObstructionChanged('a', 'b', slot, 40.0)]
+    assert network.analyze_flow_capacity('a', 'b') == 5.4
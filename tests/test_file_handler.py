@@ -0,0 +1,66 @@
+"""Lectura incremental del JSON: el resultado no depende del tamaño de bloque"""
+
+import io
+import json
+import pytest
+from models.network import WaterNetwork
+from utils.file_handler import JSONStreamReader, NetworkFileHandler
+
+CHUNK_SIZES = [1, 2, 3, 5, 8, 13, 64, 1 << 16]
+
+DOCUMENT = {
+    'x': 1.5e10,
+    'escala': -0.25,
+    'nodos': [1, 22, 3.75e-3, True, None, {'id': 'a', 'num_casas': 120}, 'texto'],
+    'vacio': [],
+    'conexiones': [{'origen': 'a', 'destino': 'b', 'capacidad': 12.5}, 100000]
+}
+
+
+def stream(text: str, chunk_size: int):
+    reader = JSONStreamReader(io.StringIO(text), chunk_size)
+    items = list(reader.items())
+    return items, reader.keys
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_number_split_by_chunk(chunk_size):
+    items, keys = stream('{"x": 1.5e10, "nodos":[1]}', chunk_size)
+    assert items == [('nodos', 1)]
+    assert keys == ['x', 'nodos']
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_items_match_json_load(chunk_size, indent):
+    text = json.dumps(DOCUMENT, indent=indent)
+    expected = [(key, item) for key, value in DOCUMENT.items()
+                if isinstance(value, list) for item in value]
+    items, keys = stream(text, chunk_size)
+    assert items == expected
+    assert keys == list(DOCUMENT)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_streaming_load_matches_full_load(tmp_path, chunk_size):
+    source = WaterNetwork()
+    source.add_node('T', 'tanque')
+    source.add_node('B1', 'barrio', 1250)
+    source.add_node('I1', 'interseccion')
+    source.add_pipe('T', 'I1', 1234.5)
+    source.add_pipe('I1', 'B1', 0.125)
+    source.add_obstruction('I1', 'B1', 37.5)
+    filename = str(tmp_path / 'red.json')
+    assert NetworkFileHandler.save_network(filename, source)
+
+    expected = WaterNetwork()
+    assert NetworkFileHandler.load_network(filename, expected)
+    loaded = WaterNetwork()
+    stats = NetworkFileHandler.load_network_streaming(filename, loaded, chunk_size)
+    assert stats['valid'], stats['errors']
+    assert loaded.neighborhoods == expected.neighborhoods
+    assert sorted(loaded.get_pipes()) == sorted(expected.get_pipes())
+    for u, v in expected.get_pipes():
+        slot, reference = loaded.pipes.slot(u, v), expected.pipes.slot(u, v)
+        assert loaded.pipes.capacity[slot] == expected.pipes.capacity[reference]
+        assert loaded.pipes.obstruction[slot] == expected.pipes.obstruction[reference]
@@ -0,0 +1,56 @@
+"""Caché de flujo máximo: la reparación incremental coincide con networkx"""
+
+import random
+import networkx as nx
+import pytest
+from models.network import WaterNetwork
+
+
+def reference_max_flow(network: WaterNetwork, source: str, target: str) -> float:
+    if source in network.tank_levels and network.tank_levels[source] <= 0:
+        return 0.0
+    graph = nx.DiGraph()
+    graph.add_nodes_from(network.graph.nodes)
+    store = network.pipes
+    capacity = store.effective_capacity()
+    for slot in store.active_slots().tolist():
+        u, v = store.endpoints(slot)
+        graph.add_edge(u, v, capacity=capacity[slot])
+        graph.add_edge(v, u, capacity=capacity[slot])
+    return nx.maximum_flow_value(graph, source, target)
+
+
+def random_network(rng: random.Random, size: int = 7) -> WaterNetwork:
+    network = WaterNetwork()
+    network.add_node('T', 'tanque')
+    for i in range(size):
+        network.add_node(f'n{i}', 'barrio' if i % 3 == 0 else 'interseccion', 4)
+    nodes = ['T'] + [f'n{i}' for i in range(size)]
+    for _ in range(2 * size):
+        u, v = rng.sample(nodes, 2)
+        network.add_pipe(u, v, rng.choice([2.0, 4.0, 6.0, 8.0]))
+    return network
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_incremental_repair_matches_networkx(seed):
+    rng = random.Random(seed)
+    network = random_network(rng)
+    pairs = [('T', 'n3'), ('n0', 'n6'), ('n1', 'n5')]
+    for source, target in pairs:
+        network.analyze_flow_capacity(source, target)
+    pipes = network.get_pipes()
+    for _ in range(30):
+        u, v = rng.choice(pipes)
+        action = rng.random()
+        if action < 0.5:
+            network.add_obstruction(u, v, rng.choice([0, 20, 40, 60, 80, 100]))
+        elif action < 0.7:
+            network.block_pipe(u, v)
+        elif action < 0.9:
+            network.unblock_pipe(u, v)
+        else:
+            network.update_tank_level('T', rng.choice([0.0, 50.0]))
+        for source, target in pairs:
+            expected = round(reference_max_flow(network, source, target), 2)
+            assert network.analyze_flow_capacity(source, target) == pytest.approx(expected, abs=0.011)
@@ -0,0 +1,108 @@
+"""Flujo de costo mínimo contra networkx, en frío y con arranques en caliente"""
+
+import networkx as nx
+import numpy as np
+import pytest
+from models.flow_optimizer import MinCostFlow
+from models.network import WaterNetwork
+
+
+def random_instance(rng: np.random.Generator, n: int = 10):
+    """Tuberías no dirigidas al azar más la estructura del despacho
+
+    Súper fuente ``n`` hacia los tanques, barrios hacia el súper sumidero
+    ``n + 1`` y un arco directo caro que absorbe la demanda no servida.
+    """
+    pairs = {tuple(sorted(rng.choice(n, 2, replace=False).tolist())) for _ in range(2 * n)}
+    pipes = np.array(sorted(pairs), dtype=np.int64)
+    tanks = np.arange(2)
+    neighborhoods = np.arange(n - 4, n)
+    demand = rng.integers(1, 30, neighborhoods.size)
+    total = int(demand.sum())
+    s, t = n, n + 1
+    tail = np.concatenate([pipes[:, 0], np.full(tanks.size, s), neighborhoods, [s]])
+    head = np.concatenate([pipes[:, 1], tanks, np.full(neighborhoods.size, t), [t]])
+    supply = np.zeros(n + 2, dtype=np.int64)
+    supply[s], supply[t] = total, -total
+    return tail, head, len(pipes), tanks.size, demand, supply
+
+
+def bounds(rng: np.random.Generator, pipe_count: int, tank_count: int, demand: np.ndarray):
+    total = int(demand.sum())
+    pipe_upper = rng.integers(0, 25, pipe_count)
+    pipe_cost = rng.integers(1, 12, pipe_count)
+    upper = np.concatenate([pipe_upper, np.full(tank_count, total), demand, [total]])
+    lower = np.concatenate([-pipe_upper, np.zeros(tank_count + demand.size + 1, dtype=np.int64)])
+    cost = np.concatenate([pipe_cost, np.zeros(tank_count + demand.size, dtype=np.int64),
+                           [int(pipe_cost.sum()) + 1]])
+    return lower, upper, cost
+
+
+def networkx_cost(tail, head, lower, upper, cost, supply) -> int:
+    """Costo óptimo con cada arco de cota inferior negativa partido en dos"""
+    graph = nx.DiGraph()
+    for node, value in enumerate(supply.tolist()):
+        graph.add_node(node, demand=-value)
+    for u, v, low, high, weight in zip(tail.tolist(), head.tolist(), lower.tolist(),
+                                       upper.tolist(), cost.tolist()):
+        graph.add_edge(u, v, capacity=high, weight=weight)
+        if low < 0:
+            graph.add_edge(v, u, capacity=-low, weight=weight)
+    return nx.min_cost_flow_cost(graph)
+
+
+def check(solver: MinCostFlow, supply: np.ndarray) -> None:
+    result = solver.solve(supply)
+    assert result['unrouted'] == 0
+    assert not np.any(solver.excess(supply))
+    assert np.all((solver.lower <= solver.flow) & (solver.flow <= solver.upper))
+    expected = networkx_cost(solver.tail, solver.head, solver.lower, solver.upper,
+                             solver.cost, supply)
+    assert int(solver.cost @ np.abs(solver.flow)) == expected
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_matches_networkx_cold_and_warm(seed):
+    rng = np.random.default_rng(seed)
+    tail, head, pipe_count, tank_count, demand, supply = random_instance(rng)
+    solver = MinCostFlow(len(supply), tail, head, *bounds(rng, pipe_count, tank_count, demand))
+    check(solver, supply)
+    for _ in range(4):
+        # Nuevas capacidades y costos sobre la solución anterior
+        solver.set_bounds(*bounds(rng, pipe_count, tank_count, demand))
+        check(solver, supply)
+
+
+def test_set_bounds_leaves_no_negative_reduced_cost_arc():
+    rng = np.random.default_rng(3)
+    tail, head, pipe_count, tank_count, demand, supply = random_instance(rng)
+    solver = MinCostFlow(len(supply), tail, head, *bounds(rng, pipe_count, tank_count, demand))
+    solver.solve(supply)
+    for _ in range(10):
+        solver.set_bounds(*bounds(rng, pipe_count, tank_count, demand))
+        cap_f, cost_f, cap_b, cost_b = solver._residual()
+        shift = solver.potential[solver.tail] - solver.potential[solver.head]
+        assert not np.any((cap_f > 0) & (cost_f + shift < 0))
+        assert not np.any((cap_b > 0) & (cost_b - shift < 0))
+
+
+def test_optimizer_warm_start_matches_cold():
+    network = WaterNetwork()
+    network.add_tank('T', 1000, 100)
+    for i in range(6):
+        network.add_node(f'b{i}', 'barrio', 4 + i)
+    edges = [('T', 'b0', 5.0), ('b0', 'b1', 3.0), ('b1', 'b2', 4.0), ('T', 'b3', 6.0),
+             ('b3', 'b4', 2.0), ('b4', 'b5', 3.0), ('b2', 'b5', 2.0), ('b0', 'b3', 1.0)]
+    for u, v, capacity in edges:
+        network.add_pipe(u, v, capacity)
+    assert not network.optimize_flow('Media')['warm_start']
+
+    network.add_obstruction('T', 'b0', 60.0)
+    network.add_pipe('b3', 'b4', 4.0)
+    warm = network.optimize_flow('Alta')
+    cold = network.snapshot()
+    cold.optimizer.solver = None
+    expected = cold.optimize_flow('Alta')
+    assert warm['warm_start'] and not expected['warm_start']
+    for key in ('efficiency', 'cost', 'served', 'status'):
+        assert warm[key] == expected[key]
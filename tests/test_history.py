@@ -0,0 +1,61 @@
+"""Historial de flujos: lectura desde el .sim, regrabación y rotación"""
+
+import os
+import numpy as np
+from models.history import FlowHistory
+
+
+def record(history: FlowHistory, steps: int, width: int, start: float = 0.0) -> np.ndarray:
+    rows = np.arange(steps * width, dtype=np.float32).reshape(steps, width) + start
+    for step, flows in enumerate(rows):
+        history.record(start + step, flows)
+    return rows
+
+
+def test_spilled_rows_round_trip(tmp_path):
+    filename = str(tmp_path / 'flujos.sim')
+    history = FlowHistory(filename, chunk_rows=4)
+    expected = record(history, 11, 3)
+    times, matrix = history.rows(0)
+    assert np.array_equal(times, np.arange(11))
+    assert np.array_equal(matrix, expected)
+    assert np.array_equal(history.series(1), expected[:, 1])
+    history.close()
+
+    reopened = FlowHistory.open(filename)
+    assert len(reopened) == 11
+    assert np.array_equal(reopened.rows(0)[1], expected)
+
+
+def test_growing_network_reads_missing_slots_as_zero(tmp_path):
+    history = FlowHistory(str(tmp_path / 'flujos.sim'), chunk_rows=2)
+    history.record(0.0, np.array([1.0, 2.0]))
+    history.record(1.0, np.array([3.0, 4.0]))
+    history.record(2.0, np.array([5.0, 6.0, 7.0]))
+    assert np.array_equal(history.series(2), [0.0, 0.0, 7.0])
+
+
+def test_new_recording_replaces_existing_file(tmp_path):
+    filename = str(tmp_path / 'flujos.sim')
+    for _ in range(2):
+        history = FlowHistory(filename, chunk_rows=4)
+        record(history, 10, 2)
+        history.close()
+    reopened = FlowHistory.open(filename)
+    assert len(reopened) == 10
+    assert np.array_equal(reopened.times(), np.arange(10))
+
+
+def test_owned_file_rotates_oldest_chunks():
+    width, chunk_rows = 50, 8
+    chunk_bytes = 16 + 8 * chunk_rows + 4 * width * chunk_rows
+    history = FlowHistory(chunk_rows=chunk_rows, max_file_bytes=4 * chunk_bytes)
+    expected = record(history, 20 * chunk_rows, width)
+    history.flush()
+    assert os.path.getsize(history.filename) <= 4 * chunk_bytes + 8
+    assert history.dropped_rows > 0
+    assert len(history) + history.dropped_rows == len(expected)
+    times, matrix = history.rows(0)
+    assert np.array_equal(matrix, expected[history.dropped_rows:])
+    assert times[-1] == len(expected) - 1
+    history.clear()
@@ -0,0 +1,80 @@
+"""Solver hidráulico: conservación, pérdidas de Hazen-Williams y reutilización de la LU"""
+
+import numpy as np
+import pytest
+from config.settings import SIMULATION_SETTINGS
+from models.hydraulics import HW_EXPONENT, HydraulicSolver
+
+SETTINGS = dict(SIMULATION_SETTINGS['hydraulics'], accuracy=1e-10)
+UNIT = SETTINGS['flow_unit']
+
+# T(0) - A(1) - B(2) - D(4) con un lazo A - C(3) - B y una rama C - D
+SOURCE = np.array([0, 1, 1, 3, 2, 3])
+TARGET = np.array([1, 2, 3, 2, 4, 4])
+CAPACITY = np.array([40.0, 20.0, 15.0, 10.0, 12.0, 8.0])
+OBSTRUCTION = np.array([0.0, 0.0, 30.0, 0.0, 0.0, 0.0])
+DEMAND = np.array([0.0, 2.0, 6.0, 3.0, 5.0])
+
+
+def residuals(solver: HydraulicSolver, demand: np.ndarray, capacity: np.ndarray,
+              obstruction: np.ndarray):
+    """Desbalance de masa por nodo (relativo a la demanda) y de energía por tubería (m)"""
+    q = solver.flow
+    out = (np.bincount(solver.source, q, minlength=solver.node_count)
+           - np.bincount(solver.target, q, minlength=solver.node_count))
+    mass = (out[solver.unknown] / UNIT + demand[solver.unknown]) / np.linalg.norm(demand)
+    pipes = solver.pipes
+    r = solver._resistance(capacity[pipes], obstruction[pipes])
+    loss = r * np.abs(q[pipes]) ** (HW_EXPONENT - 1.0) * q[pipes]
+    drop = solver.head[solver.source[pipes]] - solver.head[solver.target[pipes]]
+    return mass, drop - loss
+
+
+def test_series_heads_match_hand_computation():
+    solver = HydraulicSolver(3, [0, 1], [1, 2], SETTINGS)
+    capacity = np.array([30.0, 10.0])
+    obstruction = np.zeros(2)
+    solver.solve(np.array([0.0, 4.0, 6.0]), [0], np.array([80.0]), capacity, obstruction,
+                 np.arange(2))
+    # En serie el caudal es la demanda aguas abajo; la carga cae r·Q^1.852 por tubería
+    q = np.array([10.0, 6.0]) * UNIT
+    r = solver._resistance(capacity, obstruction)
+    assert solver.flow == pytest.approx(q, rel=1e-8)
+    head_a = 80.0 - r[0] * q[0] ** HW_EXPONENT
+    assert solver.head[1] == pytest.approx(head_a, rel=1e-8)
+    assert solver.head[2] == pytest.approx(head_a - r[1] * q[1] ** HW_EXPONENT, rel=1e-8)
+    assert solver.pressure()[2] == pytest.approx(solver.head[2])
+
+
+def test_looped_network_balances_mass_and_energy():
+    solver = HydraulicSolver(5, SOURCE, TARGET, SETTINGS)
+    result = solver.solve(DEMAND, [0], np.array([70.0]), CAPACITY, OBSTRUCTION, np.arange(6))
+    assert result['error'] < SETTINGS['accuracy']
+    mass, energy = residuals(solver, DEMAND, CAPACITY, OBSTRUCTION)
+    assert np.abs(mass).max() <= SETTINGS['linear_tolerance']
+    assert np.abs(energy).max() < 1e-6
+    # Lo que sale del tanque es la demanda total
+    assert solver.flow[0] / UNIT == pytest.approx(DEMAND.sum())
+
+
+def test_warm_steps_reuse_the_factorization():
+    solver = HydraulicSolver(5, SOURCE, TARGET, SETTINGS)
+    solver.solve(DEMAND, [0], np.array([70.0]), CAPACITY, OBSTRUCTION, np.arange(6))
+    factorizations = solver.factorizations
+    for step in range(1, 4):
+        demand = DEMAND * (1.0 + 0.02 * step)
+        solver.solve(demand, [0], np.array([70.0 - step]), CAPACITY, OBSTRUCTION, np.arange(6))
+        mass, energy = residuals(solver, demand, CAPACITY, OBSTRUCTION)
+        assert np.abs(mass).max() <= SETTINGS['linear_tolerance']
+        assert np.abs(energy).max() < 1e-6
+    # Los pasos siguientes resuelven con gradiente conjugado sobre la misma LU
+    assert solver.factorizations == factorizations
+
+    # Cerrar una tubería cambia la estructura y obliga a factorizar de nuevo
+    open_pipes = np.array([0, 1, 2, 4, 5])
+    solver.solve(DEMAND, [0], np.array([70.0]), CAPACITY, OBSTRUCTION, open_pipes)
+    assert solver.factorizations > factorizations
+    assert solver.flow[3] == 0.0
+    mass, energy = residuals(solver, DEMAND, CAPACITY, OBSTRUCTION)
+    assert np.abs(mass).max() <= SETTINGS['linear_tolerance']
+    assert np.abs(energy).max() < 1e-6
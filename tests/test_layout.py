@@ -0,0 +1,60 @@
+"""Distribución automática: componentes empaquetadas, nodos nuevos y caché"""
+
+import numpy as np
+from config.settings import FILE_SETTINGS, VISUALIZATION_SETTINGS
+from models import layout
+from models.network import WaterNetwork
+
+EDGE_LENGTH = VISUALIZATION_SETTINGS['layout']['edge_length']
+
+
+def grid_edges(side: int):
+    index = np.arange(side * side).reshape(side, side)
+    source = np.concatenate([index[:, :-1].ravel(), index[:-1, :].ravel()])
+    target = np.concatenate([index[:, 1:].ravel(), index[1:, :].ravel()])
+    return source, target
+
+
+def test_isolated_nodes_and_small_components_stay_close():
+    side = 20
+    source, target = grid_edges(side)
+    alone = layout.multilevel_layout(side * side, source, target)
+    # Tres caminos cortos y diez nodos aislados junto a la grilla
+    extra = side * side + np.arange(12)
+    path = extra.reshape(3, 4)
+    source = np.concatenate([source, path[:, :-1].ravel()])
+    target = np.concatenate([target, path[:, 1:].ravel()])
+    pos = layout.multilevel_layout(side * side + 22, source, target)
+    assert np.ptp(pos, axis=0).max() < 1.5 * np.ptp(alone, axis=0).max()
+    rounded = {tuple(p) for p in np.round(pos, 6)}
+    assert len(rounded) == len(pos)
+
+
+def test_new_node_is_placed_next_to_its_neighbor():
+    network = WaterNetwork()
+    network.add_node('T', 'tanque')
+    network.add_node('A', 'interseccion')
+    network.add_pipe('T', 'A', 10.0)
+    positions = {'T': (100.0, 100.0), 'A': (103.0, 100.0)}
+    network.add_node('B', 'barrio', 10)
+    network.add_pipe('A', 'B', 5.0)
+    network.add_node('C', 'interseccion')
+    network.add_pipe('B', 'C', 5.0)
+    network.add_node('D', 'interseccion')
+
+    placed = layout.extend_layout(network, positions)
+    assert placed['T'] == positions['T'] and placed['A'] == positions['A']
+    assert np.hypot(*np.subtract(placed['B'], placed['A'])) <= EDGE_LENGTH + 1e-9
+    assert np.hypot(*np.subtract(placed['C'], placed['B'])) <= EDGE_LENGTH + 1e-9
+    assert np.hypot(*np.subtract(placed['D'], placed['T'])) < 3 * EDGE_LENGTH
+
+
+def test_disk_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setitem(FILE_SETTINGS, 'layout_cache_directory', tmp_path)
+    monkeypatch.setitem(FILE_SETTINGS, 'max_layout_cache_files', 3)
+    monkeypatch.setattr(layout, '_memory_cache', {})
+    for size in range(2, 9):
+        ids = [f'n{i}' for i in range(size)]
+        layout.cached_layout(ids, np.arange(size - 1), np.arange(1, size))
+    assert len(list(tmp_path.glob('*.npy'))) == 3
+    assert len(layout._memory_cache) <= layout.MEMORY_CACHE_ENTRIES
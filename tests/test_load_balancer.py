@@ -0,0 +1,58 @@
+"""Balance de carga: la desviación de utilización no empeora y el flujo es factible"""
+
+import random
+import numpy as np
+import pytest
+from models.network import WaterNetwork
+
+
+def random_network(rng: random.Random) -> WaterNetwork:
+    network = WaterNetwork()
+    size = rng.randint(5, 10)
+    for i in range(size):
+        if i < 2:
+            network.add_node(f'n{i}', 'tanque')
+        elif rng.random() < 0.5:
+            network.add_node(f'n{i}', 'barrio', rng.randint(1, 10))
+        else:
+            network.add_node(f'n{i}', 'interseccion')
+    for i in range(1, size):
+        network.add_pipe(f'n{rng.randrange(i)}', f'n{i}', rng.uniform(5, 40))
+    for _ in range(4):
+        a, b = rng.sample(range(size), 2)
+        network.add_pipe(f'n{a}', f'n{b}', rng.uniform(5, 40))
+    return network
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_balanced_load_never_exceeds_routing(seed):
+    network = random_network(random.Random(seed))
+    result = network.balance_load()
+    assert result['after_deviation'] <= result['before_deviation'] + 0.05
+    assert result['improvement'] >= -0.1
+
+    # El flujo equilibrado conserva masa: lo que sale de los tanques llega a los barrios
+    store = network.pipes
+    flow = network.balancer.flow
+    size = store.size
+    inflow = (np.bincount(store.target[:size], flow, minlength=store.node_count)
+              - np.bincount(store.source[:size], flow, minlength=store.node_count))
+    for tank, draw in network.balancer.tank_draw.items():
+        inflow[store.node_index[tank]] += draw
+    assert inflow.sum() == pytest.approx(result['served'], abs=0.05)
+    assert np.all(np.abs(flow[:size]) <= store.effective_capacity()[:size] * 1.01 + 1e-9)
+
+
+def test_rerun_starts_from_previous_solution():
+    network = random_network(random.Random(3))
+    first = network.balance_load()
+    assert not first['warm_start']
+    second = network.balance_load()
+    assert second['warm_start']
+    assert second['iterations'] < first['iterations']
+    assert second['after_deviation'] == pytest.approx(first['after_deviation'], abs=0.05)
+
+    # Otra topología descarta el arranque en caliente
+    network.add_node('extra', 'barrio', 2)
+    network.add_pipe('n0', 'extra', 10.0)
+    assert not network.balance_load()['warm_start']
@@ -0,0 +1,54 @@
+"""Confiabilidad Monte Carlo: componentes por lote y red serie-paralelo"""
+
+import numpy as np
+import pytest
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from config.settings import NETWORK_SETTINGS
+from models.network import WaterNetwork
+from models.reliability import ReliabilityEstimator, batch_components
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_batch_components_match_scipy(seed):
+    rng = np.random.default_rng(seed)
+    n = 40
+    source = rng.integers(0, n, 60)
+    target = rng.integers(0, n, 60)
+    alive = rng.random((25, 60)) < rng.uniform(0.2, 0.9)
+    roots = batch_components(n, source, target, alive)
+    for sample in range(alive.shape[0]):
+        block = roots[sample] - sample * n
+        assert np.all((block >= 0) & (block < n))
+        # Cada raíz es un nodo de su propio conjunto
+        assert np.array_equal(block[block], block)
+        kept = alive[sample]
+        graph = coo_matrix((np.ones(kept.sum()), (source[kept], target[kept])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        # Misma partición: la raíz determina la etiqueta y viceversa
+        assert len(set(zip(block.tolist(), labels.tolist()))) == len(set(labels.tolist()))
+        assert len(set(block.tolist())) == len(set(labels.tolist()))
+
+
+def test_series_parallel_estimate_within_confidence_interval():
+    p = 0.2
+    settings = dict(NETWORK_SETTINGS['reliability'], failure_probability=p,
+                    tolerance=0.01, max_samples=40000)
+    network = WaterNetwork()
+    network.add_tank('T', 1000, 100)
+    network.add_node('A', 'barrio', 3)
+    network.add_node('B', 'barrio', 3)
+    for u, v in [('T', 'A'), ('A', 'x'), ('x', 'B'), ('A', 'y'), ('y', 'B')]:
+        network.add_pipe(u, v, 10.0)
+
+    result = ReliabilityEstimator(network, settings).estimate(seed=1)
+    assert result['converged']
+    assert settings['min_samples'] <= result['samples'] < settings['max_samples']
+    assert result['half_width'] <= settings['tolerance']
+
+    # A: una tubería en serie; B: además dos ramas de dos tuberías en paralelo
+    expected = {'A': 1 - p, 'B': (1 - p) * (1 - (1 - (1 - p) ** 2) ** 2)}
+    for row in result['neighborhoods']:
+        assert row['low'] <= expected[row['neighborhood']] <= row['high']
+    system = result['system']
+    assert system['low'] <= expected['B'] <= system['high']
@@ -0,0 +1,71 @@
+"""Índice de rutas desde tanques contra networkx bajo ediciones"""
+
+import random
+import networkx as nx
+import pytest
+from models.network import WaterNetwork
+
+
+def open_graph(network: WaterNetwork) -> nx.Graph:
+    """Grafo con las tuberías sin bloquear"""
+    store = network.pipes
+    graph = nx.Graph()
+    graph.add_nodes_from(network.graph.nodes)
+    graph.add_edges_from(edge for edge in network.graph.edges
+                         if not store.blocked[store.slot(*edge)])
+    return graph
+
+
+def check_routes(network: WaterNetwork) -> None:
+    graph = open_graph(network)
+    for tank in network.tank_levels:
+        lengths = nx.single_source_shortest_path_length(graph, tank)
+        for node in graph.nodes:
+            path = network.find_shortest_path(tank, node)
+            if node not in lengths:
+                assert path is None
+                assert network.route_index.distance_from_tank(tank, node) == -1
+                continue
+            assert path[0] == tank and path[-1] == node
+            assert len(path) - 1 == lengths[node]
+            assert all(graph.has_edge(u, v) for u, v in zip(path, path[1:]))
+            assert network.route_index.distance_from_tank(tank, node) == lengths[node]
+            if node not in network.tank_levels:
+                # Hacia el tanque se devuelve la misma ruta invertida
+                assert network.find_shortest_path(node, tank) == path[::-1]
+
+
+def random_edit(network: WaterNetwork, rng: random.Random, nodes: list) -> None:
+    pipes = network.get_pipes()
+    action = rng.random()
+    if action < 0.35 or not pipes:
+        network.add_pipe(*rng.sample(nodes, 2), 5.0)
+    elif action < 0.55:
+        network.delete_pipe(*rng.choice(pipes))
+    elif action < 0.75:
+        network.block_pipe(*rng.choice(pipes))
+    elif action < 0.9:
+        network.unblock_pipe(*rng.choice(pipes))
+    else:
+        node_id = f'x{len(nodes)}'
+        network.add_node(node_id, rng.choice(['barrio', 'interseccion', 'tanque']), 3)
+        nodes.append(node_id)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_routes_match_networkx_under_edits(seed):
+    rng = random.Random(seed)
+    network = WaterNetwork()
+    nodes = []
+    for i in range(10):
+        node_type = 'tanque' if i < 2 else rng.choice(['barrio', 'interseccion'])
+        network.add_node(f'n{i}', node_type, 3)
+        nodes.append(f'n{i}')
+    for _ in range(14):
+        network.add_pipe(*rng.sample(nodes, 2), 5.0)
+    check_routes(network)
+    for _ in range(30):
+        random_edit(network, rng, nodes)
+        check_routes(network)
+    # Los árboles sobreviven a las ediciones que no los afectan
+    assert network.route_index.stats['built'] < 30 * len(network.tank_levels)
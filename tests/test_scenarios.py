@@ -0,0 +1,53 @@
+"""Barrido de escenarios en procesos contra la simulación secuencial"""
+
+import pytest
+from models.network import WaterNetwork
+from models.scenarios import (SHARED_FIELDS, SharedNetwork, resolve_scenario,
+                              run_scenario_sweep, simulate_scenario)
+
+SCENARIOS = [
+    {'name': 'base'},
+    {'name': 'pico', 'consumption_scale': 1.8, 'blocked_pipes': [('A', 'B')],
+     'obstructions': [('T', 'A', 40.0)], 'tank_levels': {'T': 30.0}}
+]
+
+
+def small_network() -> WaterNetwork:
+    network = WaterNetwork()
+    network.add_tank('T', 50.0, 80.0)
+    network.add_node('A', 'interseccion')
+    network.add_node('B', 'barrio', 6)
+    network.add_node('C', 'barrio', 10)
+    for u, v, capacity in [('T', 'A', 12.0), ('A', 'B', 4.0), ('A', 'C', 6.0), ('B', 'C', 2.0)]:
+        network.add_pipe(u, v, capacity)
+    return network
+
+
+@pytest.mark.parametrize('hydraulic', [False, True])
+def test_sweep_matches_sequential(hydraulic):
+    network = small_network()
+    network.set_hydraulic_mode(hydraulic)
+    engine = network.get_simulation_engine()
+    shared = SharedNetwork(engine)
+    try:
+        assert shared.hydraulic == hydraulic
+        arrays = {name: SharedNetwork.view(shared.memory, shared.layout, name).copy()
+                  for name, _ in SHARED_FIELDS}
+    finally:
+        shared.close()
+    expected = [simulate_scenario(arrays, resolve_scenario(network, scenario, i), 30, 1.0,
+                                  engine.settings, hydraulic)
+                for i, scenario in enumerate(SCENARIOS)]
+
+    rows = run_scenario_sweep(network, SCENARIOS, steps=30, max_workers=2)
+    assert rows == expected
+    assert [row['scenario'] for row in rows] == ['base', 'pico']
+    assert rows[1]['served_ratio'] < rows[0]['served_ratio']
+
+
+def test_hydraulic_mode_changes_the_sweep():
+    network = small_network()
+    routing = run_scenario_sweep(network, SCENARIOS[:1], steps=30, max_workers=1)
+    network.set_hydraulic_mode(True)
+    hydraulic = run_scenario_sweep(network, SCENARIOS[:1], steps=30, max_workers=1)
+    assert routing[0]['peak_utilization'] != hydraulic[0]['peak_utilization']
@@ -0,0 +1,91 @@
+"""Motor vectorizado: flujos y niveles contra una red resuelta a mano"""
+
+import numpy as np
+import pytest
+from config.settings import SIMULATION_SETTINGS
+from models.network import WaterNetwork
+from models.simulation import SimulationEngine, bfs_levels
+
+
+@pytest.fixture(autouse=True)
+def noon(monkeypatch):
+    """Mediodía: ningún patrón horario aplica y el factor de consumo es 1"""
+    monkeypatch.setitem(SIMULATION_SETTINGS, 'start_hour', 12)
+    monkeypatch.setitem(SIMULATION_SETTINGS, 'time_step', 1.0)
+    monkeypatch.setitem(SIMULATION_SETTINGS, 'consumption_per_house', 0.5)
+
+
+def diamond_network(tank_capacity: float = 1000.0, tank_level: float = 50.0) -> WaterNetwork:
+    """T → A → {B, C} → D; B pide 1 unidad y D pide 2
+
+    D tiene dos padres al mismo nivel (B y C) y recibe la mitad de cada uno.
+    La tubería C–D está guardada al revés y su capacidad recorta el flujo.
+    """
+    network = WaterNetwork()
+    network.add_tank('T', tank_capacity, tank_level)
+    network.add_node('A', 'interseccion')
+    network.add_node('B', 'barrio', 2)
+    network.add_node('C', 'interseccion')
+    network.add_node('D', 'barrio', 4)
+    network.add_pipe('T', 'A', 10.0)
+    network.add_pipe('A', 'B', 10.0)
+    network.add_pipe('A', 'C', 10.0)
+    network.add_obstruction('A', 'C', 50.0)
+    network.add_pipe('B', 'D', 10.0)
+    network.add_pipe('D', 'C', 0.5)
+    return network
+
+
+def test_bfs_levels():
+    source = np.array([0, 1, 1, 3])
+    target = np.array([1, 2, 3, 2])
+    level = bfs_levels(6, source, target, np.array([0]))
+    assert level.tolist() == [0, 1, 2, 2, -1, -1]
+    assert bfs_levels(6, source, target, np.array([2, 0])).tolist() == [0, 1, 0, 1, -1, -1]
+
+
+def test_step_matches_hand_computed_flows():
+    network = diamond_network()
+    engine = SimulationEngine.from_network(network)
+    result = engine.step()
+
+    store = network.pipes
+    flow = {pipe: float(store.flow[store.slot(*pipe)]) for pipe in
+            [('T', 'A'), ('A', 'B'), ('A', 'C'), ('B', 'D'), ('D', 'C')]}
+    # D reparte 2 unidades entre B y C; C–D se recorta a 0.5 y va de C a D
+    assert flow == pytest.approx({('T', 'A'): 3.0, ('A', 'B'): 2.0, ('A', 'C'): 1.0,
+                                  ('B', 'D'): 1.0, ('D', 'C'): -0.5})
+    assert result['demand'] == pytest.approx(3.0)
+    assert result['served'] == pytest.approx(2.5)
+    assert result['unserved'] == pytest.approx(0.5)
+    assert result['tank_outflow'] == pytest.approx(3.0)
+    assert result['peak_utilization'] == pytest.approx(1.0)
+    # 500 m³ menos 3 unidades en un paso de 1 s sobre 1000 m³
+    assert engine.tank_level[store.node_index['T']] == pytest.approx(49.7)
+    assert engine.time == pytest.approx(1.0)
+
+
+def test_empty_tank_stops_supply_on_next_step():
+    network = diamond_network(tank_capacity=2.0, tank_level=100.0)
+    engine = SimulationEngine.from_network(network)
+    first = engine.step()
+    assert first['tank_outflow'] == pytest.approx(3.0)
+    assert first['min_tank_level'] == 0.0
+
+    second = engine.step()
+    assert second['served'] == 0.0
+    assert second['unserved'] == pytest.approx(3.0)
+    assert not np.any(engine.flow)
+
+
+def test_update_simulation_and_reset_through_the_network():
+    network = diamond_network()
+    network.update_simulation()
+    network.update_simulation()
+    assert network.tank_levels['T'] == pytest.approx(49.4)
+    assert network.flows[('C', 'D')] == pytest.approx(0.5)
+    assert len(network.history) == 2
+
+    network.reset_simulation()
+    assert network.tank_levels['T'] == pytest.approx(50.0)
+    assert not np.any(network.pipes.flow)
@@ -0,0 +1,58 @@
+"""Copias congeladas para análisis en segundo plano y retorno de sus cachés"""
+
+import networkx as nx
+from models.network import WaterNetwork
+
+
+def sample_network() -> WaterNetwork:
+    network = WaterNetwork()
+    network.add_tank('T', 2.0, 100.0)
+    network.add_tank('T2', 500.0, 50.0)
+    for node_id in ('A', 'B', 'C'):
+        network.add_node(node_id, 'barrio', 4)
+    for u, v, capacity in [('T', 'A', 5.0), ('A', 'B', 3.0), ('B', 'C', 4.0),
+                           ('T2', 'C', 2.0), ('A', 'C', 1.0)]:
+        network.add_pipe(u, v, capacity)
+    network.remove_tank('T2')
+    return network
+
+
+def test_snapshot_builds_its_graph_only_when_used():
+    network = sample_network()
+    frozen = network.snapshot()
+    assert frozen._graph_types is not None
+    assert nx.utils.graphs_equal(frozen.graph, network.graph)
+    assert 'T2' not in frozen.graph
+
+
+def test_snapshot_carries_the_flow_cache_and_adopt_returns_it():
+    network = sample_network()
+    first = network.analyze_flow_capacity('T', 'C')
+    frozen = network.snapshot()
+    assert frozen.flow_cache.cached('T', 'C') == first
+    computed = frozen.analyze_flow_capacity('A', 'C')
+    # La copia no toca la caché de la red original
+    assert network.flow_cache.cached('A', 'C') is None
+
+    assert network.adopt(frozen)
+    assert network.flow_cache is frozen.flow_cache and frozen.flow_cache.network is network
+    assert network.flow_cache.cached('A', 'C') == computed
+    assert network.flow_cache.cached('T', 'C') == first
+
+
+def test_adopt_tolerates_simulation_steps_but_not_edits():
+    network = sample_network()
+    network.analyze_flow_capacity('T', 'B')
+    frozen = network.snapshot()
+    frozen.analyze_flow_capacity('T', 'C')
+    # El tanque T (2 m³) se vacía durante la simulación
+    for _ in range(100):
+        network.update_simulation()
+    assert network.tank_levels['T'] == 0.0
+    assert network.adopt(frozen)
+    assert network.flow_cache.cached('T', 'C') == 0.0
+    assert network.flow_cache.cached('T', 'B') == 0.0
+
+    frozen = network.snapshot()
+    network.add_obstruction('A', 'B', 30.0)
+    assert not network.adopt(frozen)
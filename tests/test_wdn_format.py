@@ -0,0 +1,85 @@
+"""Formato .wdn: ida y vuelta con JSON y carga respaldada por el archivo"""
+
+import json
+import numpy as np
+from models.network import WaterNetwork
+from utils.file_handler import NetworkFileHandler
+from utils.wdn_format import json_to_wdn, load_wdn, save_wdn, wdn_to_json
+
+
+def sample_network() -> WaterNetwork:
+    network = WaterNetwork()
+    network.add_node('T', 'tanque')
+    network.add_node('ñ', 'barrio', 4)
+    network.add_node('X', 'interseccion')
+    network.add_node('B', 'barrio', 2)
+    network.add_pipe('T', 'X', 10.0)
+    network.add_pipe('X', 'ñ', 5.0)
+    network.add_pipe('X', 'B', 3.0)
+    network.add_obstruction('X', 'B', 40.0)
+    network.delete_pipe('X', 'ñ')
+    network.add_pipe('ñ', 'B', 7.0)
+    return network
+
+
+def contents(network: WaterNetwork):
+    store = network.pipes
+    pipes = {}
+    for slot in store.active_slots().tolist():
+        u, v = sorted(store.endpoints(slot))
+        pipes[u, v] = (float(store.capacity[slot]), float(store.obstruction[slot]))
+    nodes = {node_id: attrs['type'] for node_id, attrs in network.graph.nodes(data=True)}
+    edges = {tuple(sorted(edge)) for edge in network.graph.edges}
+    return nodes, pipes, edges, dict(network.neighborhoods), dict(network.tank_levels)
+
+
+def test_json_round_trip(tmp_path):
+    network = sample_network()
+    wdn, text, back = (str(tmp_path / name) for name in ('red.wdn', 'red.json', 'copia.wdn'))
+    save_wdn(network, wdn)
+    wdn_to_json(wdn, text)
+    assert json.load(open(text, encoding='utf-8'))['nodos'][1] == \
+        {'id': 'ñ', 'tipo': 'barrio', 'num_casas': 4}
+    json_to_wdn(text, back)
+    loaded = WaterNetwork()
+    load_wdn(back, loaded).close()
+    assert contents(loaded) == contents(network)
+
+
+def test_loaded_network_is_editable_and_can_overwrite_its_file(tmp_path):
+    filename = str(tmp_path / 'red.wdn')
+    save_wdn(sample_network(), filename)
+    network = WaterNetwork()
+    assert NetworkFileHandler.load_network(filename, network)
+    assert network.pipes.find('X', 'T') is not None
+
+    network.add_obstruction('T', 'X', 25.0)
+    network.add_pipe('B', 'T', 1.5)
+    network.delete_pipe('X', 'B')
+    assert network.find_shortest_path('T', 'B') == ['T', 'B']
+    # El archivo sigue mapeado por la red mientras se reescribe
+    assert NetworkFileHandler.save_network(filename, network)
+    expected = contents(network)
+
+    reloaded = WaterNetwork()
+    assert NetworkFileHandler.load_network(filename, reloaded)
+    assert contents(reloaded) == expected
+    assert np.array_equal(network.pipes.effective_capacity()[network.pipes.active_slots()],
+                          reloaded.pipes.effective_capacity()[reloaded.pipes.active_slots()])
+
+
+def test_removed_nodes_are_not_saved(tmp_path):
+    filename = str(tmp_path / 'red.wdn')
+    network = sample_network()
+    network.add_tank('T2', 500.0, 80.0)
+    network.add_pipe('T2', 'B', 2.0)
+    network.add_tank('T3', 500.0, 60.0)
+    network.add_pipe('T3', 'X', 4.0)
+    network.remove_tank('T2')
+    save_wdn(network, filename)
+
+    loaded = WaterNetwork()
+    load_wdn(filename, loaded).close()
+    assert 'T2' not in loaded.graph and 'T2' not in loaded.pipes.node_index
+    assert contents(loaded)[:4] == contents(network)[:4]
+    assert loaded.pipes.find('T3', 'X') is not None